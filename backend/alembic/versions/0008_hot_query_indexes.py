@@ -0,0 +1,61 @@
+"""Composite and partial indexes for hot practice queries
+
+Revision ID: 0008_hot_query_indexes
+Revises: 0007_topics_table
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0008_hot_query_indexes"
+down_revision = "0007_topics_table"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # PracticeRepository.get_active_session: user + skill, unfinished only, newest activity first.
+    op.create_index(
+        "ix_practice_sessions_active_user_skill",
+        "practice_sessions",
+        ["user_id", "skill_id", "last_activity_at"],
+        unique=False,
+        postgresql_where=sa.text("finished_at IS NULL"),
+    )
+
+    # AnalyticsService.questions_log: user + skill ordered by answered_at.
+    op.create_index(
+        "ix_practice_attempts_user_skill_answered",
+        "practice_attempts",
+        ["user_id", "skill_id", "answered_at"],
+        unique=False,
+    )
+    # Session report: attempts of one session ordered by answered_at.
+    op.create_index(
+        "ix_practice_attempts_session_answered",
+        "practice_attempts",
+        ["session_id", "answered_at"],
+        unique=False,
+    )
+    # QuestionRepository.list_for_skill_levels: skill + level IN (...).
+    op.create_index("ix_questions_skill_level", "questions", ["skill_id", "level"], unique=False)
+
+    # The composites above lead with these columns, so the single-column versions only cost writes.
+    op.drop_index("ix_practice_attempts_user_id", table_name="practice_attempts")
+    op.drop_index("ix_practice_attempts_session_id", table_name="practice_attempts")
+    op.drop_index("ix_questions_skill_id", table_name="questions")
+
+
+def downgrade() -> None:
+    op.create_index("ix_questions_skill_id", "questions", ["skill_id"], unique=False)
+    op.create_index("ix_practice_attempts_session_id", "practice_attempts", ["session_id"], unique=False)
+    op.create_index("ix_practice_attempts_user_id", "practice_attempts", ["user_id"], unique=False)
+
+    op.drop_index("ix_questions_skill_level", table_name="questions")
+    op.drop_index("ix_practice_attempts_session_answered", table_name="practice_attempts")
+    op.drop_index("ix_practice_attempts_user_skill_answered", table_name="practice_attempts")
+    op.drop_index("ix_practice_sessions_active_user_skill", table_name="practice_sessions")
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hmac
+import json
+import logging
+import os
+import socket
+import time
+
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.errors import AppError
+from app.core.logging import logging_stats
+from app.core.metrics import CONTENT_TYPE, REGISTRY, Family, merge_expositions, register_collector, stats_family
+from app.db.session import pool_stats
+from app.plugins.compiler import get_tsx_compiler
+from app.plugins.registry import get_plugin_registry
+from app.utils.local_cache import cache_stats
+from app.utils.pdf_cache import get_pdf_cache
+from app.utils.pdf_pool import get_pdf_pool
+from app.worker.queue import get_job_queue
+from app.worker.worker import parse_queues
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get(settings.metrics_path, include_in_schema=False)
+async def metrics(request: Request) -> PlainTextResponse:
+    if settings.metrics_token:
+        expected = f"Bearer {settings.metrics_token}"
+        if not hmac.compare_digest(request.headers.get("authorization", ""), expected):
+            raise AppError(status_code=401, code="unauthorized", message="Invalid metrics token")
+    if _shared is not None:
+        return PlainTextResponse(await _shared.collect(), media_type=CONTENT_TYPE)
+    return PlainTextResponse(await REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+def _db_pool() -> list[Family]:
+    stats = pool_stats()
+    rows = [({"engine": "primary"}, stats)]
+    if stats.get("replica"):
+        rows.append(({"engine": "replica"}, stats["replica"]))
+    families = stats_family("db_pool", "Database pool", rows)
+    if stats.get("health"):
+        families += stats_family("db_health", "Database health check", [({}, stats["health"])])
+    return families
+
+
+def _pdf() -> list[Family]:
+    families = stats_family("pdf_pool", "PDF render pool", [({}, get_pdf_pool().stats())])
+    cache = get_pdf_cache()
+    if cache is not None:
+        families += stats_family("pdf_cache", "PDF disk cache", [({}, cache.stats())])
+    return families
+
+
+def _tsx_compiler() -> list[Family]:
+    return stats_family("tsx_compiler", "TSX compiler", [({}, get_tsx_compiler().stats())])
+
+
+def _plugin_registry() -> list[Family]:
+    return stats_family("plugin_registry", "Plugin registry", [({}, get_plugin_registry().stats())])
+
+
+async def _job_queues() -> list[Family]:
+    backend = get_job_queue()
+    rows = [({"queue": q}, await backend.depth(q)) for q in parse_queues(settings.worker_queues)]
+    return stats_family("job_queue", "Job queue depth", rows)
+
+
+def _local_caches() -> list[Family]:
+    return stats_family("local_cache", "In-process cache", [({"cache": name}, stats) for name, stats in cache_stats().items()])
+
+
+def _logging() -> list[Family]:
+    return stats_family("log_records", "Log sink", [({}, logging_stats())])
+
+
+for _collector in (_db_pool, _pdf, _tsx_compiler, _plugin_registry, _job_queues, _local_caches, _logging):
+    register_collector(_collector)
+
+
+class SharedMetrics:
+    """Metrics of all API processes on this host, whichever process answers the scrape.
+
+    Counters live in process memory, so with several gunicorn workers each one publishes its
+    exposition to a per-host Redis hash every `interval_sec`; a scrape merges the fresh entries
+    with its own current numbers, labelling samples with `worker`.
+    """
+
+    def __init__(self, redis: Redis, interval_sec: float) -> None:
+        self._redis = redis
+        self._interval_sec = interval_sec
+        self._key = f"metrics:workers:{socket.gethostname()}"
+        self.worker = str(os.getpid())
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def _publish(self, text: str) -> None:
+        await self._redis.hset(self._key, self.worker, json.dumps({"at": time.time(), "text": text}))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._publish(await REGISTRY.render())
+            except RedisError as exc:
+                logger.warning("Publishing metrics failed: %s", exc)
+            await asyncio.sleep(self._interval_sec)
+
+    async def collect(self) -> str:
+        own = await REGISTRY.render()
+        renders = {self.worker: own}
+        try:
+            await self._publish(own)
+            stale_before = time.time() - 3 * self._interval_sec
+            for worker, raw in (await self._redis.hgetall(self._key)).items():
+                entry = json.loads(raw)
+                if worker == self.worker:
+                    continue
+                if entry["at"] < stale_before:
+                    # A worker that exited without cleaning up (killed, or recycled mid-write).
+                    await self._redis.hdel(self._key, worker)
+                    continue
+                renders[worker] = entry["text"]
+        except RedisError as exc:
+            logger.warning("Reading shared metrics failed: %s", exc)
+        return merge_expositions(renders)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        with contextlib.suppress(RedisError):
+            await self._redis.hdel(self._key, self.worker)
+
+
+_shared: SharedMetrics | None = None
+
+
+def init_shared_metrics(redis: Redis, interval_sec: float) -> None:
+    global _shared
+    _shared = SharedMetrics(redis, interval_sec)
+    _shared.start()
+
+
+async def close_shared_metrics() -> None:
+    global _shared
+    if _shared is not None:
+        await _shared.close()
+        _shared = None
@@ -2,10 +2,19 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends
 
+from app.core.config import settings
+from app.core.errors import AppError
 from app.core.rbac import require_roles
+from app.db.session import pool_stats
+from app.plugins.compiler import get_tsx_compiler
+from app.plugins.registry import get_plugin_registry
 from app.schemas.admin import BulkImportRequest
 from app.schemas.base import ApiResponse
 from app.services.admin_service import AdminService
+from app.utils.pdf_cache import get_pdf_cache
+from app.utils.pdf_pool import get_pdf_pool
+from app.worker.queue import get_job, get_job_queue
+from app.worker.worker import parse_queues
 
 from app.api.v1.routes.admin_routes import grades, questions, skills, subjects, topics
 from app.plugins.router import router as plugins_router
@@ -23,3 +32,38 @@ router.include_router(plugins_router, prefix="/plugins", tags=["Admin"])
 async def bulk_import(body: BulkImportRequest, svc: AdminService = Depends()):
     res = await svc.bulk_import(body)
     return ApiResponse(data=res.model_dump(mode="json"))
+
+
+@router.get("/db-pool", response_model=ApiResponse[dict], dependencies=[Depends(require_roles("ADMIN"))], tags=["Admin"])
+async def db_pool_stats():
+    return ApiResponse(data=pool_stats())
+
+
+@router.get("/pdf-pool", response_model=ApiResponse[dict], dependencies=[Depends(require_roles("ADMIN"))], tags=["Admin"])
+async def pdf_pool_stats():
+    cache = get_pdf_cache()
+    return ApiResponse(data={**get_pdf_pool().stats(), "cache": cache.stats() if cache else None})
+
+
+@router.get("/tsx-compiler", response_model=ApiResponse[dict], dependencies=[Depends(require_roles("ADMIN"))], tags=["Admin"])
+async def tsx_compiler_stats():
+    return ApiResponse(data=get_tsx_compiler().stats())
+
+
+@router.get("/plugin-registry", response_model=ApiResponse[dict], dependencies=[Depends(require_roles("ADMIN"))], tags=["Admin"])
+async def plugin_registry_stats():
+    return ApiResponse(data=get_plugin_registry().stats())
+
+
+@router.get("/jobs/queues", response_model=ApiResponse[dict], dependencies=[Depends(require_roles("ADMIN"))], tags=["Admin"])
+async def job_queues():
+    backend = get_job_queue()
+    return ApiResponse(data={q: await backend.depth(q) for q in parse_queues(settings.worker_queues)})
+
+
+@router.get("/jobs/{job_id}", response_model=ApiResponse[dict], dependencies=[Depends(require_roles("ADMIN"))], tags=["Admin"])
+async def job_status(job_id: str):
+    job = await get_job(job_id)
+    if job is None:
+        raise AppError(status_code=404, code="not_found", message="Job not found")
+    return ApiResponse(data=job.public())
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 
+from app.core.config import settings
 from app.core.rbac import require_roles
-from app.schemas.admin import BulkImportRequest, InteractiveQuestionCreate, PluginQuestionCreate, QuestionCreate, QuestionUpdate
+from app.schemas.admin import BulkImportRequest, BulkImportResponse, InteractiveQuestionCreate, PluginQuestionCreate, QuestionCreate, QuestionUpdate
 from app.schemas.base import ApiResponse, PaginatedMeta
 from app.services.admin_service import AdminService
+from app.services.bulk_import import json_rows, ndjson_rows
 
 router = APIRouter(dependencies=[Depends(require_roles("ADMIN"))])
 
@@ -84,6 +86,21 @@ async def bulk_import(body: BulkImportRequest, svc: AdminService = Depends()):
     return ApiResponse(data=res.model_dump(mode="json"))
 
 
+@router.post("/import", response_model=ApiResponse[BulkImportResponse])
+async def import_questions(request: Request, svc: AdminService = Depends()):
+    """Импорт навыков и вопросов из JSON или NDJSON (`application/x-ndjson`, читается потоком).
+
+    Ошибочные строки пропускаются и перечисляются в `errors`, остальные импортируются.
+    """
+    max_bytes = settings.bulk_import_max_mb * 2**20
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in ("application/x-ndjson", "application/jsonl", "application/jsonlines"):
+        rows = ndjson_rows(request.stream(), max_bytes=max_bytes)
+    else:
+        rows = await json_rows(request.stream(), max_bytes=max_bytes)
+    return ApiResponse(data=await svc.import_rows(rows))
+
+
 @router.post("/interactive", response_model=ApiResponse[dict])
 async def create_interactive_question(body: InteractiveQuestionCreate, svc: AdminService = Depends()):
     """Создание интерактивного задания с кодом компонента"""
@@ -1,20 +1,24 @@
 from __future__ import annotations
 
+from datetime import date
+
 from fastapi import APIRouter, Depends
 
 from app.core.deps import get_current_user
+from app.db.query_tracer import query_budget
 from app.schemas.base import ApiResponse
 from app.services.analytics_service import AnalyticsService
+from app.services.csv_export_service import CsvExportService, csv_response
 
 router = APIRouter()
 
 
-@router.get("/overview", response_model=ApiResponse[dict])
+@router.get("/overview", response_model=ApiResponse[dict], dependencies=[Depends(query_budget(6))])
 async def overview(user=Depends(get_current_user), svc: AnalyticsService = Depends()):
     return ApiResponse(data=await svc.overview(user_id=user.id))
 
 
-@router.get("/skills", response_model=ApiResponse[list[dict]])
+@router.get("/skills", response_model=ApiResponse[list[dict]], dependencies=[Depends(query_budget(4))])
 async def skills(user=Depends(get_current_user), svc: AnalyticsService = Depends()):
     return ApiResponse(data=await svc.skills(user_id=user.id))
 
@@ -37,6 +41,21 @@ async def questions_log(
     )
 
 
+@router.get("/skills/{skill_id}/attempts.csv")
+async def skill_attempts_csv(
+    skill_id: int,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    user=Depends(get_current_user),
+    svc: CsvExportService = Depends(),
+):
+    role_value = getattr(user.role, "value", user.role)
+    export = await svc.skill_attempts(
+        requester_id=user.id, requester_role=role_value, skill_id=skill_id, date_from=date_from, date_to=date_to
+    )
+    return csv_response(export)
+
+
 @router.get("/all-questions", response_model=ApiResponse[list[dict]])
 async def all_questions(user=Depends(get_current_user), svc: AnalyticsService = Depends()):
     return ApiResponse(data=await svc.all_questions(user_id=user.id))
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, Request
 
 from app.core.config import settings
 from app.core.rate_limit import rate_limit_dep
+from app.core.responses import api_response
 from app.schemas.auth import (
     AuthLoginRequest,
     AuthRefreshRequest,
@@ -29,7 +30,7 @@ async def register(
     _rl: None = Depends(rate_limit_dep(limit=settings.auth_rate_limit, window_sec=settings.auth_rate_window_sec)),
 ):
     tokens = await svc.register(body)
-    return ApiResponse(data=tokens)
+    return api_response(data=tokens)
 
 
 @router.post(
@@ -43,7 +44,7 @@ async def login(
     _rl: None = Depends(rate_limit_dep(limit=settings.auth_rate_limit, window_sec=settings.auth_rate_window_sec)),
 ):
     tokens = await svc.login(body)
-    return ApiResponse(data=tokens)
+    return api_response(data=tokens)
 
 
 @router.post("/refresh", response_model=ApiResponse[AuthTokensResponse])
@@ -52,11 +53,11 @@ async def refresh(
     svc: AuthService = Depends(),
 ):
     tokens = await svc.refresh(body.refresh_token)
-    return ApiResponse(data=tokens)
+    return api_response(data=tokens)
 
 
 @router.post("/logout", response_model=ApiResponse[dict])
 async def logout(body: LogoutRequest, svc: AuthService = Depends()):
     await svc.logout(body.refresh_token)
-    return ApiResponse(data={"ok": True})
+    return api_response(data={"ok": True})
 
@@ -3,6 +3,7 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, Query
 
 from app.core.deps import get_current_user, get_current_user_optional, get_or_create_guest_user
+from app.core.responses import api_response
 from app.schemas.base import ApiResponse, PaginatedMeta
 from app.schemas.catalog import (
     GradeResponse,
@@ -19,17 +20,17 @@ router = APIRouter()
 
 @router.get("/subjects", response_model=ApiResponse[list[SubjectResponse]])
 async def list_subjects(svc: CatalogService = Depends()):
-    return ApiResponse(data=await svc.list_subjects())
+    return api_response(data=await svc.list_subjects())
 
 
 @router.get("/grades", response_model=ApiResponse[list[GradeResponse]])
 async def list_grades(svc: CatalogService = Depends()):
-    return ApiResponse(data=await svc.list_grades())
+    return api_response(data=await svc.list_grades())
 
 
 @router.get("/topics", response_model=ApiResponse[list[TopicResponse]])
 async def list_topics(svc: CatalogService = Depends()):
-    return ApiResponse(data=await svc.list_topics())
+    return api_response(data=await svc.list_topics())
 
 
 @router.get("/skills", response_model=ApiResponse[list[SkillListItem]])
@@ -50,12 +51,12 @@ async def list_skills(
         page=page,
         page_size=page_size,
     )
-    return ApiResponse(data=items, meta=PaginatedMeta(page=page, page_size=page_size, total=total))
+    return api_response(data=items, meta=PaginatedMeta(page=page, page_size=page_size, total=total))
 
 
 @router.get("/skills/{skill_id}", response_model=ApiResponse[SkillDetailResponse])
 async def get_skill(skill_id: int, svc: CatalogService = Depends()):
-    return ApiResponse(data=await svc.get_skill(skill_id))
+    return api_response(data=await svc.get_skill(skill_id))
 
 
     effective_user = user if user is not None else guest_user
@@ -75,4 +76,4 @@ async def update_skill(
          # For now, simplistic check or handled by service/policy
          pass 
 
-    return ApiResponse(data=await svc.update_skill(skill_id, data))
+    return api_response(data=await svc.update_skill(skill_id, data))
@@ -6,6 +6,7 @@ from app.core.config import settings
 from app.core.deps import get_current_user, get_current_user_optional, get_or_create_guest_user
 from app.core.idempotency import idempotency_get, idempotency_set
 from app.core.rate_limit import rate_limit_dep
+from app.core.responses import ApiJSONResponse, api_response
 from app.schemas.base import ApiResponse
 from app.schemas.practice import (
     PracticeHeartbeatRequest,
@@ -37,7 +38,7 @@ async def create_session(
     result = await svc.start_session(user_id=effective_user.id, skill_id=body.skill_id)
     resp = ApiResponse(data=result)
     await idempotency_set(user_id=user_id_for_cache, key=idempotency_key, request_body=body, response=resp)
-    return resp
+    return ApiJSONResponse(resp)
 
 
 @router.get("/sessions/{session_id}", response_model=ApiResponse[PracticeSessionResponse])
@@ -48,7 +49,7 @@ async def get_session(
     svc: PracticeService = Depends(),
 ):
     effective_user = user if user is not None else guest_user
-    return ApiResponse(data=await svc.get_session(user_id=effective_user.id, session_id=session_id))
+    return api_response(data=await svc.get_session(user_id=effective_user.id, session_id=session_id))
 
 
 @router.post("/sessions/{session_id}/next", response_model=ApiResponse[dict])
@@ -59,7 +60,7 @@ async def next_question(
     svc: PracticeService = Depends(),
 ):
     effective_user = user if user is not None else guest_user
-    return ApiResponse(data=await svc.next_question(user_id=effective_user.id, session_id=session_id))
+    return api_response(data=await svc.next_question(user_id=effective_user.id, session_id=session_id))
 
 
 @router.post("/sessions/{session_id}/submit", response_model=ApiResponse[PracticeSubmitResponse])
@@ -79,7 +80,7 @@ async def submit_answer(
     result = await svc.submit(user_id=effective_user.id, session_id=session_id, req=body)
     resp = ApiResponse(data=result)
     await idempotency_set(user_id=effective_user.id, key=idempotency_key, request_body=body, response=resp)
-    return resp
+    return ApiJSONResponse(resp)
 
 
 @router.post("/sessions/{session_id}/finish", response_model=ApiResponse[dict])
@@ -97,7 +98,7 @@ async def finish(
     await svc.finish(user_id=effective_user.id, session_id=session_id)
     resp = ApiResponse(data={"ok": True})
     await idempotency_set(user_id=effective_user.id, key=idempotency_key, request_body={"session_id": session_id}, response=resp)
-    return resp
+    return ApiJSONResponse(resp)
 
 
 @router.post("/sessions/{session_id}/heartbeat", response_model=ApiResponse[PracticeSessionResponse])
@@ -110,4 +111,4 @@ async def heartbeat(
 ):
     # We currently only use server-time based updates; client fields are accepted for future tuning.
     effective_user = user if user is not None else guest_user
-    return ApiResponse(data=await svc.heartbeat(user_id=effective_user.id, session_id=session_id))
+    return api_response(data=await svc.heartbeat(user_id=effective_user.id, session_id=session_id))
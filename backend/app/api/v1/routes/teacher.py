@@ -1,17 +1,29 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import json
+from collections.abc import AsyncIterator
+from datetime import date
 
+from fastapi import APIRouter, Depends, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, StreamingResponse
+
+from app.core.config import settings
 from app.core.deps import get_current_user
 from app.core.rbac import require_roles
+from app.db.query_tracer import query_budget
 from app.schemas.base import ApiResponse
+from app.schemas.report import ReportExportRequest
 from app.services.analytics_service import AnalyticsService
 from app.services.assignment_service import AssignmentService
+from app.services.csv_export_service import CsvExportService, csv_response
+from app.services.report_export_service import ReportExportService
+from app.utils.score_grid_bus import ScoreGridSubscription
 
 router = APIRouter(dependencies=[Depends(require_roles("TEACHER"))])
 
 
-@router.get("/analytics/classroom/{classroom_id}", response_model=ApiResponse[dict])
+@router.get("/analytics/classroom/{classroom_id}", response_model=ApiResponse[dict], dependencies=[Depends(query_budget(6))])
 async def classroom_analytics(
     classroom_id: str,
     user=Depends(get_current_user),
@@ -20,7 +32,11 @@ async def classroom_analytics(
     return ApiResponse(data=await svc.classroom_analytics(teacher_id=user.id, classroom_id=classroom_id))
 
 
-@router.get("/classrooms/{classroom_id}/assignments/{assignment_id}/score-grid", response_model=ApiResponse[dict])
+@router.get(
+    "/classrooms/{classroom_id}/assignments/{assignment_id}/score-grid",
+    response_model=ApiResponse[dict],
+    dependencies=[Depends(query_budget(4))],
+)
 async def assignment_score_grid(
     classroom_id: str,
     assignment_id: str,
@@ -28,3 +44,96 @@ async def assignment_score_grid(
     svc: AssignmentService = Depends(),
 ):
     return ApiResponse(data=await svc.score_grid(teacher_id=user.id, classroom_id=classroom_id, assignment_id=assignment_id))
+
+
+@router.get("/classrooms/{classroom_id}/assignments/{assignment_id}/score-grid.csv")
+async def assignment_score_grid_csv(
+    classroom_id: str,
+    assignment_id: str,
+    user=Depends(get_current_user),
+    svc: CsvExportService = Depends(),
+):
+    return csv_response(await svc.score_grid(teacher_id=user.id, classroom_id=classroom_id, assignment_id=assignment_id))
+
+
+@router.get("/classrooms/{classroom_id}/attempts.csv")
+async def classroom_attempts_csv(
+    classroom_id: str,
+    skill_id: int | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    user=Depends(get_current_user),
+    svc: CsvExportService = Depends(),
+):
+    export = await svc.classroom_attempts(
+        teacher_id=user.id, classroom_id=classroom_id, skill_id=skill_id, date_from=date_from, date_to=date_to
+    )
+    return csv_response(export)
+
+
+@router.get("/classrooms/{classroom_id}/assignments/{assignment_id}/score-grid/stream")
+async def assignment_score_grid_stream(
+    classroom_id: str,
+    assignment_id: str,
+    request: Request,
+    user=Depends(get_current_user),
+    svc: AssignmentService = Depends(),
+):
+    snapshot, sub = await svc.score_grid_stream(teacher_id=user.id, classroom_id=classroom_id, assignment_id=assignment_id)
+    return StreamingResponse(
+        _score_grid_events(request, snapshot, sub),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data), separators=(',', ':'))}\n\n"
+
+
+async def _score_grid_events(request: Request, snapshot: dict, sub: ScoreGridSubscription) -> AsyncIterator[str]:
+    try:
+        yield _sse("snapshot", snapshot)
+        while not await request.is_disconnected():
+            deltas = await sub.get(timeout=settings.score_grid_sse_ping_sec)
+            if not deltas:
+                # Keeps proxies from closing an idle connection.
+                yield ": ping\n\n"
+                continue
+            for delta in deltas:
+                yield _sse("delta", delta)
+            if sub.dropped:
+                # The client fell behind and missed deltas; EventSource reconnects and gets a fresh snapshot.
+                yield _sse("resync", {"dropped": sub.dropped})
+                return
+    finally:
+        await sub.close()
+
+
+@router.post("/report-exports", response_model=ApiResponse[dict], status_code=202)
+async def create_report_export(
+    body: ReportExportRequest,
+    user=Depends(get_current_user),
+    svc: ReportExportService = Depends(),
+):
+    return ApiResponse(data=await svc.create_export(teacher_id=user.id, req=body))
+
+
+@router.get("/report-exports/{job_id}", response_model=ApiResponse[dict])
+async def get_report_export(
+    job_id: str,
+    user=Depends(get_current_user),
+    svc: ReportExportService = Depends(),
+):
+    return ApiResponse(data=await svc.get_export(teacher_id=user.id, job_id=job_id))
+
+
+@router.get("/report-exports/{job_id}/file")
+async def download_report_export(
+    job_id: str,
+    user=Depends(get_current_user),
+    svc: ReportExportService = Depends(),
+):
+    path, fmt = await svc.export_file(teacher_id=user.id, job_id=job_id)
+    media_type = "application/zip" if fmt == "zip" else "application/pdf"
+    return FileResponse(path, media_type=media_type, filename=f"reports-{job_id}.{fmt}")
@@ -0,0 +1,42 @@
+"""Request body size limits for upload endpoints, enforced before the body is parsed.
+
+FastAPI reads a multipart body (spooling files to memory or disk) before any dependency or
+handler runs, so a limit checked in the handler only applies after the whole upload arrived.
+This middleware rejects a declared `Content-Length` over the limit without reading the body
+and stops a chunked or mislabelled body as soon as it passes the limit.
+"""
+
+from __future__ import annotations
+
+from starlette.exceptions import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class BodyLimitMiddleware:
+    """`limits` maps an exact request path to the largest body it accepts, in bytes."""
+
+    def __init__(self, app: ASGIApp, limits: dict[str, int]) -> None:
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        max_bytes = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+        declared = dict(scope["headers"]).get(b"content-length")
+        received = 0
+
+        async def _receive() -> Message:
+            nonlocal received
+            # Raised from inside body parsing: FastAPI passes HTTPException through to the handlers.
+            if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+                raise HTTPException(status_code=413, detail=f"Request body is larger than {max_bytes} bytes")
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Request body is larger than {max_bytes} bytes")
+            return message
+
+        await self.app(scope, _receive, send)
@@ -11,9 +11,33 @@ class Settings(BaseSettings):
     environment: str = "local"
     api_v1_prefix: str = "/api/v1"
 
+    log_level: str = "INFO"
+    # Keep a fraction of hot-path debug/info events by name, e.g. "practice.submit.*=0.01"
+    log_sample_rates: str = ""
+    # Records waiting for the writer thread; beyond this they are dropped (see /metrics)
+    log_queue_size: int = 10000
+
     database_url: str
     redis_url: str
 
+    # Connection pool per process (API and each worker process)
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_recycle_sec: int = 1800
+    db_pool_timeout_sec: float = 10.0
+    # Postgres session settings (ms, 0 = server default) and asyncpg prepared statement cache
+    db_statement_timeout_ms: int = 60000
+    db_idle_in_transaction_timeout_ms: int = 60000
+    db_prepared_statement_cache_size: int = 100
+    # Periodic SELECT 1 instead of a pre-ping on every checkout; 0 = pre-ping
+    db_health_check_interval_sec: float = 15.0
+    # Optional read replica for read-only services (analytics, catalog, reports, exports);
+    # reads fall back to the primary while lag exceeds the budget or the user wrote recently
+    database_replica_url: str = ""
+    db_replica_max_lag_sec: float = 5.0
+    db_replica_lag_check_sec: float = 2.0
+    db_read_your_writes_sec: int = 10
+
     jwt_issuer: str = "ixl-clone"
     jwt_audience: str = "ixl-clone-users"
     jwt_secret_key: str
@@ -23,6 +47,8 @@ class Settings(BaseSettings):
     password_hash_scheme: str = "argon2"
 
     cache_ttl_sec: int = 60
+    # In-process copy of hot catalog lists in front of Redis; dropped in every worker on change
+    local_cache_ttl_sec: int = 30
 
     auth_rate_limit: int = 10
     auth_rate_window_sec: int = 60
@@ -35,9 +61,77 @@ class Settings(BaseSettings):
     practice_stop_min_questions: int = 10
     practice_session_expiry_hours: int = 24
 
+    # Live score grid (SSE): "redis" streams across processes, "memory" for tests/single process
+    score_grid_bus_backend: str = "redis"
+    score_grid_stream_maxlen: int = 1000
+    score_grid_sse_ping_sec: int = 15
+
+    # PDF rendering runs in a process pool; 0 workers renders in a thread (tests/dev)
+    pdf_render_workers: int = 2
+    pdf_render_max_concurrency: int = 0  # 0 = same as workers
+    pdf_render_max_queue: int = 32
+    pdf_render_timeout_sec: float = 30.0
+    # Session reports with more answers than this hand their rows to the renderer through a temp file
+    pdf_report_spill_rows: int = 500
+
+    # Disk cache for immutable report PDFs (finished sessions, fully completed assignments); 0 MB disables
+    pdf_cache_dir: str = "var/pdf-cache"
+    pdf_cache_max_mb: int = 512
+
+    # Bulk report exports: files under report_export_dir (shared by all API processes), state in Redis
+    report_export_dir: str = "var/exports"
+    report_export_ttl_sec: int = 60 * 60 * 24
+    report_export_max_sessions: int = 500
+    report_export_concurrency: int = 2  # renders per job; leaves pool slots for interactive downloads
+
+    # Bulk skill/question import: rows per multi-row INSERT (each row binds ~13 parameters,
+    # Postgres allows 32767 per statement) and the size cap for one upload
+    bulk_import_batch_size: int = 500
+    bulk_import_max_mb: int = 50
+
+    # Background jobs (app/worker). "memory" runs jobs inside the API process (tests/dev);
+    # with "redis", run `python -m app.worker` or set job_inline_worker to consume in the API.
+    job_queue_backend: str = "redis"
+    job_inline_worker: bool = False
+    worker_processes: int = 0  # 0 = one per usable CPU (affinity mask and cgroup quota)
+    worker_queues: str = "default=4,reports=2"
+
+    # Production API serving (gunicorn.conf.py): gunicorn master + UvicornWorker processes.
+    # Every process has its own DB pool, Redis client and PDF pool, so size those per process.
+    web_bind: str = "0.0.0.0:8001"
+    web_workers: int = 0  # 0 = one per usable CPU, at most 8; set it explicitly in production
+    web_preload: bool = True  # import the app once in the master; resources are still created per worker
+    web_timeout_sec: int = 60
+    web_graceful_timeout_sec: int = 30  # in-flight requests get this long on restart/shutdown
+    web_keepalive_sec: int = 5
+    web_max_requests: int = 0  # recycle a worker after this many requests (0 = never)
+    web_max_requests_jitter: int = 0
+
     # Plugin settings
     plugins_dir: str = "static/plugins"  # Директория для хранения плагинов
     plugin_max_size_mb: int = 10  # Максимальный размер ZIP плагина
+    plugin_max_unpacked_mb: int = 50  # Максимальный размер распакованных файлов плагина
+    plugin_assets_accel_prefix: str = ""  # Internal location nginx для X-Accel-Redirect (напр. "/_plugin_files/"); пусто - файлы отдает приложение
+    plugin_vendor_dir: str = "static/vendor"  # Общий бандл React/lucide и Tailwind для TSX плагинов (plugin-vendor/build.mjs)
+    # TSX плагины: esbuild запускается асинхронно, сборки кешируются по хешу исходника
+    tsx_compile_cache_dir: str = "var/tsx-cache"  # пусто = без кеша
+    tsx_compile_max_concurrency: int = 2
+    tsx_compile_timeout_sec: float = 30.0
+
+    # Prometheus text metrics (app.core.metrics); keep the path off the public proxy or set a token
+    metrics_enabled: bool = True
+    metrics_path: str = "/metrics"
+    metrics_token: str = ""  # if set, scrapes must send "Authorization: Bearer <token>"
+    # Several API processes per host (gunicorn.conf.py turns this on for web_workers > 1):
+    # each publishes its metrics to Redis every N seconds and any of them answers with all
+    metrics_shared: bool = False
+    metrics_share_interval_sec: float = 5.0
+
+    # Per-request SQL tracing (app.db.query_tracer): "warn", "header" (warn + X-Query-* headers) or "off";
+    # empty = header for ENVIRONMENT=test, warn for local/dev, off otherwise
+    query_trace_mode: str = ""
+    query_budget_default: int = 0  # statements per request for routes without query_budget(); 0 = none
+    query_repeat_threshold: int = 5  # same statement shape this often in one request is reported as N+1
 
 
 settings = Settings()  # type: ignore[call-arg]
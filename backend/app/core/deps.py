@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import uuid
+from collections.abc import AsyncGenerator
 
 from fastapi import Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
@@ -8,7 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.errors import AppError
 from app.core.security import decode_token, hash_password, require_token_type
-from app.db.session import get_db_session
+from app.db.session import get_db_session, get_read_sessionmaker, release_connection
 from app.models.enums import UserRole
 from app.repositories.user_repo import UserRepository
 
@@ -30,9 +31,29 @@ async def get_current_user(
     user = await repo.get_by_id(user_id)
     if user is None or not user.is_active:
         raise AppError(status_code=401, code="unauthorized", message="User not found or inactive")
+    # get_db_session marks this user's recent writes for read-your-writes routing.
+    session.info["user_id"] = str(user.id)
+    # Handlers served from Redis or waiting on other work should not hold a pooled connection.
+    await release_connection(session)
     return user
 
 
+async def get_read_session(
+    creds: HTTPAuthorizationCredentials | None = Depends(bearer),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only queries; served by the read replica when one is configured and
+    the caller has not written recently. Never write through it."""
+    user_id = None
+    if creds is not None:
+        try:
+            user_id = decode_token(creds.credentials).get("sub")
+        except Exception:
+            user_id = None
+    sessionmaker = await get_read_sessionmaker(str(user_id) if user_id else None)
+    async with sessionmaker() as session:
+        yield session
+
+
 async def get_current_user_optional(
     creds: HTTPAuthorizationCredentials | None = Depends(bearer),
     session: AsyncSession = Depends(get_db_session),
@@ -50,6 +71,8 @@ async def get_current_user_optional(
         user = await repo.get_by_id(user_id)
         if user is None or not user.is_active:
             return None
+        session.info["user_id"] = str(user.id)
+        await release_connection(session)
         return user
     except Exception:
         return None
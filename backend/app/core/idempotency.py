@@ -7,6 +7,7 @@ from typing import Any
 from pydantic import BaseModel
 from redis.exceptions import RedisError
 
+from app.core.responses import ApiJSONResponse
 from app.schemas.base import ApiResponse
 from app.utils.redis import get_redis
 
@@ -19,7 +20,7 @@ def _request_hash(body: Any) -> str:
     return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
 
-async def idempotency_get(*, user_id: str, key: str | None, request_body: Any) -> ApiResponse | None:
+async def idempotency_get(*, user_id: str, key: str | None, request_body: Any) -> ApiJSONResponse | None:
     if not key:
         return None
     redis_key = f"idem:{user_id}:{key}"
@@ -33,7 +34,8 @@ async def idempotency_get(*, user_id: str, key: str | None, request_body: Any) -
     payload = json.loads(stored)
     if payload.get("request_hash") != _request_hash(request_body):
         return None
-    return ApiResponse.model_validate(payload["response"])
+    # Stored from our own response: replayed without building the models again.
+    return ApiJSONResponse(payload["response"])
 
 
 async def idempotency_set(
@@ -1,39 +1,315 @@
+"""Structured logging with a non-blocking sink.
+
+structlog and stdlib loggers share one pipeline. The calling thread only does cheap work
+(level filtering, sampling, context merge, timestamp) and puts the event on a bounded queue;
+a writer thread renders JSON (or console output in local/dev) and writes to stdout. When the
+queue is full, records are dropped and counted rather than blocking a request.
+
+Log events are constant names with fields, not formatted strings:
+
+    logger = structlog.get_logger(__name__)
+    logger.info("practice.submit", session_id=..., is_correct=...)
+
+Field values are rendered later on the writer thread, so pass scalars or snapshots rather
+than objects that the request goes on to mutate. Below-level calls return immediately, but
+their arguments are still evaluated: keep expensive fields out of hot-path debug events, and
+name such events so `LOG_SAMPLE_RATES` can sample them.
+"""
+
 from __future__ import annotations
 
+import atexit
+import contextlib
+import fnmatch
 import logging
+import queue
+import random
+import re
 import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any
 
 import structlog
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from structlog.typing import EventDict, WrappedLogger
 
+REQUEST_ID_HEADER = "x-request-id"
+_REQUEST_ID_RE = re.compile(r"[A-Za-z0-9._:-]{1,64}")
+
+
+def parse_sample_rates(raw: str) -> dict[str, float]:
+    """`"practice.submit.*=0.01,plugin.evaluate=0.1"` -> {pattern: rate}."""
+    rates = {}
+    for item in raw.split(","):
+        if not item.strip():
+            continue
+        pattern, _, rate = item.partition("=")
+        value = float(rate)
+        if not 0.0 <= value <= 1.0:
+            raise ValueError(f"Sample rate for {pattern.strip()!r} must be between 0 and 1")
+        rates[pattern.strip()] = value
+    return rates
+
+
+class EventSampler:
+    """Keeps a fraction of debug/info events by event name; warnings and errors always pass.
+
+    Kept events carry `sample_rate`, so counts can be scaled back up.
+    """
+
+    def __init__(self, rates: dict[str, float]) -> None:
+        self.dropped = 0
+        self.set_rates(rates)
+
+    def set_rates(self, rates: dict[str, float]) -> None:
+        self._patterns = rates
+        self._rates: dict[str, float] = {}
+
+    def rate(self, event: str) -> float:
+        rate = self._rates.get(event)
+        if rate is None:
+            rate = next((r for p, r in self._patterns.items() if fnmatch.fnmatchcase(event, p)), 1.0)
+            if len(self._rates) < 1024:
+                self._rates[event] = rate
+        return rate
+
+    def __call__(self, logger: WrappedLogger, method_name: str, event_dict: EventDict) -> EventDict:
+        if not self._patterns or method_name not in ("debug", "info"):
+            return event_dict
+        rate = self.rate(str(event_dict.get("event")))
+        if rate >= 1.0:
+            return event_dict
+        if random.random() >= rate:
+            self.dropped += 1
+            raise structlog.DropEvent
+        event_dict["sample_rate"] = rate
+        return event_dict
+
+
+class _Sink:
+    """Bounded queue drained by one writer thread; writes are flushed when the queue runs empty."""
+
+    _STOP = object()
+
+    def __init__(self, stream: Any, renderer: structlog.typing.Processor, maxsize: int) -> None:
+        self._stream = stream
+        self._chain = [structlog.processors.EventRenamer("message"), renderer]
+        self._formatter = structlog.stdlib.ProcessorFormatter(
+            foreign_pre_chain=[structlog.stdlib.add_log_level, _foreign_fields],
+            processors=[structlog.stdlib.ProcessorFormatter.remove_processors_meta, *self._chain],
+        )
+        self.queue: queue.Queue[Any] = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, item: EventDict | logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _render(self, item: EventDict | logging.LogRecord) -> str:
+        if isinstance(item, logging.LogRecord):
+            return self._formatter.format(item)
+        item["timestamp"] = _iso(item.pop("_created"))
+        level = item["level"]
+        for processor in self._chain:
+            item = processor(None, level, item)
+        return item
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is self._STOP:
+                break
+            try:
+                self._stream.write(self._render(item) + "\n")
+                if self.queue.empty():
+                    self._stream.flush()
+            except Exception:
+                self.dropped += 1
+        with contextlib.suppress(Exception):
+            self._stream.flush()
+
+    def close(self) -> None:
+        # Waits for room rather than dropping the stop marker; everything queued is written first.
+        self.queue.put(self._STOP)
+        self._thread.join()
+
+
+class _SinkLogger:
+    """What structlog loggers wrap: every level method hands the processed event to the sink.
+
+    The sink is looked up on each call: loggers are cached on first use and outlive a
+    `configure_logging()` that replaces the sink.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def _log(self, event_dict: EventDict) -> None:
+        sink = _sink
+        if sink is not None:
+            sink.put(event_dict)
+
+    debug = info = warning = warn = error = critical = exception = fatal = msg = _log
 
-def configure_logging(environment: str) -> None:
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=logging.INFO,
-    )
 
-    shared_processors: list[structlog.typing.Processor] = [
-        structlog.processors.TimeStamper(fmt="iso", utc=True),
-        structlog.processors.add_log_level,
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-    ]
+class _SinkHandler(logging.Handler):
+    """Sends stdlib records to the sink; the message is formatted now, the line later."""
+
+    def __init__(self, sink: _Sink) -> None:
+        super().__init__()
+        self._sink = sink
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # `%` arguments may be mutated after the call returns.
+        record.msg = record.getMessage()
+        record.args = None
+        record.context = structlog.contextvars.get_contextvars()
+        if record.exc_info and record.exc_info[0] is not None:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self._sink.put(record)
+
+
+def _iso(created: float) -> str:
+    return datetime.fromtimestamp(created, timezone.utc).isoformat(timespec="microseconds").replace("+00:00", "Z")
+
+
+def _stamp(logger: WrappedLogger, method_name: str, event_dict: EventDict) -> EventDict:
+    # Formatted as ISO 8601 on the writer thread.
+    event_dict["_created"] = time.time()
+    return event_dict
+
+
+def _capture_exc_info(logger: WrappedLogger, method_name: str, event_dict: EventDict) -> EventDict:
+    # `exc_info=True` refers to the exception being handled in *this* thread.
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    if event_dict.get("exc_info"):
+        event_dict["exception"] = logging.Formatter().formatException(event_dict.pop("exc_info"))
+    return event_dict
+
+
+def _to_sink(logger: WrappedLogger, method_name: str, event_dict: EventDict) -> tuple[tuple[EventDict], dict[str, Any]]:
+    return (event_dict,), {}
+
+
+def _foreign_fields(logger: WrappedLogger, method_name: str, event_dict: EventDict) -> EventDict:
+    # Records from stdlib loggers: time of the call, context captured in the calling thread.
+    record: logging.LogRecord = event_dict["_record"]
+    event_dict.update(getattr(record, "context", None) or {})
+    event_dict["timestamp"] = _iso(record.created)
+    event_dict["logger"] = record.name
+    if record.exc_text:
+        event_dict["exception"] = record.exc_text
+    return event_dict
+
+
+_sink: _Sink | None = None
+_handler: _SinkHandler | None = None
+# One instance for the process: loggers cache the processor chain on first use.
+_sampler = EventSampler({})
+
+
+def configure_logging(
+    environment: str,
+    *,
+    level: str = "INFO",
+    sample_rates: str = "",
+    queue_size: int = 10000,
+    stream: Any = None,
+) -> None:
+    global _sink, _handler
+    close_logging()
+    log_level = logging.getLevelName(level.upper())
+    if not isinstance(log_level, int):
+        raise ValueError(f"Unknown log level {level!r}")
 
     if environment in {"local", "dev"}:
         renderer: structlog.typing.Processor = structlog.dev.ConsoleRenderer()
     else:
-        renderer = structlog.processors.JSONRenderer()
+        renderer = structlog.processors.JSONRenderer(default=str)
+    _sink = _Sink(stream or sys.stdout, renderer, queue_size)
+
+    _handler = _SinkHandler(_sink)
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(log_level)
 
+    _sampler.set_rates(parse_sample_rates(sample_rates))
     structlog.configure(
         processors=[
-            *shared_processors,
-            structlog.processors.EventRenamer("message"),
-            renderer,
+            _sampler,
+            structlog.contextvars.merge_contextvars,
+            structlog.processors.add_log_level,
+            structlog.stdlib.add_logger_name,
+            _stamp,
+            _capture_exc_info,
+            _to_sink,
         ],
-        wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
+        wrapper_class=structlog.make_filtering_bound_logger(log_level),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=lambda name="", *args: _SinkLogger(name),
         cache_logger_on_first_use=True,
     )
 
+
+def close_logging() -> None:
+    """Write out everything still queued and stop the writer thread."""
+    global _sink, _handler
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+    if _sink is not None:
+        _sink.close()
+        _sink = None
+
+
+atexit.register(close_logging)
+
+
+def logging_stats() -> dict[str, Any]:
+    if _sink is None:
+        return {}
+    return {
+        "queued": _sink.queue.qsize(),
+        "dropped": _sink.dropped,
+        "sampled_out": _sampler.dropped,
+    }
+
+
+class RequestIdMiddleware:
+    """Binds a correlation id to every log event of a request and echoes it as `X-Request-ID`.
+
+    An incoming `X-Request-ID` (from the proxy or the client) is reused when it looks sane.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = ""
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        if not _REQUEST_ID_RE.fullmatch(request_id):
+            request_id = uuid.uuid4().hex
+
+        async def _send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        with structlog.contextvars.bound_contextvars(request_id=request_id):
+            await self.app(scope, receive, _send)
@@ -0,0 +1,304 @@
+"""In-process metrics in the Prometheus text format.
+
+Instruments are updated inline by the code they measure (a dict lookup, a bisect and two float
+additions per observation), so they stay on in production. Everything runs on the event loop
+thread, hence no locks. Pools, caches and queues that already keep `stats()` are exported by
+collectors registered with `register_collector`, which run only when `/metrics` is scraped.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import inspect
+import math
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# (name, type, help, [(labels, value), ...]) as returned by collectors
+Family = tuple[str, str, str, list[tuple[dict[str, str], float]]]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], Any] = {}
+        REGISTRY.register(self)
+
+    def labels(self, *values: str) -> Any:
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def _label_str(self, values: tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for values, child in sorted(self._children.items()):
+            yield from self._render_child(values, child)
+
+    def _render_child(self, values: tuple[str, ...], child: Any) -> Iterable[str]:
+        yield f"{self.name}{self._label_str(values)} {_fmt(child.value)}"
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), *, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def _render_child(self, values: tuple[str, ...], child: _HistogramValue) -> Iterable[str]:
+        cumulative = 0
+        for bound, n in zip((*self.buckets, math.inf), child.counts):
+            cumulative += n
+            le = 'le="' + _fmt(bound) + '"'
+            yield f"{self.name}_bucket{self._label_str(values, le)} {cumulative}"
+        yield f"{self.name}_sum{self._label_str(values)} {_fmt(child.sum)}"
+        yield f"{self.name}_count{self._label_str(values)} {child.count}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], Iterable[Family] | Awaitable[Iterable[Family]]]] = []
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Family] | Awaitable[Iterable[Family]]]) -> None:
+        self._collectors.append(collector)
+
+    async def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                families = collector()
+                if inspect.isawaitable(families):
+                    families = await families
+            except Exception as e:  # a subsystem that is not initialized simply has no samples
+                lines.append(f"# collector {getattr(collector, '__name__', collector)} failed: {type(e).__name__}")
+                continue
+            for name, kind, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    label_str = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+                    lines.append(f"{name}{{{label_str}}} {_fmt(value)}" if label_str else f"{name} {_fmt(value)}")
+        lines.append("")
+        return "\n".join(lines)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def merge_expositions(renders: dict[str, str]) -> str:
+    """One exposition out of several processes' `render()` output, every sample labelled with
+    its `worker`. HELP/TYPE lines appear once per family, in order of first appearance."""
+    headers: dict[str, list[str]] = {}
+    samples: dict[str, list[str]] = {}
+    for worker, text in renders.items():
+        worker_label = f'worker="{_escape(worker)}"'
+        family = None
+        for line in text.splitlines():
+            if line.startswith(("# HELP ", "# TYPE ")):
+                family = line.split(" ", 3)[2]
+                if line not in headers.setdefault(family, []):
+                    headers[family].append(line)
+                samples.setdefault(family, [])
+            elif line and not line.startswith("#") and family is not None:
+                series, _, value = line.rpartition(" ")
+                if series.endswith("}"):
+                    series = f"{series[:-1]},{worker_label}}}"
+                else:
+                    series = f"{series}{{{worker_label}}}"
+                samples[family].append(f"{series} {value}")
+    lines = [line for family in headers for line in (*headers[family], *samples[family])]
+    lines.append("")
+    return "\n".join(lines)
+
+
+def stats_family(name: str, help: str, rows: Iterable[tuple[dict[str, str], dict[str, Any]]]) -> list[Family]:
+    """Export the numeric entries of `stats()` dicts as `{name}_{key}` gauges, one sample per row."""
+    samples: dict[str, list[tuple[dict[str, str], float]]] = {}
+    for labels, stats in rows:
+        for key, value in stats.items():
+            if isinstance(value, bool):
+                value = int(value)
+            if isinstance(value, (int, float)):
+                samples.setdefault(key, []).append((labels, value))
+    return [(f"{name}_{key}", "gauge", f"{help}: {key}", values) for key, values in samples.items()]
+
+
+REGISTRY = Registry()
+register_collector = REGISTRY.register_collector
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status")
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being handled")
+_in_flight = HTTP_IN_FLIGHT.labels()
+HTTP_DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request", ("route",), buckets=COUNT_BUCKETS
+)
+HTTP_DB_SECONDS = Histogram("http_request_db_seconds", "Time spent in SQL per HTTP request", ("route",))
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "SQL statement execution time", ("engine",))
+REDIS_COMMAND_SECONDS = Histogram("redis_command_duration_seconds", "Redis command latency", ("command",))
+GENERATOR_SECONDS = Histogram("generator_execution_seconds", "Question generator execution time", ("outcome",))
+PDF_RENDER_SECONDS = Histogram("pdf_render_seconds", "PDF render time in the render pool", ("kind", "outcome"), buckets=SLOW_BUCKETS)
+TSX_COMPILE_SECONDS = Histogram("tsx_compile_seconds", "esbuild compile time for TSX plugins", ("outcome",), buckets=SLOW_BUCKETS)
+
+# Any other method (clients may send arbitrary tokens) is labelled "other", keeping the label set bounded
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE"})
+
+# [statement count, seconds] of the current HTTP request; None outside requests
+_request_db: ContextVar[list[float] | None] = ContextVar("request_db", default=None)
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Time every statement executed by `engine` and add it to the current request's totals."""
+    histogram = DB_QUERY_SECONDS.labels(name)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - context._metrics_started
+        histogram.observe(elapsed)
+        totals = _request_db.get()
+        if totals is not None:
+            totals[0] += 1
+            totals[1] += elapsed
+
+
+class MetricsMiddleware:
+    """Per-route latency, in-flight requests and per-request SQL totals.
+
+    Routes are labelled by their template (`/api/v1/skills/{skill_id}`), so the label set
+    stays bounded; requests that match no route share the `unmatched` label and nonstandard
+    methods the `other` label.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def _send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        totals = [0, 0.0]
+        token = _request_db.set(totals)
+        _in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        except asyncio.CancelledError:
+            status = 499
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            _in_flight.dec()
+            _request_db.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"] if scope["method"] in HTTP_METHODS else "other"
+            HTTP_REQUEST_SECONDS.labels(method, path, str(status)).observe(elapsed)
+            HTTP_DB_QUERIES.labels(path).observe(totals[0])
+            HTTP_DB_SECONDS.labels(path).observe(totals[1])
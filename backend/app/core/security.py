@@ -1,26 +1,41 @@
 from __future__ import annotations
 
+import functools
 import time
 import uuid
 from dataclasses import dataclass
-from typing import Any
-
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from typing import TYPE_CHECKING, Any
 
 from app.core.config import settings
 from app.core.errors import AppError
 
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+# jose (with cryptography) and passlib (with argon2) are imported on first use rather than at
+# app import; the lifespan warms them via `warm_up()` before the first request.
+
 
-pwd_context = CryptContext(schemes=[settings.password_hash_scheme], deprecated="auto")
+@functools.cache
+def password_context() -> CryptContext:
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=[settings.password_hash_scheme], deprecated="auto")
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_context().hash(password)
 
 
 def verify_password(plain_password: str, password_hash: str) -> bool:
-    return pwd_context.verify(plain_password, password_hash)
+    return password_context().verify(plain_password, password_hash)
+
+
+def warm_up() -> None:
+    """Import the JWT and password hashing libraries now (blocking; run in a thread)."""
+    import jose.jwt  # noqa: F401
+
+    password_context()
 
 
 @dataclass(frozen=True)
@@ -35,6 +50,8 @@ def _now() -> int:
 
 
 def create_access_token(*, user_id: str, role: str) -> tuple[str, str]:
+    from jose import jwt
+
     jti = str(uuid.uuid4())
     payload = {
         "iss": settings.jwt_issuer,
@@ -50,6 +67,8 @@ def create_access_token(*, user_id: str, role: str) -> tuple[str, str]:
 
 
 def create_refresh_token(*, user_id: str, role: str) -> tuple[str, str]:
+    from jose import jwt
+
     jti = str(uuid.uuid4())
     payload = {
         "iss": settings.jwt_issuer,
@@ -65,6 +84,8 @@ def create_refresh_token(*, user_id: str, role: str) -> tuple[str, str]:
 
 
 def decode_token(token: str) -> dict[str, Any]:
+    from jose import JWTError, jwt
+
     try:
         return jwt.decode(
             token,
@@ -0,0 +1,145 @@
+"""Request-scoped SQL tracing: statement counts, repeated statement shapes and query budgets.
+
+Every statement executed while a trace is active is recorded by its *shape* (the SQL text with
+bind parameters and literals collapsed), so a loop issuing the same SELECT per row shows up as
+one shape with a high count: the usual N+1 signature.
+
+- `QueryBudgetMiddleware` traces each HTTP request. Routes declare a budget with
+  `dependencies=[Depends(query_budget(n))]`; going over it, or repeating one shape
+  `repeat_threshold` times, logs a warning. In header mode (tests) the counts are also
+  returned as `X-Query-Count` / `X-Query-Budget` / `X-Query-Repeats`.
+- `assert_max_queries(n)` turns a budget into a regression test around any block of code.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+_PARAM = r"(?:\$\d+|%\(\w+\)s|\?|:\w+|'(?:[^']|'')*'|-?\b\d+(?:\.\d+)?\b)"
+_PARAM_LIST = re.compile(rf"{_PARAM}(?:\s*,\s*{_PARAM})*")
+_SPACE = re.compile(r"\s+")
+
+_active: ContextVar[tuple[QueryTrace, ...]] = ContextVar("query_traces", default=())
+
+
+def statement_shape(statement: str) -> str:
+    """SQL text with parameters, literals and IN-lists collapsed to `?`."""
+    return _PARAM_LIST.sub("?", _SPACE.sub(" ", statement).strip())
+
+
+@dataclass
+class QueryTrace:
+    label: str = ""
+    budget: int | None = None
+    count: int = 0
+    shapes: Counter[str] = field(default_factory=Counter)
+
+    def record(self, statement: str) -> None:
+        self.count += 1
+        self.shapes[statement_shape(statement)] += 1
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+    @property
+    def max_repeats(self) -> int:
+        return max(self.shapes.values(), default=0)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def summary(self, limit: int = 5) -> str:
+        return "\n".join(f"  {n}x {shape[:200]}" for shape, n in self.shapes.most_common(limit))
+
+
+def install_query_tracer(engine: AsyncEngine) -> None:
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+        for trace in _active.get():
+            trace.record(statement)
+
+
+@contextmanager
+def trace_queries(label: str = "", *, budget: int | None = None) -> Iterator[QueryTrace]:
+    """Record the statements executed inside the block (nested traces all see them)."""
+    trace = QueryTrace(label=label, budget=budget)
+    token = _active.set((*_active.get(), trace))
+    try:
+        yield trace
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def assert_max_queries(n: int, *, label: str = "") -> Iterator[QueryTrace]:
+    """Fail with the most frequent statement shapes if the block runs more than `n` statements."""
+    with trace_queries(label, budget=n) as trace:
+        yield trace
+    if trace.over_budget:
+        raise AssertionError(f"{label or 'block'} ran {trace.count} SQL statements, budget {n}:\n{trace.summary()}")
+
+
+def query_budget(n: int) -> Callable:
+    """Route dependency declaring the route's statement budget for `QueryBudgetMiddleware`."""
+
+    async def _dep() -> None:
+        traces = _active.get()
+        if traces:
+            traces[-1].budget = n
+
+    return _dep
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, app: ASGIApp, *, headers: bool = False, default_budget: int = 0, repeat_threshold: int = 5) -> None:
+        self.app = app
+        self.headers = headers
+        self.default_budget = default_budget or None
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with trace_queries(budget=self.default_budget) as trace:
+
+            async def _send(message: Message) -> None:
+                if self.headers and message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers["X-Query-Count"] = str(trace.count)
+                    headers["X-Query-Repeats"] = str(trace.max_repeats)
+                    if trace.budget is not None:
+                        headers["X-Query-Budget"] = str(trace.budget)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, _send)
+            finally:
+                self._report(scope, trace)
+
+    def _report(self, scope: Scope, trace: QueryTrace) -> None:
+        repeated = trace.repeated(self.repeat_threshold)
+        if not trace.over_budget and not repeated:
+            return
+        route = getattr(scope.get("route"), "path", None) or scope["path"]
+        if trace.over_budget:
+            logger.warning(
+                "%s %s ran %d SQL statements, budget %d:\n%s", scope["method"], route, trace.count, trace.budget, trace.summary()
+            )
+        for shape, n in repeated:
+            logger.warning("%s %s: possible N+1, %dx %s", scope["method"], route, n, shape[:200])
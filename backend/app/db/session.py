@@ -1,31 +1,413 @@
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator
+import asyncio
+import contextlib
+import logging
+import re
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from typing import Any
 
+from redis.exceptions import RedisError
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql.elements import TextClause
+
+from app.core.metrics import instrument_engine
+from app.db.query_tracer import install_query_tracer
+from app.utils.redis import get_redis
+
+logger = logging.getLogger(__name__)
 
 _engine: AsyncEngine | None = None
 _sessionmaker: async_sessionmaker[AsyncSession] | None = None
+_health: PoolHealthCheck | None = None
+_read_engine: AsyncEngine | None = None
+_read_sessionmaker: async_sessionmaker[AsyncSession] | None = None
+_replica: ReplicaMonitor | None = None
+_read_your_writes_sec = 0
+
+RECENT_WRITE_KEY = "db:recent-write:{}"
+_TEXT_DML = re.compile(r"\s*(?:WITH\b.*?)?\b(?:INSERT|UPDATE|DELETE|MERGE|TRUNCATE|COPY)\b", re.IGNORECASE | re.DOTALL)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that counts checkouts, time spent waiting for a connection and overflow use."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):  # type: ignore[no-untyped-def]
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.checkouts += 1
+        return conn
+
+    def _inc_overflow(self) -> bool:
+        opened = super()._inc_overflow()
+        # _overflow starts at -pool_size: positive means a connection beyond pool_size was opened.
+        if opened and self._overflow > 0:
+            self.overflow_events += 1
+        return opened
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "overflow_events": self.overflow_events,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds, 3),
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 1),
+        }
+
+
+class ReplicaMonitor:
+    """Measures replica lag periodically; the replica serves reads only while lag <= `max_lag_sec`.
+
+    The replica is caught up when it has replayed the primary's current WAL position; otherwise
+    lag is the age of the last replayed transaction. A server that is not in recovery (e.g. a
+    second local Postgres in development) counts as lag 0.
+    """
+
+    def __init__(self, primary: AsyncEngine, replica: AsyncEngine, *, interval_sec: float, max_lag_sec: float) -> None:
+        self._primary = primary
+        self._replica = replica
+        self._interval_sec = interval_sec
+        self._max_lag_sec = max_lag_sec
+        self._task: asyncio.Task[None] | None = None
+        self.healthy = False
+        self.lag_sec: float | None = None
+        self.checks = 0
+        self.failures = 0
+        self.last_error: str | None = None
+        self.replica_reads = 0
+        self.primary_fallbacks = 0
+        self.read_your_writes = 0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self._interval_sec)
 
+    async def check(self) -> bool:
+        self.checks += 1
+        try:
+            async with asyncio.timeout(max(self._interval_sec, 1.0)):
+                self.lag_sec = await self._measure_lag()
+        except Exception as e:
+            self.failures += 1
+            self.lag_sec = None
+            self.last_error = f"{type(e).__name__}: {e}"
+            if self.healthy:
+                logger.warning("Read replica check failed, reading from primary: %s", self.last_error)
+            self.healthy = False
+            return False
+        self.last_error = None
+        healthy = self.lag_sec <= self._max_lag_sec
+        if healthy != self.healthy:
+            logger.warning("Read replica %s (lag %.1fs)", "in use" if healthy else "lagging, reading from primary", self.lag_sec)
+        self.healthy = healthy
+        return healthy
 
-def init_engine(database_url: str) -> None:
-    global _engine, _sessionmaker
-    _engine = create_async_engine(database_url, pool_pre_ping=True)
+    async def _measure_lag(self) -> float:
+        async with self._replica.connect() as conn:
+            in_recovery, replay_lsn, replay_age = (
+                await conn.execute(
+                    text(
+                        "SELECT pg_is_in_recovery(), pg_last_wal_replay_lsn()::text, "
+                        "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+                    )
+                )
+            ).one()
+        if not in_recovery:
+            return 0.0
+        if replay_lsn is None:
+            raise RuntimeError("replica has not replayed any WAL")
+        async with self._primary.connect() as conn:
+            behind = (
+                await conn.execute(text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), CAST(:lsn AS pg_lsn))"), {"lsn": replay_lsn})
+            ).scalar_one()
+        return 0.0 if behind <= 0 else float(replay_age or 0.0)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "lag_sec": round(self.lag_sec, 3) if self.lag_sec is not None else None,
+            "max_lag_sec": self._max_lag_sec,
+            "checks": self.checks,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "replica_reads": self.replica_reads,
+            "primary_fallbacks": self.primary_fallbacks,
+            "read_your_writes": self.read_your_writes,
+        }
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+class PoolHealthCheck:
+    """Periodic `SELECT 1` instead of a pre-ping round trip on every checkout.
+
+    A disconnect error here makes SQLAlchemy invalidate every pooled connection opened
+    before it, so requests after a database restart get fresh connections.
+    """
+
+    def __init__(self, engine: AsyncEngine, interval_sec: float) -> None:
+        self._engine = engine
+        self._interval_sec = interval_sec
+        self._task: asyncio.Task[None] | None = None
+        self.checks = 0
+        self.failures = 0
+        self.last_error: str | None = None
+        self.last_ok_at: float | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval_sec)
+            await self.check()
+
+    async def check(self) -> bool:
+        self.checks += 1
+        try:
+            async with asyncio.timeout(self._interval_sec):
+                async with self._engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+        except Exception as e:
+            self.failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.warning("Database health check failed: %s", self.last_error)
+            return False
+        self.last_ok_at = time.time()
+        self.last_error = None
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "interval_sec": self._interval_sec,
+            "checks": self.checks,
+            "failures": self.failures,
+            "last_ok_at": self.last_ok_at,
+            "last_error": self.last_error,
+        }
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+def init_engine(
+    database_url: str,
+    *,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_recycle_sec: int = -1,
+    pool_timeout_sec: float = 30.0,
+    statement_timeout_ms: int = 0,
+    idle_in_transaction_timeout_ms: int = 0,
+    prepared_statement_cache_size: int = 100,
+    health_check_interval_sec: float = 0,
+    metrics: bool = False,
+) -> None:
+    """Create the global engine. Defaults match SQLAlchemy's; the app passes values from Settings.
+
+    Postgres timeouts of 0 leave the server defaults. With `health_check_interval_sec` > 0 and
+    a running event loop, a background task checks the database instead of pre-pinging.
+    `metrics` times every statement for `/metrics`; processes that do not serve it leave it off.
+    """
+    global _engine, _sessionmaker, _health
+    # Sync callers (scripts) have no loop to run the health check on and keep pre-ping.
+    health_check = health_check_interval_sec > 0 and _loop_running()
+    _engine = _create_engine(
+        database_url,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle_sec=pool_recycle_sec,
+        pool_timeout_sec=pool_timeout_sec,
+        statement_timeout_ms=statement_timeout_ms,
+        idle_in_transaction_timeout_ms=idle_in_transaction_timeout_ms,
+        prepared_statement_cache_size=prepared_statement_cache_size,
+        pre_ping=not health_check,
+    )
+    if metrics:
+        instrument_engine(_engine, "primary")
+    install_query_tracer(_engine)
     _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False)
+    _health = None
+    if health_check:
+        _health = PoolHealthCheck(_engine, health_check_interval_sec)
+        _health.start()
+
+
+def init_read_engine(
+    database_url: str | None,
+    *,
+    max_lag_sec: float = 5.0,
+    lag_check_interval_sec: float = 2.0,
+    read_your_writes_sec: int = 10,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_recycle_sec: int = -1,
+    pool_timeout_sec: float = 30.0,
+    statement_timeout_ms: int = 0,
+    idle_in_transaction_timeout_ms: int = 0,
+    prepared_statement_cache_size: int = 100,
+    health_check_interval_sec: float = 0,
+    metrics: bool = False,
+) -> None:
+    """Create the optional read replica engine (call after `init_engine`).
+
+    Without a URL every read session comes from the primary. Otherwise a lag monitor decides
+    whether the replica may serve reads, and users who wrote within `read_your_writes_sec`
+    keep reading from the primary.
+    """
+    global _read_engine, _read_sessionmaker, _replica, _read_your_writes_sec
+    _read_engine = _read_sessionmaker = _replica = None
+    if not database_url:
+        return
+    _read_engine = _create_engine(
+        database_url,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle_sec=pool_recycle_sec,
+        pool_timeout_sec=pool_timeout_sec,
+        statement_timeout_ms=statement_timeout_ms,
+        idle_in_transaction_timeout_ms=idle_in_transaction_timeout_ms,
+        prepared_statement_cache_size=prepared_statement_cache_size,
+        # The lag check doubles as the replica health check.
+        pre_ping=health_check_interval_sec <= 0,
+    )
+    if metrics:
+        instrument_engine(_read_engine, "replica")
+    install_query_tracer(_read_engine)
+    _read_sessionmaker = async_sessionmaker(_read_engine, expire_on_commit=False)
+    _read_your_writes_sec = read_your_writes_sec
+    _replica = ReplicaMonitor(get_engine(), _read_engine, interval_sec=lag_check_interval_sec, max_lag_sec=max_lag_sec)
+    if _loop_running():
+        _replica.start()
+
+
+def _create_engine(
+    database_url: str,
+    *,
+    pool_size: int,
+    max_overflow: int,
+    pool_recycle_sec: int,
+    pool_timeout_sec: float,
+    statement_timeout_ms: int,
+    idle_in_transaction_timeout_ms: int,
+    prepared_statement_cache_size: int,
+    pre_ping: bool,
+) -> AsyncEngine:
+    return create_async_engine(
+        database_url,
+        poolclass=InstrumentedPool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=pool_recycle_sec,
+        pool_timeout=pool_timeout_sec,
+        pool_pre_ping=pre_ping,
+        connect_args=_connect_args(
+            database_url,
+            statement_timeout_ms=statement_timeout_ms,
+            idle_in_transaction_timeout_ms=idle_in_transaction_timeout_ms,
+            prepared_statement_cache_size=prepared_statement_cache_size,
+        ),
+    )
+
+
+def _connect_args(
+    database_url: str,
+    *,
+    statement_timeout_ms: int,
+    idle_in_transaction_timeout_ms: int,
+    prepared_statement_cache_size: int,
+) -> dict[str, Any]:
+    if not make_url(database_url).drivername.endswith("+asyncpg"):
+        return {}
+    server_settings = {}
+    if statement_timeout_ms:
+        server_settings["statement_timeout"] = str(statement_timeout_ms)
+    if idle_in_transaction_timeout_ms:
+        server_settings["idle_in_transaction_session_timeout"] = str(idle_in_transaction_timeout_ms)
+    return {"server_settings": server_settings, "prepared_statement_cache_size": prepared_statement_cache_size}
+
+
+def _loop_running() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
 
 
 async def close_engine() -> None:
-    global _engine
+    global _engine, _health, _read_engine, _read_sessionmaker, _replica
+    if _replica is not None:
+        await _replica.close()
+        _replica = None
+    if _read_engine is not None:
+        await _read_engine.dispose()
+        _read_engine = _read_sessionmaker = None
+    if _health is not None:
+        await _health.close()
+        _health = None
     if _engine is not None:
         await _engine.dispose()
         _engine = None
 
 
+def pool_stats() -> dict[str, Any]:
+    """Connection pool counters and health check state for /admin/db-pool."""
+    replica = None
+    if _read_engine is not None and _replica is not None:
+        replica = {**_engine_pool_stats(_read_engine), **_replica.stats()}
+    return {**_engine_pool_stats(get_engine()), "health": _health.stats() if _health is not None else None, "replica": replica}
+
+
+def _engine_pool_stats(engine: AsyncEngine) -> dict[str, Any]:
+    pool = engine.sync_engine.pool
+    return pool.stats() if isinstance(pool, InstrumentedPool) else {"status": pool.status()}
+
+
 def get_engine() -> AsyncEngine:
     if _engine is None:
         raise RuntimeError("Database engine not initialized")
@@ -38,8 +420,99 @@ def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
     return _sessionmaker
 
 
+def after_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """Run `callback` once the request transaction has committed (skipped on rollback)."""
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+async def run_after_commit(session: AsyncSession) -> None:
+    callbacks = session.info.pop("after_commit", [])
+    for callback in callbacks:
+        try:
+            await callback()
+        except Exception:
+            # The data is already committed; side effects are best-effort.
+            logger.exception("after_commit callback failed")
+
+
+async def release_connection(session: AsyncSession) -> None:
+    """Give the session's connection back to the pool if the transaction has only read so far.
+
+    Loaded objects stay usable (expire_on_commit=False). No-op once the request has written,
+    so a request's writes always commit together.
+    """
+    if not session.in_transaction() or session.info.get("wrote") or session.info.get("after_commit"):
+        return
+    if session.new or session.dirty or session.deleted:
+        return
+    await session.commit()
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_flush(session: Session, _flush_context: Any) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_dml(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["wrote"] = True
+    # SQLAlchemy does not classify text() statements. A CTE with SELECT ... FOR UPDATE matches
+    # too, which only keeps the connection until the request ends.
+    elif isinstance(state.statement, TextClause) and _TEXT_DML.match(state.statement.text):
+        state.session.info["wrote"] = True
+
+
+async def mark_recent_write(user_id: str) -> None:
+    """Route this user's reads to the primary for the read-your-writes window."""
+    if _replica is None or _read_your_writes_sec <= 0:
+        return
+    try:
+        await get_redis().set(RECENT_WRITE_KEY.format(user_id), "1", ex=_read_your_writes_sec)
+    except RedisError as exc:
+        logger.warning("Recent write mark failed for %s: %s", user_id, exc)
+
+
+async def _has_recent_write(user_id: str) -> bool:
+    try:
+        return bool(await get_redis().exists(RECENT_WRITE_KEY.format(user_id)))
+    except RedisError:
+        # Unknown: the primary is always consistent.
+        return True
+
+
+async def get_read_sessionmaker(user_id: str | None = None) -> async_sessionmaker[AsyncSession]:
+    """Sessionmaker for read-only work: the replica when configured and within the lag budget,
+    unless `user_id` wrote within the read-your-writes window; the primary otherwise."""
+    if _read_sessionmaker is None or _replica is None:
+        return get_sessionmaker()
+    if not _replica.healthy:
+        _replica.primary_fallbacks += 1
+        return get_sessionmaker()
+    if user_id is not None and await _has_recent_write(user_id):
+        _replica.read_your_writes += 1
+        return get_sessionmaker()
+    _replica.replica_reads += 1
+    return _read_sessionmaker
+
+
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """Request session, committed when the request succeeds and rolled back otherwise.
+
+    The session autobegins: no connection is checked out until the first query, so requests
+    answered from Redis never touch the pool. `release_connection` can end a read-only
+    transaction early; later queries start a new one, which is committed here as usual.
+    """
     sessionmaker = get_sessionmaker()
     async with sessionmaker() as session:
-        async with session.begin():
+        try:
             yield session
+            await session.commit()
+        except BaseException:
+            await session.rollback()
+            raise
+        await run_after_commit(session)
+        # get_current_user records who the request is for.
+        user_id = session.info.get("user_id")
+        if user_id is not None and session.info.get("wrote"):
+            await mark_recent_write(user_id)
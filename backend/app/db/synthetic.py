@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import hash_password
+from app.db.session import close_engine, get_sessionmaker, init_engine
+
+logger = logging.getLogger(__name__)
+
+# Every synthetic row is tagged so it can be purged without touching seed/demo data.
+SYNTHETIC_EMAIL_DOMAIN = "load.local"
+SYNTHETIC_SKILL_PREFIX = "SYN"
+
+
+@dataclass(frozen=True)
+class SyntheticScale:
+    students: int = 5000
+    students_per_classroom: int = 25
+    assignments_per_classroom: int = 8
+    skills: int = 400
+    questions_per_skill: int = 60
+    sessions_per_student: int = 20
+    attempts_per_session: int = 25
+    # Share of sessions left unfinished (resumable); real traffic keeps this small.
+    unfinished_ratio: float = 0.05
+
+
+async def _reset_sequences(session: AsyncSession) -> None:
+    # Seed data uses fixed IDs; make sure generated rows don't collide with them.
+    for table in ["skills", "questions"]:
+        await session.execute(
+            text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1), true);")
+        )
+
+
+async def _generate_skills(session: AsyncSession, scale: SyntheticScale) -> None:
+    await session.execute(
+        text(
+            """
+            INSERT INTO skills (subject_id, grade_id, code, title, description, difficulty, is_published)
+            SELECT
+                (SELECT MIN(id) FROM subjects),
+                (SELECT MIN(id) FROM grades),
+                CAST(:prefix AS text) || '.' || g,
+                'Synthetic skill ' || g,
+                '',
+                1 + (g % 5),
+                true
+            FROM generate_series(1, :n) AS g
+            ON CONFLICT ON CONSTRAINT uq_skill_code_grade_subject DO NOTHING
+            """
+        ),
+        {"prefix": SYNTHETIC_SKILL_PREFIX, "n": scale.skills},
+    )
+    await session.execute(
+        text(
+            """
+            INSERT INTO questions (skill_id, type, prompt, data, correct_answer, explanation, level)
+            SELECT
+                s.id,
+                'NUMERIC',
+                'Compute ' || g || ' + ' || s.id || '.',
+                '{"tolerance": 0}'::jsonb,
+                jsonb_build_object('value', g + s.id),
+                '',
+                1 + (g % 5)
+            FROM skills s
+            CROSS JOIN generate_series(1, :q) AS g
+            WHERE s.code LIKE :pattern
+            ORDER BY s.id, g
+            """
+        ),
+        {"q": scale.questions_per_skill, "pattern": f"{SYNTHETIC_SKILL_PREFIX}.%"},
+    )
+
+
+async def _generate_people(session: AsyncSession, scale: SyntheticScale) -> None:
+    password_hash = hash_password("Password123!")
+    classrooms = max(1, -(-scale.students // scale.students_per_classroom))
+    await session.execute(
+        text(
+            """
+            INSERT INTO users (id, email, password_hash, full_name, role, is_active)
+            SELECT gen_random_uuid(), 'synthetic-teacher-' || g || '@' || CAST(:domain AS text), CAST(:pw AS text),
+                   'Synthetic Teacher ' || g, CAST('TEACHER' AS user_role), true
+            FROM generate_series(1, :classrooms) AS g
+            UNION ALL
+            SELECT gen_random_uuid(), 'synthetic-student-' || g || '@' || CAST(:domain AS text), CAST(:pw AS text),
+                   'Synthetic Student ' || g, CAST('STUDENT' AS user_role), true
+            FROM generate_series(1, :students) AS g
+            ON CONFLICT (email) DO NOTHING
+            """
+        ),
+        {"domain": SYNTHETIC_EMAIL_DOMAIN, "pw": password_hash, "classrooms": classrooms, "students": scale.students},
+    )
+    await session.execute(
+        text(
+            """
+            INSERT INTO classrooms (id, teacher_id, title, grade_id)
+            SELECT gen_random_uuid(), u.id, 'Synthetic class ' || u.full_name, (SELECT MIN(id) FROM grades)
+            FROM users u
+            WHERE u.email LIKE 'synthetic-teacher-%@' || CAST(:domain AS text)
+            """
+        ),
+        {"domain": SYNTHETIC_EMAIL_DOMAIN},
+    )
+    # Students are dealt round-robin into classrooms ordered by creation.
+    await session.execute(
+        text(
+            """
+            WITH c AS (
+                SELECT cl.id, ROW_NUMBER() OVER (ORDER BY cl.id) - 1 AS idx
+                FROM classrooms cl JOIN users t ON t.id = cl.teacher_id
+                WHERE t.email LIKE 'synthetic-teacher-%@' || CAST(:domain AS text)
+            ),
+            s AS (
+                SELECT u.id, ROW_NUMBER() OVER (ORDER BY u.id) - 1 AS idx
+                FROM users u
+                WHERE u.email LIKE 'synthetic-student-%@' || CAST(:domain AS text)
+            )
+            INSERT INTO enrollments (id, classroom_id, student_id, enrolled_at)
+            SELECT gen_random_uuid(), c.id, s.id, now() - interval '90 days'
+            FROM s JOIN c ON c.idx = s.idx % (SELECT COUNT(*) FROM c)
+            ON CONFLICT ON CONSTRAINT uq_enrollment_class_student DO NOTHING
+            """
+        ),
+        {"domain": SYNTHETIC_EMAIL_DOMAIN},
+    )
+    await session.execute(
+        text(
+            """
+            WITH sk AS (SELECT array_agg(id) AS ids FROM skills WHERE code LIKE :pattern)
+            INSERT INTO assignments (id, classroom_id, skill_id, due_at, target_smartscore)
+            SELECT gen_random_uuid(), cl.id, sk.ids[1 + floor(random() * array_length(sk.ids, 1))::int], NULL, 80
+            FROM classrooms cl
+            JOIN users t ON t.id = cl.teacher_id
+            CROSS JOIN sk
+            CROSS JOIN generate_series(1, :per_class) AS g
+            WHERE t.email LIKE 'synthetic-teacher-%@' || CAST(:domain AS text)
+            """
+        ),
+        {"pattern": f"{SYNTHETIC_SKILL_PREFIX}.%", "per_class": scale.assignments_per_classroom, "domain": SYNTHETIC_EMAIL_DOMAIN},
+    )
+    await session.execute(
+        text(
+            """
+            INSERT INTO assignment_status (id, assignment_id, student_id, status)
+            SELECT gen_random_uuid(), a.id, e.student_id, 'NOT_STARTED'
+            FROM assignments a
+            JOIN enrollments e ON e.classroom_id = a.classroom_id
+            JOIN users u ON u.id = e.student_id
+            WHERE u.email LIKE 'synthetic-student-%@' || CAST(:domain AS text)
+            ON CONFLICT ON CONSTRAINT uq_assignment_student DO NOTHING
+            """
+        ),
+        {"domain": SYNTHETIC_EMAIL_DOMAIN},
+    )
+
+
+async def _generate_practice(session: AsyncSession, scale: SyntheticScale) -> None:
+    await session.execute(
+        text(
+            """
+            WITH sk AS (SELECT array_agg(id) AS ids FROM skills WHERE code LIKE :pattern)
+            INSERT INTO practice_sessions (
+                id, user_id, skill_id, started_at, finished_at, last_activity_at,
+                questions_answered, total_questions_answered, current_smartscore, best_smartscore, state
+            )
+            SELECT
+                gen_random_uuid(),
+                u.id,
+                sk.ids[1 + floor(random() * array_length(sk.ids, 1))::int],
+                t.started_at,
+                CASE WHEN random() < :unfinished THEN NULL ELSE t.started_at + interval '20 minutes' END,
+                t.started_at + interval '20 minutes',
+                CAST(:attempts AS integer),
+                CAST(:attempts AS integer),
+                floor(random() * 100)::int,
+                floor(random() * 100)::int,
+                '{"synthetic": true}'::jsonb
+            FROM users u
+            CROSS JOIN sk
+            CROSS JOIN generate_series(1, :per_student) AS g
+            CROSS JOIN LATERAL (SELECT now() - (random() * interval '180 days') AS started_at) AS t
+            WHERE u.email LIKE 'synthetic-student-%@' || CAST(:domain AS text)
+            """
+        ),
+        {
+            "pattern": f"{SYNTHETIC_SKILL_PREFIX}.%",
+            "unfinished": scale.unfinished_ratio,
+            "attempts": scale.attempts_per_session,
+            "per_student": scale.sessions_per_student,
+            "domain": SYNTHETIC_EMAIL_DOMAIN,
+        },
+    )
+    # Synthetic questions are inserted contiguously per skill, so MIN(id) + offset picks a real question.
+    await session.execute(
+        text(
+            """
+            WITH qmin AS (SELECT skill_id, MIN(id) AS first_id FROM questions GROUP BY skill_id)
+            INSERT INTO practice_attempts (
+                id, session_id, user_id, skill_id, question_id, question_level, question_payload,
+                submitted_answer, is_correct, answered_at, time_spent_sec, smartscore_before, smartscore_after
+            )
+            SELECT
+                gen_random_uuid(),
+                s.id,
+                s.user_id,
+                s.skill_id,
+                qmin.first_id + ((g - 1) % :q),
+                1 + (g % 5),
+                jsonb_build_object('prompt', 'Synthetic question ' || g, 'correct_answer', jsonb_build_object('value', g)),
+                jsonb_build_object('value', g),
+                random() < 0.8,
+                s.started_at + g * interval '20 seconds',
+                5 + floor(random() * 40)::int,
+                LEAST(100, (g - 1) * 4),
+                LEAST(100, g * 4)
+            FROM practice_sessions s
+            JOIN qmin ON qmin.skill_id = s.skill_id
+            CROSS JOIN generate_series(1, :attempts) AS g
+            WHERE s.state ? 'synthetic'
+            """
+        ),
+        {"q": scale.questions_per_skill, "attempts": scale.attempts_per_session},
+    )
+    await session.execute(
+        text(
+            """
+            INSERT INTO progress_snapshots (
+                user_id, skill_id, best_smartscore, last_smartscore, last_practiced_at, total_questions, accuracy_percent
+            )
+            SELECT user_id, skill_id, MAX(best_smartscore), MAX(current_smartscore), MAX(last_activity_at), SUM(total_questions_answered), 80
+            FROM practice_sessions
+            WHERE state ? 'synthetic'
+            GROUP BY user_id, skill_id
+            ON CONFLICT (user_id, skill_id) DO NOTHING
+            """
+        )
+    )
+
+
+async def _analyze(session: AsyncSession) -> None:
+    # Fresh statistics matter more than anything else for realistic plans.
+    for table in [
+        "users",
+        "skills",
+        "questions",
+        "classrooms",
+        "enrollments",
+        "assignments",
+        "assignment_status",
+        "practice_sessions",
+        "practice_attempts",
+        "progress_snapshots",
+    ]:
+        await session.execute(text(f"ANALYZE {table};"))
+
+
+async def purge(session: AsyncSession) -> None:
+    # Sessions, attempts, enrollments and status rows cascade from users/skills.
+    await session.execute(text("DELETE FROM users WHERE email LIKE '%@' || CAST(:domain AS text)"), {"domain": SYNTHETIC_EMAIL_DOMAIN})
+    await session.execute(text("DELETE FROM skills WHERE code LIKE :pattern"), {"pattern": f"{SYNTHETIC_SKILL_PREFIX}.%"})
+
+
+async def populate(session: AsyncSession, scale: SyntheticScale) -> None:
+    await _reset_sequences(session)
+    await _generate_skills(session, scale)
+    await _generate_people(session, scale)
+    await _generate_practice(session, scale)
+
+
+async def generate(scale: SyntheticScale, *, reset: bool = False) -> None:
+    init_engine(settings.database_url)
+    sessionmaker = get_sessionmaker()
+
+    try:
+        async with sessionmaker() as session:
+            async with session.begin():
+                if reset:
+                    await purge(session)
+                await populate(session, scale)
+            # ANALYZE must see committed rows to produce useful statistics.
+            async with session.begin():
+                await _analyze(session)
+        logger.info("Synthetic data generated: %s", scale)
+    finally:
+        await close_engine()
+
+
+def main() -> None:
+    defaults = SyntheticScale()
+    parser = argparse.ArgumentParser(description="Fill the database with production-like synthetic practice data.")
+    parser.add_argument("--students", type=int, default=defaults.students)
+    parser.add_argument("--skills", type=int, default=defaults.skills)
+    parser.add_argument("--questions-per-skill", type=int, default=defaults.questions_per_skill)
+    parser.add_argument("--sessions-per-student", type=int, default=defaults.sessions_per_student)
+    parser.add_argument("--attempts-per-session", type=int, default=defaults.attempts_per_session)
+    parser.add_argument("--reset", action="store_true", help="Delete previously generated synthetic rows first")
+    args = parser.parse_args()
+
+    scale = SyntheticScale(
+        students=args.students,
+        skills=args.skills,
+        questions_per_skill=args.questions_per_skill,
+        sessions_per_student=args.sessions_per_student,
+        attempts_per_session=args.attempts_per_session,
+    )
+    asyncio.run(generate(scale, reset=args.reset))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,151 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import time
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
 from app.api.v1.router import api_router_v1
+from app.core.body_limit import BodyLimitMiddleware
 from app.core.config import settings
 from app.core.errors import install_exception_handlers
-from app.core.logging import configure_logging
-from app.db.session import close_engine, init_engine
-from app.utils.redis import close_redis, init_redis
+from app.core.logging import RequestIdMiddleware, close_logging, configure_logging
+from app.core.metrics import MetricsMiddleware
+from app.db.query_tracer import QueryBudgetMiddleware
+from app.db.session import close_engine, get_engine, get_sessionmaker, init_engine, init_read_engine
+from app.plugins.assets import PluginStaticFiles, VendorStaticFiles
+from app.plugins.compiler import close_tsx_compiler, init_tsx_compiler
+from app.plugins.registry import close_plugin_registry, init_plugin_registry
+from app.utils.local_cache import close_cache_invalidator, init_cache_invalidator
+from app.utils.pdf_cache import close_pdf_cache, init_pdf_cache
+from app.utils.pdf_pool import close_pdf_pool, get_pdf_pool, init_pdf_pool
+from app.utils.redis import close_redis, get_redis, init_redis
+from app.utils.score_grid_bus import close_score_grid_bus, init_score_grid_bus
+from app.worker.queue import close_job_queue, get_job_queue, init_job_queue
+
+logger = logging.getLogger(__name__)
+
+
+def assert_no_shared_resources() -> None:
+    """Fail if a connection pool or client exists outside the lifespan.
+
+    gunicorn (`gunicorn.conf.py`) calls this in the master after preloading the app: anything
+    created at import time would be inherited by every forked worker, sharing sockets.
+    """
+    for name, getter in (("database engine", get_sessionmaker), ("redis client", get_redis), ("job queue", get_job_queue)):
+        try:
+            getter()
+        except RuntimeError:
+            continue
+        raise RuntimeError(f"{name} created at import time; create it in the lifespan so each worker gets its own")
+
+
+def _warm_imports() -> None:
+    """Heavy libraries that route modules import on first use (see tests/test_startup.py)."""
+    from app.core import security
+    from app.plugins.ingest import manifest_validator
+    from app.plugins.tsx_transformer import plugin_vendor_assets
+
+    security.warm_up()
+    manifest_validator()
+    plugin_vendor_assets()
+
+
+async def _open_first_connection() -> None:
+    try:
+        async with get_engine().connect() as conn:
+            await conn.exec_driver_sql("SELECT 1")
+    except Exception as exc:
+        # Not fatal: the pool connects again on the first request.
+        logger.warning("Database warm-up failed: %s", exc)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    configure_logging(environment=settings.environment)
-    init_engine(settings.database_url)
-    await init_redis(settings.redis_url)
+    started = time.perf_counter()
+    configure_logging(
+        environment=settings.environment,
+        level=settings.log_level,
+        sample_rates=settings.log_sample_rates,
+        queue_size=settings.log_queue_size,
+    )
+    db_options = dict(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle_sec=settings.db_pool_recycle_sec,
+        pool_timeout_sec=settings.db_pool_timeout_sec,
+        statement_timeout_ms=settings.db_statement_timeout_ms,
+        idle_in_transaction_timeout_ms=settings.db_idle_in_transaction_timeout_ms,
+        prepared_statement_cache_size=settings.db_prepared_statement_cache_size,
+        health_check_interval_sec=settings.db_health_check_interval_sec,
+        metrics=settings.metrics_enabled,
+    )
+    init_engine(settings.database_url, **db_options)
+    init_read_engine(
+        settings.database_replica_url or None,
+        max_lag_sec=settings.db_replica_max_lag_sec,
+        lag_check_interval_sec=settings.db_replica_lag_check_sec,
+        read_your_writes_sec=settings.db_read_your_writes_sec,
+        **db_options,
+    )
+    await init_redis(settings.redis_url, metrics=settings.metrics_enabled)
+    init_cache_invalidator(get_redis())
+    init_score_grid_bus(settings.score_grid_bus_backend, get_redis(), maxlen=settings.score_grid_stream_maxlen)
+    init_pdf_pool(
+        workers=settings.pdf_render_workers,
+        max_concurrency=settings.pdf_render_max_concurrency or None,
+        max_queue=settings.pdf_render_max_queue,
+        timeout_sec=settings.pdf_render_timeout_sec,
+    )
+    init_pdf_cache(settings.pdf_cache_dir, max_mb=settings.pdf_cache_max_mb)
+    init_tsx_compiler(
+        settings.tsx_compile_cache_dir or None,
+        max_concurrency=settings.tsx_compile_max_concurrency,
+        timeout_sec=settings.tsx_compile_timeout_sec,
+    )
+    # Independent warm-ups run together, so the first requests don't pay for them.
+    await asyncio.gather(
+        init_plugin_registry(get_sessionmaker(), get_redis()),
+        get_pdf_pool().warm(),
+        _open_first_connection(),
+        asyncio.to_thread(_warm_imports),
+    )
+    init_job_queue(settings.job_queue_backend, get_redis())
+    # enqueue() takes the queue and retry policy from the registration, so the API needs it too.
+    from app.worker import tasks  # noqa: F401  (registers tasks)
+
+    worker = None
+    if settings.job_queue_backend == "memory" or settings.job_inline_worker:
+        from app.worker.worker import Worker, parse_queues
+
+        worker = Worker(get_job_queue(), parse_queues(settings.worker_queues))
+        worker.start()
+    if settings.metrics_enabled and settings.metrics_shared:
+        from app.api.metrics import init_shared_metrics
+
+        init_shared_metrics(get_redis(), settings.metrics_share_interval_sec)
+    logger.info("Application ready in %.0f ms", (time.perf_counter() - started) * 1000)
     yield
+    if settings.metrics_enabled and settings.metrics_shared:
+        from app.api.metrics import close_shared_metrics
+
+        await close_shared_metrics()
+    if worker is not None:
+        await worker.stop()
+    await close_job_queue()
+    await close_plugin_registry()
+    close_tsx_compiler()
+    close_pdf_cache()
+    close_pdf_pool()
+    await close_score_grid_bus()
+    await close_cache_invalidator()
     await close_redis()
     await close_engine()
+    close_logging()
 
 
 app = FastAPI(
@@ -34,6 +157,13 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Innermost: uploads over the limit are refused before FastAPI spools the multipart body.
+# The slack covers multipart boundaries and part headers; save_upload checks the file itself.
+app.add_middleware(
+    BodyLimitMiddleware,
+    limits={f"{settings.api_v1_prefix}/admin/plugins/upload": settings.plugin_max_size_mb * 2**20 + 64 * 1024},
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -43,12 +173,41 @@ app.add_middleware(
     allow_headers=["*"],  # Разрешаем все заголовки
 )
 
+query_trace_mode = settings.query_trace_mode or {"test": "header", "local": "warn", "dev": "warn"}.get(settings.environment, "off")
+if query_trace_mode != "off":
+    app.add_middleware(
+        QueryBudgetMiddleware,
+        headers=query_trace_mode == "header",
+        default_budget=settings.query_budget_default,
+        repeat_threshold=settings.query_repeat_threshold,
+    )
+
+if settings.metrics_enabled:
+    from app.api import metrics
+
+    # Outermost, so latency includes CORS and exception handling.
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router)
+
+# Outermost, so every log line of a request, metrics and errors included, carries its id.
+app.add_middleware(RequestIdMiddleware)
+
 install_exception_handlers(app)
 app.include_router(api_router_v1, prefix=settings.api_v1_prefix)
 
 # Статическая раздача файлов плагинов
 # Плагины доступны по пути /static/plugins/{plugin_id}/{version}/{file}
+# и /static/plugins/{plugin_id}/{version}@{build_hash}/{file} (immutable, см. app.plugins.assets)
 plugins_dir = Path(settings.plugins_dir)
 plugins_dir.mkdir(parents=True, exist_ok=True)
-app.mount("/static/plugins", StaticFiles(directory=str(plugins_dir)), name="plugins")
+app.mount(
+    "/static/plugins",
+    PluginStaticFiles(directory=str(plugins_dir), accel_prefix=settings.plugin_assets_accel_prefix),
+    name="plugins",
+)
+
+# Общий vendor бандл TSX плагинов: /static/vendor/{file}.{hash}.{js,css}
+vendor_dir = Path(settings.plugin_vendor_dir)
+vendor_dir.mkdir(parents=True, exist_ok=True)
+app.mount("/static/vendor", VendorStaticFiles(directory=str(vendor_dir)), name="plugin-vendor")
 
@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Integer
+from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Index, Integer, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -16,6 +16,16 @@ from app.models.mixins import TimestampMixin
 
 class PracticeSession(Base):
     __tablename__ = "practice_sessions"
+    __table_args__ = (
+        # Resume lookup (get_active_session): only unfinished sessions, newest activity first.
+        Index(
+            "ix_practice_sessions_active_user_skill",
+            "user_id",
+            "skill_id",
+            "last_activity_at",
+            postgresql_where=text("finished_at IS NULL"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
@@ -59,10 +69,15 @@ class PracticeAttempt(Base):
     # Убираем UniqueConstraint для question_id, так как для генераторов он может быть None
     # Можно добавить частичный индекс для уникальности только когда question_id не NULL
     # __table_args__ = (UniqueConstraint("session_id", "question_id", name="uq_attempt_session_question"),)
+    __table_args__ = (
+        # Questions log per student/skill and session reports, both ordered by answered_at.
+        Index("ix_practice_attempts_user_skill_answered", "user_id", "skill_id", "answered_at"),
+        Index("ix_practice_attempts_session_answered", "session_id", "answered_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    session_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("practice_sessions.id", ondelete="CASCADE"), index=True, nullable=False)
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    session_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("practice_sessions.id", ondelete="CASCADE"), nullable=False)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     skill_id: Mapped[int] = mapped_column(ForeignKey("skills.id", ondelete="CASCADE"), index=True, nullable=False)
     question_id: Mapped[int | None] = mapped_column(ForeignKey("questions.id", ondelete="CASCADE"), index=True, nullable=True)
     question_level: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
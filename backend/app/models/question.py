@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import Enum, ForeignKey, Integer, Text
+from sqlalchemy import Enum, ForeignKey, Index, Integer, Text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -12,9 +12,10 @@ from app.models.mixins import TimestampMixin
 
 class Question(Base, TimestampMixin):
     __tablename__ = "questions"
+    __table_args__ = (Index("ix_questions_skill_level", "skill_id", "level"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    skill_id: Mapped[int] = mapped_column(ForeignKey("skills.id", ondelete="CASCADE"), index=True, nullable=False)
+    skill_id: Mapped[int] = mapped_column(ForeignKey("skills.id", ondelete="CASCADE"), nullable=False)
     type: Mapped[QuestionType] = mapped_column(Enum(QuestionType, name="question_type"), index=True, nullable=False)
     prompt: Mapped[str] = mapped_column(Text, nullable=False)
     data: Mapped[dict] = mapped_column(MutableDict.as_mutable(JSONB), nullable=False, default=dict)
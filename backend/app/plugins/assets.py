@@ -0,0 +1,242 @@
+"""Сборка и раздача статики плагинов: предсжатые варианты, хеш сборки, immutable-кеширование.
+
+При публикации версии плагина `build_assets` пишет рядом с каждым текстовым файлом `.gz`
+(и `.br`, если установлен пакет brotli) и считает хеш содержимого версии в `.build.json`.
+Клиенты обращаются к файлам по адресу `/static/plugins/{id}/{version}@{hash}/{path}`:
+пока хеш совпадает с текущей сборкой, ответ кешируется навсегда (`immutable`), а
+относительные ссылки внутри плагина автоматически получают тот же префикс.
+Адреса без хеша продолжают работать, но требуют ревалидации.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import stat
+import tempfile
+from pathlib import Path
+from urllib.parse import quote
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, PathLike, StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:  # без brotli пишутся только .gz варианты
+    brotli = None
+
+BUILD_FILE = ".build.json"
+# Текстовые форматы, которые имеет смысл сжимать заранее
+COMPRESSIBLE_SUFFIXES = (".html", ".htm", ".js", ".mjs", ".css", ".json", ".svg", ".txt", ".map", ".xml", ".wasm")
+MIN_COMPRESS_BYTES = 1024
+# (Content-Encoding, суффикс файла) в порядке предпочтения
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def _is_variant(path: Path) -> bool:
+    return path.suffix in (".gz", ".br") and path.with_suffix("").suffix in COMPRESSIBLE_SUFFIXES
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+
+
+def build_assets(plugin_dir: Path) -> str:
+    """Готовит версию плагина к раздаче: сжатые варианты файлов и хеш сборки.
+
+    Вызывается при публикации файлов версии (синхронно, сервис вызывает через
+    asyncio.to_thread). Повторный вызов пересобирает варианты и хеш целиком.
+
+    Returns:
+        хеш содержимого версии (16 hex-символов)
+    """
+    digest = hashlib.sha256()
+    files = sorted(
+        p for p in plugin_dir.rglob("*")
+        if p.is_file() and p.name != BUILD_FILE and not _is_variant(p) and not p.name.endswith(".tmp")
+    )
+    for path in files:
+        data = path.read_bytes()
+        rel = path.relative_to(plugin_dir).as_posix()
+        digest.update(f"{rel}\0{len(data)}\0".encode())
+        digest.update(data)
+        if path.suffix.lower() not in COMPRESSIBLE_SUFFIXES:
+            continue
+        variants = {".gz": None, ".br": None}
+        if len(data) >= MIN_COMPRESS_BYTES:
+            # mtime=0: одинаковый вход дает побайтно одинаковый .gz
+            variants[".gz"] = gzip.compress(data, compresslevel=9, mtime=0)
+            if brotli is not None:
+                variants[".br"] = brotli.compress(data, quality=11)
+        for suffix, packed in variants.items():
+            variant = path.with_name(path.name + suffix)
+            if packed is not None and len(packed) < len(data):
+                _write_atomic(variant, packed)
+            else:
+                # Файл изменился и перестал сжиматься: устаревший вариант раздавать нельзя
+                with contextlib.suppress(FileNotFoundError):
+                    variant.unlink()
+
+    build_hash = digest.hexdigest()[:16]
+    _write_atomic(plugin_dir / BUILD_FILE, json.dumps({"hash": build_hash, "files": len(files)}).encode())
+    return build_hash
+
+
+_build_hashes: dict[Path, tuple[int, str | None]] = {}
+
+
+def read_build_hash(plugin_dir: Path) -> str | None:
+    """Хеш текущей сборки версии плагина или None, если `build_assets` для нее не вызывался.
+
+    Результат кешируется в памяти по mtime `.build.json`, так что на запрос приходится один stat.
+    """
+    build_file = plugin_dir / BUILD_FILE
+    try:
+        mtime = build_file.stat().st_mtime_ns
+    except OSError:
+        _build_hashes.pop(plugin_dir, None)
+        return None
+    cached = _build_hashes.get(plugin_dir)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    try:
+        build_hash = json.loads(build_file.read_text(encoding="utf-8")).get("hash")
+    except (OSError, ValueError):
+        build_hash = None
+    _build_hashes[plugin_dir] = (mtime, build_hash)
+    return build_hash
+
+
+def asset_base(plugin_id: str, version: str, build_hash: str | None) -> str:
+    """Сегмент пути версии плагина: `{id}/{version}@{hash}` или `{id}/{version}` без сборки."""
+    return f"{plugin_id}/{version}@{build_hash}" if build_hash else f"{plugin_id}/{version}"
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted = set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name and q > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class PluginStaticFiles(StaticFiles):
+    """StaticFiles для static/plugins с поддержкой `{version}@{hash}` и предсжатых файлов.
+
+    Если задан `accel_prefix`, тело файла не отдается: ответ содержит только заголовки и
+    `X-Accel-Redirect` на исходный файл, а байты (и `.gz`/`.br` варианты через
+    gzip_static/brotli_static) отдает nginx из internal location.
+    """
+
+    def __init__(self, *, directory: PathLike, accel_prefix: str = "") -> None:
+        super().__init__(directory=directory)
+        self.accel_prefix = accel_prefix
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+
+        parts = Path(path).parts
+        pinned = None
+        if len(parts) >= 3 and "@" in parts[1]:
+            version, _, pinned = parts[1].partition("@")
+            parts = (parts[0], version, *parts[2:])
+        rel = os.path.join(*parts) if parts else path
+
+        full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, rel)
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            raise HTTPException(status_code=404)
+
+        cache_control = REVALIDATE_CACHE_CONTROL
+        if pinned is not None and len(parts) >= 3:
+            current = await anyio.to_thread.run_sync(read_build_hash, Path(self.directory) / parts[0] / parts[1])
+            if pinned == current:
+                cache_control = IMMUTABLE_CACHE_CONTROL
+
+        if self.accel_prefix:
+            return self._accel_response(rel, full_path, cache_control)
+        return await self._encoded_response(full_path, stat_result, scope, cache_control)
+
+    def _accel_response(self, rel: str, full_path: str, cache_control: str) -> Response:
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+        location = self.accel_prefix + quote(Path(rel).as_posix())
+        return Response(
+            headers={"X-Accel-Redirect": location, "Cache-Control": cache_control, "Vary": "Accept-Encoding"},
+            media_type=media_type,
+        )
+
+    async def _encoded_response(self, full_path: str, stat_result: os.stat_result, scope: Scope, cache_control: str) -> Response:
+        request_headers = Headers(scope=scope)
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+        headers = {"Cache-Control": cache_control}
+        if full_path.endswith(COMPRESSIBLE_SUFFIXES):
+            headers["Vary"] = "Accept-Encoding"
+            accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+            for encoding, suffix in ENCODINGS:
+                if encoding not in accepted:
+                    continue
+                try:
+                    variant_stat = await anyio.to_thread.run_sync(os.stat, full_path + suffix)
+                except OSError:
+                    continue
+                full_path, stat_result = full_path + suffix, variant_stat
+                headers["Content-Encoding"] = encoding
+                break
+
+        response = FileResponse(full_path, headers=headers, media_type=media_type, stat_result=stat_result)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+class VendorStaticFiles(PluginStaticFiles):
+    """static/vendor: общий бандл TSX плагинов. Имена файлов содержат хеш, кроме manifest.json."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+        full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            raise HTTPException(status_code=404)
+        cache_control = REVALIDATE_CACHE_CONTROL if path == "manifest.json" else IMMUTABLE_CACHE_CONTROL
+        return await self._encoded_response(full_path, stat_result, scope, cache_control)
+
+
+def _build_all(plugins_dir: Path) -> None:
+    for plugin_dir in sorted(p for p in plugins_dir.glob("*/*") if p.is_dir()):
+        print(f"{plugin_dir.relative_to(plugins_dir)}: {build_assets(plugin_dir)}")
+
+
+if __name__ == "__main__":
+    # Однократная сборка уже опубликованных версий: python -m app.plugins.assets
+    from app.core.config import settings
+
+    _build_all(Path(settings.plugins_dir))
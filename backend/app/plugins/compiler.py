@@ -0,0 +1,233 @@
+"""Асинхронная компиляция TSX через esbuild с кешем сборок на диске."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from app.core.metrics import TSX_COMPILE_SECONDS
+from app.plugins.tsx_transformer import ESBUILD_ARGS, TSX_TRANSFORMER_VERSION, prepare_tsx, render_plugin_html, resolve_esbuild_path
+
+logger = logging.getLogger(__name__)
+
+
+class TsxCompileError(RuntimeError):
+    """esbuild не найден, завершился с ошибкой или не уложился в таймаут."""
+
+
+class TsxCompiler:
+    """Компилирует подготовленный TSX в JS через `esbuild` (stdin -> stdout) без блокировки event loop.
+
+    Одновременно работает не больше `max_concurrency` процессов esbuild. Результаты кешируются
+    на диске по sha256 от версии трансформера, версии esbuild, аргументов и исходника, так что
+    повторная загрузка того же кода не запускает esbuild. Одинаковые исходники, пришедшие
+    одновременно, компилируются один раз.
+    """
+
+    def __init__(
+        self,
+        *,
+        cache_dir: Path | None,
+        max_concurrency: int = 2,
+        timeout_sec: float = 30.0,
+        esbuild_path: str | None = None,
+    ) -> None:
+        self._cache_dir = cache_dir
+        if cache_dir is not None:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+        self._esbuild_path = esbuild_path
+        self._esbuild_version: str | None = None
+        self._slots = asyncio.Semaphore(max(1, max_concurrency))
+        self._max_concurrency = max(1, max_concurrency)
+        self._timeout_sec = timeout_sec
+        self._inflight: dict[str, asyncio.Future[str]] = {}
+        self._waiting = 0
+        self._running = 0
+        self._compiled = 0
+        self._cache_hits = 0
+        self._deduplicated = 0
+        self._failed = 0
+        self._timeouts = 0
+        self._compile_seconds = 0.0
+
+    async def compile(self, code: str) -> str:
+        key = await self._key(code)
+        cached = await self._read_cache(key)
+        if cached is not None:
+            self._cache_hits += 1
+            return cached
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._deduplicated += 1
+            return await asyncio.shield(pending)
+
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            js = await self._compile_uncached(code)
+        except BaseException as e:
+            future.set_exception(e if isinstance(e, Exception) else TsxCompileError("Compilation cancelled"))
+            # Никто, кроме ожидающих дубликатов, эту ошибку не заберёт.
+            future.exception()
+            raise
+        else:
+            future.set_result(js)
+            await self._write_cache(key, js)
+            return js
+        finally:
+            del self._inflight[key]
+
+    async def _compile_uncached(self, code: str) -> str:
+        esbuild = self._resolve()
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        self._running += 1
+        started = time.perf_counter()
+        outcome = "failed"
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                esbuild,
+                *ESBUILD_ARGS,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(code.encode("utf-8")), timeout=self._timeout_sec)
+            except BaseException:
+                with contextlib.suppress(ProcessLookupError):
+                    proc.kill()
+                await proc.wait()
+                raise
+            if proc.returncode != 0:
+                self._failed += 1
+                raise TsxCompileError(f"esbuild compilation failed: {stderr.decode('utf-8', errors='replace')}")
+            self._compiled += 1
+            outcome = "ok"
+            return stdout.decode("utf-8")
+        except asyncio.TimeoutError as e:
+            self._timeouts += 1
+            outcome = "timeout"
+            raise TsxCompileError(f"esbuild timed out after {self._timeout_sec:.0f}s") from e
+        finally:
+            elapsed = time.perf_counter() - started
+            self._compile_seconds += elapsed
+            TSX_COMPILE_SECONDS.labels(outcome).observe(elapsed)
+            self._running -= 1
+            self._slots.release()
+
+    def _resolve(self) -> str:
+        if self._esbuild_path is None:
+            self._esbuild_path = resolve_esbuild_path()
+        if not self._esbuild_path:
+            raise TsxCompileError(
+                "esbuild binary not found. Install Node dependencies "
+                "(npm install in backend/ or project root) or add esbuild to PATH."
+            )
+        return self._esbuild_path
+
+    async def _key(self, code: str) -> str:
+        version = self._esbuild_version or await self._probe_version()
+        h = hashlib.sha256()
+        h.update(f"{TSX_TRANSFORMER_VERSION}\0{version}\0{' '.join(ESBUILD_ARGS)}\0".encode())
+        h.update(code.encode("utf-8"))
+        return h.hexdigest()
+
+    async def _probe_version(self) -> str:
+        # Новая версия esbuild может собрать иначе, поэтому она входит в ключ кеша.
+        try:
+            esbuild = self._resolve()
+            proc = await asyncio.create_subprocess_exec(esbuild, "--version", stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+            out, _ = await asyncio.wait_for(proc.communicate(), timeout=self._timeout_sec)
+        except (TsxCompileError, OSError, asyncio.TimeoutError):
+            return "unknown"
+        version = out.decode().strip()
+        if proc.returncode == 0 and version:
+            self._esbuild_version = version
+            return version
+        return "unknown"
+
+    def _path(self, key: str) -> Path | None:
+        return self._cache_dir / key[:2] / f"{key}.js" if self._cache_dir is not None else None
+
+    async def _read_cache(self, key: str) -> str | None:
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            return await asyncio.to_thread(path.read_text, encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    async def _write_cache(self, key: str, js: str) -> None:
+        path = self._path(key)
+        if path is None:
+            return
+        try:
+            await asyncio.to_thread(_atomic_write, path, js)
+        except OSError as exc:
+            logger.warning("TSX build cache write failed for %s: %s", key, exc)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_concurrency": self._max_concurrency,
+            "queue_depth": self._waiting,
+            "running": self._running,
+            "compiled": self._compiled,
+            "cache_hits": self._cache_hits,
+            "deduplicated": self._deduplicated,
+            "failed": self._failed,
+            "timeouts": self._timeouts,
+            "compile_seconds_total": round(self._compile_seconds, 3),
+            "esbuild_version": self._esbuild_version,
+        }
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+
+
+_compiler: TsxCompiler | None = None
+
+
+def init_tsx_compiler(cache_dir: str | None, *, max_concurrency: int = 2, timeout_sec: float = 30.0) -> None:
+    global _compiler
+    _compiler = TsxCompiler(cache_dir=Path(cache_dir) if cache_dir else None, max_concurrency=max_concurrency, timeout_sec=timeout_sec)
+
+
+def get_tsx_compiler() -> TsxCompiler:
+    if _compiler is None:
+        raise RuntimeError("TSX compiler not initialized")
+    return _compiler
+
+
+def close_tsx_compiler() -> None:
+    global _compiler
+    _compiler = None
+
+
+async def compile_tsx_plugin(tsx_code: str, plugin_name: str) -> str:
+    """Асинхронный аналог `transform_tsx_to_html`: TSX -> HTML страница плагина."""
+    code, _component_name = prepare_tsx(tsx_code)
+    js_code = await get_tsx_compiler().compile(code)
+    return render_plugin_html(js_code, plugin_name)
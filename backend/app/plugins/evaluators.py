@@ -0,0 +1,154 @@
+"""Стратегии проверки ответов плагинов.
+
+Стратегия объявляется в manifest.json (`"evaluator"`) и выбирается один раз при загрузке
+реестра плагинов (app.plugins.registry), а не на каждый ответ.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections.abc import Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+Evaluator = Callable[[dict[str, Any]], dict[str, Any]]
+
+_ADDITION_QUESTION = re.compile(r"(\d+)\s*\+\s*(\d+)\s*=\s*\?")
+_SUM_AT_END = re.compile(r"=\s*(\d+)\s*$")
+_FULL_SUM = re.compile(r"(\d+)\s*\+\s*(\d+)\s*=\s*(\d+)")
+
+NOT_IMPLEMENTED = {
+    "correct": False,
+    "score": 0.0,
+    "explanation": "Логика проверки для этого плагина еще не реализована",
+}
+
+
+def _to_int(x: Any) -> int | None:
+    if x is None:
+        return None
+    try:
+        return int(x)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_bool(raw: Any) -> bool:
+    if isinstance(raw, bool):
+        return raw
+    if isinstance(raw, str):
+        return raw.lower() in ("true", "1", "yes")
+    if isinstance(raw, (int, float)):
+        return bool(raw)
+    logger.warning("Plugin answer: isCorrect is not a valid boolean: %r (type: %s)", raw, type(raw).__name__)
+    return False
+
+
+def evaluate_addition(user_answer: dict[str, Any]) -> dict[str, Any]:
+    """Сложение: вопрос вида "5 + 3 = ?", ответ в `answer`."""
+    user_answer_value = user_answer.get("answer")
+    match = _ADDITION_QUESTION.match(user_answer.get("question", ""))
+    if not match:
+        return {"correct": False, "score": 0.0, "explanation": "Не удалось распознать вопрос"}
+
+    a, b = int(match.group(1)), int(match.group(2))
+    correct_answer = a + b
+    is_correct = user_answer_value == correct_answer
+    if is_correct:
+        explanation = f"Правильно! {a} + {b} = {correct_answer}"
+    else:
+        explanation = f"Неправильно. Правильный ответ: {a} + {b} = {correct_answer}. Вы ввели: {user_answer_value}"
+    return {"correct": is_correct, "score": 1.0 if is_correct else 0.0, "explanation": explanation}
+
+
+def evaluate_drag_drop_sum(user_answer: dict[str, Any]) -> dict[str, Any]:
+    """Перетаскивание слагаемых: `a` + `b` должно дать сумму из вопроса "? + ? = Z"."""
+    user_a = _to_int(user_answer.get("a"))
+    user_b = _to_int(user_answer.get("b"))
+    question_text = (user_answer.get("question") or "").strip()
+
+    # Правильный ответ (сумма) — из строки "X + Y = Z" или "Решите: ? + ? = Z"
+    correct_sum = None
+    match = _SUM_AT_END.search(question_text)
+    if match:
+        correct_sum = int(match.group(1))
+    if correct_sum is None:
+        match_full = _FULL_SUM.match(question_text)
+        if match_full:
+            correct_sum = int(match_full.group(3))
+
+    if correct_sum is None:
+        return {
+            "correct": False,
+            "score": 0.0,
+            "explanation": f"Не удалось распознать правильный ответ из вопроса: {question_text!r}. a={user_a}, b={user_b}",
+        }
+    if user_a is None or user_b is None:
+        return {
+            "correct": False,
+            "score": 0.0,
+            "explanation": f"Не получены оба слагаемых. Получено: a={user_a}, b={user_b}",
+        }
+
+    calculated_sum = user_a + user_b
+    is_correct = calculated_sum == correct_sum
+    if is_correct:
+        explanation = f"Правильно! {user_a} + {user_b} = {correct_sum}"
+    else:
+        explanation = f"Неправильно. Сумма должна быть {correct_sum}. Вы указали: {user_a} + {user_b} = {calculated_sum}"
+    return {"correct": is_correct, "score": 1.0 if is_correct else 0.0, "explanation": explanation}
+
+
+def evaluate_self_checked(user_answer: dict[str, Any]) -> dict[str, Any]:
+    """Плагин проверяет ответ сам (TSX плагины): `{isCorrect, userAnswer, correctAnswer}`."""
+    is_correct = _to_bool(user_answer.get("isCorrect"))
+    correct_answer_value = user_answer.get("correctAnswer") or user_answer.get("correct_answer", "")
+    user_answer_value = user_answer.get("userAnswer") or user_answer.get("user_answer", "")
+    if is_correct:
+        explanation = f"Правильно! Правильный ответ: {correct_answer_value}"
+    else:
+        explanation = f"Неправильно. Ваш ответ: {user_answer_value}. Правильный ответ: {correct_answer_value}"
+    return {
+        "correct": is_correct,
+        "score": 1.0 if is_correct else 0.0,
+        "explanation": explanation,
+        "correct_answer": correct_answer_value,  # Для отображения на фронтенде
+    }
+
+
+def evaluate_default(user_answer: dict[str, Any]) -> dict[str, Any]:
+    """Стратегия не объявлена: принимаем самопроверку, если плагин ее прислал."""
+    if "isCorrect" in user_answer:
+        return evaluate_self_checked(user_answer)
+    return dict(NOT_IMPLEMENTED)
+
+
+EVALUATORS: dict[str, Evaluator] = {
+    "addition": evaluate_addition,
+    "drag_drop_sum": evaluate_drag_drop_sum,
+    "self_checked": evaluate_self_checked,
+    "default": evaluate_default,
+}
+
+# Плагины, загруженные до появления поля "evaluator" в manifest
+_LEGACY_EVALUATORS = {
+    "math-addition-example": "addition",
+    "drag-drop-math-example": "drag_drop_sum",
+}
+
+
+def resolve_evaluator_name(plugin_id: str, name: str | None, manifest_data: dict[str, Any] | None) -> str:
+    """Имя стратегии для плагина: из manifest, иначе по признакам старых плагинов."""
+    manifest_data = manifest_data or {}
+    declared = manifest_data.get("evaluator")
+    if declared in EVALUATORS:
+        return declared
+    if plugin_id in _LEGACY_EVALUATORS:
+        return _LEGACY_EVALUATORS[plugin_id]
+    # TSX плагины до появления manifest.evaluator определялись по id/имени
+    names = (plugin_id, name or "", manifest_data.get("name") or "")
+    if plugin_id.startswith("tsx-") or any("tsx" in n.lower() for n in names):
+        return "self_checked"
+    return "default"
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import functools
+import json
+import os
+import shutil
+import uuid
+import zipfile
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+from app.plugins.security import SCANNED_SUFFIXES, PluginSecurityError, check_member_name, scan_member_text
+
+if TYPE_CHECKING:
+    import jsonschema
+
+# Приём ZIP плагина без чтения архива в память: загрузка копируется на диск блоками под
+# лимитом размера, затем каждый файл архива за один проход проверяется и распаковывается в
+# staging-директорию, которая переименованием ставится на место static/plugins/{id}/{version}.
+# Функции синхронные: сервис вызывает их через asyncio.to_thread.
+
+COPY_CHUNK = 1024 * 1024
+MB = 1024 * 1024
+
+
+def save_upload(src: BinaryIO, dest: Path, *, max_size_mb: int) -> int:
+    """Копирует загруженный файл в `dest` блоками; прерывается, как только превышен лимит."""
+    max_bytes = max_size_mb * MB
+    written = 0
+    with open(dest, "wb") as out:
+        while chunk := src.read(COPY_CHUNK):
+            written += len(chunk)
+            if written > max_bytes:
+                raise PluginSecurityError(f"ZIP файл слишком большой (максимум {max_size_mb}MB)")
+            out.write(chunk)
+    return written
+
+
+def extract_plugin_zip(zip_path: Path, dest: Path, *, max_unpacked_mb: int) -> bytes | None:
+    """Проверяет и распаковывает архив в `dest` за один проход.
+
+    Для каждого файла проверяется имя (zip slip, запрещенные типы), текстовые файлы
+    сканируются перед записью. Общий распакованный размер ограничен (zip bomb) по реально
+    прочитанным байтам, а не по заголовкам архива.
+
+    Returns:
+        содержимое manifest.json из корня архива или None, если его нет
+    """
+    limit = max_unpacked_mb * MB
+    total = 0
+    manifest: bytes | None = None
+
+    def _count(n: int) -> None:
+        nonlocal total
+        total += n
+        if total > limit:
+            raise PluginSecurityError(f"Распакованный плагин слишком большой (максимум {max_unpacked_mb}MB)")
+
+    try:
+        with zipfile.ZipFile(zip_path, "r") as zf:
+            for info in zf.infolist():
+                name = info.filename
+                check_member_name(name)
+                if info.is_dir():
+                    continue
+                target = dest / name
+                target.parent.mkdir(parents=True, exist_ok=True)
+                with zf.open(info) as src:
+                    if name.endswith(SCANNED_SUFFIXES):
+                        data = src.read(limit - total + 1)
+                        _count(len(data))
+                        scan_member_text(name, data.decode("utf-8", errors="ignore"))
+                        target.write_bytes(data)
+                        if name == "manifest.json":
+                            manifest = data
+                        continue
+                    with open(target, "wb") as out:
+                        while chunk := src.read(COPY_CHUNK):
+                            _count(len(chunk))
+                            out.write(chunk)
+    except zipfile.BadZipFile:
+        raise PluginSecurityError("Некорректный ZIP файл")
+    except PluginSecurityError:
+        raise
+    except Exception as e:
+        raise PluginSecurityError(f"Ошибка при проверке архива: {str(e)}")
+    return manifest
+
+
+@functools.lru_cache(maxsize=1)
+def manifest_validator() -> jsonschema.protocols.Validator:
+    """Валидатор manifest.json; схема читается и компилируется один раз на процесс.
+
+    jsonschema импортируется здесь, а не при старте приложения: он нужен только при загрузке плагина.
+    """
+    import jsonschema
+
+    schema = json.loads((Path(__file__).parent / "manifest_schema.json").read_text(encoding="utf-8"))
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
+
+def publish_dir(staged: Path, target: Path) -> None:
+    """Ставит подготовленную директорию на место `target` переименованием.
+
+    `staged` должна лежать на той же файловой системе. Старая версия (если есть) сначала
+    отодвигается в соседнюю директорию и удаляется после замены, так что файлы плагина
+    никогда не видны наполовину скопированными.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    old = None
+    if target.exists():
+        old = staged.with_name(f"{staged.name}.old-{uuid.uuid4().hex[:8]}")
+        os.replace(target, old)
+    os.replace(staged, target)
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
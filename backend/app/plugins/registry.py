@@ -0,0 +1,196 @@
+"""Реестр плагинов в памяти процесса для проверки ответов.
+
+Реестр загружается при старте и перечитывается целиком после изменения плагинов
+(загрузка, публикация, обновление, удаление): сервис после коммита вызывает `invalidate()`,
+которое сразу перечитывает реестр своего процесса и через Redis pub/sub оповещает остальные
+процессы API. Проверка ответа PLUGIN берет метаданные и стратегию проверки отсюда, без запросов
+к таблице plugins.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.plugin import Plugin
+from app.plugins.evaluators import EVALUATORS, Evaluator, resolve_evaluator_name
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "plugins:invalidate"
+# Неизвестный plugin_id перечитывает реестр не чаще этого интервала (на случай потерянного оповещения)
+MISS_RELOAD_INTERVAL_SEC = 5.0
+
+
+@dataclass(frozen=True, slots=True)
+class PluginEntry:
+    plugin_id: str
+    name: str
+    version: str
+    entry: str
+    height: int
+    is_published: bool
+    evaluator_name: str
+    evaluate: Evaluator
+
+
+class PluginRegistry:
+    def __init__(self, sessionmaker: async_sessionmaker[AsyncSession], redis: Redis | None = None) -> None:
+        self._sessionmaker = sessionmaker
+        self._redis = redis
+        self._entries: dict[str, PluginEntry] = {}
+        self._loaded_at: float | None = None
+        self._reload_lock = asyncio.Lock()
+        self._listener: asyncio.Task[None] | None = None
+        self._hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._refresh_errors = 0
+        self._invalidations = 0
+
+    async def start(self) -> None:
+        try:
+            await self.reload()
+        except Exception:
+            # Без БД на старте реестр загрузится при первом обращении.
+            logger.exception("Plugin registry initial load failed")
+        if self._redis is not None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def get(self, plugin_id: str) -> PluginEntry | None:
+        entry = self._entries.get(plugin_id)
+        if entry is not None:
+            self._hits += 1
+            return entry
+        self._misses += 1
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > MISS_RELOAD_INTERVAL_SEC:
+            await self.reload()
+            return self._entries.get(plugin_id)
+        return None
+
+    async def reload(self) -> None:
+        requested = time.monotonic()
+        async with self._reload_lock:
+            # Пока ждали lock, реестр уже перечитали: второй запрос к БД не нужен.
+            if self._loaded_at is not None and self._loaded_at >= requested:
+                return
+            started = time.monotonic()
+            try:
+                async with self._sessionmaker() as session:
+                    rows = (await session.execute(select(Plugin).order_by(Plugin.created_at.desc()))).scalars().all()
+            except Exception:
+                self._refresh_errors += 1
+                raise
+            self._entries = build_entries(rows)
+            self._loaded_at = started
+            self._refreshes += 1
+
+    async def invalidate(self) -> None:
+        """Перечитывает реестр в этом процессе и оповещает остальные процессы об изменении плагинов.
+
+        Свой процесс обновляется сразу, не дожидаясь оповещения через pub/sub: иначе запрос,
+        пришедший сразу после изменения, мог бы увидеть старый реестр.
+        """
+        self._invalidations += 1
+        if self._redis is None or self._listener is None:
+            await self.reload()
+            return
+        try:
+            await self.reload()
+        except Exception:
+            # Остальные процессы все равно нужно оповестить; этот перечитает реестр по оповещению.
+            logger.exception("Plugin registry reload failed")
+        try:
+            await self._redis.publish(INVALIDATE_CHANNEL, "1")
+        except RedisError as exc:
+            logger.warning("Plugin registry invalidation publish failed: %s", exc)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATE_CHANNEL)
+                # Оповещения могли быть пропущены, пока подписки не было.
+                await self.reload()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        await self.reload()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Plugin registry listener failed: %s", exc)
+                await asyncio.sleep(1)
+            finally:
+                with contextlib.suppress(Exception):
+                    await pubsub.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "plugins": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "refreshes": self._refreshes,
+            "refresh_errors": self._refresh_errors,
+            "invalidations": self._invalidations,
+            "loaded_age_sec": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None,
+            "listening": self._listener is not None and not self._listener.done(),
+        }
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+        self._entries = {}
+
+
+def build_entries(plugins: list[Plugin]) -> dict[str, PluginEntry]:
+    """plugin_id -> PluginEntry. `plugins` упорядочены от новых к старым: побеждает самая новая запись."""
+    entries: dict[str, PluginEntry] = {}
+    for p in plugins:
+        if p.plugin_id in entries:
+            continue
+        evaluator_name = resolve_evaluator_name(p.plugin_id, p.name, p.manifest_data)
+        entries[p.plugin_id] = PluginEntry(
+            plugin_id=p.plugin_id,
+            name=p.name,
+            version=p.version,
+            entry=p.entry,
+            height=p.height,
+            is_published=p.is_published,
+            evaluator_name=evaluator_name,
+            evaluate=EVALUATORS[evaluator_name],
+        )
+    return entries
+
+
+_registry: PluginRegistry | None = None
+
+
+async def init_plugin_registry(sessionmaker: async_sessionmaker[AsyncSession], redis: Redis | None = None) -> None:
+    global _registry
+    _registry = PluginRegistry(sessionmaker, redis)
+    await _registry.start()
+
+
+def get_plugin_registry() -> PluginRegistry:
+    if _registry is None:
+        raise RuntimeError("Plugin registry not initialized")
+    return _registry
+
+
+async def close_plugin_registry() -> None:
+    global _registry
+    if _registry is not None:
+        await _registry.close()
+        _registry = None
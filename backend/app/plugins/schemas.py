@@ -17,6 +17,7 @@ class PluginManifest(BaseModel):
     api_version: str = Field(..., alias="apiVersion", description="Версия API")
     capabilities: dict[str, bool] = Field(default_factory=dict, description="Возможности плагина")
     height: int = Field(default=400, ge=200, le=2000, description="Высота iframe")
+    evaluator: str | None = Field(default=None, description="Стратегия проверки ответа (app.plugins.evaluators)")
 
     model_config = {"populate_by_name": True}
 
@@ -10,98 +10,82 @@ class PluginSecurityError(Exception):
     pass
 
 
+# Опасные типы файлов (по имени)
+_DANGEROUS_NAME = re.compile(r"\.(py|pyc|exe|sh|bat|cmd)$", re.IGNORECASE)
+
+# Безопасные CDN источники (разрешены для TSX плагинов)
+_SAFE_CDN = re.compile(r"https://unpkg\.com/(react|react-dom|@babel|lucide)/|https://cdn\.tailwindcss\.com/", re.IGNORECASE)
+
+# Опасные паттерны в содержимом (для текстовых файлов)
+_DANGEROUS_CONTENT = [
+    (r"eval\s*\(", re.compile(r"eval\s*\(", re.IGNORECASE)),
+    (r"new\s+Function\s*\(", re.compile(r"new\s+Function\s*\(", re.IGNORECASE)),
+    (r"Function\s*\(", re.compile(r"Function\s*\(", re.IGNORECASE)),
+]
+
+# Удаленные скрипты и iframe
+_REMOTE_SCRIPT = re.compile(r"<script[^>]*src\s*=\s*['\"](https?://[^'\"]+)['\"]", re.IGNORECASE)
+_REMOTE_IFRAME = re.compile(r"<iframe[^>]*src\s*=\s*['\"](https?://[^'\"]+)['\"]", re.IGNORECASE)
+
+# Файлы, содержимое которых проверяется на опасный код
+SCANNED_SUFFIXES = (".html", ".js", ".json")
+
+
+def check_member_name(member: str) -> None:
+    """Проверяет имя файла в архиве: zip slip и запрещенные типы файлов."""
+    if ".." in member or member.startswith(("/", "\\")) or member[1:2] == ":":
+        raise PluginSecurityError(f"Небезопасный путь в архиве: {member}")
+    if _DANGEROUS_NAME.search(member):
+        raise PluginSecurityError(f"Запрещенный тип файла: {member}")
+
+
+def scan_member_text(member: str, content: str) -> None:
+    """Проверяет содержимое текстового файла: eval/Function, внешние скрипты и iframe."""
+    for pattern, regex in _DANGEROUS_CONTENT:
+        if regex.search(content):
+            raise PluginSecurityError(f"Обнаружен опасный код в {member}: {pattern}")
+
+    # Проверяем удаленные скрипты (но разрешаем безопасные CDN)
+    for match in _REMOTE_SCRIPT.finditer(content):
+        url = match.group(1)
+        if not _SAFE_CDN.search(url):
+            raise PluginSecurityError(
+                f"Обнаружен небезопасный внешний скрипт в {member}: {url}. "
+                f"Разрешены только безопасные CDN (unpkg.com для React/Babel, cdn.tailwindcss.com)"
+            )
+
+    # Проверяем удаленные iframe (не разрешаем)
+    if _REMOTE_IFRAME.search(content):
+        raise PluginSecurityError(f"Обнаружен внешний iframe в {member}. Внешние iframe не разрешены.")
+
+
 def scan_zip_contents(zip_path: Path, max_size_mb: int = 10) -> None:
     """Проверяет содержимое ZIP-архива на безопасность.
-    
+
     Проверяет:
     - Размер архива не превышает лимит
     - Нет опасных файлов (executable, .py, .js с eval)
     - Нет путей выхода за пределы директории (zip slip)
     - Нет удаленных скриптов (remote script src)
-    
+
+    Загрузка плагинов использует `app.plugins.ingest`, который делает те же проверки
+    за один проход вместе с распаковкой.
+
     Raises:
         PluginSecurityError: если обнаружены проблемы безопасности
     """
     max_size_bytes = max_size_mb * 1024 * 1024
-    
+
     # Проверка размера файла
     if zip_path.stat().st_size > max_size_bytes:
         raise PluginSecurityError(f"ZIP файл слишком большой (максимум {max_size_mb}MB)")
-    
-    # Опасные паттерны в именах файлов
-    dangerous_patterns = [
-        r"\.py$",
-        r"\.pyc$",
-        r"\.exe$",
-        r"\.sh$",
-        r"\.bat$",
-        r"\.cmd$",
-    ]
-    
-    # Безопасные CDN источники (разрешены для TSX плагинов)
-    safe_cdn_patterns = [
-        r"https://unpkg\.com/(react|react-dom|@babel|lucide)/",
-        r"https://cdn\.tailwindcss\.com/",
-    ]
-    
-    # Опасные паттерны в содержимом (для текстовых файлов)
-    dangerous_content_patterns = [
-        r"eval\s*\(",
-        r"new\s+Function\s*\(",
-        r"Function\s*\(",
-    ]
-    
-    # Проверка удаленных скриптов (но разрешаем безопасные CDN)
-    remote_script_pattern = r"<script[^>]*src\s*=\s*['\"](https?://[^'\"]+)['\"]"
-    remote_iframe_pattern = r"<iframe[^>]*src\s*=\s*['\"](https?://[^'\"]+)['\"]"
-    
+
     try:
         with zipfile.ZipFile(zip_path, "r") as zip_file:
-            # Проверка на zip slip (пути выхода за пределы)
             for member in zip_file.namelist():
-                # Нормализуем путь и проверяем, что он не выходит за пределы
-                normalized = Path(member).resolve()
-                if not str(normalized).startswith(str(zip_path.parent.resolve())):
-                    # Это не zip slip, но проверяем относительный путь
-                    if ".." in member or member.startswith("/"):
-                        raise PluginSecurityError(f"Небезопасный путь в архиве: {member}")
-                
-                # Проверка расширения файла
-                for pattern in dangerous_patterns:
-                    if re.search(pattern, member, re.IGNORECASE):
-                        raise PluginSecurityError(f"Запрещенный тип файла: {member}")
-                
-                # Проверка содержимого текстовых файлов
-                if member.endswith((".html", ".js", ".json")):
-                    try:
-                        content = zip_file.read(member).decode("utf-8", errors="ignore")
-                        
-                        # Проверяем опасные паттерны
-                        for pattern in dangerous_content_patterns:
-                            if re.search(pattern, content, re.IGNORECASE):
-                                raise PluginSecurityError(
-                                    f"Обнаружен опасный код в {member}: {pattern}"
-                                )
-                        
-                        # Проверяем удаленные скрипты (но разрешаем безопасные CDN)
-                        for match in re.finditer(remote_script_pattern, content, re.IGNORECASE):
-                            url = match.group(1)
-                            is_safe = any(re.search(pattern, url, re.IGNORECASE) for pattern in safe_cdn_patterns)
-                            if not is_safe:
-                                raise PluginSecurityError(
-                                    f"Обнаружен небезопасный внешний скрипт в {member}: {url}. "
-                                    f"Разрешены только безопасные CDN (unpkg.com для React/Babel, cdn.tailwindcss.com)"
-                                )
-                        
-                        # Проверяем удаленные iframe (не разрешаем)
-                        if re.search(remote_iframe_pattern, content, re.IGNORECASE):
-                            raise PluginSecurityError(
-                                f"Обнаружен внешний iframe в {member}. Внешние iframe не разрешены."
-                            )
-                    except (UnicodeDecodeError, zipfile.BadZipFile):
-                        # Пропускаем бинарные файлы или поврежденные
-                        pass
-                        
+                check_member_name(member)
+                if member.endswith(SCANNED_SUFFIXES):
+                    scan_member_text(member, zip_file.read(member).decode("utf-8", errors="ignore"))
     except zipfile.BadZipFile:
         raise PluginSecurityError("Некорректный ZIP файл")
     except Exception as e:
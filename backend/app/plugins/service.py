@@ -1,20 +1,24 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import shutil
 import tempfile
 import uuid
 from pathlib import Path
 
-import jsonschema
 from fastapi import UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.errors import AppError
+from app.db.session import after_commit
+from app.plugins.assets import asset_base, build_assets, read_build_hash
+from app.plugins.compiler import compile_tsx_plugin
+from app.plugins.ingest import extract_plugin_zip, manifest_validator, publish_dir, save_upload
+from app.plugins.registry import get_plugin_registry
 from app.plugins.schemas import PluginCreate, PluginManifest
-from app.plugins.security import PluginSecurityError, scan_zip_contents
-from app.plugins.tsx_transformer import transform_tsx_to_html
+from app.plugins.security import PluginSecurityError
 from app.repositories.plugin_repo import PluginRepository
 
 
@@ -26,79 +30,71 @@ class PluginService:
         self.repo = PluginRepository(session)
         self.plugins_dir = Path(settings.plugins_dir)
         self.plugins_dir.mkdir(parents=True, exist_ok=True)
+        # Не внутри plugins_dir: она раздаётся как статика
+        self.staging_dir = self.plugins_dir.parent / ".plugin-staging"
 
     async def upload_plugin(self, zip_file: UploadFile) -> dict:
         """Загружает и валидирует плагин из ZIP файла.
         
         Шаги:
-        1. Сохраняет ZIP во временную директорию
-        2. Проверяет размер и безопасность
-        3. Распаковывает и находит manifest.json
+        1. Потоково сохраняет ZIP в staging-директорию (с лимитом размера)
+        2. За один проход проверяет безопасность и распаковывает файлы
+        3. Находит manifest.json
         4. Валидирует manifest по JSON Schema
         5. Проверяет наличие entry файла
-        6. Сохраняет в /static/plugins/{plugin_id}/{version}/
-        7. Сохраняет метаданные в БД
+        6. Готовит сжатые варианты файлов и хеш сборки (app.plugins.assets)
+        7. Переименованием ставит файлы в /static/plugins/{plugin_id}/{version}/
+        8. Сохраняет метаданные в БД
         
         Returns:
             dict с информацией о загруженном плагине
         """
-        # Сохраняем ZIP во временную директорию
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir) / zip_file.filename or "plugin.zip"
-            
-            # Читаем файл
-            content = await zip_file.read()
-            temp_path.write_bytes(content)
-            
-            # Security scan
+        # Всё промежуточное лежит в staging рядом с plugins_dir (та же ФС, чтобы rename был атомарным)
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=self.staging_dir))
+        try:
+            # Потоково сохраняем ZIP на диск, проверяем и распаковываем его за один проход
+            zip_path = staging / "upload.zip"
+            extract_dir = staging / "files"
             try:
-                scan_zip_contents(temp_path, max_size_mb=settings.plugin_max_size_mb)
+                await asyncio.to_thread(save_upload, zip_file.file, zip_path, max_size_mb=settings.plugin_max_size_mb)
+                manifest_raw = await asyncio.to_thread(
+                    extract_plugin_zip, zip_path, extract_dir, max_unpacked_mb=settings.plugin_max_unpacked_mb
+                )
             except PluginSecurityError as e:
                 raise AppError(status_code=400, code="plugin_security_error", message=str(e))
-            
-            # Распаковываем во временную директорию
-            extract_dir = Path(temp_dir) / "extracted"
-            extract_dir.mkdir()
-            
-            import zipfile
-            try:
-                with zipfile.ZipFile(temp_path, "r") as zip_ref:
-                    zip_ref.extractall(extract_dir)
-            except zipfile.BadZipFile:
-                raise AppError(status_code=400, code="invalid_zip", message="Некорректный ZIP файл")
-            
+            zip_path.unlink()
+
             # Ищем manifest.json
-            manifest_path = extract_dir / "manifest.json"
-            if not manifest_path.exists():
+            if manifest_raw is None:
                 raise AppError(
                     status_code=400,
                     code="manifest_not_found",
                     message="manifest.json не найден в корне архива"
                 )
-            
+
             # Читаем и валидируем manifest
             try:
-                manifest_data = json.loads(manifest_path.read_text(encoding="utf-8"))
-            except json.JSONDecodeError as e:
+                manifest_data = json.loads(manifest_raw.decode("utf-8"))
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
                 raise AppError(
                     status_code=400,
                     code="invalid_manifest_json",
                     message=f"Некорректный JSON в manifest.json: {str(e)}"
                 )
-            
+
             # Валидация по JSON Schema
-            schema_path = Path(__file__).parent / "manifest_schema.json"
-            schema = json.loads(schema_path.read_text(encoding="utf-8"))
-            
+            from jsonschema import ValidationError
+
             try:
-                jsonschema.validate(instance=manifest_data, schema=schema)
-            except jsonschema.ValidationError as e:
+                manifest_validator().validate(manifest_data)
+            except ValidationError as e:
                 raise AppError(
                     status_code=400,
                     code="manifest_validation_error",
                     message=f"Ошибка валидации manifest.json: {e.message}"
                 )
-            
+
             # Парсим в Pydantic схему
             try:
                 manifest = PluginManifest.model_validate(manifest_data)
@@ -108,32 +104,27 @@ class PluginService:
                     code="manifest_parse_error",
                     message=f"Ошибка парсинга manifest: {str(e)}"
                 )
-            
+
             # Проверяем наличие entry файла
             entry_path = extract_dir / manifest.entry
-            if not entry_path.exists():
+            if not entry_path.is_file():
                 raise AppError(
                     status_code=400,
                     code="entry_not_found",
                     message=f"Entry файл не найден: {manifest.entry}"
                 )
-            
+
             # Используем manifest.id как уникальный идентификатор плагина
             # Это позволяет иметь несколько версий одного плагина с одинаковым ID
             plugin_id = manifest.id
-            
+
             # Проверяем, не существует ли уже такой плагин с такой версией
             # Ищем по plugin_id и версии
             existing = await self.repo.get_by_plugin_id_and_version(plugin_id, manifest.version)
             if existing:
-                # Если плагин не опубликован, удаляем старый и заменяем новым
+                # Если плагин не опубликован, заменяем его новым
                 if not existing.is_published:
-                    # Удаляем старый плагин из БД
                     await self.repo.delete(existing.id)
-                    # Удаляем старые файлы
-                    old_plugin_dir = self.plugins_dir / plugin_id / manifest.version
-                    if old_plugin_dir.exists():
-                        shutil.rmtree(old_plugin_dir)
                 else:
                     # Если плагин опубликован, не разрешаем замену
                     raise AppError(
@@ -141,53 +132,46 @@ class PluginService:
                         code="plugin_exists",
                         message=f"Плагин {plugin_id} версии {manifest.version} уже опубликован и не может быть заменен"
                     )
-            
-            # Сохраняем плагин в постоянную директорию
-            # Путь: static/plugins/{plugin_id}/{version}/
+
+            # Ставим распакованные файлы на место: static/plugins/{plugin_id}/{version}/
+            # (старые файлы этой версии, если есть, заменяются целиком)
             plugin_dir = self.plugins_dir / plugin_id / manifest.version
-            if plugin_dir.exists():
-                # Если директория существует (но записи в БД нет), удаляем
-                shutil.rmtree(plugin_dir)
-            plugin_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Копируем все файлы
-            # Используем более надежный способ копирования
-            for item in extract_dir.rglob("*"):
-                if item.is_file():
-                    rel_path = item.relative_to(extract_dir)
-                    target_path = plugin_dir / rel_path
-                    target_path.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(item, target_path)
-            
-            # Генерируем UUID для БД (для уникальности записи)
-            # Но используем plugin_id (manifest.id) для пути к файлам
-            plugin_uuid = str(uuid.uuid4())
-            
-            # Сохраняем в БД
-            plugin = await self.repo.create({
-                "id": plugin_uuid,  # UUID для БД
-                "plugin_id": plugin_id,  # ID из manifest для пути к файлам
-                "name": manifest.name,
-                "version": manifest.version,
-                "entry": manifest.entry,
-                "api_version": manifest.api_version,
-                "capabilities": manifest.capabilities,
-                "height": manifest.height,
-                "is_published": False,  # По умолчанию не опубликован
-                "manifest_data": manifest_data,
-            })
-            
-            return {
-                "id": plugin.id,
-                "plugin_id": plugin.plugin_id,  # ID для пути к файлам
-                "name": plugin.name,
-                "version": plugin.version,
-                "entry": plugin.entry,
-                "api_version": plugin.api_version,
-                "capabilities": plugin.capabilities,
-                "height": plugin.height,
-                "is_published": plugin.is_published,
-            }
+            build_hash = await asyncio.to_thread(build_assets, extract_dir)
+            await asyncio.to_thread(publish_dir, extract_dir, plugin_dir)
+        finally:
+            await asyncio.to_thread(shutil.rmtree, staging, True)
+
+        # Генерируем UUID для БД (для уникальности записи)
+        # Но используем plugin_id (manifest.id) для пути к файлам
+        plugin_uuid = str(uuid.uuid4())
+
+        # Сохраняем в БД
+        plugin = await self.repo.create({
+            "id": plugin_uuid,  # UUID для БД
+            "plugin_id": plugin_id,  # ID из manifest для пути к файлам
+            "name": manifest.name,
+            "version": manifest.version,
+            "entry": manifest.entry,
+            "api_version": manifest.api_version,
+            "capabilities": manifest.capabilities,
+            "height": manifest.height,
+            "is_published": False,  # По умолчанию не опубликован
+            "manifest_data": manifest_data,
+        })
+        self._invalidate_registry()
+
+        return {
+            "id": plugin.id,
+            "plugin_id": plugin.plugin_id,  # ID для пути к файлам
+            "name": plugin.name,
+            "version": plugin.version,
+            "entry": plugin.entry,
+            "api_version": plugin.api_version,
+            "capabilities": plugin.capabilities,
+            "height": plugin.height,
+            "is_published": plugin.is_published,
+            "asset_base": asset_base(plugin.plugin_id, plugin.version, build_hash),
+        }
 
     async def list_plugins(self) -> list[dict]:
         """Получить список всех загруженных плагинов."""
@@ -203,6 +187,7 @@ class PluginService:
                 "capabilities": p.capabilities,
                 "height": p.height,
                 "is_published": p.is_published,
+                "asset_base": asset_base(p.plugin_id, p.version, read_build_hash(self.plugins_dir / p.plugin_id / p.version)),
                 "created_at": p.created_at.isoformat(),
                 "updated_at": p.updated_at.isoformat(),
             }
@@ -214,6 +199,7 @@ class PluginService:
         plugin = await self.repo.update_published(plugin_id, is_published)
         if not plugin:
             raise AppError(status_code=404, code="plugin_not_found", message="Плагин не найден")
+        self._invalidate_registry()
         
         return {
             "id": plugin.id,
@@ -296,7 +282,7 @@ class PluginService:
         # Преобразуем TSX в HTML
         try:
             logger.info("Transforming TSX to HTML...")
-            html_content = transform_tsx_to_html(tsx_code, plugin_name)
+            html_content = await compile_tsx_plugin(tsx_code, plugin_name)
             logger.info(f"TSX transformed successfully: {len(html_content)} characters")
         except Exception as e:
             logger.error(f"TSX transformation error: {str(e)}", exc_info=True)
@@ -313,6 +299,7 @@ class PluginService:
             version=version,
             entry="index.html",
             apiVersion="1",
+            evaluator="self_checked",
             capabilities={
                 "submit": True,
                 "explanation": True,
@@ -329,6 +316,7 @@ class PluginService:
         (plugin_dir / "manifest.json").write_text(
             manifest.model_dump_json(indent=2), encoding="utf-8"
         )
+        build_hash = await asyncio.to_thread(build_assets, plugin_dir)
         
         # Создаем ZIP архив
         zip_path = plugin_dir.parent / f"{plugin_id}-{version}.zip"
@@ -354,6 +342,7 @@ class PluginService:
             "is_published": False,
             "manifest_data": manifest.model_dump(),
         })
+        self._invalidate_registry()
         logger.info(f"Plugin created in database: id={plugin.id}, plugin_id={plugin.plugin_id}")
         
         result = {
@@ -362,6 +351,7 @@ class PluginService:
             "name": plugin_name,
             "version": version,
             "is_published": False,
+            "asset_base": asset_base(plugin_id, version, build_hash),
         }
         
         # Если указан grade_id, автоматически добавляем в тест
@@ -456,7 +446,7 @@ class PluginService:
         # Преобразуем TSX в HTML
         try:
             logger.info("Transforming TSX to HTML...")
-            html_content = transform_tsx_to_html(tsx_code, plugin.name)
+            html_content = await compile_tsx_plugin(tsx_code, plugin.name)
             logger.info(f"TSX transformed successfully: {len(html_content)} characters")
         except Exception as e:
             logger.error(f"TSX transformation error: {str(e)}", exc_info=True)
@@ -482,6 +472,7 @@ class PluginService:
         
         # Записываем новый index.html
         (new_plugin_dir / "index.html").write_text(html_content, encoding="utf-8")
+        build_hash = await asyncio.to_thread(build_assets, new_plugin_dir)
         
         # Создаём ZIP архив для новой версии
         import zipfile
@@ -493,6 +484,7 @@ class PluginService:
         
         # Обновляем версию в БД
         await self.repo.update_version(plugin_id, new_version)
+        self._invalidate_registry()
         
         logger.info(f"Plugin updated successfully: plugin_id={plugin.plugin_id}, version: {old_version} -> {new_version}")
         
@@ -503,6 +495,7 @@ class PluginService:
             "old_version": old_version,
             "version": new_version,
             "is_published": plugin.is_published,
+            "asset_base": asset_base(plugin.plugin_id, new_version, build_hash),
             "updated": True,
         }
 
@@ -534,6 +527,7 @@ class PluginService:
         
         # Удаляем из БД
         await self.repo.delete(plugin_id)
+        self._invalidate_registry()
         
         return {
             "id": plugin_id,
@@ -548,211 +542,14 @@ class PluginService:
     ) -> dict:
         """Проверяет ответ пользователя для плагина.
         
-        plugin_id - это plugin_id из manifest (не UUID из БД).
-        Для примера math-addition-example проверяем сложение чисел.
+        plugin_id - это plugin_id из manifest (не UUID из БД). Плагин и его стратегия
+        проверки (manifest.evaluator, см. app.plugins.evaluators) берутся из реестра в памяти.
         """
-        # Ищем плагин по plugin_id (из manifest)
-        plugin = await self.repo.get_by_plugin_id(plugin_id)
-        if not plugin:
+        plugin = await get_plugin_registry().get(plugin_id)
+        if plugin is None:
             raise AppError(status_code=404, code="plugin_not_found", message="Плагин не найден")
-        
-        # Простая логика проверки для примера math-addition-example
-        if plugin_id == "math-addition-example":
-            # Извлекаем ответ пользователя
-            user_answer_value = user_answer.get("answer")
-            question_text = user_answer.get("question", "")
-            
-            # Парсим вопрос для получения правильного ответа
-            # Формат: "5 + 3 = ?"
-            import re
-            match = re.match(r'(\d+)\s*\+\s*(\d+)\s*=\s*\?', question_text)
-            if match:
-                a = int(match.group(1))
-                b = int(match.group(2))
-                correct_answer = a + b
-                
-                is_correct = user_answer_value == correct_answer
-                score = 1.0 if is_correct else 0.0
-                
-                if is_correct:
-                    explanation = f"Правильно! {a} + {b} = {correct_answer}"
-                else:
-                    explanation = f"Неправильно. Правильный ответ: {a} + {b} = {correct_answer}. Вы ввели: {user_answer_value}"
-                
-                return {
-                    "correct": is_correct,
-                    "score": score,
-                    "explanation": explanation,
-                }
-            else:
-                # Если не удалось распарсить вопрос, возвращаем ошибку
-                return {
-                    "correct": False,
-                    "score": 0.0,
-                    "explanation": "Не удалось распознать вопрос",
-                }
-        
-        # Логика проверки для drag-drop-math-example
-        if plugin_id == "drag-drop-math-example":
-            import re
-            import logging
-            logger = logging.getLogger(__name__)
-
-            def _to_int(x):
-                if x is None:
-                    return None
-                try:
-                    return int(x)
-                except (TypeError, ValueError):
-                    return None
+        return plugin.evaluate(user_answer)
 
-            user_a = _to_int(user_answer.get("a"))
-            user_b = _to_int(user_answer.get("b"))
-            user_sum = _to_int(user_answer.get("answer"))
-            question_text = (user_answer.get("question") or "").strip()
-
-            logger.info(f"Drag-drop check: a={user_a}, b={user_b}, sum={user_sum}, question={question_text!r}")
-
-            # Правильный ответ (сумма) — из строки "X + Y = Z" или "Решите: ? + ? = Z"
-            correct_sum = None
-            match = re.search(r'=\s*(\d+)\s*$', question_text)
-            if match:
-                correct_sum = int(match.group(1))
-            if correct_sum is None:
-                match_full = re.match(r'(\d+)\s*\+\s*(\d+)\s*=\s*(\d+)', question_text)
-                if match_full:
-                    correct_sum = int(match_full.group(3))
-
-            if correct_sum is None:
-                return {
-                    "correct": False,
-                    "score": 0.0,
-                    "explanation": f"Не удалось распознать правильный ответ из вопроса: {question_text!r}. a={user_a}, b={user_b}",
-                }
-
-            if user_a is None or user_b is None:
-                return {
-                    "correct": False,
-                    "score": 0.0,
-                    "explanation": f"Не получены оба слагаемых. Получено: a={user_a}, b={user_b}",
-                }
-
-            calculated_sum = user_a + user_b
-            is_correct = calculated_sum == correct_sum
-            score = 1.0 if is_correct else 0.0
-            if is_correct:
-                explanation = f"Правильно! {user_a} + {user_b} = {correct_sum}"
-            else:
-                explanation = f"Неправильно. Сумма должна быть {correct_sum}. Вы указали: {user_a} + {user_b} = {calculated_sum}"
-
-            return {
-                "correct": is_correct,
-                "score": score,
-                "explanation": explanation,
-            }
-        
-        # Логируем для диагностики
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"Plugin evaluate_answer: plugin_id={plugin_id}, user_answer type={type(user_answer)}, user_answer={user_answer}")
-        
-        # Проверяем, является ли это TSX плагином
-        # TSX плагины могут иметь plugin_id, который начинается с "tsx-" или содержит "tsx"
-        # Также проверяем по имени плагина в БД и по структуре ответа
-        is_tsx_plugin = plugin_id.startswith("tsx-") or "tsx" in plugin_id.lower()
-        
-        # Дополнительная проверка: получаем плагин из БД и проверяем его имя
-        if not is_tsx_plugin:
-            try:
-                plugin_db = await self.repo.get_by_plugin_id(plugin_id)
-                if plugin_db:
-                    # Проверяем имя плагина и manifest
-                    plugin_name_lower = (plugin_db.name or "").lower()
-                    manifest_name_lower = ((plugin_db.manifest_data or {}).get("name", "") or "").lower()
-                    if "tsx" in plugin_name_lower or "tsx" in manifest_name_lower:
-                        is_tsx_plugin = True
-                        logger.info(f"TSX plugin detected by name: plugin_id={plugin_id}, name={plugin_db.name}")
-            except Exception as e:
-                logger.warning(f"Error checking plugin in DB: {e}")
-        
-        # Также проверяем структуру ответа - TSX плагины отправляют isCorrect
-        if not is_tsx_plugin and isinstance(user_answer, dict):
-            if "isCorrect" in user_answer or "is_correct" in user_answer:
-                is_tsx_plugin = True
-                logger.info(f"TSX plugin detected by answer structure: plugin_id={plugin_id}, has isCorrect={('isCorrect' in user_answer)}")
-        
-        if is_tsx_plugin:
-            # TSX плагины отправляют ответ в формате:
-            # { "isCorrect": true/false, "userAnswer": "...", "correctAnswer": "..." }
-            is_correct_raw = user_answer.get("isCorrect")
-            user_answer_value = user_answer.get("userAnswer", "")
-            correct_answer_value = user_answer.get("correctAnswer", "")
-            
-            # Преобразуем в булево значение
-            if isinstance(is_correct_raw, bool):
-                is_correct = is_correct_raw
-            elif isinstance(is_correct_raw, str):
-                is_correct = is_correct_raw.lower() in ("true", "1", "yes")
-            elif isinstance(is_correct_raw, (int, float)):
-                is_correct = bool(is_correct_raw)
-            else:
-                is_correct = False
-                logger.warning(f"TSX plugin: isCorrect is not a valid boolean: {is_correct_raw} (type: {type(is_correct_raw)})")
-            
-            logger.info(f"TSX plugin answer: isCorrect={is_correct} (raw: {is_correct_raw}, type: {type(is_correct_raw)}), userAnswer={user_answer_value}, correctAnswer={correct_answer_value}")
-            
-            score = 1.0 if is_correct else 0.0
-            
-            if is_correct:
-                explanation = f"Правильно! Правильный ответ: {correct_answer_value}"
-            else:
-                explanation = f"Неправильно. Ваш ответ: {user_answer_value}. Правильный ответ: {correct_answer_value}"
-            
-            return {
-                "correct": is_correct,
-                "score": score,
-                "explanation": explanation,
-                "correct_answer": correct_answer_value,  # Добавляем для отображения на фронтенде
-            }
-        
-        # Для плагинов, которые отправляют уже проверенный ответ (с полем isCorrect)
-        if "isCorrect" in user_answer or user_answer.get("isCorrect") is not None:
-            is_correct_raw = user_answer.get("isCorrect")
-            # Проверяем разные варианты ключей
-            correct_answer_value = user_answer.get("correctAnswer") or user_answer.get("correct_answer", "")
-            user_answer_value = user_answer.get("userAnswer") or user_answer.get("user_answer", "")
-            
-            # Преобразуем в булево значение
-            if isinstance(is_correct_raw, bool):
-                is_correct = is_correct_raw
-            elif isinstance(is_correct_raw, str):
-                is_correct = is_correct_raw.lower() in ("true", "1", "yes")
-            elif isinstance(is_correct_raw, (int, float)):
-                is_correct = bool(is_correct_raw)
-            else:
-                is_correct = False
-                logger.warning(f"Plugin with isCorrect: isCorrect is not a valid boolean: {is_correct_raw} (type: {type(is_correct_raw)})")
-            
-            logger.info(f"Plugin with isCorrect: isCorrect={is_correct} (raw: {is_correct_raw}, type: {type(is_correct_raw)}), userAnswer={user_answer_value}, correctAnswer={correct_answer_value}")
-            
-            score = 1.0 if is_correct else 0.0
-            
-            if is_correct:
-                explanation = f"Правильно! Правильный ответ: {correct_answer_value}"
-            else:
-                explanation = f"Неправильно. Ваш ответ: {user_answer_value}. Правильный ответ: {correct_answer_value}"
-            
-            return {
-                "correct": is_correct,
-                "score": score,
-                "explanation": explanation,
-                "correct_answer": correct_answer_value,
-            }
-        
-        # Для других плагинов - базовая проверка
-        # В будущем можно добавить специфичную логику для каждого плагина
-        return {
-            "correct": False,
-            "score": 0.0,
-            "explanation": "Логика проверки для этого плагина еще не реализована",
-        }
+    def _invalidate_registry(self) -> None:
+        """Перечитать реестр плагинов во всех процессах после коммита транзакции."""
+        after_commit(self.session, get_plugin_registry().invalidate)
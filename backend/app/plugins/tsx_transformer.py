@@ -4,17 +4,49 @@
 from __future__ import annotations
 
 import subprocess
-import tempfile
+import json
 import os
 import re
 import shutil
 from pathlib import Path
-import logging
 
-logger = logging.getLogger(__name__)
+import structlog
 
+from app.core.config import settings
 
-def _resolve_esbuild_path() -> str | None:
+logger = structlog.get_logger(__name__)
+
+# Входит в ключ кеша сборок (app/plugins/compiler.py): увеличьте при изменении
+# подготовки кода или аргументов esbuild, чтобы старые сборки не переиспользовались.
+TSX_TRANSFORMER_VERSION = 2
+
+# esbuild читает код из stdin: только трансформация, без bundling. React и lucide приходят
+# глобальными переменными из общего vendor бандла; код плагина заворачивается в IIFE, которое
+# заканчивается вызовом __mountPlugin, поэтому tree shaking выбрасывает все, что не нужно компоненту.
+ESBUILD_ARGS = (
+    "--loader=tsx",
+    "--jsx=transform",
+    "--jsx-factory=React.createElement",
+    "--jsx-fragment=React.Fragment",
+    "--target=es2020",
+    "--format=iife",
+    "--tree-shaking=true",
+    "--minify",
+)
+
+# Адрес, по которому раздается settings.plugin_vendor_dir (app/main.py)
+VENDOR_URL_PREFIX = "/static/vendor/"
+
+# Без собранного vendor бандла (make plugin-vendor) страница плагина грузит библиотеки с CDN
+_CDN_HEAD = '''    <script crossorigin src="https://unpkg.com/react@18/umd/react.development.js"></script>
+    <script crossorigin src="https://unpkg.com/react-dom@18/umd/react-dom.development.js"></script>
+    <script src="https://unpkg.com/lucide@latest/dist/umd/lucide.min.js"></script>
+    <script src="https://cdn.tailwindcss.com"></script>'''
+
+_vendor_manifest: tuple[int, dict[str, str] | None] | None = None
+
+
+def resolve_esbuild_path() -> str | None:
     """Находит бинарник esbuild без зависимости от npx."""
     backend_dir = Path(__file__).resolve().parents[2]
     project_dir = backend_dir.parent
@@ -92,7 +124,7 @@ def fix_invalid_function_syntax(tsx_code: str) -> str:
                 # Это невалидный синтаксис на верхнем уровне - исправляем
                 fixed_line = f"{indent}function {func_name}({params}) {{"
                 fixed_lines.append(fixed_line)
-                logger.info(f"Auto-fixed invalid syntax at line {i+1}: '{line.strip()}' -> '{fixed_line.strip()}'")
+                logger.info("TSX syntax auto-fixed", line=i + 1, function=func_name)
                 continue
         
         fixed_lines.append(line)
@@ -101,9 +133,10 @@ def fix_invalid_function_syntax(tsx_code: str) -> str:
 
 
 def compile_with_esbuild(tsx_code: str) -> str:
-    """Компилирует TSX/JSX код в JavaScript через esbuild.
+    """Компилирует TSX/JSX код в JavaScript через esbuild (синхронно).
     
     Убирает TypeScript синтаксис и компилирует JSX в React.createElement().
+    Обработчики запросов используют асинхронный `app.plugins.compiler.TsxCompiler`.
     
     Args:
         tsx_code: Исходный TSX/JSX код (с уже преобразованными импортами)
@@ -115,47 +148,24 @@ def compile_with_esbuild(tsx_code: str) -> str:
         RuntimeError: Если компиляция не удалась
     """
     # Находим путь к esbuild без fallback на npx (он может отсутствовать в runtime)
-    esbuild_path = _resolve_esbuild_path()
+    esbuild_path = resolve_esbuild_path()
     if not esbuild_path:
         raise RuntimeError(
             "esbuild binary not found. Install Node dependencies "
             "(npm install in backend/ or project root) or add esbuild to PATH."
         )
-    
-    # Создаем временный файл с кодом
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.tsx', delete=False, encoding='utf-8') as f:
-        f.write(tsx_code)
-        temp_file = f.name
-    
-    try:
-        # Вызываем esbuild - только трансформация, без bundling
-        cmd = [esbuild_path] + [
-            temp_file,
-            '--loader:.tsx=tsx',
-            '--jsx=transform',
-            '--jsx-factory=React.createElement',
-            '--jsx-fragment=React.Fragment',
-            '--target=es2020',
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
-        
-        if result.returncode != 0:
-            raise RuntimeError(f"esbuild compilation failed: {result.stderr}")
-        
-        return result.stdout
-        
-    finally:
-        # Удаляем временный файл
-        try:
-            os.unlink(temp_file)
-        except:
-            pass
+
+    result = subprocess.run(
+        [esbuild_path, *ESBUILD_ARGS],
+        input=tsx_code,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        timeout=30,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"esbuild compilation failed: {result.stderr}")
+    return result.stdout
 
 
 def _normalize_default_export(code: str) -> tuple[str, str]:
@@ -231,21 +241,8 @@ def _normalize_default_export(code: str) -> tuple[str, str]:
     return code, fallback_name
 
 
-def transform_tsx_to_html(tsx_code: str, plugin_name: str = "TSX Plugin") -> str:
-    """Преобразует TSX/JSX код в HTML плагин с использованием esbuild.
-    
-    Args:
-        tsx_code: Исходный TSX/JSX код
-        plugin_name: Название плагина
-        
-    Returns:
-        HTML код плагина
-    """
-    # Автоисправление неправильного синтаксиса функций (AI иногда генерирует невалидный код)
-    tsx_code = fix_invalid_function_syntax(tsx_code)
-    
-    # Lucide icons wrapper - создает React компоненты из lucide UMD
-    LUCIDE_WRAPPER = '''
+# Lucide icons wrapper - создает React компоненты из lucide UMD
+_LUCIDE_WRAPPER = '''
       window.lucideReact = new Proxy({}, {
         get(_, name) {
           const toKebab = s => s.replace(/([A-Z])/g, '-$1').toLowerCase().replace(/^-/, '');
@@ -278,6 +275,16 @@ def transform_tsx_to_html(tsx_code: str, plugin_name: str = "TSX Plugin") -> str
         }
       });
     '''
+
+
+def prepare_tsx(tsx_code: str) -> tuple[str, str]:
+    """Готовит TSX к компиляции: исправляет синтаксис, переводит импорты на глобальные переменные.
+
+    Returns:
+        (код для esbuild, имя компонента для рендера)
+    """
+    # Автоисправление неправильного синтаксиса функций (AI иногда генерирует невалидный код)
+    tsx_code = fix_invalid_function_syntax(tsx_code)
     
     # Преобразуем импорты для работы с глобальными переменными (CDN)
     code = tsx_code
@@ -305,31 +312,72 @@ def transform_tsx_to_html(tsx_code: str, plugin_name: str = "TSX Plugin") -> str
     # Нормализуем export default и определяем имя компонента
     code, component_name = _normalize_default_export(code)
     
-    # Логируем код перед компиляцией для отладки
-    logger.info(f"Code before esbuild (first 500 chars): {code[:500]}")
-    logger.info(f"Code before esbuild (lines 60-75): {chr(10).join(code.split(chr(10))[59:75])}")
-    
-    # Компилируем через esbuild (убирает TypeScript, компилирует JSX)
+    # Монтирование - последняя инструкция: от нее esbuild считает достижимый код
+    code = f"{code}\n__mountPlugin({component_name});\n"
+
+    # Исходный код плагина в лог не пишем: только размеры
+    logger.debug("TSX prepared for esbuild", component=component_name, chars=len(code), lines=code.count("\n") + 1)
+    return code, component_name
+
+
+# Монтирование компонента: вызывается последней строкой скомпилированного кода плагина
+_MOUNT_PLUGIN = '''
+      window.__mountPlugin = function(Component) {
+        const embedMode = /[?&]embed=1/i.test(window.location.search);
+        if (embedMode) {
+          document.body.classList.add('embed');
+        }
+        ReactDOM.createRoot(document.getElementById('root')).render(React.createElement(Component));
+        // Отправляем INIT сообщение
+        if (embedMode && window.parent) {
+          window.parent.postMessage({ type: 'INIT', status: 'ready' }, '*');
+        }
+      };
+    '''
+
+
+def plugin_vendor_assets() -> dict[str, str] | None:
+    """Имена файлов собранного vendor бандла (`{"js": ..., "css": ...}`) или None, если он не собран.
+
+    manifest.json перечитывается только при изменении mtime.
+    """
+    global _vendor_manifest
+    path = Path(settings.plugin_vendor_dir) / "manifest.json"
     try:
-        js_code = compile_with_esbuild(code)
-        logger.info(f"esbuild compilation successful: {len(js_code)} bytes")
-    except Exception as e:
-        # Fallback: если esbuild не сработал, логируем ошибку
-        logger.error(f"esbuild compilation failed: {e}")
-        raise RuntimeError(f"Failed to compile TSX: {e}")
-    
-    # Создаем HTML обертку
-    # Теперь НЕ используем Babel в браузере - код уже скомпилирован esbuild!
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return None
+    if _vendor_manifest is None or _vendor_manifest[0] != mtime:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            assets = {"js": data["js"], "css": data["css"]}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Invalid plugin vendor manifest", path=str(path), error=str(e))
+            assets = None
+        _vendor_manifest = (mtime, assets)
+    return _vendor_manifest[1]
+
+
+def render_plugin_html(js_code: str, plugin_name: str) -> str:
+    """Оборачивает скомпилированный JS в HTML страницу плагина."""
+    vendor = plugin_vendor_assets()
+    if vendor is not None:
+        head = (
+            f'    <link rel="stylesheet" href="{VENDOR_URL_PREFIX}{vendor["css"]}">\n'
+            f'    <script src="{VENDOR_URL_PREFIX}{vendor["js"]}"></script>'
+        )
+    else:
+        logger.warning("Plugin vendor bundle is not built, TSX plugin will load libraries from CDN")
+        head = _CDN_HEAD
+
+    # Код уже скомпилирован esbuild, Babel в браузере не нужен
     html_template = f'''<!DOCTYPE html>
 <html lang="ru">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>{plugin_name}</title>
-    <script crossorigin src="https://unpkg.com/react@18/umd/react.development.js"></script>
-    <script crossorigin src="https://unpkg.com/react-dom@18/umd/react-dom.development.js"></script>
-    <script src="https://unpkg.com/lucide@latest/dist/umd/lucide.min.js"></script>
-    <script src="https://cdn.tailwindcss.com"></script>
+{head}
     <style>
         body {{
             margin: 0;
@@ -344,31 +392,38 @@ def transform_tsx_to_html(tsx_code: str, plugin_name: str = "TSX Plugin") -> str
 </head>
 <body>
     <div id="root"></div>
-    <script>{LUCIDE_WRAPPER}</script>
-    <script>
-        (function() {{
-            const embedMode = /[?&]embed=1/i.test(window.location.search);
-            if (embedMode) {{
-                document.body.classList.add('embed');
-            }}
-            
-            {js_code}
-            
-            // Рендерим компонент
-            ReactDOM.createRoot(document.getElementById('root')).render(React.createElement({component_name}));
-            
-            // Отправляем INIT сообщение
-            if (embedMode && window.parent) {{
-                window.parent.postMessage({{ type: 'INIT', status: 'ready' }}, '*');
-            }}
-        }})();
-    </script>
+    <script>{_LUCIDE_WRAPPER}{_MOUNT_PLUGIN}</script>
+    <script>{js_code}</script>
 </body>
 </html>'''
     
     return html_template
 
 
+def transform_tsx_to_html(tsx_code: str, plugin_name: str = "TSX Plugin") -> str:
+    """Преобразует TSX/JSX код в HTML плагин с использованием esbuild.
+    
+    Args:
+        tsx_code: Исходный TSX/JSX код
+        plugin_name: Название плагина
+        
+    Returns:
+        HTML код плагина
+    """
+    code, _component_name = prepare_tsx(tsx_code)
+    
+    # Компилируем через esbuild (убирает TypeScript, компилирует JSX)
+    try:
+        js_code = compile_with_esbuild(code)
+        logger.info("esbuild compilation finished", bytes=len(js_code))
+    except Exception as e:
+        # Fallback: если esbuild не сработал, логируем ошибку
+        logger.error("esbuild compilation failed", error=str(e))
+        raise RuntimeError(f"Failed to compile TSX: {e}")
+    
+    return render_plugin_html(js_code, plugin_name)
+
+
 def _simple_hash(text: str) -> int:
     """Простая хеш-функция для генерации ID."""
     h = 0
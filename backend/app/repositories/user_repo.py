@@ -4,12 +4,17 @@ import uuid
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
 
 from app.models.subscription import Subscription
 from app.models.user import User
 
 
+# One row per user on both sides (profile keyed by user_id, unique subscription), so joining
+# them costs nothing and saves two round trips on every authenticated request.
+_WITH_PROFILE_AND_SUBSCRIPTION = (joinedload(User.profile), joinedload(User.subscription))
+
+
 class UserRepository:
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
@@ -19,11 +24,11 @@ class UserRepository:
             uid = user_id if isinstance(user_id, uuid.UUID) else uuid.UUID(str(user_id))
         except ValueError:
             return None
-        stmt = select(User).where(User.id == uid).options(selectinload(User.profile), selectinload(User.subscription))
+        stmt = select(User).where(User.id == uid).options(*_WITH_PROFILE_AND_SUBSCRIPTION)
         return (await self.session.execute(stmt)).scalar_one_or_none()
 
     async def get_by_email(self, email: str) -> User | None:
-        stmt = select(User).where(User.email == email).options(selectinload(User.profile), selectinload(User.subscription))
+        stmt = select(User).where(User.email == email).options(*_WITH_PROFILE_AND_SUBSCRIPTION)
         return (await self.session.execute(stmt)).scalar_one_or_none()
 
     async def create(self, *, email: str, password_hash: str, full_name: str, role) -> User:
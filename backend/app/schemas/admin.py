@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 from app.models.enums import QuestionType
 
@@ -126,7 +126,30 @@ class BulkImportRequest(BaseModel):
     questions: list[QuestionCreate] = Field(default_factory=list)
 
 
+class BulkQuestionRow(QuestionCreate):
+    """Строка импорта вопроса: навык по `skill_id` или по ключу (subject_id, grade_id, skill_code)."""
+    skill_id: int | None = None
+    subject_id: int | None = None
+    grade_id: int | None = None
+    skill_code: str | None = Field(default=None, min_length=1, max_length=16)
+
+    @model_validator(mode="after")
+    def _skill_reference(self) -> "BulkQuestionRow":
+        if self.skill_id is None and (self.subject_id is None or self.grade_id is None or self.skill_code is None):
+            raise ValueError("either skill_id or subject_id, grade_id and skill_code is required")
+        return self
+
+
+class BulkImportRowError(BaseModel):
+    row: int | str  # номер строки NDJSON, позиция в списке JSON (с 1) или "questions[3]" для разделов JSON
+    kind: str
+    message: str
+
+
 class BulkImportResponse(BaseModel):
-    skills_created: int
-    questions_created: int
+    skills_created: int = 0
+    skills_updated: int = 0
+    questions_created: int = 0
+    failed: int = 0
+    errors: list[BulkImportRowError] = Field(default_factory=list)
 
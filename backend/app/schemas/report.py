@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class ReportExportRequest(BaseModel):
+    classroom_id: str
+    assignment_id: str | None = None
+    date_from: date | None = None
+    date_to: date | None = None
+    format: Literal["zip", "pdf"] = Field(default="zip", description="zip: one PDF per session; pdf: one merged PDF")
+    paper: str | None = None
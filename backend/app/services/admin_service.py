@@ -1,16 +1,21 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterable, Iterable
+from pathlib import Path
+
 from fastapi import Depends
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.errors import AppError
-from app.db.session import get_db_session
+from app.db.session import after_commit, get_db_session
 from app.models.catalog import Grade, Skill, Subject
 from app.models.topic import Topic
 from app.models.question import Question
 from app.models.enums import QuestionType
+from app.plugins.assets import read_build_hash
 from app.repositories.plugin_repo import PluginRepository
 from app.schemas.admin import (
     AddPluginToTestRequest,
@@ -28,6 +33,8 @@ from app.schemas.admin import (
     TopicCreate,
     TopicUpdate,
 )
+from app.services.bulk_import import BulkImporter, ImportRow
+from app.services.catalog_service import invalidate_catalog_lists
 
 
 class AdminService:
@@ -44,6 +51,7 @@ class AdminService:
             await self.session.flush()
         except IntegrityError as e:
             raise AppError(status_code=409, code="conflict", message="Subject slug already exists") from e
+        after_commit(self.session, invalidate_catalog_lists)
         return subject
 
     async def update_subject(self, subject_id: int, req: SubjectUpdate) -> Subject:
@@ -58,6 +66,7 @@ class AdminService:
             await self.session.flush()
         except IntegrityError as e:
             raise AppError(status_code=409, code="conflict", message="Subject slug already exists") from e
+        after_commit(self.session, invalidate_catalog_lists)
         return subject
 
     async def delete_subject(self, subject_id: int) -> None:
@@ -65,6 +74,7 @@ class AdminService:
         if subject is None:
             return
         await self.session.delete(subject)
+        after_commit(self.session, invalidate_catalog_lists)
 
     async def list_grades(self) -> list[Grade]:
         return list((await self.session.execute(select(Grade).order_by(Grade.number))).scalars().all())
@@ -76,6 +86,7 @@ class AdminService:
             await self.session.flush()
         except IntegrityError as e:
             raise AppError(status_code=409, code="conflict", message="Grade number already exists") from e
+        after_commit(self.session, invalidate_catalog_lists)
         return grade
 
     async def update_grade(self, grade_id: int, req: GradeUpdate) -> Grade:
@@ -90,6 +101,7 @@ class AdminService:
             await self.session.flush()
         except IntegrityError as e:
             raise AppError(status_code=409, code="conflict", message="Grade number already exists") from e
+        after_commit(self.session, invalidate_catalog_lists)
         return grade
 
     async def delete_grade(self, grade_id: int) -> None:
@@ -97,6 +109,7 @@ class AdminService:
         if grade is None:
             return
         await self.session.delete(grade)
+        after_commit(self.session, invalidate_catalog_lists)
 
     # --- Topic CRUD ---
 
@@ -122,6 +135,7 @@ class AdminService:
             await self.session.flush()
         except IntegrityError as e:
             raise AppError(status_code=409, code="conflict", message="Topic slug already exists") from e
+        after_commit(self.session, invalidate_catalog_lists)
         return topic
 
     async def update_topic(self, topic_id: int, req: TopicUpdate) -> Topic:
@@ -144,6 +158,7 @@ class AdminService:
             await self.session.flush()
         except IntegrityError as e:
             raise AppError(status_code=409, code="conflict", message="Topic slug already exists") from e
+        after_commit(self.session, invalidate_catalog_lists)
         return topic
 
     async def delete_topic(self, topic_id: int) -> None:
@@ -151,6 +166,7 @@ class AdminService:
         if topic is None:
             return
         await self.session.delete(topic)
+        after_commit(self.session, invalidate_catalog_lists)
 
     # --- Skill CRUD ---
 
@@ -208,7 +224,7 @@ class AdminService:
         # Затем удаляем сам навык
         await self.session.delete(skill)
         await self.session.flush()  # Важно: flush() сохраняет изменения в БД
-        # Транзакция коммитится автоматически через session.begin() в get_db_session()
+        # Транзакция коммитится автоматически в get_db_session()
 
     async def list_questions(
         self, 
@@ -306,6 +322,8 @@ class AdminService:
                 "plugin_version": plugin.version,
                 "entry": plugin.entry,
                 "height": plugin.height,
+                # Хеш сборки: фронтенд строит immutable-адрес {version}@{build}
+                "build": read_build_hash(Path(settings.plugins_dir) / plugin.plugin_id / plugin.version),
             },
             correct_answer={},
             explanation="",
@@ -381,50 +399,21 @@ class AdminService:
                             "message": f"Плагин уже добавлен в тест как навык «{skill.title}»"
                         }
 
+        # Коды уже загруженных навыков класса: подбор свободного кода без запроса на каждый вариант
         base = re.sub(r"[^a-zA-Z0-9_-]", "", plugin.plugin_id)[:16] or "plugin"
+        taken_codes = {s.code for s in skills}
         code = base
         suffix = 0
-        exists_stmt = select(Skill).where(
-            Skill.subject_id == subject_id,
-            Skill.grade_id == req.grade_id,
-            Skill.code == code,
-        )
-        while (await self.session.execute(exists_stmt)).scalar_one_or_none() is not None:
+        while code in taken_codes:
             suffix += 1
             if suffix > 99:
-                # Если не удалось подобрать код, возможно плагин уже добавлен
-                # Проверяем еще раз более тщательно
-                all_skills_stmt = select(Skill).where(
-                    Skill.subject_id == subject_id,
-                    Skill.grade_id == req.grade_id
-                )
-                all_skills = (await self.session.execute(all_skills_stmt)).scalars().all()
-                for skill in all_skills:
-                    skill_questions_stmt = select(Question).where(
-                        Question.skill_id == skill.id,
-                        Question.type == QuestionType.PLUGIN
-                    )
-                    skill_questions = (await self.session.execute(skill_questions_stmt)).scalars().all()
-                    for q in skill_questions:
-                        if (q.data or {}).get('plugin_id') == plugin.plugin_id:
-                            return {
-                                "skill_id": skill.id,
-                                "skill_title": skill.title,
-                                "question_id": q.id,
-                                "already_exists": True,
-                                "message": f"Плагин уже добавлен в тест как навык «{skill.title}»"
-                            }
+                # Вопросы PLUGIN всех навыков класса уже проверены выше, значит плагин не добавлен
                 raise AppError(
                     status_code=409, 
                     code="conflict", 
                     message=f"Не удалось подобрать уникальный код навыка для плагина {plugin.plugin_id}. Возможно, слишком много навыков с похожими кодами."
                 )
             code = f"{base}_{suffix}"[:16]
-            exists_stmt = select(Skill).where(
-                Skill.subject_id == subject_id,
-                Skill.grade_id == req.grade_id,
-                Skill.code == code,
-            )
 
         skill_req = SkillCreate(
             subject_id=subject_id,
@@ -488,20 +477,9 @@ class AdminService:
         await self.session.flush()
 
     async def bulk_import(self, req: BulkImportRequest) -> BulkImportResponse:
-        skills_created = 0
-        questions_created = 0
-        for s in req.skills:
-            skill = Skill(**s.model_dump())
-            self.session.add(skill)
-            try:
-                await self.session.flush()
-                skills_created += 1
-            except IntegrityError:
-                raise AppError(status_code=409, code="conflict", message="Skill conflict during import")
-
-        for q in req.questions:
-            question = Question(**q.model_dump())
-            self.session.add(question)
-            await self.session.flush()
-            questions_created += 1
-        return BulkImportResponse(skills_created=skills_created, questions_created=questions_created)
+        rows = [(i, {"kind": "skill", **s.model_dump()}) for i, s in enumerate(req.skills, 1)]
+        rows += [(i, {"kind": "question", **q.model_dump()}) for i, q in enumerate(req.questions, 1)]
+        return await BulkImporter(self.session).run(rows)
+
+    async def import_rows(self, rows: Iterable[ImportRow] | AsyncIterable[ImportRow]) -> BulkImportResponse:
+        return await BulkImporter(self.session).run(rows)
@@ -8,8 +8,8 @@ from fastapi import Depends
 from sqlalchemy import case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.deps import get_read_session
 from app.core.errors import AppError
-from app.db.session import get_db_session
 from app.models.assignment import Assignment, AssignmentStatusRow
 from app.models.classroom import Classroom, Enrollment
 from app.models.enums import AssignmentStatus
@@ -18,7 +18,7 @@ from app.models.user import User
 
 
 class AnalyticsService:
-    def __init__(self, session: AsyncSession = Depends(get_db_session)) -> None:
+    def __init__(self, session: AsyncSession = Depends(get_read_session)) -> None:
         self.session = session
 
     async def overview(self, *, user_id: str) -> dict[str, Any]:
@@ -96,16 +96,17 @@ class AnalyticsService:
         )
         rows = (await self.session.execute(stmt)).all()
         
-        # Получаем общее время для каждого навыка из сессий
+        # Общее время по каждому навыку из сессий, одним запросом
+        time_stmt = (
+            select(PracticeSession.skill_id, func.coalesce(func.sum(PracticeSession.active_time_seconds), 0))
+            .where(PracticeSession.user_id == uid)
+            .group_by(PracticeSession.skill_id)
+        )
+        time_by_skill = {skill_id: int(total) for skill_id, total in (await self.session.execute(time_stmt)).all()}
+
         result = []
         for r in rows:
-            # Суммируем время из всех сессий для этого навыка
-            time_stmt = (
-                select(func.coalesce(func.sum(PracticeSession.active_time_seconds), 0))
-                .where(PracticeSession.user_id == uid, PracticeSession.skill_id == r.skill_id)
-            )
-            total_time = int((await self.session.execute(time_stmt)).scalar_one())
-            
+            total_time = time_by_skill.get(r.skill_id, 0)
             result.append({
                 "skill_id": r.skill_id,
                 "skill_name": r.skill_name,
@@ -253,30 +254,42 @@ class AnalyticsService:
         if classroom is None or classroom.teacher_id != tid:
             raise AppError(status_code=404, code="not_found", message="Classroom not found")
 
-        enroll_stmt = select(Enrollment.student_id).where(Enrollment.classroom_id == cid)
-        student_ids = [row.student_id for row in (await self.session.execute(enroll_stmt)).all()]
+        # One query per aggregate for the whole class rather than per student.
+        enroll_stmt = (
+            select(User)
+            .join(Enrollment, Enrollment.student_id == User.id)
+            .where(Enrollment.classroom_id == cid)
+        )
+        users = (await self.session.execute(enroll_stmt)).scalars().all()
+        student_ids = [u.id for u in users]
 
-        students: list[dict[str, Any]] = []
-        for sid in student_ids:
-            user = await self.session.get(User, sid)
-            if user is None:
-                continue
-            snap_stmt = select(func.coalesce(func.avg(ProgressSnapshot.best_smartscore), 0)).where(ProgressSnapshot.user_id == sid)
-            avg_best = int(round(float((await self.session.execute(snap_stmt)).scalar_one())))
+        snap_stmt = (
+            select(ProgressSnapshot.user_id, func.avg(ProgressSnapshot.best_smartscore))
+            .where(ProgressSnapshot.user_id.in_(student_ids))
+            .group_by(ProgressSnapshot.user_id)
+        )
+        avg_by_student = dict((await self.session.execute(snap_stmt)).all()) if student_ids else {}
 
-            assign_stmt = (
-                select(
-                    func.count(AssignmentStatusRow.id),
-                    func.coalesce(
-                        func.sum(case((AssignmentStatusRow.status == AssignmentStatus.COMPLETED, 1), else_=0)),
-                        0,
-                    ),
-                )
-                .select_from(AssignmentStatusRow)
-                .join(Assignment, Assignment.id == AssignmentStatusRow.assignment_id)
-                .where(Assignment.classroom_id == cid, AssignmentStatusRow.student_id == sid)
+        assign_stmt = (
+            select(
+                AssignmentStatusRow.student_id,
+                func.count(AssignmentStatusRow.id),
+                func.coalesce(
+                    func.sum(case((AssignmentStatusRow.status == AssignmentStatus.COMPLETED, 1), else_=0)),
+                    0,
+                ),
             )
-            total_assign, completed_assign = (await self.session.execute(assign_stmt)).one()
+            .join(Assignment, Assignment.id == AssignmentStatusRow.assignment_id)
+            .where(Assignment.classroom_id == cid)
+            .group_by(AssignmentStatusRow.student_id)
+        )
+        assign_by_student = {sid: (total, done) for sid, total, done in (await self.session.execute(assign_stmt)).all()}
+
+        students: list[dict[str, Any]] = []
+        for user in users:
+            sid = user.id
+            avg_best = int(round(float(avg_by_student.get(sid) or 0)))
+            total_assign, completed_assign = assign_by_student.get(sid, (0, 0))
             students.append(
                 {
                     "student_id": str(sid),
@@ -5,6 +5,7 @@ import uuid
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.deps import get_read_session
 from app.core.errors import AppError
 from app.db.session import get_db_session
 from app.models.assignment import Assignment, AssignmentStatusRow
@@ -14,11 +15,17 @@ from app.repositories.classroom_repo import ClassroomRepository
 from app.repositories.catalog_repo import SkillRepository
 from app.models.user import User
 from app.schemas.assignment import AssignmentCreateRequest, AssignmentResponse, AssignmentStatusResponse, StudentAssignmentResponse
+from app.utils.score_grid_bus import ScoreGridSubscription, get_score_grid_bus
 
 
 class AssignmentService:
-    def __init__(self, session: AsyncSession = Depends(get_db_session)) -> None:
+    def __init__(
+        self,
+        session: AsyncSession = Depends(get_db_session),
+        read_session: AsyncSession = Depends(get_read_session),
+    ) -> None:
         self.session = session
+        self.read_session = read_session
         self.assignments = AssignmentRepository(session)
         self.status = AssignmentStatusRepository(session)
         self.classrooms = ClassroomRepository(session)
@@ -138,6 +145,16 @@ class AssignmentService:
         teacher_id: str,
         classroom_id: str,
         assignment_id: str,
+    ) -> dict:
+        return await self._score_grid(self.read_session, teacher_id=teacher_id, classroom_id=classroom_id, assignment_id=assignment_id)
+
+    async def _score_grid(
+        self,
+        session: AsyncSession,
+        *,
+        teacher_id: str,
+        classroom_id: str,
+        assignment_id: str,
     ) -> dict:
         import sqlalchemy as sa
 
@@ -145,7 +162,7 @@ class AssignmentService:
         cid = _parse_uuid(classroom_id)
         aid = _parse_uuid(assignment_id)
 
-        assignment = await self.assignments.get_for_teacher(assignment_id=aid, teacher_id=tid)
+        assignment = await AssignmentRepository(session).get_for_teacher(assignment_id=aid, teacher_id=tid)
         if assignment is None or assignment.classroom_id != cid:
             raise AppError(status_code=404, code="not_found", message="Assignment not found")
 
@@ -155,7 +172,7 @@ class AssignmentService:
             .where(AssignmentStatusRow.assignment_id == aid)
             .order_by(User.full_name.asc())
         )
-        rows = (await self.session.execute(stmt)).all()
+        rows = (await session.execute(stmt)).all()
         grid = []
         for user, status_row in rows:
             grid.append(
@@ -194,6 +211,30 @@ class AssignmentService:
             "rows": grid,
         }
 
+    async def score_grid_stream(
+        self,
+        *,
+        teacher_id: str,
+        classroom_id: str,
+        assignment_id: str,
+    ) -> tuple[dict, ScoreGridSubscription]:
+        """Snapshot of the score grid plus a subscription to its subsequent deltas.
+
+        The subscription is opened before the snapshot query, so no update can fall between the two.
+        The snapshot is read from the primary: a lagging replica could miss deltas published
+        before the subscription.
+        """
+        aid = _parse_uuid(assignment_id)
+        sub = await get_score_grid_bus().subscribe(str(aid))
+        try:
+            snapshot = await self._score_grid(self.session, teacher_id=teacher_id, classroom_id=classroom_id, assignment_id=str(aid))
+            # The stream can stay open for hours; give the pooled connection back now.
+            await self.session.commit()
+        except BaseException:
+            await sub.close()
+            raise
+        return snapshot, sub
+
 
 
 def _parse_uuid(value: str | None) -> uuid.UUID:
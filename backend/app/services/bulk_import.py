@@ -0,0 +1,336 @@
+"""Bulk import of skills and questions.
+
+An upload is either JSON or NDJSON. JSON can be `{"skills": [...], "questions": [...]}`, a list of
+rows, or the `{"data": [...]}` export of GET /admin/questions. NDJSON has one row per line and is
+parsed while it streams in; its rows are questions unless they carry `"kind": "skill"`. A question
+names its skill by `skill_id`, or by `subject_id`, `grade_id` and `skill_code` of a skill that
+already exists or comes earlier in the upload.
+
+Rows are handled `bulk_import_batch_size` at a time:
+
+- each row is validated on its own; an invalid row is reported and skipped;
+- the subjects, grades, topics and skills a batch refers to are checked with one query each;
+- skills are upserted by (subject_id, grade_id, code) and questions inserted with one multi-row
+  `INSERT ... RETURNING` per batch. If the statement still fails (a concurrent delete, a value the
+  schema does not check), the batch is retried row by row in savepoints and only the failing rows
+  are reported.
+
+The whole import is one request transaction. Skill caches are dropped once, after commit.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable
+from typing import Any
+
+import structlog
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Select, func, insert, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.errors import AppError
+from app.db.session import after_commit
+from app.models.catalog import Grade, Skill, Subject
+from app.models.question import Question
+from app.models.topic import Topic
+from app.schemas.admin import BulkImportResponse, BulkImportRowError, BulkQuestionRow, QuestionCreate, SkillCreate
+from app.services.catalog_service import invalidate_skills
+
+logger = structlog.get_logger(__name__)
+
+# Errors beyond this are only counted in `failed`.
+MAX_REPORTED_ERRORS = 1000
+
+RowRef = int | str  # NDJSON line number or list position; "questions[3]" in a sectioned JSON upload
+ImportRow = tuple[RowRef, Any]  # (row reference, decoded JSON value or a raw NDJSON line)
+SkillKey = tuple[int, int, str]
+
+_SKILL_KEY_COLUMNS = ("subject_id", "grade_id", "code")
+_SKILL_UPDATE_COLUMNS = tuple(name for name in SkillCreate.model_fields if name not in _SKILL_KEY_COLUMNS)
+_QUESTION_COLUMNS = frozenset(QuestionCreate.model_fields)
+_ROW_SCHEMAS: dict[str, type[BaseModel]] = {"skill": SkillCreate, "question": BulkQuestionRow}
+
+
+async def _limited(chunks: AsyncIterable[bytes], max_bytes: int) -> AsyncIterator[bytes]:
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > max_bytes:
+            raise AppError(status_code=413, code="too_large", message=f"Import is larger than {max_bytes // 2**20} MB")
+        yield chunk
+
+
+async def ndjson_rows(chunks: AsyncIterable[bytes], *, max_bytes: int) -> AsyncIterator[ImportRow]:
+    """Yield `(line number, line)` for every non-blank line; lines are decoded with their batch."""
+    buffer = b""
+    line_no = 0
+    async for chunk in _limited(chunks, max_bytes):
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield line_no, line
+    if buffer.strip():
+        yield line_no + 1, buffer
+
+
+async def json_rows(chunks: AsyncIterable[bytes], *, max_bytes: int) -> list[ImportRow]:
+    body = b"".join([chunk async for chunk in _limited(chunks, max_bytes)])
+    try:
+        doc = json.loads(body)
+    except ValueError as e:
+        raise AppError(status_code=400, code="validation_error", message=f"Invalid JSON: {e}") from e
+    if isinstance(doc, list):
+        return list(enumerate(doc, 1))
+    if isinstance(doc, dict) and isinstance(doc.get("data"), list):
+        return list(enumerate(doc["data"], 1))
+    if isinstance(doc, dict) and ("skills" in doc or "questions" in doc):
+        rows: list[ImportRow] = []
+        for kind in ("skills", "questions"):
+            items = doc.get(kind) or []
+            if not isinstance(items, list):
+                raise AppError(status_code=400, code="validation_error", message=f"`{kind}` must be a list")
+            for i, item in enumerate(items, 1):
+                if isinstance(item, dict):
+                    item.setdefault("kind", kind[:-1])
+                rows.append((f"{kind}[{i}]", item))
+        return rows
+    raise AppError(
+        status_code=400,
+        code="validation_error",
+        message='Expected a list of rows, {"skills": [...], "questions": [...]} or {"data": [...]}',
+    )
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, err['loc']))}: {err['msg']}" if err["loc"] else err["msg"] for err in exc.errors()
+    )
+
+
+def _db_message(exc: DBAPIError) -> str:
+    # asyncpg errors come wrapped as "<class '...'>: message"
+    message = str(exc.orig).splitlines()[0] if exc.orig is not None else str(exc)
+    return message.split(">: ", 1)[-1]
+
+
+class BulkImporter:
+    def __init__(self, session: AsyncSession, *, batch_size: int | None = None) -> None:
+        self.session = session
+        self.batch_size = batch_size or settings.bulk_import_batch_size
+        self.result = BulkImportResponse()
+        self._skill_ids: dict[SkillKey, int] = {}
+        self._skill_rows: dict[SkillKey, RowRef] = {}  # rows whose skill upsert went through
+        self._known_skill_ids: set[int] = set()
+        self._upserted: set[int] = set()
+
+    async def run(self, rows: Iterable[ImportRow] | AsyncIterable[ImportRow]) -> BulkImportResponse:
+        batch: list[ImportRow] = []
+        if isinstance(rows, AsyncIterable):
+            async for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    await self._import_batch(batch)
+                    batch = []
+        else:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    await self._import_batch(batch)
+                    batch = []
+        if batch:
+            await self._import_batch(batch)
+
+        if self._upserted:
+            after_commit(self.session, functools.partial(invalidate_skills, sorted(self._upserted)))
+        logger.info(
+            "bulk_import.done",
+            skills_created=self.result.skills_created,
+            skills_updated=self.result.skills_updated,
+            questions_created=self.result.questions_created,
+            failed=self.result.failed,
+        )
+        return self.result
+
+    def _fail(self, row: RowRef, kind: str, message: str) -> None:
+        self.result.failed += 1
+        if len(self.result.errors) < MAX_REPORTED_ERRORS:
+            self.result.errors.append(BulkImportRowError(row=row, kind=kind, message=message))
+
+    # --- validation ---
+
+    def _parse(self, row: RowRef, raw: Any) -> tuple[str, BaseModel] | None:
+        if isinstance(raw, bytes):
+            try:
+                raw = json.loads(raw)
+            except ValueError as e:
+                self._fail(row, "unknown", f"Invalid JSON: {e}")
+                return None
+        if not isinstance(raw, dict):
+            self._fail(row, "unknown", "Row must be a JSON object")
+            return None
+        kind = raw.pop("kind", "question")
+        schema = _ROW_SCHEMAS.get(kind) if isinstance(kind, str) else None
+        if schema is None:
+            self._fail(row, str(kind), "kind must be 'skill' or 'question'")
+            return None
+        try:
+            return kind, schema.model_validate(raw)
+        except ValidationError as e:
+            self._fail(row, kind, _validation_message(e))
+            return None
+
+    async def _existing(self, stmt: Select) -> set[Any]:
+        return set((await self.session.execute(stmt)).scalars().all())
+
+    async def _import_batch(self, batch: list[ImportRow]) -> None:
+        skills: list[tuple[RowRef, SkillCreate]] = []
+        questions: list[tuple[RowRef, BulkQuestionRow]] = []
+        for row, raw in batch:
+            parsed = self._parse(row, raw)
+            if parsed is None:
+                continue
+            kind, item = parsed
+            (skills if kind == "skill" else questions).append((row, item))
+        # Навыки партии раньше вопросов: вопрос может ссылаться на навык из той же партии по коду
+        if skills:
+            await self._upsert_skills(skills)
+        if questions:
+            await self._insert_questions(questions)
+
+    # --- skills ---
+
+    async def _upsert_skills(self, rows: list[tuple[RowRef, SkillCreate]]) -> None:
+        subject_ids = await self._existing(select(Subject.id).where(Subject.id.in_({s.subject_id for _, s in rows})))
+        grade_ids = await self._existing(select(Grade.id).where(Grade.id.in_({s.grade_id for _, s in rows})))
+        topic_refs = {s.topic_id for _, s in rows if s.topic_id is not None}
+        topic_ids = await self._existing(select(Topic.id).where(Topic.id.in_(topic_refs))) if topic_refs else set()
+
+        pending: list[tuple[RowRef, SkillCreate]] = []
+        for row, skill in rows:
+            if skill.subject_id not in subject_ids:
+                self._fail(row, "skill", f"Subject {skill.subject_id} not found")
+            elif skill.grade_id not in grade_ids:
+                self._fail(row, "skill", f"Grade {skill.grade_id} not found")
+            elif skill.topic_id is not None and skill.topic_id not in topic_ids:
+                self._fail(row, "skill", f"Topic {skill.topic_id} not found")
+            else:
+                pending.append((row, skill))
+        # ON CONFLICT cannot touch one row twice in a statement, so a repeated key waits for the next round:
+        # it is a duplicate if the first row went in and gets its own try if that row failed.
+        while pending:
+            batch: dict[SkillKey, tuple[RowRef, SkillCreate]] = {}
+            later: list[tuple[RowRef, SkillCreate]] = []
+            for row, skill in pending:
+                key = (skill.subject_id, skill.grade_id, skill.code)
+                if key in self._skill_rows:
+                    self._fail(row, "skill", f"Duplicate of row {self._skill_rows[key]} (same subject, grade and code)")
+                elif key in batch:
+                    later.append((row, skill))
+                else:
+                    batch[key] = (row, skill)
+            record = functools.partial(self._record_skills, {key: row for key, (row, _) in batch.items()})
+            await self._execute_batch("skill", list(batch.values()), self._upsert_skills_stmt, record)
+            pending = later
+
+    @staticmethod
+    def _upsert_skills_stmt(items: list[SkillCreate]) -> Any:
+        stmt = pg_insert(Skill).values([item.model_dump() for item in items])
+        return stmt.on_conflict_do_update(
+            constraint="uq_skill_code_grade_subject",
+            set_={**{name: stmt.excluded[name] for name in _SKILL_UPDATE_COLUMNS}, "updated_at": func.now()},
+        ).returning(
+            Skill.id,
+            Skill.subject_id,
+            Skill.grade_id,
+            Skill.code,
+            # xmax is 0 for a freshly inserted row version, the locking transaction id after an update
+            literal_column("skills.xmax = 0").label("inserted"),
+        )
+
+    def _record_skills(self, rows: dict[SkillKey, RowRef], result_rows: list[Any]) -> None:
+        for r in result_rows:
+            key = (r.subject_id, r.grade_id, r.code)
+            self._skill_rows[key] = rows[key]
+            self._skill_ids[key] = r.id
+            self._known_skill_ids.add(r.id)
+            self._upserted.add(r.id)
+            if r.inserted:
+                self.result.skills_created += 1
+            else:
+                self.result.skills_updated += 1
+
+    # --- questions ---
+
+    async def _insert_questions(self, rows: list[tuple[RowRef, BulkQuestionRow]]) -> None:
+        missing_keys = {
+            (q.subject_id, q.grade_id, q.skill_code)
+            for _, q in rows
+            if q.skill_id is None and (q.subject_id, q.grade_id, q.skill_code) not in self._skill_ids
+        }
+        if missing_keys:
+            stmt = select(Skill.id, Skill.subject_id, Skill.grade_id, Skill.code).where(
+                tuple_(Skill.subject_id, Skill.grade_id, Skill.code).in_(missing_keys)
+            )
+            for r in await self.session.execute(stmt):
+                self._skill_ids[(r.subject_id, r.grade_id, r.code)] = r.id
+                self._known_skill_ids.add(r.id)
+        unknown_ids = {q.skill_id for _, q in rows if q.skill_id is not None} - self._known_skill_ids
+        if unknown_ids:
+            self._known_skill_ids |= await self._existing(select(Skill.id).where(Skill.id.in_(unknown_ids)))
+
+        valid: list[tuple[RowRef, dict[str, Any]]] = []
+        for row, q in rows:
+            if q.skill_id is None:
+                skill_id = self._skill_ids.get((q.subject_id, q.grade_id, q.skill_code))
+                if skill_id is None:
+                    self._fail(row, "question", f"Skill {q.skill_code!r} not found in subject {q.subject_id}, grade {q.grade_id}")
+                    continue
+            elif q.skill_id not in self._known_skill_ids:
+                self._fail(row, "question", f"Skill {q.skill_id} not found")
+                continue
+            else:
+                skill_id = q.skill_id
+            valid.append((row, {**q.model_dump(include=_QUESTION_COLUMNS), "skill_id": skill_id}))
+        await self._execute_batch("question", valid, self._insert_questions_stmt, self._record_questions)
+
+    @staticmethod
+    def _insert_questions_stmt(items: list[dict[str, Any]]) -> Any:
+        return insert(Question).values(items).returning(Question.id)
+
+    def _record_questions(self, result_rows: list[Any]) -> None:
+        self.result.questions_created += len(result_rows)
+
+    # --- execution ---
+
+    async def _execute_batch(
+        self,
+        kind: str,
+        rows: list[tuple[RowRef, Any]],
+        make_stmt: Callable[[list[Any]], Any],
+        record: Callable[[list[Any]], None],
+    ) -> None:
+        if not rows:
+            return
+        try:
+            async with self.session.begin_nested():
+                result_rows = (await self.session.execute(make_stmt([item for _, item in rows]))).all()
+        except DBAPIError:
+            logger.warning("bulk_import.batch_retry", kind=kind, rows=len(rows))
+        else:
+            record(result_rows)
+            return
+        for row, item in rows:
+            try:
+                async with self.session.begin_nested():
+                    result_rows = (await self.session.execute(make_stmt([item]))).all()
+            except DBAPIError as e:
+                self._fail(row, kind, _db_message(e))
+            else:
+                record(result_rows)
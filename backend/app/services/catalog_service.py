@@ -2,30 +2,62 @@ from __future__ import annotations
 
 import json
 import logging
+from collections.abc import Iterable
 
 from fastapi import Depends
 from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.deps import get_read_session
 from app.core.errors import AppError
 from app.db.session import get_db_session
 from app.repositories.catalog_repo import GradeRepository, SkillRepository, SubjectRepository, TopicRepository
 from app.repositories.practice_repo import PracticeRepository
 from app.schemas.catalog import GradeResponse, SkillDetailResponse, SkillListItem, SkillUpdate, SubjectResponse, TopicResponse
+from app.utils.local_cache import LocalCache, get_cache_invalidator
 from app.utils.redis import get_redis
 
 logger = logging.getLogger(__name__)
 
+# Subjects, grades and topics are read on every catalog page and change only through the admin API.
+catalog_cache = LocalCache("catalog", ttl_sec=settings.local_cache_ttl_sec)
+CATALOG_LIST_KEYS = ("cache:subjects", "cache:grades", "cache:topics")
+
+
+async def invalidate_catalog_lists() -> None:
+    """Drop the cached subject/grade/topic lists in Redis and in every API process."""
+    try:
+        await get_redis().delete(*CATALOG_LIST_KEYS)
+    except RedisError as exc:
+        logger.warning("Cache delete failed for catalog lists: %s", exc)
+    await get_cache_invalidator().invalidate(catalog_cache.name)
+
+
+async def invalidate_skills(skill_ids: Iterable[int]) -> None:
+    """Drop the cached details of `skill_ids` and every cached skill list page."""
+    try:
+        redis = get_redis()
+        keys = [f"cache:skill:{skill_id}" for skill_id in skill_ids]
+        keys += [key async for key in redis.scan_iter(match="cache:skills:*", count=1000)]
+        for i in range(0, len(keys), 1000):
+            await redis.delete(*keys[i : i + 1000])
+    except RedisError as exc:
+        logger.warning("Cache delete failed for skills: %s", exc)
+
 
 class CatalogService:
-    def __init__(self, session: AsyncSession = Depends(get_db_session)) -> None:
+    def __init__(
+        self,
+        session: AsyncSession = Depends(get_db_session),
+        read_session: AsyncSession = Depends(get_read_session),
+    ) -> None:
         self.session = session
-        self.subjects = SubjectRepository(session)
-        self.grades = GradeRepository(session)
-        self.topics = TopicRepository(session)
-        self.skills = SkillRepository(session)
-        self.practice = PracticeRepository(session)
+        self.subjects = SubjectRepository(read_session)
+        self.grades = GradeRepository(read_session)
+        self.topics = TopicRepository(read_session)
+        self.skills = SkillRepository(read_session)
+        self.practice = PracticeRepository(read_session)
 
     async def _cache_get(self, key: str) -> str | None:
         try:
@@ -51,29 +83,43 @@ class CatalogService:
 
     async def list_subjects(self) -> list[SubjectResponse]:
         key = "cache:subjects"
+        if (local := catalog_cache.get(key)) is not None:
+            return local
         cached = await self._cache_get(key)
         if cached:
-            return [SubjectResponse.model_validate(x) for x in json.loads(cached)]
+            data = [SubjectResponse.model_validate(x) for x in json.loads(cached)]
+            catalog_cache.set(key, data)
+            return data
         rows = await self.subjects.list()
         data = [SubjectResponse(id=s.id, slug=s.slug, title=s.title) for s in rows]
         await self._cache_setex(key, json.dumps([d.model_dump(mode="json") for d in data]))
+        catalog_cache.set(key, data)
         return data
 
     async def list_grades(self) -> list[GradeResponse]:
         key = "cache:grades"
+        if (local := catalog_cache.get(key)) is not None:
+            return local
         cached = await self._cache_get(key)
         if cached:
-            return [GradeResponse.model_validate(x) for x in json.loads(cached)]
+            data = [GradeResponse.model_validate(x) for x in json.loads(cached)]
+            catalog_cache.set(key, data)
+            return data
         rows = await self.grades.list()
         data = [GradeResponse(id=g.id, number=g.number, title=g.title) for g in rows]
         await self._cache_setex(key, json.dumps([d.model_dump(mode="json") for d in data]))
+        catalog_cache.set(key, data)
         return data
 
     async def list_topics(self) -> list[TopicResponse]:
         key = "cache:topics"
+        if (local := catalog_cache.get(key)) is not None:
+            return local
         cached = await self._cache_get(key)
         if cached:
-            return [TopicResponse.model_validate(x) for x in json.loads(cached)]
+            data = [TopicResponse.model_validate(x) for x in json.loads(cached)]
+            catalog_cache.set(key, data)
+            return data
         rows = await self.topics.list(published_only=True)
         data = [TopicResponse(
             id=t.id,
@@ -85,6 +131,7 @@ class CatalogService:
             is_published=t.is_published,
         ) for t in rows]
         await self._cache_setex(key, json.dumps([d.model_dump(mode="json") for d in data]))
+        catalog_cache.set(key, data)
         return data
 
     async def list_skills(
@@ -167,7 +214,8 @@ class CatalogService:
         return resp
 
     async def update_skill(self, skill_id: int, data: SkillUpdate) -> SkillDetailResponse:
-        s = await self.skills.get(skill_id)
+        skills = SkillRepository(self.session)
+        s = await skills.get(skill_id)
         if s is None:
             raise AppError(status_code=404, code="not_found", message="Skill not found")
 
@@ -190,7 +238,7 @@ class CatalogService:
             )
              return resp
 
-        updated_skill = await self.skills.update(s, **update_data)
+        updated_skill = await skills.update(s, **update_data)
 
         # Invalidate cache
         # 1. Skill detail cache
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import uuid
+from collections.abc import AsyncIterator, Callable, Sequence
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from typing import Any
+
+from fastapi import Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.errors import AppError
+from app.db.session import get_db_session, get_read_sessionmaker
+from app.models.assignment import Assignment, AssignmentStatusRow
+from app.models.catalog import Skill
+from app.models.classroom import Classroom, Enrollment
+from app.models.practice import PracticeAttempt
+from app.models.user import User
+
+# Rows fetched per round trip from the server-side cursor and written per response chunk.
+CSV_CHUNK_ROWS = 1000
+
+ATTEMPT_COLUMNS = [
+    "answered_at",
+    "student_id",
+    "student_name",
+    "student_email",
+    "skill_code",
+    "session_id",
+    "question_id",
+    "question_level",
+    "is_correct",
+    "mistake_type",
+    "time_spent_sec",
+    "smartscore_before",
+    "smartscore_after",
+    "submitted_answer",
+]
+
+SCORE_GRID_COLUMNS = [
+    "student_id",
+    "student_name",
+    "student_email",
+    "status",
+    "best_smartscore",
+    "last_smartscore",
+    "questions_answered",
+    "time_spent_seconds",
+    "completed_at",
+    "last_activity_at",
+]
+
+
+class CsvExport:
+    """A permission-checked query plus how to turn its rows into CSV cells; streamed by `stream_csv`."""
+
+    def __init__(self, *, columns: Sequence[str], stmt: Select, row: Callable[[Any], Sequence[Any]], filename: str) -> None:
+        self.columns = columns
+        self.stmt = stmt
+        self.row = row
+        self.filename = filename
+
+
+class CsvExportService:
+    def __init__(self, session: AsyncSession = Depends(get_db_session)) -> None:
+        self.session = session
+
+    async def score_grid(self, *, teacher_id: str, classroom_id: str, assignment_id: str) -> CsvExport:
+        tid = _parse_uuid(teacher_id)
+        cid = _parse_uuid(classroom_id)
+        aid = _parse_uuid(assignment_id)
+        assignment = await self.session.get(Assignment, aid)
+        classroom = await self.session.get(Classroom, cid)
+        if assignment is None or classroom is None or assignment.classroom_id != cid or classroom.teacher_id != tid:
+            raise AppError(status_code=404, code="not_found", message="Assignment not found")
+
+        stmt = (
+            select(
+                User.id,
+                User.full_name,
+                User.email,
+                AssignmentStatusRow.status,
+                AssignmentStatusRow.best_smartscore,
+                AssignmentStatusRow.last_smartscore,
+                AssignmentStatusRow.questions_answered,
+                AssignmentStatusRow.time_spent_seconds,
+                AssignmentStatusRow.completed_at,
+                AssignmentStatusRow.last_activity_at,
+            )
+            .join(AssignmentStatusRow, AssignmentStatusRow.student_id == User.id)
+            .where(AssignmentStatusRow.assignment_id == aid)
+            .order_by(User.full_name.asc())
+        )
+        return CsvExport(columns=SCORE_GRID_COLUMNS, stmt=stmt, row=_score_grid_row, filename=f"score-grid-{aid}.csv")
+
+    async def classroom_attempts(
+        self,
+        *,
+        teacher_id: str,
+        classroom_id: str,
+        skill_id: int | None,
+        date_from: date | None,
+        date_to: date | None,
+    ) -> CsvExport:
+        tid = _parse_uuid(teacher_id)
+        cid = _parse_uuid(classroom_id)
+        classroom = await self.session.get(Classroom, cid)
+        if classroom is None or classroom.teacher_id != tid:
+            raise AppError(status_code=404, code="not_found", message="Classroom not found")
+
+        stmt = _attempts_stmt().join(Enrollment, Enrollment.student_id == PracticeAttempt.user_id).where(Enrollment.classroom_id == cid)
+        if skill_id is not None:
+            stmt = stmt.where(PracticeAttempt.skill_id == skill_id)
+        stmt = _date_filter(stmt, date_from, date_to)
+        return CsvExport(columns=ATTEMPT_COLUMNS, stmt=stmt, row=_attempt_row, filename=f"classroom-{cid}-attempts.csv")
+
+    async def skill_attempts(
+        self,
+        *,
+        requester_id: str,
+        requester_role: str,
+        skill_id: int,
+        date_from: date | None,
+        date_to: date | None,
+    ) -> CsvExport:
+        rid = _parse_uuid(requester_id)
+        if requester_role not in {"TEACHER", "ADMIN"}:
+            raise AppError(status_code=403, code="forbidden", message="Insufficient permissions")
+        if await self.session.get(Skill, skill_id) is None:
+            raise AppError(status_code=404, code="not_found", message="Skill not found")
+
+        stmt = _attempts_stmt().where(PracticeAttempt.skill_id == skill_id)
+        if requester_role == "TEACHER":
+            # Teachers see their own students only, even if a student is enrolled in several of their classrooms.
+            own_students = (
+                select(Enrollment.student_id)
+                .join(Classroom, Classroom.id == Enrollment.classroom_id)
+                .where(Classroom.teacher_id == rid)
+            )
+            stmt = stmt.where(PracticeAttempt.user_id.in_(own_students))
+        stmt = _date_filter(stmt, date_from, date_to)
+        return CsvExport(columns=ATTEMPT_COLUMNS, stmt=stmt, row=_attempt_row, filename=f"skill-{skill_id}-attempts.csv")
+
+
+def _attempts_stmt() -> Select:
+    return (
+        select(
+            PracticeAttempt.answered_at,
+            User.id,
+            User.full_name,
+            User.email,
+            Skill.code,
+            PracticeAttempt.session_id,
+            PracticeAttempt.question_id,
+            PracticeAttempt.question_level,
+            PracticeAttempt.is_correct,
+            PracticeAttempt.mistake_type,
+            PracticeAttempt.time_spent_sec,
+            PracticeAttempt.smartscore_before,
+            PracticeAttempt.smartscore_after,
+            PracticeAttempt.submitted_answer,
+        )
+        .join(User, User.id == PracticeAttempt.user_id)
+        .join(Skill, Skill.id == PracticeAttempt.skill_id)
+        .order_by(PracticeAttempt.answered_at.asc(), PracticeAttempt.id.asc())
+    )
+
+
+def _date_filter(stmt: Select, date_from: date | None, date_to: date | None) -> Select:
+    if date_from is not None:
+        stmt = stmt.where(PracticeAttempt.answered_at >= datetime.combine(date_from, dtime.min, tzinfo=timezone.utc))
+    if date_to is not None:
+        stmt = stmt.where(PracticeAttempt.answered_at < datetime.combine(date_to + timedelta(days=1), dtime.min, tzinfo=timezone.utc))
+    return stmt
+
+
+def _attempt_row(r) -> list[Any]:
+    return [
+        r[0].isoformat(),
+        r[1],
+        _text(r[2]),
+        _text(r[3]),
+        _text(r[4]),
+        r[5],
+        r[6] if r[6] is not None else "",
+        r[7],
+        "1" if r[8] else "0",
+        _enum(r[9]),
+        r[10] or 0,
+        r[11],
+        r[12],
+        _text(json.dumps(r[13], ensure_ascii=False, sort_keys=True)) if r[13] is not None else "",
+    ]
+
+
+def _score_grid_row(r) -> list[Any]:
+    return [
+        r[0],
+        _text(r[1]),
+        _text(r[2]),
+        _enum(r[3]),
+        r[4],
+        r[5],
+        r[6],
+        r[7],
+        r[8].isoformat() if r[8] else "",
+        r[9].isoformat() if r[9] else "",
+    ]
+
+
+def _enum(value) -> str:
+    if value is None:
+        return ""
+    return value.value if hasattr(value, "value") else str(value)
+
+
+def _text(value: str | None) -> str:
+    # Spreadsheet apps evaluate cells starting with these characters as formulas.
+    if value and value[0] in "=+-@\t\r":
+        return "'" + value
+    return value or ""
+
+
+async def stream_csv(export: CsvExport) -> AsyncIterator[bytes]:
+    """Yield the CSV in chunks straight from a server-side cursor.
+
+    Runs on its own session: the request session may already be closed while the response streams.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(export.columns)
+    # BOM so Excel opens UTF-8 names correctly.
+    yield ("\ufeff" + buf.getvalue()).encode("utf-8")
+
+    async with (await get_read_sessionmaker())() as session:
+        result = await session.stream(export.stmt.execution_options(yield_per=CSV_CHUNK_ROWS))
+        async for rows in result.partitions():
+            buf.seek(0)
+            buf.truncate()
+            writer.writerows(export.row(r) for r in rows)
+            yield buf.getvalue().encode("utf-8")
+
+
+def csv_response(export: CsvExport) -> StreamingResponse:
+    return StreamingResponse(
+        stream_csv(export),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{export.filename}"', "Cache-Control": "no-store"},
+    )
+
+
+def _parse_uuid(value: str | None) -> uuid.UUID:
+    if not value:
+        raise AppError(status_code=400, code="validation_error", message="Invalid id")
+    try:
+        return uuid.UUID(str(value))
+    except ValueError as e:
+        raise AppError(status_code=400, code="validation_error", message="Invalid id") from e
@@ -4,8 +4,11 @@ from __future__ import annotations
 
 import json
 import logging
+import time
 from typing import Any
 
+from app.core.metrics import GENERATOR_SECONDS
+
 logger = logging.getLogger(__name__)
 
 
@@ -73,6 +76,7 @@ class GeneratorService:
         # (Docker container, sandbox, или отдельный сервис)
         # Для разработки выполняем напрямую, но с ограничениями
         
+        started = time.perf_counter()
         try:
             # Преобразуем JavaScript-подобный код в Python
             # Заменяем JavaScript комментарии на Python комментарии
@@ -181,9 +185,11 @@ class GeneratorService:
                 if field not in result:
                     raise ValueError(f"Generator result must contain '{field}' field")
             
+            GENERATOR_SECONDS.labels("ok").observe(time.perf_counter() - started)
             return result
             
         except Exception as e:
+            GENERATOR_SECONDS.labels("error").observe(time.perf_counter() - started)
             logger.error(f"Error executing generator: {e}", exc_info=True)
             raise ValueError(f"Generator execution failed: {str(e)}")
     
@@ -4,6 +4,7 @@ import uuid
 from datetime import datetime
 from typing import Any
 
+import structlog
 from fastapi import Depends
 from redis.exceptions import RedisError
 from sqlalchemy import select
@@ -11,7 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.errors import AppError
-from app.db.session import get_db_session
+from app.db.session import after_commit, get_db_session
 from app.models.enums import MistakeType, PracticeZone, QuestionType, SubscriptionPlan
 from app.models.practice import PracticeAttempt, PracticeSession, ProgressSnapshot
 from app.models.profile import StudentProfile
@@ -26,8 +27,11 @@ from app.services.generator_service import GeneratorService
 from app.services.scoring import WindowStats, compute_next_smartscore, zone_for_score
 from app.services.timer_service import apply_active_time_delta, inactivity_threshold_seconds_for_grade
 from app.utils.redis import get_redis
+from app.utils.score_grid_bus import get_score_grid_bus
 from app.utils.time import utc_now
 
+logger = structlog.get_logger(__name__)
+
 
 class PracticeService:
     def __init__(self, session: AsyncSession = Depends(get_db_session)) -> None:
@@ -39,15 +43,12 @@ class PracticeService:
         self.assignments = AssignmentRepository(session)
 
     async def start_session(self, *, user_id, skill_id: int) -> PracticeSessionResponse:
-        import logging
-        logger = logging.getLogger(__name__)
-        
         user_uuid = _parse_uuid(user_id)
         skill = await self.skills.get(skill_id)
         if skill is None or not skill.is_published:
             raise AppError(status_code=404, code="not_found", message="Skill not found")
         
-        logger.info(f"Starting session for skill {skill_id}, has_generator: {bool(skill.generator_code)}")
+        logger.info("practice.session.start", skill_id=skill_id, has_generator=bool(skill.generator_code))
 
         # Resume unfinished session if not expired (IXL-like).
         active = await self.practice.get_active_session(user_id=user_uuid, skill_id=skill_id)
@@ -122,9 +123,7 @@ class PracticeService:
                 await self.session.flush()
                 q = _generated_to_question_public(q_data, question_id)
             except Exception as e:
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.error(f"Error executing generator for skill {skill_id}: {e}", exc_info=True)
+                logger.error("practice.generator_failed", skill_id=skill_id, exc_info=True)
                 # Если генератор не работает, пытаемся использовать вопросы из БД
                 try:
                     q = await self._select_next_question(ps)
@@ -132,7 +131,7 @@ class PracticeService:
                     ps.state["current_question_id"] = q.id
                     ps.state["recent_question_ids"] = _push_recent(ps.state.get("recent_question_ids", []), q.id)
                 except AppError as db_error:
-                    logger.error(f"Error getting question from DB for skill {skill_id}: {db_error}", exc_info=True)
+                    logger.error("practice.question_fallback_failed", skill_id=skill_id, exc_info=True)
                     # Если и из БД не получилось, возвращаем понятную ошибку
                     if db_error.status_code == 404 and db_error.code == "not_found":
                         raise AppError(
@@ -146,7 +145,7 @@ class PracticeService:
                         message=f"Failed to generate question: {str(e)}. Also failed to get question from DB: {str(db_error)}"
                     )
                 except Exception as db_error:
-                    logger.error(f"Unexpected error getting question from DB for skill {skill_id}: {db_error}", exc_info=True)
+                    logger.error("practice.question_fallback_failed", skill_id=skill_id, exc_info=True)
                     raise AppError(
                         status_code=500,
                         code="generator_error",
@@ -169,9 +168,7 @@ class PracticeService:
                     )
                 raise
             except Exception as e:
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.error(f"Unexpected error selecting question for skill {skill_id}: {e}", exc_info=True)
+                logger.error("practice.question_select_failed", skill_id=skill_id, exc_info=True)
                 raise AppError(
                     status_code=500,
                     code="question_selection_error",
@@ -180,9 +177,7 @@ class PracticeService:
         
         # Проверяем, что вопрос был создан
         if q is None:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"No question created for skill {skill_id}, has_generator: {bool(skill.generator_code)}")
+            logger.error("practice.no_question_created", skill_id=skill_id, has_generator=bool(skill.generator_code))
             raise AppError(
                 status_code=500,
                 code="no_question_created",
@@ -268,30 +263,17 @@ class PracticeService:
         return {"finished": False, "question": q_public.model_dump(mode="json")}
 
     async def submit(self, *, user_id, session_id: str, req: PracticeSubmitRequest) -> PracticeSubmitResponse:
-        import logging
-        logger = logging.getLogger(__name__)
-        
         user_uuid = _parse_uuid(user_id)
         ps = await self.practice.get_session(session_id=session_id)
         if ps is None or ps.user_id != user_uuid:
             raise AppError(status_code=404, code="not_found", message="Session not found")
         
-        # Проверяем состояние сессии перед обработкой
-        logger.info(
-            f"Submitting answer for session {session_id}: "
-            f"finished_at={ps.finished_at}, "
-            f"questions_answered={ps.total_questions_answered}, "
-            f"smartscore={ps.current_smartscore}, "
-            f"wrong_streak={ps.state.get('wrong_streak', 0)}"
-        )
-        
         if ps.finished_at is not None:
             logger.warning(
-                f"Session {session_id} already finished: "
-                f"finished_at={ps.finished_at}, "
-                f"questions_answered={ps.total_questions_answered}, "
-                f"smartscore={ps.current_smartscore}, "
-                f"wrong_streak={ps.state.get('wrong_streak', 0)}"
+                "practice.submit.session_finished",
+                session_id=session_id,
+                questions_answered=ps.total_questions_answered,
+                smartscore=ps.current_smartscore,
             )
             raise AppError(status_code=409, code="conflict", message="Session already finished")
 
@@ -306,42 +288,29 @@ class PracticeService:
             current_q_id = ps.state.get("current_question_id")
             generated_questions = ps.state.get("generated_questions", {})
             
-            import logging
-            logger = logging.getLogger(__name__)
-            
             # Проверяем, что current_q_id не None
             if current_q_id is None:
-                logger.error(f"current_question_id is None in session state. State: {ps.state}")
+                logger.error("practice.submit.no_current_question", session_id=session_id)
                 raise AppError(status_code=404, code="not_found", message="Current question ID is not set in session")
             
-            logger.info(
-                f"Generator skill submit check: "
-                f"current_q_id={current_q_id} (type: {type(current_q_id)}), "
-                f"req.question_id={req.question_id} (type: {type(req.question_id)}), "
-                f"generated_questions_keys={list(generated_questions.keys())}, "
-                f"key_types={[type(k) for k in generated_questions.keys()]}, "
-                f"current_q_id == str(req.question_id): {current_q_id == str(req.question_id)}, "
-                f"current_q_id in generated_questions: {current_q_id in generated_questions}, "
-                f"state_keys={list(ps.state.keys())}"
-            )
-            
             if current_q_id != str(req.question_id):
-                logger.error(f"Question ID mismatch: current_q_id={current_q_id}, req.question_id={req.question_id}")
+                logger.warning(
+                    "practice.submit.question_mismatch",
+                    session_id=session_id,
+                    current_question_id=current_q_id,
+                    question_id=str(req.question_id),
+                )
                 raise AppError(status_code=409, code="conflict", message="Question does not match current session state")
             
-            logger.info(f"Checking if {current_q_id} is in generated_questions: {current_q_id in generated_questions}")
             if current_q_id not in generated_questions:
                 logger.error(
-                    f"Generated question not found: "
-                    f"current_q_id={current_q_id} (type: {type(current_q_id)}), "
-                    f"available_keys={list(generated_questions.keys())}, "
-                    f"key_types={[type(k) for k in generated_questions.keys()]}, "
-                    f"current_q_id in generated_questions: {current_q_id in generated_questions}, "
-                    f"state={ps.state}"
+                    "practice.submit.generated_question_missing",
+                    session_id=session_id,
+                    current_question_id=current_q_id,
+                    generated_count=len(generated_questions),
                 )
                 raise AppError(status_code=404, code="not_found", message="Generated question not found in session")
             
-            logger.info(f"Found generated question: {current_q_id}, proceeding with validation")
             q_data = generated_questions[current_q_id]
             question_type = QuestionType(q_data.get('type', 'MCQ'))
             question_data = q_data.get('data', {})
@@ -351,28 +320,24 @@ class PracticeService:
             if current_q_id in answered_questions:
                 raise AppError(status_code=409, code="conflict", message="Question already answered in this session")
             
-            logger.info(f"Validating submitted answer for question {current_q_id}")
             _validate_submitted_answer(question_type, question_data, req.submitted_answer)
             
             # Проверяем ответ используя генератор
-            logger.info(f"Calling GeneratorService.validate_answer for question {current_q_id}")
             is_correct, explanation = await GeneratorService.validate_answer(
                 skill.generator_code,
                 q_data,
                 req.submitted_answer,
                 skill.generator_metadata or {}
             )
-            logger.info(f"GeneratorService.validate_answer returned: is_correct={is_correct}, explanation={explanation}")
+            logger.debug("practice.submit.generator_checked", question_id=current_q_id, is_correct=is_correct)
             
             # Сохраняем, что вопрос был отвечен
-            logger.info(f"Marking question {current_q_id} as answered")
             ps.state.setdefault("answered_question_ids", []).append(current_q_id)
             question_level = q_data.get('level', 1)
             question = None  # Для генераторов question = None
             # Для генераторов правильный ответ уже в q_data
             correct_answer = q_data.get('correct_answer', {})
             explanation = q_data.get('explanation')
-            logger.info(f"Extracted question data: level={question_level}, correct_answer={correct_answer}, explanation={explanation}")
             # Для генераторов is_correct уже определен через GeneratorService.validate_answer
             # Не нужно вызывать _is_correct() для генераторов
             question_type = QuestionType(q_data.get('type', 'MCQ'))
@@ -392,9 +357,10 @@ class PracticeService:
                 
                 if last_q_id != req_q_id:
                     logger.warning(
-                        f"Question ID mismatch: last_question_id={ps.last_question_id} (type: {type(ps.last_question_id)}), "
-                        f"req.question_id={req.question_id} (type: {type(req.question_id)}), "
-                        f"session_id={session_id}"
+                        "practice.submit.question_mismatch",
+                        session_id=session_id,
+                        current_question_id=last_q_id,
+                        question_id=req_q_id,
                     )
                     raise AppError(status_code=409, code="conflict", message="Question does not match current session state")
 
@@ -418,24 +384,12 @@ class PracticeService:
                 if not plugin_id:
                     raise AppError(status_code=400, code="validation_error", message="PLUGIN question missing data.plugin_id")
                 svc = PluginService(self.session)
-                
-                # Логируем для диагностики
-                logger.info(f"PLUGIN answer evaluation: plugin_id={plugin_id}, submitted_answer={req.submitted_answer}")
-                
                 result = await svc.evaluate_answer(
                     plugin_id=plugin_id,
                     task_id=str(ps.id),
                     user_answer=req.submitted_answer,
                 )
                 
-                # Логируем полный результат от evaluate_answer
-                logger.info(
-                    f"PLUGIN evaluate_answer returned: "
-                    f"result={result}, "
-                    f"result_type={type(result)}, "
-                    f"result_keys={list(result.keys()) if isinstance(result, dict) else 'not a dict'}"
-                )
-                
                 # Получаем is_correct из результата
                 # Проверяем разные возможные ключи
                 is_correct = None
@@ -447,32 +401,23 @@ class PracticeService:
                         is_correct = result.get("isCorrect")
                     if is_correct is None:
                         is_correct = False
-                        logger.warning(f"PLUGIN result does not contain 'correct', 'is_correct', or 'isCorrect' key. Result: {result}")
+                        logger.warning("practice.submit.plugin_result_unrecognized", plugin_id=plugin_id, result_keys=sorted(result))
                 else:
                     is_correct = False
-                    logger.error(f"PLUGIN evaluate_answer returned non-dict result: {result} (type: {type(result)})")
+                    logger.error("practice.submit.plugin_result_not_dict", plugin_id=plugin_id, result_type=type(result).__name__)
                 
                 explanation = result.get("explanation", "") if isinstance(result, dict) else ""
                 
-                # Логируем результат
-                logger.info(
-                    f"PLUGIN answer result: "
-                    f"is_correct={is_correct} (type: {type(is_correct)}), "
-                    f"raw_result={result}, "
-                    f"explanation={explanation[:100] if explanation else 'None'}"
-                )
-                
                 # Убеждаемся, что is_correct - это булево значение
                 if not isinstance(is_correct, bool):
-                    logger.warning(f"is_correct is not bool: {is_correct} (type: {type(is_correct)}), converting to bool")
+                    logger.warning("practice.submit.plugin_result_not_bool", plugin_id=plugin_id, result_type=type(is_correct).__name__)
                     if isinstance(is_correct, str):
                         is_correct = is_correct.lower() in ("true", "1", "yes")
                     elif isinstance(is_correct, (int, float)):
                         is_correct = bool(is_correct)
                     else:
                         is_correct = False
-                
-                logger.info(f"PLUGIN final is_correct: {is_correct} (type: {type(is_correct)})")
+                logger.debug("practice.submit.plugin_checked", plugin_id=plugin_id, is_correct=is_correct)
             
             # Для вопросов типа "last digit" вычисляем правильный ответ динамически
             # если правильный ответ в базе неправильный
@@ -506,73 +451,25 @@ class PracticeService:
                     # Если нашли правильный вариант, обновляем correct_answer
                     if correct_choice_id:
                         correct_answer = {"choice": correct_choice_id}
-                        # Логируем исправление
-                        import structlog
-                        logger = structlog.get_logger()
-                        logger.info(
-                            "Fixed correct answer for last digit question",
+                        logger.debug(
+                            "practice.submit.last_digit_fixed",
                             question_id=question.id,
-                            prompt=question.prompt,
-                            number=number,
-                            last_digit=last_digit,
                             correct_choice_id=correct_choice_id,
-                            original_correct=question.correct_answer,
                         )
                     else:
                         # Правильный ответ отсутствует среди вариантов - это ошибка в данных
-                        import structlog
-                        logger = structlog.get_logger()
                         logger.error(
-                            "Correct answer not found in choices for last digit question",
+                            "practice.submit.last_digit_missing",
                             question_id=question.id,
-                            prompt=question.prompt,
-                            number=number,
                             last_digit=last_digit,
-                            choices=choices,
-                            current_correct=question.correct_answer,
+                            choices_count=len(choices),
                         )
                     # Пытаемся найти ближайший вариант или использовать первый
                     # Но лучше всего - исправить вопрос в базе данных
         
         # Для генераторов is_correct уже определен; для PLUGIN — из evaluate; для остальных — _is_correct
         if not is_generator_skill and question_type != QuestionType.PLUGIN:
-            # Логируем для отладки MCQ вопросов
-            if question_type == QuestionType.MCQ:
-                import structlog
-                logger = structlog.get_logger()
-                logger.info(
-                    "MCQ answer check",
-                    question_id=req.question_id,
-                    submitted=req.submitted_answer,
-                    correct=correct_answer,
-                    submitted_choice=req.submitted_answer.get("choice"),
-                    correct_choice=correct_answer.get("choice"),
-                    choices_match=req.submitted_answer.get("choice") == correct_answer.get("choice"),
-                )
             is_correct = _is_correct(question_type, question_data, correct_answer, req.submitted_answer)
-        else:
-            if is_generator_skill:
-                logger.info(f"Using is_correct from GeneratorService: {is_correct}")
-            elif question_type == QuestionType.PLUGIN:
-                # Проверяем, что is_correct был определен в блоке обработки PLUGIN вопросов
-                try:
-                    # Пытаемся получить значение is_correct
-                    is_correct_value = is_correct
-                    logger.info(f"Using is_correct from PluginService.evaluate_answer: {is_correct_value} (type: {type(is_correct_value)})")
-                except NameError:
-                    logger.error(f"is_correct not defined for PLUGIN question! This should not happen. Setting to False.")
-                    is_correct = False
-                else:
-                    # Убеждаемся, что is_correct - это булево значение
-                    if not isinstance(is_correct, bool):
-                        logger.warning(f"is_correct is not bool for PLUGIN: {is_correct} (type: {type(is_correct)}), converting")
-                        if isinstance(is_correct, str):
-                            is_correct = is_correct.lower() in ("true", "1", "yes")
-                        elif isinstance(is_correct, (int, float)):
-                            is_correct = bool(is_correct)
-                        else:
-                            is_correct = False
-                    logger.info(f"PLUGIN is_correct final value: {is_correct} (type: {type(is_correct)})")
 
         now = utc_now()
         zone_before = ps.current_zone or zone_for_score(ps.current_smartscore)
@@ -581,16 +478,6 @@ class PracticeService:
         stats = WindowStats(correct=int(window.get("correct", 0)), total=int(window.get("total", 0)))
         score_before = int(ps.current_smartscore or 0)
         
-        # Логируем состояние перед вычислением SmartScore
-        logger.info(
-            f"Before SmartScore computation: "
-            f"is_correct={is_correct} (type: {type(is_correct)}), "
-            f"score_before={score_before}, "
-            f"zone_before={zone_before}, "
-            f"streak_before={streak_before}, "
-            f"question_level={question_level}"
-        )
-        
         # Отслеживаем серию неправильных ответов
         wrong_streak_before = int(ps.state.get("wrong_streak", 0))
         wrong_streak_after = 0
@@ -601,7 +488,7 @@ class PracticeService:
         
         # Убеждаемся, что is_correct - это булево значение
         if not isinstance(is_correct, bool):
-            logger.warning(f"is_correct is not bool before SmartScore: {is_correct} (type: {type(is_correct)}), converting")
+            logger.warning("practice.submit.is_correct_not_bool", result_type=type(is_correct).__name__)
             is_correct = bool(is_correct)
         
         score_res = compute_next_smartscore(
@@ -613,17 +500,7 @@ class PracticeService:
             wrong_streak=wrong_streak_before,  # Передаем текущее значение до увеличения
             recent_window_stats=stats,
         )
-        
-        # Логируем результат вычисления SmartScore
-        logger.info(
-            f"SmartScore computation result: "
-            f"smartscore={score_res.smartscore} (was {score_before}), "
-            f"streak={score_res.streak} (was {streak_before}), "
-            f"zone={score_res.zone} (was {zone_before}), "
-            f"is_correct={is_correct} (type: {type(is_correct)}), "
-            f"question_type={question_type}, "
-            f"is_generator_skill={is_generator_skill}"
-        )
+
 
         # Убрано ограничение на 3 ошибки подряд - пользователь может делать неограниченное количество ошибок
         # if wrong_streak_after >= 3:
@@ -634,12 +511,10 @@ class PracticeService:
 
         # Для генераторов создаем вопрос с данными из q_data
         if is_generator_skill:
-            logger.info(f"Creating PracticeAttempt for generator question {req.question_id}")
             # Для генераторов используем данные из q_data
             # Для генераторов question_id = None, так как вопроса нет в базе данных
             import hashlib
             question_id_hash = int(hashlib.md5(str(req.question_id).encode()).hexdigest()[:8], 16) % 1000000
-            logger.info(f"Question ID hash: {question_id_hash}, question_level: {question_level}")
             attempt = PracticeAttempt(
                 session_id=ps.id,
                 user_id=user_uuid,
@@ -666,9 +541,7 @@ class PracticeService:
                 zone_before=zone_before,
                 zone_after=score_res.zone,
             )
-            logger.info(f"PracticeAttempt created for generator, adding to database")
         else:
-            logger.info(f"Creating PracticeAttempt for regular question {question.id if question else 'None'}")
             # Для PLUGIN/INTERACTIVE разрешаем несколько попыток, не привязывая к question_id
             is_plugin_like = question.type in (QuestionType.PLUGIN, QuestionType.INTERACTIVE)
             attempt = PracticeAttempt(
@@ -698,9 +571,7 @@ class PracticeService:
                 zone_after=score_res.zone,
             )
         
-        logger.info(f"Adding PracticeAttempt to database: session_id={attempt.session_id}, question_id={attempt.question_id}, is_correct={attempt.is_correct}")
         await self.practice.add_attempt(attempt)
-        logger.info(f"PracticeAttempt added successfully")
 
         ps.total_questions_answered += 1
         ps.total_correct += 1 if is_correct else 0
@@ -716,7 +587,7 @@ class PracticeService:
         
         # Если SmartScore достиг 100, завершаем тест
         if ps.current_smartscore >= 100:
-            logger.info(f"Session {ps.id} finished: SmartScore reached 100 (current: {ps.current_smartscore}, questions: {ps.total_questions_answered})")
+            logger.info("practice.session.mastered", session_id=session_id, questions_answered=ps.total_questions_answered)
             ps.finished_at = now
             ps.last_question_id = None
             ps.state["current_question_id"] = None
@@ -769,21 +640,11 @@ class PracticeService:
         await self._update_assignment_status(student_id=user_uuid, skill_id=ps.skill_id, now=now, session_obj=ps, attempt=attempt)
 
         finished = ps.finished_at is not None
-        if finished:
-            logger.info(
-                f"Session {ps.id} is finished after submit: "
-                f"questions_answered={ps.total_questions_answered}, "
-                f"smartscore={ps.current_smartscore}, "
-                f"wrong_streak={ps.state.get('wrong_streak', 0)}, "
-                f"is_correct={is_correct}"
-            )
-        
         next_q = None
         # Если тест не завершен, загружаем следующий вопрос
         if not finished:
             if is_generator_skill:
                 # Для генераторов создаем новый вопрос
-                logger.info("Generating next question for generator skill")
                 try:
                     q_data = GeneratorService.execute_generator(
                         skill.generator_code,
@@ -800,9 +661,8 @@ class PracticeService:
                     # Сохраняем изменения в state
                     await self.session.flush()
                     next_q = _generated_to_question_public(q_data, question_id)
-                    logger.info(f"Next question generated: {question_id}")
-                except Exception as e:
-                    logger.error(f"Error generating next question: {e}", exc_info=True)
+                except Exception:
+                    logger.error("practice.generator_failed", skill_id=ps.skill_id, exc_info=True)
                     # Если генератор не работает, пытаемся использовать вопросы из БД
                     try:
                         next_q = await self._select_next_question(ps)
@@ -810,8 +670,8 @@ class PracticeService:
                             ps.last_question_id = next_q.id
                             ps.state["current_question_id"] = next_q.id
                             ps.state["recent_question_ids"] = _push_recent(ps.state.get("recent_question_ids", []), next_q.id)
-                    except AppError as db_error:
-                        logger.error(f"Error getting question from DB: {db_error}", exc_info=True)
+                    except AppError:
+                        logger.error("practice.question_fallback_failed", skill_id=ps.skill_id, exc_info=True)
                         # Если и из БД не получилось, next_q остается None
             else:
                 # Старый способ - получаем вопрос из БД
@@ -825,14 +685,17 @@ class PracticeService:
         await self.session.flush()
 
         session_resp = await self._to_session_response(ps, current_question=None)
-        # Логируем финальный результат перед возвратом
+        # Одна строка INFO на ответ; подробности - debug-события practice.submit.* (LOG_SAMPLE_RATES)
         logger.info(
-            f"Returning PracticeSubmitResponse: "
-            f"is_correct={is_correct} (type: {type(is_correct)}), "
-            f"finished={ps.finished_at is not None}, "
-            f"smartscore={ps.current_smartscore}, "
-            f"questions_answered={ps.total_questions_answered}, "
-            f"explanation_length={len(explanation) if explanation else 0}"
+            "practice.submit",
+            session_id=session_id,
+            skill_id=ps.skill_id,
+            question_type=question_type.value,
+            is_correct=is_correct,
+            smartscore_before=score_before,
+            smartscore=ps.current_smartscore,
+            zone=ps.current_zone.value,
+            finished=ps.finished_at is not None,
         )
         
         return PracticeSubmitResponse(
@@ -889,10 +752,8 @@ class PracticeService:
         else:
             try:
                 q = _to_question_public(current_question)
-            except Exception as e:
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.error(f"Error converting question to public format: {e}", exc_info=True)
+            except Exception:
+                logger.error("practice.question_public_failed", exc_info=True)
                 q = None
         return PracticeSessionResponse(
             id=str(ps.id),
@@ -904,7 +765,7 @@ class PracticeService:
             wrong_count=ps.wrong_count,
             smartscore=ps.smartscore,
             time_elapsed_sec=ps.time_elapsed_sec,
-            state=ps.state,
+            state=_public_state(ps.state),
             current_question=q,
             current_smartscore=ps.current_smartscore,
             best_smartscore=ps.best_smartscore,
@@ -933,16 +794,7 @@ class PracticeService:
         if sub and sub.plan == SubscriptionPlan.PREMIUM and sub.is_active:
             return
 
-        # Логируем для отладки, если подписка не найдена или неактивна
-        import structlog
-        logger = structlog.get_logger()
-        logger.warning(
-            "Subscription check failed",
-            user_id=str(user_id),
-            has_subscription=sub is not None,
-            plan=sub.plan.value if sub else None,
-            is_active=sub.is_active if sub else None,
-        )
+        logger.debug("practice.submit.free_limit", has_subscription=sub is not None)
 
         # Для пользователей без подписки применяем лимит бесплатных вопросов
         redis = get_redis()
@@ -956,7 +808,7 @@ class PracticeService:
                 ttl = int(tomorrow - utc_now().timestamp())
                 await redis.expire(key, max(60, ttl))
         except RedisError as exc:
-            logger.warning("Skipping free-question usage increment due to Redis error: %s", exc)
+            logger.warning("practice.free_usage_not_counted", error=str(exc))
             return
         if count > settings.free_daily_question_limit:
             raise AppError(status_code=402, code="subscription_required", message="Daily free question limit exceeded")
@@ -992,6 +844,7 @@ class PracticeService:
         attempt: PracticeAttempt,
     ) -> None:
         rows = await self.assignments.list_active_for_student_skill(student_id=student_id, skill_id=skill_id)
+        deltas: list[tuple[str, dict[str, Any]]] = []
         for assignment, status_row in rows:
             if status_row.status == AssignmentStatus.NOT_STARTED:
                 status_row.status = AssignmentStatus.IN_PROGRESS
@@ -1003,6 +856,27 @@ class PracticeService:
             if status_row.best_smartscore >= int(assignment.target_smartscore or 80):
                 status_row.status = AssignmentStatus.COMPLETED
                 status_row.completed_at = now
+            deltas.append((str(assignment.id), _score_grid_delta(status_row)))
+
+        if deltas:
+            # Teachers watching the score grid get the new values once this submit commits.
+            async def _publish() -> None:
+                await get_score_grid_bus().publish(deltas)
+
+            after_commit(self.session, _publish)
+
+
+def _score_grid_delta(status_row) -> dict[str, Any]:
+    return {
+        "student_id": str(status_row.student_id),
+        "status": status_row.status.value if hasattr(status_row.status, "value") else str(status_row.status),
+        "best_smartscore": status_row.best_smartscore,
+        "last_smartscore": status_row.last_smartscore,
+        "questions_answered": status_row.questions_answered,
+        "time_spent_seconds": status_row.time_spent_seconds,
+        "completed_at": status_row.completed_at.isoformat() if status_row.completed_at else None,
+        "last_activity_at": status_row.last_activity_at.isoformat() if status_row.last_activity_at else None,
+    }
 
 
 def _is_expired(last_activity_at: datetime) -> bool:
@@ -1037,6 +911,15 @@ def _level_search_order(difficulty: int) -> list[int]:
     return order
 
 
+# Только для сервера: сгенерированные вопросы содержат правильные ответы, и оба ключа растут
+# с каждым ответом - без них ответ на submit/heartbeat не увеличивается к концу сессии.
+_PRIVATE_STATE_KEYS = frozenset({"generated_questions", "answered_question_ids"})
+
+
+def _public_state(state: dict[str, Any]) -> dict[str, Any]:
+    return {k: v for k, v in state.items() if k not in _PRIVATE_STATE_KEYS}
+
+
 def _to_question_public(q) -> QuestionPublic:
     return QuestionPublic(id=q.id, skill_id=q.skill_id, type=q.type, prompt=q.prompt, data=q.data, level=q.level)
 
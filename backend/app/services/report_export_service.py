@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+import zipfile
+from datetime import datetime, time as dtime, timedelta, timezone
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from fastapi import Depends
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.errors import AppError
+from app.db.session import get_db_session, get_read_sessionmaker
+from app.models.assignment import Assignment
+from app.models.catalog import Skill
+from app.models.classroom import Classroom, Enrollment
+from app.models.practice import PracticeSession
+from app.models.user import User
+from app.schemas.report import ReportExportRequest
+from app.services.report_service import ReportService, practice_session_version, release_report_data, report_timeout_sec
+from app.utils.pdf_cache import cached_pdf
+from app.utils.pdf_pool import render_pdf_async
+from app.utils.redis import get_redis
+from app.utils.time import utc_now
+from app.worker.queue import enqueue
+
+logger = logging.getLogger(__name__)
+
+# Export state lives in Redis (report_export:{id}) so any API process can answer a poll. The
+# work runs as the "reports.export" job (app/worker/tasks.py) and writes under report_export_dir,
+# which must be shared by the API and worker processes.
+
+
+def _job_key(job_id: str) -> str:
+    return f"report_export:{job_id}"
+
+
+def _export_path(job_id: str, fmt: str) -> Path:
+    return Path(settings.report_export_dir) / f"{job_id}.{fmt}"
+
+
+class ReportExportService:
+    def __init__(self, session: AsyncSession = Depends(get_db_session)) -> None:
+        self.session = session
+
+    async def create_export(self, *, teacher_id: str, req: ReportExportRequest) -> dict[str, Any]:
+        tid = _parse_uuid(teacher_id)
+        cid = _parse_uuid(req.classroom_id)
+        classroom = await self.session.get(Classroom, cid)
+        if classroom is None or classroom.teacher_id != tid:
+            raise AppError(status_code=404, code="not_found", message="Classroom not found")
+
+        skill_id = None
+        if req.assignment_id:
+            assignment = await self.session.get(Assignment, _parse_uuid(req.assignment_id))
+            if assignment is None or assignment.classroom_id != cid:
+                raise AppError(status_code=404, code="not_found", message="Assignment not found")
+            skill_id = assignment.skill_id
+
+        if req.date_from and req.date_to and req.date_from > req.date_to:
+            raise AppError(status_code=400, code="validation_error", message="date_from must not be after date_to")
+
+        session_ids = await _select_sessions(self.session, classroom_id=cid, skill_id=skill_id, date_from=req.date_from, date_to=req.date_to)
+        if not session_ids:
+            raise AppError(status_code=404, code="not_found", message="No finished practice sessions match the export")
+        if len(session_ids) > settings.report_export_max_sessions:
+            raise AppError(
+                status_code=400,
+                code="validation_error",
+                message=f"Export is limited to {settings.report_export_max_sessions} sessions; narrow the date range",
+            )
+
+        await asyncio.to_thread(sweep_report_exports)
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "teacher_id": str(tid),
+            "status": "queued",
+            "format": req.format,
+            "paper": req.paper or "",
+            "total": len(session_ids),
+            "done": 0,
+            "failed": 0,
+            "error": "",
+            "created_at": utc_now().isoformat(),
+            "finished_at": "",
+            "session_ids": json.dumps([str(s) for s in session_ids]),
+        }
+        try:
+            redis = get_redis()
+            await redis.hset(_job_key(job_id), mapping=job)
+            await redis.expire(_job_key(job_id), settings.report_export_ttl_sec)
+            await enqueue("reports.export", {"job_id": job_id})
+        except RedisError as e:
+            raise AppError(status_code=503, code="unavailable", message="Export queue unavailable") from e
+
+        return _public_job(job)
+
+    async def get_export(self, *, teacher_id: str, job_id: str) -> dict[str, Any]:
+        return _public_job(await _load_job(teacher_id, job_id))
+
+    async def export_file(self, *, teacher_id: str, job_id: str) -> tuple[Path, str]:
+        job = await _load_job(teacher_id, job_id)
+        if job["status"] != "done":
+            raise AppError(status_code=409, code="conflict", message="Export is not ready")
+        path = _export_path(job_id, job["format"])
+        if not path.exists():
+            raise AppError(status_code=410, code="gone", message="Export file expired")
+        return path, job["format"]
+
+
+async def _select_sessions(
+    session: AsyncSession,
+    *,
+    classroom_id: uuid.UUID,
+    skill_id: int | None,
+    date_from,
+    date_to,
+) -> list[uuid.UUID]:
+    stmt = (
+        select(PracticeSession.id)
+        .join(Enrollment, Enrollment.student_id == PracticeSession.user_id)
+        .join(User, User.id == PracticeSession.user_id)
+        .where(Enrollment.classroom_id == classroom_id, PracticeSession.finished_at.is_not(None))
+        .order_by(User.full_name.asc(), PracticeSession.finished_at.asc())
+    )
+    if skill_id is not None:
+        stmt = stmt.where(PracticeSession.skill_id == skill_id)
+    if date_from is not None:
+        stmt = stmt.where(PracticeSession.finished_at >= datetime.combine(date_from, dtime.min, tzinfo=timezone.utc))
+    if date_to is not None:
+        stmt = stmt.where(PracticeSession.finished_at < datetime.combine(date_to + timedelta(days=1), dtime.min, tzinfo=timezone.utc))
+    return list((await session.execute(stmt)).scalars().all())
+
+
+async def _load_job(teacher_id: str, job_id: str) -> dict[str, Any]:
+    try:
+        job = await get_redis().hgetall(_job_key(job_id))
+    except RedisError as e:
+        raise AppError(status_code=503, code="unavailable", message="Export queue unavailable") from e
+    if not job or job.get("teacher_id") != str(teacher_id):
+        raise AppError(status_code=404, code="not_found", message="Export not found")
+    return job
+
+
+def _public_job(job: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "id": job["id"],
+        "status": job["status"],
+        "format": job["format"],
+        "total": int(job["total"]),
+        "done": int(job["done"]),
+        "failed": int(job["failed"]),
+        "error": job.get("error") or None,
+        "created_at": job["created_at"],
+        "finished_at": job.get("finished_at") or None,
+    }
+
+
+async def run_report_export(job_id: str) -> None:
+    redis = get_redis()
+    key = _job_key(job_id)
+    job = await redis.hgetall(key)
+    if not job:
+        return
+    fmt = job["format"]
+    paper = job.get("paper") or None
+    session_ids = [uuid.UUID(s) for s in json.loads(job["session_ids"])]
+    started = time.perf_counter()
+    await redis.hset(key, mapping={"status": "running"})
+    try:
+        async with (await get_read_sessionmaker())() as db:
+            if fmt == "zip":
+                await _export_zip(db, redis, key, job_id, session_ids, paper)
+            else:
+                await _export_merged(db, redis, key, job_id, session_ids, paper)
+            await db.rollback()
+    except asyncio.CancelledError:
+        # The worker is shutting down and re-queues the job; it starts over on the next pickup.
+        with contextlib.suppress(RedisError):
+            await redis.hset(key, mapping={"status": "queued", "done": 0, "failed": 0})
+        raise
+    except Exception as e:
+        logger.exception("Report export %s failed", job_id)
+        message = e.message if isinstance(e, AppError) else "Export failed"
+        await _finish(redis, key, status="failed", error=message)
+        return
+    await _finish(redis, key, status="done")
+    logger.info("Report export %s finished: %d sessions as %s in %.1fs", job_id, len(session_ids), fmt, time.perf_counter() - started)
+
+
+async def _finish(redis, key: str, *, status: str, error: str = "") -> None:
+    with contextlib.suppress(RedisError):
+        await redis.hset(key, mapping={"status": status, "error": error, "finished_at": utc_now().isoformat()})
+
+
+async def _load_sources(db: AsyncSession, session_ids: list[uuid.UUID]) -> list[tuple[PracticeSession, User, Skill]]:
+    stmt = (
+        select(PracticeSession, User, Skill)
+        .join(User, User.id == PracticeSession.user_id)
+        .join(Skill, Skill.id == PracticeSession.skill_id)
+        .where(PracticeSession.id.in_(session_ids))
+    )
+    by_id = {ps.id: (ps, user, skill) for ps, user, skill in (await db.execute(stmt)).all()}
+    return [by_id[sid] for sid in session_ids if sid in by_id]
+
+
+async def _export_zip(db: AsyncSession, redis, key: str, job_id: str, session_ids: list[uuid.UUID], paper: str | None) -> None:
+    reports = ReportService(db, db)
+    sources = await _load_sources(db, session_ids)
+    # Data loading shares one DB session, so it is serialized; rendering overlaps in the pool.
+    db_lock = asyncio.Lock()
+    slots = asyncio.Semaphore(settings.report_export_concurrency)
+
+    async def _one(index: int, ps: PracticeSession, user: User, skill: Skill):
+        async with slots:
+
+            async def _data() -> dict:
+                async with db_lock:
+                    return await reports.practice_session_report_data(ps, user, skill)
+
+            async def _render() -> bytes:
+                data = await _data()
+                try:
+                    return await render_pdf_async({"kind": "practice_session", "paper": paper, **data}, timeout_sec=report_timeout_sec(data))
+                finally:
+                    release_report_data(data)
+
+            # Finished sessions go through the PDF cache, so reports printed before are not re-rendered.
+            doc = await cached_pdf("practice_session", str(ps.id), paper, practice_session_version(ps, user, skill), _render)
+            name = f"{index:03d}-{_safe_name(user.full_name)}-{skill.code}-{ps.finished_at.date().isoformat()}.pdf"
+            return name, doc
+
+    target = _export_path(job_id, "zip")
+    target.parent.mkdir(parents=True, exist_ok=True)
+    part = target.with_suffix(".zip.part")
+    zf = zipfile.ZipFile(part, "w", compression=zipfile.ZIP_STORED)
+    tasks = [asyncio.create_task(_one(i, *src)) for i, src in enumerate(sources, start=1)]
+    try:
+        done = failed = 0
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                name, doc = await next_done
+            except AppError as e:
+                failed += 1
+                logger.warning("Report export %s: one report failed: %s", job_id, e.message)
+            else:
+                # PDFs are already compressed; STORED avoids burning CPU for nothing.
+                if doc.file is not None:
+                    await asyncio.to_thread(_write_member, zf, name, doc.file)
+                else:
+                    await asyncio.to_thread(zf.writestr, name, doc.content or b"")
+                done += 1
+            await redis.hset(key, mapping={"done": done, "failed": failed})
+    except BaseException:
+        for t in tasks:
+            t.cancel()
+        zf.close()
+        with contextlib.suppress(OSError):
+            part.unlink()
+        raise
+    zf.close()
+    os.replace(part, target)
+
+
+async def _export_merged(db: AsyncSession, redis, key: str, job_id: str, session_ids: list[uuid.UUID], paper: str | None) -> None:
+    reports = ReportService(db, db)
+    sources = await _load_sources(db, session_ids)
+    bundle = []
+    try:
+        for i, (ps, user, skill) in enumerate(sources, start=1):
+            bundle.append(await reports.practice_session_report_data(ps, user, skill))
+            if i % 10 == 0:
+                await redis.hset(key, mapping={"done": i})
+        await redis.hset(key, mapping={"status": "rendering", "done": len(bundle)})
+
+        # One document can only be laid out by one worker; allow it time proportional to its size.
+        data = await render_pdf_async(
+            {"kind": "practice_session_bundle", "paper": paper, "reports": bundle},
+            timeout_sec=max(settings.pdf_render_timeout_sec * max(1, len(bundle) // 10), report_timeout_sec(*bundle)),
+        )
+    finally:
+        release_report_data(*bundle)
+    target = _export_path(job_id, "pdf")
+    target.parent.mkdir(parents=True, exist_ok=True)
+    part = target.with_suffix(".pdf.part")
+    await asyncio.to_thread(part.write_bytes, data)
+    os.replace(part, target)
+
+
+def sweep_report_exports() -> None:
+    """Delete export files older than the job TTL (their Redis records are gone by then)."""
+    root = Path(settings.report_export_dir)
+    if not root.is_dir():
+        return
+    cutoff = time.time() - settings.report_export_ttl_sec
+    for path in root.iterdir():
+        with contextlib.suppress(OSError):
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+
+
+def _write_member(zf: zipfile.ZipFile, name: str, f: BinaryIO) -> None:
+    """Copy an open cached PDF into the archive and close it."""
+    with f, zf.open(name, "w") as out:
+        shutil.copyfileobj(f, out)
+
+
+def _safe_name(value: str) -> str:
+    cleaned = "".join(ch if ch.isalnum() else "_" for ch in value).strip("_")
+    return cleaned[:60] or "student"
+
+
+def _parse_uuid(value: str | None) -> uuid.UUID:
+    if not value:
+        raise AppError(status_code=400, code="validation_error", message="Invalid id")
+    try:
+        return uuid.UUID(str(value))
+    except ValueError as e:
+        raise AppError(status_code=400, code="validation_error", message="Invalid id") from e
@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import contextlib
+import json
+import os
+import tempfile
 import uuid
 from datetime import date
 
@@ -7,21 +11,30 @@ from fastapi import Depends
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.deps import get_read_session
 from app.core.errors import AppError
 from app.db.session import get_db_session
 from app.models.assignment import Assignment, AssignmentStatusRow
 from app.models.awards import AwardEvent
 from app.models.catalog import Skill
 from app.models.classroom import Classroom, Enrollment
+from app.models.enums import AssignmentStatus
 from app.models.practice import PracticeAttempt, PracticeSession
 from app.models.user import User
-from app.utils.pdf import build_assignment_report_pdf, build_certificate_pdf, build_practice_session_report_pdf
+from app.utils.pdf_cache import PdfDocument, cached_pdf
+from app.utils.pdf_pool import PDF_LAYOUT_VERSION, render_pdf_async
 from app.utils.time import utc_now
 
 
 class ReportService:
-    def __init__(self, session: AsyncSession = Depends(get_db_session)) -> None:
+    def __init__(
+        self,
+        session: AsyncSession = Depends(get_db_session),
+        read_session: AsyncSession = Depends(get_read_session),
+    ) -> None:
         self.session = session
+        self.read_session = read_session
 
     async def practice_session_pdf(
         self,
@@ -30,10 +43,10 @@ class ReportService:
         requester_role: str,
         session_id: str,
         paper: str | None,
-    ) -> bytes:
+    ) -> PdfDocument:
         sid = _parse_uuid(session_id)
         rid = _parse_uuid(requester_id)
-        ps = await self.session.get(PracticeSession, sid)
+        ps = await self.read_session.get(PracticeSession, sid)
         if ps is None:
             raise AppError(status_code=404, code="not_found", message="Session not found")
 
@@ -47,20 +60,47 @@ class ReportService:
                 .join(Classroom, Classroom.id == Enrollment.classroom_id)
                 .where(Classroom.teacher_id == rid, Enrollment.student_id == ps.user_id)
             )
-            if int((await self.session.execute(stmt)).scalar_one()) == 0:
+            if int((await self.read_session.execute(stmt)).scalar_one()) == 0:
                 raise AppError(status_code=403, code="forbidden", message="Student not in your classrooms")
 
-        user = await self.session.get(User, ps.user_id)
-        skill = await self.session.get(Skill, ps.skill_id)
+        user = await self.read_session.get(User, ps.user_id)
+        skill = await self.read_session.get(Skill, ps.skill_id)
         if user is None or skill is None:
             raise AppError(status_code=404, code="not_found", message="Report source not found")
 
+        return await self.practice_session_document(ps, user, skill, paper)
+
+    async def practice_session_document(self, ps: PracticeSession, user: User, skill: Skill, paper: str | None) -> PdfDocument:
+        async def _render() -> bytes:
+            data = await self.practice_session_report_data(ps, user, skill)
+            try:
+                return await render_pdf_async({"kind": "practice_session", "paper": paper, **data}, timeout_sec=report_timeout_sec(data))
+            finally:
+                release_report_data(data)
+
+        return await cached_pdf("practice_session", str(ps.id), paper, practice_session_version(ps, user, skill), _render)
+
+    async def practice_session_report_data(self, ps: PracticeSession, user: User, skill: Skill) -> dict:
+        """Header and question log rows of a practice session report (the render spec minus paper).
+
+        Attempts are read from a server-side cursor. Long sessions write their rows to a JSON-lines
+        temp file passed as `rows_path` instead of `rows`, so neither this process nor the render
+        spec holds the whole log; callers must pass the result to `release_report_data`.
+        """
         attempts_stmt = (
-            select(PracticeAttempt)
+            select(
+                PracticeAttempt.answered_at,
+                PracticeAttempt.question_payload,
+                PracticeAttempt.submitted_answer,
+                PracticeAttempt.is_correct,
+                PracticeAttempt.time_spent_sec,
+                PracticeAttempt.smartscore_before,
+                PracticeAttempt.smartscore_after,
+            )
             .where(PracticeAttempt.session_id == ps.id)
             .order_by(PracticeAttempt.answered_at.asc())
+            .execution_options(yield_per=1000)
         )
-        attempts = list((await self.session.execute(attempts_stmt)).scalars().all())
 
         header = {
             "student": user.full_name,
@@ -73,23 +113,20 @@ class ReportService:
             "incorrect": ps.total_incorrect,
             "active_time_seconds": ps.active_time_seconds,
         }
-        rows = []
-        for a in attempts:
-            qp = a.question_payload or {}
-            rows.append(
-                {
-                    "answered_at": a.answered_at.isoformat(),
-                    "question": qp.get("prompt") or "",
-                    "submitted_answer": _compact_json(a.submitted_answer),
-                    "correct_answer": _compact_json(qp.get("correct_answer")),
-                    "is_correct": bool(a.is_correct),
-                    "time_spent_sec": int(a.time_spent_sec or 0),
-                    "smartscore_before": int(a.smartscore_before or 0),
-                    "smartscore_after": int(a.smartscore_after or 0),
-                }
-            )
+        result = await self.read_session.stream(attempts_stmt)
+        if (ps.total_questions_answered or 0) <= settings.pdf_report_spill_rows:
+            return {"header": header, "rows": [_attempt_report_row(r) async for r in result]}
 
-        return build_practice_session_report_pdf(paper=paper, header=header, rows=rows)
+        fd, rows_path = tempfile.mkstemp(prefix="report-rows-", suffix=".jsonl")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                async for rows in result.partitions():
+                    f.writelines(json.dumps(_attempt_report_row(r), ensure_ascii=False) + "\n" for r in rows)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(rows_path)
+            raise
+        return {"header": header, "rows_path": rows_path}
 
     async def assignment_pdf(
         self,
@@ -98,10 +135,10 @@ class ReportService:
         requester_role: str,
         assignment_id: str,
         paper: str | None,
-    ) -> bytes:
+    ) -> PdfDocument:
         rid = _parse_uuid(requester_id)
         aid = _parse_uuid(assignment_id)
-        assignment = await self.session.get(Assignment, aid)
+        assignment = await self.read_session.get(Assignment, aid)
         if assignment is None:
             raise AppError(status_code=404, code="not_found", message="Assignment not found")
 
@@ -109,53 +146,84 @@ class ReportService:
             raise AppError(status_code=403, code="forbidden", message="Insufficient permissions")
 
         if requester_role == "TEACHER":
-            classroom = await self.session.get(Classroom, assignment.classroom_id)
+            classroom = await self.read_session.get(Classroom, assignment.classroom_id)
             if classroom is None or classroom.teacher_id != rid:
                 raise AppError(status_code=403, code="forbidden", message="Insufficient permissions")
 
-        skill = await self.session.get(Skill, assignment.skill_id)
+        skill = await self.read_session.get(Skill, assignment.skill_id)
         if skill is None:
             raise AppError(status_code=404, code="not_found", message="Skill not found")
 
-        stmt = (
-            select(User, AssignmentStatusRow)
-            .join(AssignmentStatusRow, AssignmentStatusRow.student_id == User.id)
-            .where(AssignmentStatusRow.assignment_id == assignment.id)
-            .order_by(User.full_name.asc())
-        )
-        rows = (await self.session.execute(stmt)).all()
-        grid_rows = []
-        completed = 0
-        in_progress = 0
-        not_started = 0
-        for u, s in rows:
-            status = s.status.value if hasattr(s.status, "value") else str(s.status)
-            if status == "COMPLETED":
-                completed += 1
-            elif status == "IN_PROGRESS":
-                in_progress += 1
-            else:
-                not_started += 1
-            grid_rows.append(
-                {
-                    "student": u.full_name,
-                    "status": status,
-                    "best_smartscore": s.best_smartscore,
-                    "last_smartscore": s.last_smartscore,
-                    "questions_answered": s.questions_answered,
-                    "time_spent_seconds": getattr(s, "time_spent_seconds", 0),
-                    "last_activity_at": (getattr(s, "last_activity_at", None).isoformat() if getattr(s, "last_activity_at", None) else None),
-                }
+        # Cached only once every student has completed it; new enrollments or renames change the version.
+        agg = (
+            await self.read_session.execute(
+                select(
+                    func.count(),
+                    func.count().filter(AssignmentStatusRow.status == AssignmentStatus.COMPLETED),
+                    func.max(AssignmentStatusRow.updated_at),
+                    func.max(User.updated_at),
+                )
+                .select_from(AssignmentStatusRow)
+                .join(User, User.id == AssignmentStatusRow.student_id)
+                .where(AssignmentStatusRow.assignment_id == assignment.id)
+            )
+        ).one()
+        total_rows, completed_rows, rows_updated_at, users_updated_at = agg
+        version = None
+        if total_rows and completed_rows == total_rows:
+            version = ":".join(
+                [
+                    str(PDF_LAYOUT_VERSION),
+                    str(total_rows),
+                    rows_updated_at.isoformat(),
+                    users_updated_at.isoformat(),
+                    assignment.updated_at.isoformat(),
+                    skill.updated_at.isoformat(),
+                ]
             )
 
-        header = {
-            "assignment_id": str(assignment.id),
-            "skill": f"{skill.code} — {skill.title}",
-            "target_smartscore": assignment.target_smartscore,
-            "due_at": assignment.due_at.isoformat() if assignment.due_at else "",
-            "summary": f"Completed {completed} / In progress {in_progress} / Not started {not_started}",
-        }
-        return build_assignment_report_pdf(paper=paper, header=header, rows=grid_rows)
+        async def _render() -> bytes:
+            stmt = (
+                select(User, AssignmentStatusRow)
+                .join(AssignmentStatusRow, AssignmentStatusRow.student_id == User.id)
+                .where(AssignmentStatusRow.assignment_id == assignment.id)
+                .order_by(User.full_name.asc())
+            )
+            rows = (await self.read_session.execute(stmt)).all()
+            grid_rows = []
+            completed = 0
+            in_progress = 0
+            not_started = 0
+            for u, s in rows:
+                status = s.status.value if hasattr(s.status, "value") else str(s.status)
+                if status == "COMPLETED":
+                    completed += 1
+                elif status == "IN_PROGRESS":
+                    in_progress += 1
+                else:
+                    not_started += 1
+                grid_rows.append(
+                    {
+                        "student": u.full_name,
+                        "status": status,
+                        "best_smartscore": s.best_smartscore,
+                        "last_smartscore": s.last_smartscore,
+                        "questions_answered": s.questions_answered,
+                        "time_spent_seconds": getattr(s, "time_spent_seconds", 0),
+                        "last_activity_at": (getattr(s, "last_activity_at", None).isoformat() if getattr(s, "last_activity_at", None) else None),
+                    }
+                )
+
+            header = {
+                "assignment_id": str(assignment.id),
+                "skill": f"{skill.code} — {skill.title}",
+                "target_smartscore": assignment.target_smartscore,
+                "due_at": assignment.due_at.isoformat() if assignment.due_at else "",
+                "summary": f"Completed {completed} / In progress {in_progress} / Not started {not_started}",
+            }
+            return await render_pdf_async({"kind": "assignment", "paper": paper, "header": header, "rows": grid_rows})
+
+        return await cached_pdf("assignment", str(assignment.id), paper, version, _render)
 
     async def certificate_pdf(
         self,
@@ -176,8 +244,8 @@ class ReportService:
         if sid != rid and requester_role not in {"TEACHER", "ADMIN"}:
             raise AppError(status_code=403, code="forbidden", message="Insufficient permissions")
 
-        user = await self.session.get(User, sid)
-        skill = await self.session.get(Skill, skill_id)
+        user = await self.read_session.get(User, sid)
+        skill = await self.read_session.get(Skill, skill_id)
         if user is None or skill is None:
             raise AppError(status_code=404, code="not_found", message="Not found")
 
@@ -192,16 +260,56 @@ class ReportService:
         self.session.add(AwardEvent(user_id=sid, skill_id=skill_id, type=type, issued_at=utc_now(), related_session_id=rel))
         await self.session.flush()
 
-        return build_certificate_pdf(
-            paper=paper,
-            title=title,
-            student_name=user.full_name,
-            skill_name=f"{skill.code} — {skill.title}",
-            date_str=d,
-            awarded_by=awarded_by,
+        return await render_pdf_async(
+            {
+                "kind": "certificate",
+                "paper": paper,
+                "title": title,
+                "student_name": user.full_name,
+                "skill_name": f"{skill.code} — {skill.title}",
+                "date_str": d,
+                "awarded_by": awarded_by,
+            }
         )
 
 
+def practice_session_version(ps: PracticeSession, user: User, skill: Skill) -> str | None:
+    """PDF cache version of a session report. A finished session never changes; unfinished ones are not cached."""
+    if ps.finished_at is None:
+        return None
+    return f"{PDF_LAYOUT_VERSION}:{ps.finished_at.isoformat()}:{user.updated_at.isoformat()}:{skill.updated_at.isoformat()}"
+
+
+def release_report_data(*reports: dict) -> None:
+    """Remove the row files of reports returned by `practice_session_report_data`."""
+    for report in reports:
+        if report.get("rows_path"):
+            with contextlib.suppress(OSError):
+                os.unlink(report["rows_path"])
+
+
+def report_timeout_sec(*reports: dict) -> float:
+    """Render timeout for session reports: the pool default, scaled up for very long question logs."""
+    rows = sum(int(r["header"].get("questions_answered") or 0) for r in reports)
+    return settings.pdf_render_timeout_sec * max(1, -(-rows // 1000))
+
+
+def _attempt_report_row(r) -> dict:
+    answered_at, question_payload, submitted_answer, is_correct, time_spent_sec, smartscore_before, smartscore_after = r
+    qp = question_payload or {}
+    # Trimmed to what the log table prints, so long prompts do not ride along into the spec.
+    return {
+        "answered_at": answered_at.isoformat(),
+        "question": (qp.get("prompt") or "")[:120],
+        "submitted_answer": _compact_json(submitted_answer)[:60],
+        "correct_answer": _compact_json(qp.get("correct_answer"))[:60],
+        "is_correct": bool(is_correct),
+        "time_spent_sec": int(time_spent_sec or 0),
+        "smartscore_before": int(smartscore_before or 0),
+        "smartscore_after": int(smartscore_after or 0),
+    }
+
+
 def _parse_uuid(value: str | None) -> uuid.UUID:
     if not value:
         raise AppError(status_code=400, code="validation_error", message="Invalid id")
@@ -215,8 +323,6 @@ def _compact_json(obj) -> str:
     if obj is None:
         return ""
     try:
-        import json
-
         return json.dumps(obj, ensure_ascii=False, sort_keys=True)
     except Exception:
         return str(obj)
@@ -0,0 +1,35 @@
+"""CPUs this process may actually use, for sizing process pools.
+
+`os.cpu_count()` is the host's count; in a container that can be far more than its share.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from pathlib import Path
+
+CGROUP_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+
+
+def _cgroup_quota() -> float | None:
+    # cgroup v2: "<quota> <period>" in microseconds, or "max <period>" without a limit
+    try:
+        quota, period = CGROUP_CPU_MAX.read_text().split()
+    except (OSError, ValueError):
+        return None
+    if quota == "max":
+        return None
+    return int(quota) / int(period)
+
+
+def usable_cpu_count() -> int:
+    """CPUs in the affinity mask, further limited by a cgroup CPU quota (docker --cpus)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_quota()
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+    return max(1, cpus)
@@ -0,0 +1,162 @@
+"""In-process caches kept consistent across API worker processes.
+
+Every worker holds its own copy of a `LocalCache`. After a change commits, `invalidate(name)`
+drops this process's entries right away and publishes the cache name over Redis pub/sub so
+every other process drops its own; the TTL bounds staleness if a message is lost while a
+listener reconnects. Caches are
+emptied in forked children, so a preloaded master never hands its contents to workers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import time
+import weakref
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "cache:invalidate"
+
+_caches: weakref.WeakValueDictionary[str, LocalCache] = weakref.WeakValueDictionary()
+
+
+class LocalCache:
+    def __init__(self, name: str, *, ttl_sec: float, max_entries: int = 256) -> None:
+        if name in _caches:
+            raise ValueError(f"Local cache {name!r} already exists")
+        self.name = name
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[float, Any]] = {}
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        _caches[name] = self
+
+    def get(self, key: str) -> Any | None:
+        item = self._entries.get(key)
+        if item is None or item[0] < time.monotonic():
+            self._misses += 1
+            return None
+        self._hits += 1
+        return item[1]
+
+    def set(self, key: str, value: Any) -> None:
+        if self.ttl_sec <= 0:
+            return
+        if len(self._entries) >= self.max_entries and key not in self._entries:
+            # Insertion order: the oldest entry goes first.
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic() + self.ttl_sec, value)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._invalidations += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self._hits, "misses": self._misses, "invalidations": self._invalidations}
+
+
+def _clear_all() -> None:
+    for cache in list(_caches.values()):
+        cache.clear()
+
+
+def cache_stats() -> dict[str, dict[str, Any]]:
+    return {name: cache.stats() for name, cache in sorted(_caches.items())}
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_clear_all)
+
+
+class CacheInvalidator:
+    """One Redis subscription per process that clears local caches by name."""
+
+    def __init__(self, redis: Redis | None) -> None:
+        self._redis = redis
+        self._listener: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        if self._redis is not None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def invalidate(self, name: str) -> None:
+        # This process first, so the request that made the change never reads the old copy;
+        # the others clear theirs when the message arrives (this one again, harmlessly).
+        self._clear(name)
+        if self._redis is not None and self._listener is not None:
+            try:
+                await self._redis.publish(INVALIDATE_CHANNEL, name)
+            except RedisError as exc:
+                logger.warning("Cache invalidation publish failed for %s: %s", name, exc)
+
+    @staticmethod
+    def _clear(name: str) -> None:
+        cache = _caches.get(name)
+        if cache is not None:
+            cache.clear()
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATE_CHANNEL)
+                # Messages may have been missed while unsubscribed.
+                _clear_all()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._clear(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Cache invalidation listener failed: %s", exc)
+                await asyncio.sleep(1)
+            finally:
+                with contextlib.suppress(Exception):
+                    await pubsub.aclose()
+
+    @property
+    def listening(self) -> bool:
+        return self._listener is not None and not self._listener.done()
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            # redis-py can swallow a cancellation that lands while it is still subscribing,
+            # and the listener then blocks in listen(); cancel again until it has ended.
+            while not self._listener.done():
+                self._listener.cancel()
+                await asyncio.wait([self._listener], timeout=0.1)
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                self._listener.result()
+            self._listener = None
+        _clear_all()
+
+
+_invalidator: CacheInvalidator | None = None
+
+
+def init_cache_invalidator(redis: Redis | None) -> None:
+    global _invalidator
+    _invalidator = CacheInvalidator(redis)
+    _invalidator.start()
+
+
+def get_cache_invalidator() -> CacheInvalidator:
+    if _invalidator is None:
+        raise RuntimeError("Cache invalidator not initialized")
+    return _invalidator
+
+
+async def close_cache_invalidator() -> None:
+    global _invalidator
+    if _invalidator is not None:
+        await _invalidator.close()
+        _invalidator = None
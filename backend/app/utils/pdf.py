@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+import json
+from collections.abc import Iterable, Iterator
 from io import BytesIO
+from itertools import islice
 from typing import Any
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, LETTER
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import inch
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+# Bump PDF_LAYOUT_VERSION in app.utils.pdf_pool when any layout here changes.
+
+# The question log is laid out as a run of tables of this many rows. Splitting one table across
+# pages re-measures every remaining row, so a single table costs O(rows^2) to lay out.
+LOG_CHUNK_ROWS = 200
 
 
 def _pagesize(paper: str | None):
@@ -16,19 +25,76 @@ def _pagesize(paper: str | None):
     return LETTER
 
 
+class _StreamingDocTemplate(SimpleDocTemplate):
+    """Pulls flowables from an iterator as layout consumes them, so only a few are alive at once."""
+
+    _lookahead = 4
+
+    def build_from(self, flowables: Iterator[Any]) -> None:
+        self._source = flowables
+        self._story: list[Any] = []
+        self._top_up()
+        self.build(self._story)
+
+    def _top_up(self) -> None:
+        # Platypus stops when its list runs empty, so refill it after every flowable it takes off.
+        while len(self._story) < self._lookahead:
+            nxt = next(self._source, None)
+            if nxt is None:
+                return
+            self._story.append(nxt)
+
+    def filterFlowables(self, flowables) -> None:
+        self._top_up()
+
+    def afterFlowable(self, flowable) -> None:
+        self._top_up()
+
+
+def _report_doc(buf: BytesIO, paper: str | None) -> _StreamingDocTemplate:
+    return _StreamingDocTemplate(buf, pagesize=_pagesize(paper), leftMargin=0.6 * inch, rightMargin=0.6 * inch)
+
+
 def build_practice_session_report_pdf(
     *,
     paper: str | None,
     header: dict[str, Any],
-    rows: list[dict[str, Any]],
+    rows: list[dict[str, Any]] | None = None,
+    rows_path: str | None = None,
 ) -> bytes:
+    """Render a session report. Long sessions pass `rows_path`, a JSON-lines file read as pages are laid out."""
+    buf = BytesIO()
+    _report_doc(buf, paper).build_from(_practice_session_story(getSampleStyleSheet(), header, _report_rows(rows, rows_path)))
+    return buf.getvalue()
+
+
+def build_practice_session_bundle_pdf(*, paper: str | None, reports: list[dict[str, Any]]) -> bytes:
+    """Several practice session reports in one document, each starting on a new page."""
     buf = BytesIO()
-    doc = SimpleDocTemplate(buf, pagesize=_pagesize(paper), leftMargin=0.6 * inch, rightMargin=0.6 * inch)
     styles = getSampleStyleSheet()
 
-    story: list[Any] = []
-    story.append(Paragraph("Practice Session Report", styles["Title"]))
-    story.append(Spacer(1, 0.2 * inch))
+    def _story() -> Iterator[Any]:
+        for i, report in enumerate(reports):
+            if i:
+                yield PageBreak()
+            yield from _practice_session_story(styles, report["header"], _report_rows(report.get("rows"), report.get("rows_path")))
+
+    _report_doc(buf, paper).build_from(_story())
+    return buf.getvalue()
+
+
+def _report_rows(rows: list[dict[str, Any]] | None, rows_path: str | None) -> Iterator[dict[str, Any]]:
+    if rows_path is None:
+        yield from rows or []
+        return
+    with open(rows_path, encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def _practice_session_story(styles, header: dict[str, Any], rows: Iterable[dict[str, Any]]) -> Iterator[Any]:
+    yield Paragraph("Practice Session Report", styles["Title"])
+    yield Spacer(1, 0.2 * inch)
 
     meta_table = Table(
         [
@@ -53,25 +119,33 @@ def build_practice_session_report_pdf(
             ]
         )
     )
-    story.append(meta_table)
-    story.append(Spacer(1, 0.25 * inch))
+    yield meta_table
+    yield Spacer(1, 0.25 * inch)
+
+    yield Paragraph("Questions Log", styles["Heading2"])
+    yield Spacer(1, 0.1 * inch)
+
+    numbered = enumerate(rows, start=1)
+    while chunk := list(islice(numbered, LOG_CHUNK_ROWS)):
+        yield _log_table(chunk)
+
+
+_LOG_HEADER = ["#", "Timestamp", "Question", "Student Answer", "Correct Answer", "Correct?", "Time (s)", "SmartScore"]
+_LOG_COL_WIDTHS = [0.35 * inch, 1.2 * inch, 2.6 * inch, 1.1 * inch, 1.1 * inch, 0.55 * inch, 0.55 * inch, 0.8 * inch]
+_LOG_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#111827")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+    ]
+)
 
-    story.append(Paragraph("Questions Log", styles["Heading2"]))
-    story.append(Spacer(1, 0.1 * inch))
 
-    table_data = [
-        [
-            "#",
-            "Timestamp",
-            "Question",
-            "Student Answer",
-            "Correct Answer",
-            "Correct?",
-            "Time (s)",
-            "SmartScore",
-        ]
-    ]
-    for i, r in enumerate(rows, start=1):
+def _log_table(numbered_rows: list[tuple[int, dict[str, Any]]]) -> Table:
+    table_data = [_LOG_HEADER]
+    for i, r in numbered_rows:
         table_data.append(
             [
                 str(i),
@@ -84,23 +158,10 @@ def build_practice_session_report_pdf(
                 f"{r.get('smartscore_before', 0)}→{r.get('smartscore_after', 0)}",
             ]
         )
-
-    log_table = Table(table_data, repeatRows=1, hAlign="LEFT", colWidths=[0.35 * inch, 1.2 * inch, 2.6 * inch, 1.1 * inch, 1.1 * inch, 0.55 * inch, 0.55 * inch, 0.8 * inch])
-    log_table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#111827")),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                ("GRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ("FONTSIZE", (0, 0), (-1, -1), 8),
-            ]
-        )
-    )
-    story.append(log_table)
-
-    doc.build(story)
-    return buf.getvalue()
+    # Every chunk carries the header row, and repeatRows keeps it on each page a chunk spills onto.
+    log_table = Table(table_data, repeatRows=1, hAlign="LEFT", colWidths=_LOG_COL_WIDTHS)
+    log_table.setStyle(_LOG_STYLE)
+    return log_table
 
 
 def build_assignment_report_pdf(*, paper: str | None, header: dict[str, Any], rows: list[dict[str, Any]]) -> bytes:
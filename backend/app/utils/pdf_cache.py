@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import fcntl
+import hashlib
+import logging
+import os
+import tempfile
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+FILE_CHUNK = 64 * 1024
+
+
+@dataclass(frozen=True)
+class PdfDocument:
+    """A rendered report: either an open cached file or fresh bytes. `etag` is set only for cacheable reports.
+
+    The file is opened before it is returned, so it stays readable if another request evicts it;
+    whoever consumes the document closes it.
+    """
+
+    content: bytes | None = None
+    file: BinaryIO | None = None
+    etag: str | None = None
+
+
+class PdfDiskCache:
+    """Content-addressed PDF files under `root`, evicted least-recently-used past `max_bytes`.
+
+    Keys include a content version, so a changed source produces a new key instead of an
+    invalidation. The directory itself is the index, shared by every process using `root`:
+    file mtimes are the LRU clock, and each `put` scans the directory under a file lock and
+    evicts the oldest files. A put follows a render, so the scan is cheap next to it.
+    Methods block on disk I/O; `cached_pdf` calls them in a thread.
+    """
+
+    def __init__(self, root: Path, *, max_bytes: int) -> None:
+        self._root = root
+        self._max_bytes = max_bytes
+        self._entries = 0
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self._root / ".lock"
+        with self._locked():
+            self._scan()
+
+    @staticmethod
+    def key(kind: str, object_id: str, paper: str | None, version: str) -> str:
+        raw = f"{kind}:{object_id}:{(paper or 'letter').lower()}:{version}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def _path(self, key: str) -> Path:
+        return self._root / key[:2] / f"{key}.pdf"
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        # flock is per open file, so this excludes other threads of this process as well.
+        with open(self._lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _scan(self) -> list[tuple[float, Path, int]]:
+        """Cached files, least recently used first; refreshes the numbers `stats` reports."""
+        entries = []
+        for path in self._root.glob("*/*.pdf"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, path, st.st_size))
+        entries.sort()
+        self._entries = len(entries)
+        self._total = sum(size for _mtime, _path, size in entries)
+        return entries
+
+    def get(self, key: str) -> BinaryIO | None:
+        try:
+            f = open(self._path(key), "rb")
+        except OSError:
+            self.misses += 1
+            return None
+        try:
+            # mtime doubles as the LRU clock, shared by every process.
+            os.utime(f.fileno())
+        except OSError:
+            pass
+        self.hits += 1
+        return f
+
+    def put(self, key: str, data: bytes) -> BinaryIO:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file in the same directory and rename, so readers never see a partial PDF.
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            raise
+        f = open(path, "rb")
+        with self._locked():
+            self._evict(keep=path)
+        return f
+
+    def _evict(self, *, keep: Path) -> None:
+        entries = self._scan()
+        for _mtime, path, size in entries:
+            if self._total <= self._max_bytes or self._entries <= 1:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                logger.warning("PDF cache eviction failed for %s: %s", path.name, exc)
+                continue
+            self._entries -= 1
+            self._total -= size
+
+    def stats(self) -> dict[str, int]:
+        """Entries and bytes are as of this process's last scan; hits and misses are per process."""
+        return {"entries": self._entries, "bytes": self._total, "max_bytes": self._max_bytes, "hits": self.hits, "misses": self.misses}
+
+
+_cache: PdfDiskCache | None = None
+
+
+def init_pdf_cache(root: str, *, max_mb: int) -> None:
+    global _cache
+    _cache = PdfDiskCache(Path(root), max_bytes=max_mb * 1024 * 1024) if max_mb > 0 else None
+
+
+def get_pdf_cache() -> PdfDiskCache | None:
+    """The configured cache, or None when caching is disabled."""
+    return _cache
+
+
+def close_pdf_cache() -> None:
+    global _cache
+    _cache = None
+
+
+async def cached_pdf(kind: str, object_id: str, paper: str | None, version: str | None, render) -> PdfDocument:
+    """Serve a report from the cache, rendering and storing it on a miss.
+
+    `version` is None when the source can still change; such reports bypass the cache.
+    `render` is an async callable producing the PDF bytes. A file evicted before it could be
+    opened is a miss and is rendered again.
+    """
+    cache = get_pdf_cache()
+    if cache is None or version is None:
+        return PdfDocument(content=await render())
+    key = cache.key(kind, object_id, paper, version)
+    f = await asyncio.to_thread(cache.get, key)
+    if f is None:
+        data = await render()
+        f = await asyncio.to_thread(cache.put, key, data)
+    return PdfDocument(file=f, etag=f'"{key}"')
+
+
+async def _file_chunks(f: BinaryIO) -> AsyncIterator[bytes]:
+    try:
+        while chunk := await asyncio.to_thread(f.read, FILE_CHUNK):
+            yield chunk
+    finally:
+        f.close()
+
+
+def pdf_response(request: Request, doc: PdfDocument, *, filename: str) -> Response:
+    headers = {"Content-Disposition": f'inline; filename="{filename}"'}
+    if doc.etag is None:
+        headers["Cache-Control"] = "no-store"
+        return Response(content=doc.content or b"", media_type="application/pdf", headers=headers)
+
+    headers["ETag"] = doc.etag
+    headers["Cache-Control"] = "private, no-cache"
+    if doc.etag in {t.strip() for t in request.headers.get("if-none-match", "").split(",")}:
+        if doc.file is not None:
+            doc.file.close()
+        return Response(status_code=304, headers={"ETag": doc.etag, "Cache-Control": headers["Cache-Control"]})
+    if doc.file is not None:
+        # Streamed from the already open file, which an eviction in any process cannot take away.
+        headers["Content-Length"] = str(os.fstat(doc.file.fileno()).st_size)
+        return StreamingResponse(_file_chunks(doc.file), media_type="application/pdf", headers=headers)
+    return Response(content=doc.content or b"", media_type="application/pdf", headers=headers)
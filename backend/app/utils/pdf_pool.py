@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+from app.core.errors import AppError
+from app.core.metrics import PDF_RENDER_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Part of the PDF cache key: bump when any report layout in app.utils.pdf changes so cached
+# files are not reused. Kept here so the API process does not import reportlab to build keys.
+PDF_LAYOUT_VERSION = 2
+
+# Handlers gather data and build a render spec: {"kind": ..., **builder kwargs}. The spec is
+# plain dicts/lists/str so it pickles cheaply; reportlab runs only inside the pool workers.
+
+
+def render_pdf(spec: dict[str, Any]) -> bytes:
+    """Render a PDF from a spec. Runs in a pool worker."""
+    from app.utils import pdf
+
+    builders = {
+        "practice_session": pdf.build_practice_session_report_pdf,
+        "practice_session_bundle": pdf.build_practice_session_bundle_pdf,
+        "assignment": pdf.build_assignment_report_pdf,
+        "certificate": pdf.build_certificate_pdf,
+    }
+    kwargs = dict(spec)
+    kind = kwargs.pop("kind")
+    return builders[kind](**kwargs)
+
+
+def _warm_worker() -> None:
+    # Import reportlab and load the stock fonts once per worker instead of on the first job.
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    import app.utils.pdf  # noqa: F401
+
+    getSampleStyleSheet()
+
+
+class PdfRenderPool:
+    """Bounded process pool for PDF rendering.
+
+    At most `max_concurrency` jobs render at once and at most `max_queue` wait for a slot;
+    beyond that callers get 503 immediately instead of piling up. `workers=0` renders in a
+    thread instead (tests, local runs without spare cores).
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int,
+        max_concurrency: int | None = None,
+        max_queue: int = 32,
+        timeout_sec: float = 30.0,
+        max_tasks_per_child: int | None = 200,
+    ) -> None:
+        self._executor: Executor
+        self._workers = workers
+        if workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+                max_tasks_per_child=max_tasks_per_child,
+            )
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf")
+        self._max_concurrency = max_concurrency or max(workers, 1)
+        self._slots = asyncio.Semaphore(self._max_concurrency)
+        self._max_queue = max_queue
+        self._timeout_sec = timeout_sec
+        self._waiting = 0
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._timeouts = 0
+        self._rejected = 0
+        self._render_seconds = 0.0
+
+    async def warm(self) -> None:
+        """Start every worker and load reportlab now instead of on the first download."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _warm_worker) for _ in range(max(self._workers, 1))))
+
+    async def render(self, spec: dict[str, Any], *, timeout_sec: float | None = None) -> bytes:
+        """Render `spec` in the pool. `timeout_sec` overrides the pool default for unusually large jobs."""
+        if self._waiting >= self._max_queue:
+            self._rejected += 1
+            raise AppError(status_code=503, code="pdf_busy", message="PDF renderer is busy, retry shortly")
+
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._in_flight += 1
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self._executor, render_pdf, spec)
+        except BaseException:
+            self._release(started)
+            raise
+        # The slot is held until the worker is actually free, even if the caller gave up,
+        # so a timed-out job still counts against the concurrency cap.
+        kind = str(spec.get("kind"))
+        future.add_done_callback(lambda f: self._on_done(f, started, kind))
+        timeout = timeout_sec or self._timeout_sec
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        except asyncio.TimeoutError as e:
+            self._timeouts += 1
+            logger.warning("PDF render timed out after %.1fs (kind=%s)", timeout, spec.get("kind"))
+            raise AppError(status_code=504, code="pdf_timeout", message="PDF rendering timed out") from e
+
+    def _on_done(self, future: asyncio.Future, started: float, kind: str) -> None:
+        if future.cancelled() or future.exception() is not None:
+            self._failed += 1
+            outcome = "failed"
+            if not future.cancelled():
+                logger.error("PDF render failed", exc_info=future.exception())
+        else:
+            self._completed += 1
+            outcome = "ok"
+        PDF_RENDER_SECONDS.labels(kind, outcome).observe(time.perf_counter() - started)
+        self._release(started)
+
+    def _release(self, started: float) -> None:
+        self._in_flight -= 1
+        self._render_seconds += time.perf_counter() - started
+        self._slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_concurrency": self._max_concurrency,
+            "max_queue": self._max_queue,
+            "queue_depth": self._waiting,
+            "in_flight": self._in_flight,
+            "completed": self._completed,
+            "failed": self._failed,
+            "timeouts": self._timeouts,
+            "rejected": self._rejected,
+            "render_seconds_total": round(self._render_seconds, 3),
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_pool: PdfRenderPool | None = None
+
+
+def init_pdf_pool(*, workers: int, max_concurrency: int | None = None, max_queue: int = 32, timeout_sec: float = 30.0) -> None:
+    global _pool
+    _pool = PdfRenderPool(workers=workers, max_concurrency=max_concurrency, max_queue=max_queue, timeout_sec=timeout_sec)
+
+
+def get_pdf_pool() -> PdfRenderPool:
+    if _pool is None:
+        raise RuntimeError("PDF pool not initialized")
+    return _pool
+
+
+def close_pdf_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+async def render_pdf_async(spec: dict[str, Any], *, timeout_sec: float | None = None) -> bytes:
+    return await get_pdf_pool().render(spec, timeout_sec=timeout_sec)
@@ -1,13 +1,34 @@
 from __future__ import annotations
 
+import time
+from typing import Any
+
 from redis.asyncio import Redis
 
+from app.core.metrics import REDIS_COMMAND_SECONDS
+
 _redis: Redis | None = None
 
 
-async def init_redis(redis_url: str) -> None:
+class InstrumentedRedis(Redis):
+    """Redis client that records per-command latency. Pipelines are timed by their own client."""
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            command = args[0] if args else "?"
+            if isinstance(command, bytes):
+                command = command.decode()
+            REDIS_COMMAND_SECONDS.labels(str(command).upper()).observe(time.perf_counter() - started)
+
+
+async def init_redis(redis_url: str, *, metrics: bool = False) -> None:
+    """`metrics` records per-command latency for `/metrics`; processes that do not serve it leave it off."""
     global _redis
-    _redis = Redis.from_url(redis_url, decode_responses=True)
+    client_class = InstrumentedRedis if metrics else Redis
+    _redis = client_class.from_url(redis_url, decode_responses=True)
     await _redis.ping()
 
 
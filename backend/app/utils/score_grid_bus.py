@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+from collections import defaultdict
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+# Score grid deltas: one compact dict per changed AssignmentStatusRow, keyed by assignment id.
+# Subscribers register before the snapshot query and publishers run after commit, so a
+# subscriber sees every change that is not already in its snapshot.
+
+
+class ScoreGridSubscription:
+    def __init__(self, bus: ScoreGridBus, assignment_id: str, maxsize: int) -> None:
+        self.assignment_id = assignment_id
+        self._bus = bus
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def _offer(self, delta: dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(delta)
+        except asyncio.QueueFull:
+            # A stalled client must not grow memory; it can reconnect for a fresh snapshot.
+            self.dropped += 1
+
+    async def get(self, timeout: float) -> list[dict[str, Any]]:
+        """Wait up to `timeout` seconds and return all pending deltas (possibly none)."""
+        try:
+            first = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return []
+        out = [first]
+        while not self._queue.empty():
+            out.append(self._queue.get_nowait())
+        return out
+
+    async def close(self) -> None:
+        await self._bus._unsubscribe(self)
+
+
+class ScoreGridBus:
+    """In-process fan-out of score grid deltas. Used directly in tests and single-process runs."""
+
+    def __init__(self, *, queue_size: int = 1000) -> None:
+        self._queue_size = queue_size
+        self._subscribers: dict[str, set[ScoreGridSubscription]] = defaultdict(set)
+
+    async def subscribe(self, assignment_id: str) -> ScoreGridSubscription:
+        sub = ScoreGridSubscription(self, assignment_id, self._queue_size)
+        self._subscribers[assignment_id].add(sub)
+        return sub
+
+    async def _unsubscribe(self, sub: ScoreGridSubscription) -> None:
+        subs = self._subscribers.get(sub.assignment_id)
+        if subs is None:
+            return
+        subs.discard(sub)
+        if not subs:
+            del self._subscribers[sub.assignment_id]
+
+    def _dispatch(self, assignment_id: str, delta: dict[str, Any]) -> None:
+        for sub in list(self._subscribers.get(assignment_id, ())):
+            sub._offer(delta)
+
+    async def publish(self, deltas: list[tuple[str, dict[str, Any]]]) -> None:
+        for assignment_id, delta in deltas:
+            self._dispatch(assignment_id, delta)
+
+    def subscriber_count(self, assignment_id: str) -> int:
+        return len(self._subscribers.get(assignment_id, ()))
+
+    async def close(self) -> None:
+        self._subscribers.clear()
+
+
+class RedisStreamScoreGridBus(ScoreGridBus):
+    """Deltas go through one Redis stream per assignment so every API process sees them.
+
+    Each process runs a single XREAD loop per watched assignment and fans entries out to
+    its local subscribers, so N teachers on one grid cost one blocked Redis read.
+    """
+
+    def __init__(self, redis: Redis, *, maxlen: int = 1000, ttl_sec: int = 86400, block_ms: int = 5000, queue_size: int = 1000) -> None:
+        super().__init__(queue_size=queue_size)
+        self._redis = redis
+        self._maxlen = maxlen
+        self._ttl_sec = ttl_sec
+        self._block_ms = block_ms
+        self._readers: dict[str, asyncio.Task[None]] = {}
+
+    @staticmethod
+    def _key(assignment_id: str) -> str:
+        return f"grid:{assignment_id}"
+
+    async def publish(self, deltas: list[tuple[str, dict[str, Any]]]) -> None:
+        if not deltas:
+            return
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for assignment_id, delta in deltas:
+                    key = self._key(assignment_id)
+                    pipe.xadd(key, {"d": json.dumps(delta, default=str)}, maxlen=self._maxlen, approximate=True)
+                    pipe.expire(key, self._ttl_sec)
+                await pipe.execute()
+        except RedisError as exc:
+            logger.warning("Score grid publish failed: %s", exc)
+
+    async def subscribe(self, assignment_id: str) -> ScoreGridSubscription:
+        sub = await super().subscribe(assignment_id)
+        if assignment_id not in self._readers:
+            start_id = await self._last_id(assignment_id)
+            # Another subscriber may have started the reader while we were awaiting Redis.
+            if assignment_id not in self._readers:
+                self._readers[assignment_id] = asyncio.create_task(self._read_loop(assignment_id, start_id))
+        return sub
+
+    async def _unsubscribe(self, sub: ScoreGridSubscription) -> None:
+        await super()._unsubscribe(sub)
+        if self.subscriber_count(sub.assignment_id) == 0:
+            task = self._readers.pop(sub.assignment_id, None)
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+
+    async def _last_id(self, assignment_id: str) -> str:
+        try:
+            last = await self._redis.xrevrange(self._key(assignment_id), count=1)
+        except RedisError as exc:
+            logger.warning("Score grid stream position lookup failed: %s", exc)
+            return "$"
+        return last[0][0] if last else "0-0"
+
+    async def _read_loop(self, assignment_id: str, last_id: str) -> None:
+        key = self._key(assignment_id)
+        while True:
+            try:
+                resp = await self._redis.xread({key: last_id}, count=500, block=self._block_ms)
+            except asyncio.CancelledError:
+                raise
+            except RedisError as exc:
+                logger.warning("Score grid stream read failed for %s: %s", assignment_id, exc)
+                await asyncio.sleep(1)
+                continue
+            for _stream, entries in resp or []:
+                for entry_id, fields in entries:
+                    last_id = entry_id
+                    try:
+                        self._dispatch(assignment_id, json.loads(fields["d"]))
+                    except (KeyError, ValueError):
+                        logger.warning("Malformed score grid entry %s on %s", entry_id, key)
+
+    async def close(self) -> None:
+        tasks = list(self._readers.values())
+        self._readers.clear()
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await super().close()
+
+
+_bus: ScoreGridBus | None = None
+
+
+def init_score_grid_bus(backend: str, redis: Redis | None = None, *, maxlen: int = 1000) -> None:
+    global _bus
+    if backend == "redis":
+        if redis is None:
+            raise RuntimeError("Redis score grid bus requires a Redis client")
+        _bus = RedisStreamScoreGridBus(redis, maxlen=maxlen)
+    elif backend == "memory":
+        _bus = ScoreGridBus()
+    else:
+        raise RuntimeError(f"Unknown score grid bus backend: {backend}")
+
+
+def get_score_grid_bus() -> ScoreGridBus:
+    if _bus is None:
+        raise RuntimeError("Score grid bus not initialized")
+    return _bus
+
+
+async def close_score_grid_bus() -> None:
+    global _bus
+    if _bus is not None:
+        await _bus.close()
+        _bus = None
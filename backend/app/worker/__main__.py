@@ -0,0 +1,113 @@
+"""Run background job consumers.
+
+    python -m app.worker                          # one process per CPU, queues from settings
+    python -m app.worker --processes 2 --queues default=4,reports=1
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+
+from app.core.config import settings
+from app.utils.cpus import usable_cpu_count
+from app.worker.worker import parse_queues
+
+logger = logging.getLogger(__name__)
+
+
+async def serve(queues: dict[str, int]) -> None:
+    from app.core.logging import close_logging, configure_logging
+    from app.db.session import close_engine, init_engine, init_read_engine
+    from app.utils.pdf_cache import close_pdf_cache, init_pdf_cache
+    from app.utils.pdf_pool import close_pdf_pool, init_pdf_pool
+    from app.utils.redis import close_redis, get_redis, init_redis
+    from app.worker import tasks  # noqa: F401  (registers tasks)
+    from app.worker.queue import close_job_queue, get_job_queue, init_job_queue
+    from app.worker.worker import Worker
+
+    configure_logging(
+        environment=settings.environment,
+        level=settings.log_level,
+        sample_rates=settings.log_sample_rates,
+        queue_size=settings.log_queue_size,
+    )
+    db_options = dict(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle_sec=settings.db_pool_recycle_sec,
+        pool_timeout_sec=settings.db_pool_timeout_sec,
+        statement_timeout_ms=settings.db_statement_timeout_ms,
+        idle_in_transaction_timeout_ms=settings.db_idle_in_transaction_timeout_ms,
+        prepared_statement_cache_size=settings.db_prepared_statement_cache_size,
+        health_check_interval_sec=settings.db_health_check_interval_sec,
+    )
+    init_engine(settings.database_url, **db_options)
+    init_read_engine(
+        settings.database_replica_url or None,
+        max_lag_sec=settings.db_replica_max_lag_sec,
+        lag_check_interval_sec=settings.db_replica_lag_check_sec,
+        read_your_writes_sec=settings.db_read_your_writes_sec,
+        **db_options,
+    )
+    await init_redis(settings.redis_url)
+    # Each worker process already owns a core, so PDFs render in-process rather than in a nested pool.
+    init_pdf_pool(workers=0, timeout_sec=settings.pdf_render_timeout_sec)
+    init_pdf_cache(settings.pdf_cache_dir, max_mb=settings.pdf_cache_max_mb)
+    init_job_queue("redis", get_redis())
+
+    worker = Worker(get_job_queue(), queues)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.request_stop)
+    logger.info("Worker %d consuming %s", os.getpid(), queues)
+    try:
+        await worker.run_forever()
+    finally:
+        await close_job_queue()
+        close_pdf_cache()
+        close_pdf_pool()
+        await close_redis()
+        await close_engine()
+        close_logging()
+
+
+def _run_process(queues: dict[str, int]) -> None:
+    asyncio.run(serve(queues))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run background job workers.")
+    parser.add_argument("--processes", type=int, default=settings.worker_processes or usable_cpu_count())
+    parser.add_argument("--queues", default=settings.worker_queues, help='e.g. "default=4,reports=2" (concurrency per process)')
+    args = parser.parse_args()
+    queues = parse_queues(args.queues)
+
+    if settings.job_queue_backend != "redis":
+        parser.error("python -m app.worker needs JOB_QUEUE_BACKEND=redis; the memory backend runs inside the API process")
+
+    if args.processes <= 1:
+        _run_process(queues)
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_run_process, args=(queues,), name=f"worker-{i}") for i in range(args.processes)]
+    for p in procs:
+        p.start()
+
+    def _forward(signum, _frame) -> None:
+        for p in procs:
+            if p.is_alive():
+                os.kill(p.pid, signum)
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, _forward)
+    for p in procs:
+        p.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import uuid
+from collections import defaultdict, deque
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from typing import Any, Generic, Protocol, TypeVar
+
+from pydantic import BaseModel
+from redis.asyncio import Redis
+
+# Job lifecycle: queued -> running -> succeeded | retrying (-> queued) | dead.
+# The queue backend only moves job ids around; the job record carries payload, attempts and result.
+
+P = TypeVar("P", bound=BaseModel)
+
+
+@dataclass
+class Job:
+    id: str
+    task: str
+    queue: str
+    payload: dict[str, Any]
+    max_retries: int
+    status: str = "queued"
+    attempts: int = 0
+    result: Any = None
+    error: str | None = None
+    enqueued_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    lease_until: float | None = None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), default=str)
+
+    @classmethod
+    def from_json(cls, raw: str) -> Job:
+        return cls(**json.loads(raw))
+
+    def public(self) -> dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if k not in {"payload", "lease_until"}}
+
+
+@dataclass(frozen=True)
+class TaskSpec(Generic[P]):
+    name: str
+    handler: Callable[[P], Awaitable[Any]]
+    payload_model: type[P]
+    queue: str
+    max_retries: int
+    backoff_sec: float
+    timeout_sec: float
+
+
+_registry: dict[str, TaskSpec[Any]] = {}
+
+
+def task(
+    name: str,
+    *,
+    payload: type[P],
+    queue: str = "default",
+    max_retries: int = 3,
+    backoff_sec: float = 5.0,
+    timeout_sec: float = 600.0,
+) -> Callable[[Callable[[P], Awaitable[Any]]], TaskSpec[P]]:
+    """Register an async handler taking a validated `payload` model. The result must be JSON-serializable."""
+
+    def _decorator(fn: Callable[[P], Awaitable[Any]]) -> TaskSpec[P]:
+        if name in _registry:
+            raise RuntimeError(f"Task {name!r} is already registered")
+        spec = TaskSpec(name, fn, payload, queue, max_retries, backoff_sec, timeout_sec)
+        _registry[name] = spec
+        return spec
+
+    return _decorator
+
+
+def get_task(name: str) -> TaskSpec[Any]:
+    try:
+        return _registry[name]
+    except KeyError:
+        raise RuntimeError(f"Unknown task {name!r}") from None
+
+
+class QueueBackend(Protocol):
+    async def save(self, job: Job, *, ttl_sec: int | None = None) -> None: ...
+    async def load(self, job_id: str) -> Job | None: ...
+    async def push(self, queue: str, job_id: str) -> None: ...
+    async def push_delayed(self, queue: str, job_id: str, run_at: float) -> None: ...
+    async def pop(self, queue: str, timeout: float) -> str | None: ...
+    async def ack(self, queue: str, job_id: str) -> None: ...
+    async def dead(self, queue: str, job_id: str) -> None: ...
+    async def promote_due(self, queue: str, now: float) -> int: ...
+    async def requeue_expired(self, queue: str, now: float) -> int: ...
+    async def depth(self, queue: str) -> dict[str, int]: ...
+    async def close(self) -> None: ...
+
+
+class RedisQueueBackend:
+    """Ready jobs in a list, retries in a sorted set by due time, in-flight ids in a processing list.
+
+    A consumer that dies mid-job leaves its id in the processing list; once the job's lease
+    (task timeout plus a margin) runs out, any worker's reaper puts it back on the queue.
+    A consumer that dies between the pop and saving the lease leaves an entry without one:
+    the reaper notes when it first saw such an entry and requeues it after `claim_timeout_sec`.
+    """
+
+    def __init__(self, redis: Redis, *, prefix: str = "jobs", claim_timeout_sec: float = 60.0) -> None:
+        self._redis = redis
+        self._prefix = prefix
+        self._claim_timeout_sec = claim_timeout_sec
+
+    def _k(self, kind: str, name: str) -> str:
+        return f"{self._prefix}:{kind}:{name}"
+
+    async def save(self, job: Job, *, ttl_sec: int | None = None) -> None:
+        key = self._k("job", job.id)
+        if ttl_sec:
+            await self._redis.set(key, job.to_json(), ex=ttl_sec)
+        else:
+            await self._redis.set(key, job.to_json())
+
+    async def load(self, job_id: str) -> Job | None:
+        raw = await self._redis.get(self._k("job", job_id))
+        return Job.from_json(raw) if raw else None
+
+    async def push(self, queue: str, job_id: str) -> None:
+        await self._redis.lpush(self._k("queue", queue), job_id)
+
+    async def push_delayed(self, queue: str, job_id: str, run_at: float) -> None:
+        await self._redis.zadd(self._k("delayed", queue), {job_id: run_at})
+
+    async def pop(self, queue: str, timeout: float) -> str | None:
+        return await self._redis.blmove(self._k("queue", queue), self._k("processing", queue), timeout, "RIGHT", "LEFT")
+
+    async def ack(self, queue: str, job_id: str) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self._k("processing", queue), 1, job_id)
+            pipe.hdel(self._k("unleased", queue), job_id)
+            await pipe.execute()
+
+    async def dead(self, queue: str, job_id: str) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self._k("processing", queue), 1, job_id)
+            pipe.hdel(self._k("unleased", queue), job_id)
+            pipe.lpush(self._k("dead", queue), job_id)
+            await pipe.execute()
+
+    async def promote_due(self, queue: str, now: float) -> int:
+        delayed = self._k("delayed", queue)
+        moved = 0
+        for job_id in await self._redis.zrangebyscore(delayed, "-inf", now, start=0, num=100):
+            # Only the worker that wins the ZREM pushes the job, so it is queued once.
+            if await self._redis.zrem(delayed, job_id):
+                await self.push(queue, job_id)
+                moved += 1
+        return moved
+
+    async def requeue_expired(self, queue: str, now: float) -> int:
+        processing = self._k("processing", queue)
+        unleased = self._k("unleased", queue)
+        moved = 0
+        for job_id in await self._redis.lrange(processing, 0, -1):
+            job = await self.load(job_id)
+            if job is not None and job.lease_until is None:
+                # Normally a consumer has just claimed it and is about to set the lease.
+                await self._redis.hsetnx(unleased, job_id, now)
+                first_seen = float(await self._redis.hget(unleased, job_id) or now)
+                if now - first_seen < self._claim_timeout_sec:
+                    continue
+            elif job is not None and job.lease_until > now:
+                continue
+            if await self._redis.lrem(processing, 1, job_id):
+                await self._redis.hdel(unleased, job_id)
+                if job is not None:
+                    # An expired lease left on the record would get the next claim reaped at once.
+                    job.status = "queued"
+                    job.lease_until = None
+                    await self.save(job)
+                    await self.push(queue, job_id)
+                    moved += 1
+        return moved
+
+    async def depth(self, queue: str) -> dict[str, int]:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.llen(self._k("queue", queue))
+            pipe.zcard(self._k("delayed", queue))
+            pipe.llen(self._k("processing", queue))
+            pipe.llen(self._k("dead", queue))
+            ready, delayed, processing, dead = await pipe.execute()
+        return {"ready": ready, "delayed": delayed, "processing": processing, "dead": dead}
+
+    async def close(self) -> None:
+        return None
+
+
+class InMemoryQueueBackend:
+    """Same semantics as the Redis backend inside one event loop. Used by tests and single-process runs."""
+
+    def __init__(self) -> None:
+        self._jobs: dict[str, str] = {}
+        self._ready: dict[str, deque[str]] = defaultdict(deque)
+        self._delayed: dict[str, dict[str, float]] = defaultdict(dict)
+        self._processing: dict[str, list[str]] = defaultdict(list)
+        self._dead: dict[str, list[str]] = defaultdict(list)
+        self._cond = asyncio.Condition()
+
+    async def save(self, job: Job, *, ttl_sec: int | None = None) -> None:
+        self._jobs[job.id] = job.to_json()
+
+    async def load(self, job_id: str) -> Job | None:
+        raw = self._jobs.get(job_id)
+        return Job.from_json(raw) if raw else None
+
+    async def push(self, queue: str, job_id: str) -> None:
+        async with self._cond:
+            self._ready[queue].appendleft(job_id)
+            self._cond.notify_all()
+
+    async def push_delayed(self, queue: str, job_id: str, run_at: float) -> None:
+        self._delayed[queue][job_id] = run_at
+
+    async def pop(self, queue: str, timeout: float) -> str | None:
+        async with self._cond:
+            try:
+                await asyncio.wait_for(self._cond.wait_for(lambda: bool(self._ready[queue])), timeout)
+            except asyncio.TimeoutError:
+                return None
+            job_id = self._ready[queue].pop()
+            self._processing[queue].append(job_id)
+            return job_id
+
+    async def ack(self, queue: str, job_id: str) -> None:
+        if job_id in self._processing[queue]:
+            self._processing[queue].remove(job_id)
+
+    async def dead(self, queue: str, job_id: str) -> None:
+        await self.ack(queue, job_id)
+        self._dead[queue].insert(0, job_id)
+
+    async def promote_due(self, queue: str, now: float) -> int:
+        due = [job_id for job_id, run_at in self._delayed[queue].items() if run_at <= now]
+        for job_id in due:
+            del self._delayed[queue][job_id]
+            await self.push(queue, job_id)
+        return len(due)
+
+    async def requeue_expired(self, queue: str, now: float) -> int:
+        return 0
+
+    async def depth(self, queue: str) -> dict[str, int]:
+        return {
+            "ready": len(self._ready[queue]),
+            "delayed": len(self._delayed[queue]),
+            "processing": len(self._processing[queue]),
+            "dead": len(self._dead[queue]),
+        }
+
+    async def close(self) -> None:
+        return None
+
+
+_backend: QueueBackend | None = None
+
+
+def init_job_queue(backend: str, redis: Redis | None = None) -> None:
+    global _backend
+    if backend == "redis":
+        if redis is None:
+            raise RuntimeError("Redis job queue requires a Redis client")
+        _backend = RedisQueueBackend(redis)
+    elif backend == "memory":
+        _backend = InMemoryQueueBackend()
+    else:
+        raise RuntimeError(f"Unknown job queue backend: {backend}")
+
+
+def get_job_queue() -> QueueBackend:
+    if _backend is None:
+        raise RuntimeError("Job queue not initialized")
+    return _backend
+
+
+async def close_job_queue() -> None:
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
+
+
+async def enqueue(name: str, payload: BaseModel | dict[str, Any], *, queue: str | None = None) -> Job:
+    """Validate `payload` against the task's model and queue it with the task's queue and retry policy."""
+    spec = _registry.get(name)
+    if spec is None:
+        # Queued with made-up defaults it would skip its queue's concurrency cap and retry policy.
+        raise RuntimeError(f"Task {name!r} is not registered; import app.worker.tasks")
+    data = payload.model_dump(mode="json") if isinstance(payload, BaseModel) else dict(payload)
+    data = spec.payload_model.model_validate(data).model_dump(mode="json")
+    job = Job(
+        id=uuid.uuid4().hex,
+        task=name,
+        queue=queue or spec.queue,
+        payload=data,
+        max_retries=spec.max_retries,
+    )
+    backend = get_job_queue()
+    await backend.save(job)
+    await backend.push(job.queue, job.id)
+    return job
+
+
+async def get_job(job_id: str) -> Job | None:
+    return await get_job_queue().load(job_id)
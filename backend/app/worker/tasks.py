@@ -1,4 +1,19 @@
 from __future__ import annotations
 
-# Placeholder for future background jobs (e.g. nightly rollups, exports).
+from pydantic import BaseModel
 
+from app.services.report_export_service import run_report_export
+from app.worker.queue import task
+
+# Importing this module registers every task; the worker and the API (which enqueues) both do so.
+
+
+class ReportExportJob(BaseModel):
+    job_id: str
+
+
+@task("reports.export", payload=ReportExportJob, queue="reports", max_retries=0, timeout_sec=60 * 60)
+async def export_reports(payload: ReportExportJob) -> dict:
+    # Failures are recorded on the export itself, which is what the teacher polls.
+    await run_report_export(payload.job_id)
+    return {"export_id": payload.job_id}
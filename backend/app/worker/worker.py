@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import random
+import time
+
+from pydantic import ValidationError
+
+from app.worker.queue import Job, QueueBackend, get_task
+
+logger = logging.getLogger(__name__)
+
+# How long a finished job record (status + result) is kept.
+RESULT_TTL_SEC = 60 * 60 * 24
+# Extra lease on top of the task timeout before a job counts as abandoned.
+LEASE_MARGIN_SEC = 30.0
+
+
+class Worker:
+    """Consumes jobs from the given queues with a fixed number of concurrent slots per queue."""
+
+    def __init__(self, backend: QueueBackend, queues: dict[str, int], *, poll_timeout: float = 1.0) -> None:
+        self._backend = backend
+        self._queues = queues
+        self._poll_timeout = poll_timeout
+        self._stopping = asyncio.Event()
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def start(self) -> None:
+        for queue, concurrency in self._queues.items():
+            for _ in range(max(1, concurrency)):
+                self._tasks.append(asyncio.create_task(self._consume(queue)))
+            self._tasks.append(asyncio.create_task(self._maintain(queue)))
+
+    def request_stop(self) -> None:
+        self._stopping.set()
+
+    async def stop(self, *, grace_sec: float = 10.0) -> None:
+        """Stop taking new jobs, give running ones `grace_sec` to finish, then cancel them."""
+        self._stopping.set()
+        if not self._tasks:
+            return
+        _done, pending = await asyncio.wait(self._tasks, timeout=grace_sec)
+        for t in pending:
+            t.cancel()
+        for t in pending:
+            with contextlib.suppress(asyncio.CancelledError):
+                await t
+        self._tasks.clear()
+
+    async def run_forever(self) -> None:
+        self.start()
+        await self._stopping.wait()
+        await self.stop()
+
+    async def _consume(self, queue: str) -> None:
+        while not self._stopping.is_set():
+            try:
+                job_id = await self._backend.pop(queue, self._poll_timeout)
+            except Exception:
+                logger.exception("Job queue %s: pop failed", queue)
+                await asyncio.sleep(1)
+                continue
+            if job_id is None:
+                continue
+            await self.run_job(queue, job_id)
+
+    async def _maintain(self, queue: str) -> None:
+        while not self._stopping.is_set():
+            try:
+                now = time.time()
+                await self._backend.promote_due(queue, now)
+                await self._backend.requeue_expired(queue, now)
+            except Exception:
+                logger.exception("Job queue %s: maintenance failed", queue)
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._stopping.wait(), timeout=1.0)
+
+    async def run_job(self, queue: str, job_id: str) -> None:
+        job = await self._backend.load(job_id)
+        if job is None:
+            await self._backend.ack(queue, job_id)
+            return
+        try:
+            spec = get_task(job.task)
+            payload = spec.payload_model.model_validate(job.payload)
+        except (RuntimeError, ValidationError) as e:
+            # Retrying cannot fix an unknown task or a bad payload.
+            await self._bury(queue, job, f"{type(e).__name__}: {e}")
+            return
+
+        job.status = "running"
+        job.attempts += 1
+        job.started_at = time.time()
+        job.lease_until = job.started_at + spec.timeout_sec + LEASE_MARGIN_SEC
+        await self._backend.save(job)
+
+        try:
+            result = await asyncio.wait_for(spec.handler(payload), timeout=spec.timeout_sec)
+        except asyncio.CancelledError:
+            # Shutdown: put it back so another worker picks it up; this attempt does not count.
+            job.status = "queued"
+            job.attempts -= 1
+            job.lease_until = None
+            await self._backend.save(job)
+            await self._backend.ack(queue, job.id)
+            await self._backend.push(queue, job.id)
+            raise
+        except Exception as e:
+            error = "Timed out" if isinstance(e, asyncio.TimeoutError) else f"{type(e).__name__}: {e}"
+            if job.attempts <= job.max_retries:
+                delay = spec.backoff_sec * (2 ** (job.attempts - 1)) * random.uniform(0.8, 1.2)
+                logger.warning("Job %s (%s) failed on attempt %d, retrying in %.1fs: %s", job.id, job.task, job.attempts, delay, error)
+                job.status = "retrying"
+                job.error = error
+                job.lease_until = None
+                await self._backend.save(job)
+                await self._backend.ack(queue, job.id)
+                await self._backend.push_delayed(queue, job.id, time.time() + delay)
+            else:
+                logger.error("Job %s (%s) failed after %d attempts: %s", job.id, job.task, job.attempts, error)
+                await self._bury(queue, job, error)
+            return
+
+        job.status = "succeeded"
+        job.result = result
+        job.error = None
+        job.finished_at = time.time()
+        job.lease_until = None
+        await self._backend.save(job, ttl_sec=RESULT_TTL_SEC)
+        await self._backend.ack(queue, job.id)
+
+    async def _bury(self, queue: str, job: Job, error: str) -> None:
+        job.status = "dead"
+        job.error = error
+        job.finished_at = time.time()
+        job.lease_until = None
+        await self._backend.save(job)
+        await self._backend.dead(queue, job.id)
+
+
+def parse_queues(spec: str) -> dict[str, int]:
+    """Parse "default=4,reports=2" into {"default": 4, "reports": 2}; a bare name gets one slot."""
+    queues: dict[str, int] = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, concurrency = part.partition("=")
+        queues[name.strip()] = int(concurrency) if concurrency else 1
+    if not queues:
+        raise ValueError("At least one queue is required")
+    return queues
@@ -0,0 +1,61 @@
+"""Run the microbenchmarks: `python -m benchmarks [-k pdf] [--save]`.
+
+Without `--save` the run is compared with the committed `benchmarks/baseline.json` and the
+exit status is 1 if anything got slower than `--threshold` percent. `--save` rewrites the
+baseline (commit it together with the change that moved the numbers).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import benchmarks.cases  # noqa: F401  registers the benchmarks
+from benchmarks.compare import report
+from benchmarks.runner import run, select
+
+BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time CPU-bound hot-path functions against a stored baseline.")
+    parser.add_argument("-k", "--filter", action="append", help="run benchmarks whose name contains or glob-matches this (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="timing rounds per benchmark; the fastest counts")
+    parser.add_argument("--min-time", type=float, default=0.1, help="seconds per round")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=25.0, help="allowed slowdown in percent")
+    parser.add_argument("--save", action="store_true", help="write the results to --baseline instead of comparing")
+    parser.add_argument("--out", type=Path, default=None, help="also write the results to this file")
+    args = parser.parse_args()
+
+    selected = select(args.filter)
+    if not selected:
+        sys.exit("no benchmark matches the filter")
+    result = run(selected, repeat=args.repeat, min_time=args.min_time)
+    if args.out:
+        args.out.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+
+    if args.save:
+        if args.filter and args.baseline.exists():
+            # A filtered run only refreshes its own entries.
+            saved = json.loads(args.baseline.read_text(encoding="utf-8"))
+            for name, entry in saved["benchmarks"].items():
+                result["benchmarks"].setdefault(name, entry)
+            result["benchmarks"] = dict(sorted(result["benchmarks"].items()))
+        args.baseline.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+        print(f"\nbaseline: {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        sys.exit(f"\n{args.baseline} does not exist; record one with --save")
+    print()
+    base = json.loads(args.baseline.read_text(encoding="utf-8"))
+    base["benchmarks"] = {name: entry for name, entry in base["benchmarks"].items() if name in result["benchmarks"]}
+    if not report(base, result, threshold=args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
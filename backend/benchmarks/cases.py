@@ -0,0 +1,248 @@
+"""The benchmarks. Names are `<module>.<function>[<input>]` and are the keys in `baseline.json`."""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import structlog
+from fastapi import FastAPI
+from fastapi.routing import serialize_response
+
+from app.core.logging import close_logging, configure_logging
+from app.core.responses import api_response
+from app.models.enums import PracticeZone, QuestionType
+from app.plugins.security import scan_zip_contents
+from app.plugins.tsx_transformer import fix_invalid_function_syntax, prepare_tsx, resolve_esbuild_path, transform_tsx_to_html
+from app.schemas.base import ApiResponse
+from app.schemas.catalog import SkillListItem
+from app.schemas.practice import PracticeSessionResponse, PracticeSubmitResponse, QuestionPublic
+from app.services.generator_service import GeneratorService
+from app.services.practice_service import _is_correct, _public_state, _validate_submitted_answer
+from app.services.scoring import WindowStats, compute_next_smartscore
+from app.utils.pdf import build_assignment_report_pdf, build_certificate_pdf, build_practice_session_bundle_pdf, build_practice_session_report_pdf
+from benchmarks import fixtures
+from benchmarks.runner import Skip, benchmark
+
+
+def _run_sync(coro: Any) -> Any:
+    """Drive a coroutine that never suspends without paying for an event loop per call."""
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return done.value
+    coro.close()
+    raise RuntimeError("coroutine suspended")
+
+
+def _tsx(name: str) -> str:
+    sources = fixtures.tsx_sources()
+    if name not in sources:
+        raise Skip(f"{fixtures.TSX_DIR / name}.tsx not found")
+    return sources[name]
+
+
+@benchmark("scoring.compute_next_smartscore[correct]")
+def _(stack: contextlib.ExitStack):
+    window = WindowStats(correct=8, total=10)
+    return lambda: compute_next_smartscore(
+        current_smartscore=72, zone=PracticeZone.REFINING, question_level=3, is_correct=True, current_streak=4, recent_window_stats=window
+    )
+
+
+@benchmark("scoring.compute_next_smartscore[wrong]")
+def _(stack: contextlib.ExitStack):
+    return lambda: compute_next_smartscore(current_smartscore=91, zone=None, question_level=5, is_correct=False, current_streak=0, wrong_streak=2)
+
+
+@benchmark("practice._validate_submitted_answer[mcq]")
+def _(stack: contextlib.ExitStack):
+    return lambda: _validate_submitted_answer(QuestionType.MCQ, fixtures.MCQ_DATA, {"choice": "5/8"})
+
+
+@benchmark("practice._is_correct[mcq-direct]")
+def _(stack: contextlib.ExitStack):
+    return lambda: _is_correct(QuestionType.MCQ, fixtures.MCQ_DATA, {"choice": "2/3"}, {"choice": "2/3"})
+
+
+@benchmark("practice._is_correct[mcq-index-miss]")
+def _(stack: contextlib.ExitStack):
+    # A wrong answer against an index key walks every fallback, the slowest MCQ path.
+    return lambda: _is_correct(QuestionType.MCQ, fixtures.MCQ_DATA, {"choice": "1"}, {"choice": "1/2"})
+
+
+@benchmark("practice._is_correct[numeric]")
+def _(stack: contextlib.ExitStack):
+    return lambda: _is_correct(QuestionType.NUMERIC, {"tolerance": 0.01}, {"value": 12.5}, {"value": 12.499})
+
+
+@benchmark("practice._is_correct[multi-select]")
+def _(stack: contextlib.ExitStack):
+    return lambda: _is_correct(QuestionType.MULTI_SELECT, {}, {"choices": ["a", "c", "d"]}, {"choices": ["d", "c", "a"]})
+
+
+@benchmark("generator.execute_generator[addition]")
+def _(stack: contextlib.ExitStack):
+    return lambda: GeneratorService.execute_generator(fixtures.ADDITION_GENERATOR)
+
+
+@benchmark("generator.execute_generator[fractions]")
+def _(stack: contextlib.ExitStack):
+    return lambda: GeneratorService.execute_generator(fixtures.FRACTION_GENERATOR, {"level": 3})
+
+
+@benchmark("generator.validate_answer[mcq]")
+def _(stack: contextlib.ExitStack):
+    question = GeneratorService.execute_generator(fixtures.ADDITION_GENERATOR)
+    return lambda: _run_sync(GeneratorService.validate_answer(fixtures.ADDITION_GENERATOR, question, {"choice": "A"}))
+
+
+@benchmark("generator.validate_answer[numeric]")
+def _(stack: contextlib.ExitStack):
+    question = {"type": "NUMERIC", "correct_answer": {"answer": 3.75}, "explanation": "15/4"}
+    return lambda: _run_sync(GeneratorService.validate_answer("", question, {"answer": "3.75"}))
+
+
+for _name in ("fraction_comparison_app", "kazakh_rectangle_area_app"):
+
+    @benchmark(f"tsx.fix_invalid_function_syntax[{_name}]")
+    def _(stack: contextlib.ExitStack, name: str = _name):
+        source = fixtures.malformed_tsx(_tsx(name))
+        return lambda: fix_invalid_function_syntax(source)
+
+    @benchmark(f"tsx.prepare_tsx[{_name}]")
+    def _(stack: contextlib.ExitStack, name: str = _name):
+        source = _tsx(name)
+        return lambda: prepare_tsx(source)
+
+    @benchmark(f"tsx.transform_tsx_to_html[{_name}]")
+    def _(stack: contextlib.ExitStack, name: str = _name):
+        if resolve_esbuild_path() is None:
+            raise Skip("esbuild not installed")
+        source = _tsx(name)
+        return lambda: transform_tsx_to_html(source, name)
+
+
+@benchmark("security.scan_zip_contents[plugin]")
+def _(stack: contextlib.ExitStack):
+    tmp = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+    path = fixtures.build_plugin_zip(tmp / "plugin.zip", fixtures.tsx_sources())
+    return lambda: scan_zip_contents(path)
+
+
+@benchmark("pdf.build_practice_session_report_pdf[30-rows]")
+def _(stack: contextlib.ExitStack):
+    report = fixtures.practice_report(30)
+    return lambda: build_practice_session_report_pdf(paper="A4", header=report["header"], rows=report["rows"])
+
+
+@benchmark("pdf.build_practice_session_report_pdf[500-rows]")
+def _(stack: contextlib.ExitStack):
+    report = fixtures.practice_report(500)
+    return lambda: build_practice_session_report_pdf(paper="A4", header=report["header"], rows=report["rows"])
+
+
+@benchmark("pdf.build_practice_session_bundle_pdf[10x30-rows]")
+def _(stack: contextlib.ExitStack):
+    reports = [fixtures.practice_report(30) for _ in range(10)]
+    return lambda: build_practice_session_bundle_pdf(paper="A4", reports=reports)
+
+
+@benchmark("pdf.build_assignment_report_pdf[35-students]")
+def _(stack: contextlib.ExitStack):
+    report = fixtures.assignment_report(35)
+    return lambda: build_assignment_report_pdf(paper="A4", header=report["header"], rows=report["rows"])
+
+
+@benchmark("pdf.build_certificate_pdf")
+def _(stack: contextlib.ExitStack):
+    return lambda: build_certificate_pdf(
+        paper="LETTER", title="Certificate of Mastery", student_name="Айгерим Нурланова", skill_name="Сравнение дробей", date_str="2025-03-01", awarded_by="Ms. Teacher"
+    )
+
+
+def _logger(stack: contextlib.ExitStack, **options: Any) -> Any:
+    configure_logging("prod", stream=stack.enter_context(open(os.devnull, "w")), **options)
+    stack.callback(close_logging)
+    return structlog.get_logger("benchmarks")
+
+
+@benchmark("logging.info[practice.submit]")
+def _(stack: contextlib.ExitStack):
+    log = _logger(stack)
+
+    def emit() -> None:
+        with structlog.contextvars.bound_contextvars(request_id="0" * 32):
+            log.info("practice.submit", session_id="s", skill_id=1, question_type="MCQ", is_correct=True, smartscore=72, finished=False)
+
+    return emit
+
+
+@benchmark("logging.debug[below-level]")
+def _(stack: contextlib.ExitStack):
+    log = _logger(stack)
+    return lambda: log.debug("practice.submit.plugin_checked", plugin_id="p", is_correct=True)
+
+
+@benchmark("logging.debug[sampled-out]")
+def _(stack: contextlib.ExitStack):
+    log = _logger(stack, level="DEBUG", sample_rates="practice.submit.*=0")
+    return lambda: log.debug("practice.submit.plugin_checked", plugin_id="p", is_correct=True)
+
+
+def _submit_response(state: dict[str, Any], answered: int) -> PracticeSubmitResponse:
+    at = datetime(2025, 3, 1, 9, 30, tzinfo=timezone.utc)
+    session = PracticeSessionResponse(
+        id="3f0a6f4e-6c2b-4b0e-9a51-1f3e8d2c7b90", skill_id=1, started_at=at, finished_at=None, questions_answered=answered,
+        correct_count=answered - 4, wrong_count=4, smartscore=72, time_elapsed_sec=600, state=state, current_smartscore=72,
+        best_smartscore=75, total_questions_answered=answered, total_correct=answered - 4, total_incorrect=4,
+        current_streak_correct=3, max_streak_correct=6, current_zone="REFINING", last_question_id=None, last_activity_at=at,
+        active_time_seconds=600, inactivity_threshold_seconds=120,
+    )
+    question = QuestionPublic(id=1, skill_id=0, type=QuestionType.MCQ, prompt="Сколько будет 7 + 8?", data={"choices": ["14", "15", "16", "17"]}, level=2)
+    return PracticeSubmitResponse(is_correct=True, explanation=None, session=session, next_question=question, finished=False)
+
+
+def _fastapi_serializer(response_model: Any) -> Any:
+    """What FastAPI does with a returned `ApiResponse` when the route declares `response_model`."""
+    app = FastAPI()
+    app.post("/", response_model=response_model)(lambda: None)
+    field = app.router.routes[-1].response_field
+    return lambda content: _run_sync(serialize_response(field=field, response_content=content, dump_json=True))
+
+
+@benchmark("response.fastapi[submit-30-answered]")
+def _(stack: contextlib.ExitStack):
+    serialize = _fastapi_serializer(ApiResponse[PracticeSubmitResponse])
+    submit = _submit_response(fixtures.practice_session_state(30), 30)
+    return lambda: serialize(ApiResponse(data=submit))
+
+
+@benchmark("response.api_response[submit-30-answered]")
+def _(stack: contextlib.ExitStack):
+    submit = _submit_response(_public_state(fixtures.practice_session_state(30)), 30)
+    return lambda: api_response(submit)
+
+
+def _skills(n: int) -> list[SkillListItem]:
+    return [
+        SkillListItem(id=i, subject_id=1, grade_id=1 + i % 11, topic_id=i % 9, topic_title=f"Тема {i % 9}", code=f"A.{i}", title=f"Навык {i}", difficulty=1 + i % 5, tags=["дроби", "сравнение"])
+        for i in range(n)
+    ]
+
+
+@benchmark("response.fastapi[skills-100]")
+def _(stack: contextlib.ExitStack):
+    serialize = _fastapi_serializer(ApiResponse[list[SkillListItem]])
+    skills = _skills(100)
+    return lambda: serialize(ApiResponse(data=skills, meta={"page": 1, "page_size": 100, "total": 100}))
+
+
+@benchmark("response.api_response[skills-100]")
+def _(stack: contextlib.ExitStack):
+    skills = _skills(100)
+    return lambda: api_response(skills, meta={"page": 1, "page_size": 100, "total": 100})
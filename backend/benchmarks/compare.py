@@ -0,0 +1,60 @@
+"""Compare two benchmark results: `python -m benchmarks.compare base.json new.json [--threshold 25]`.
+
+Times are compared relative to each run's calibration loop, so a baseline recorded on a
+laptop still means something on CI. Exits 1 if any benchmark got slower by more than
+`--threshold` percent.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+
+def compare(base: dict[str, Any], new: dict[str, Any], *, threshold: float) -> tuple[list[str], list[str]]:
+    """Returns (report lines, regressed benchmarks)."""
+    lines = [f"{'benchmark':<60} {'base':>9} {'new':>9} {'change':>8}"]
+    regressed = []
+    for name in sorted(set(base["benchmarks"]) | set(new["benchmarks"])):
+        old, cur = base["benchmarks"].get(name), new["benchmarks"].get(name)
+        if old is None or cur is None:
+            lines.append(f"{name:<60} {'only in ' + ('new' if old is None else 'base'):>28}")
+            continue
+        change = (cur["relative"] - old["relative"]) / old["relative"] * 100 if old["relative"] else 0.0
+        flag = "  REGRESSED" if change > threshold else ""
+        lines.append(f"{name:<60} {old['relative']:>9.4g} {cur['relative']:>9.4g} {change:>+7.0f}%{flag}")
+        if change > threshold:
+            regressed.append(name)
+    return lines, regressed
+
+
+def report(base: dict[str, Any], new: dict[str, Any], *, threshold: float) -> bool:
+    """Print the comparison; True if nothing regressed."""
+    print(f"base: {base['meta'].get('git_commit')} {base['meta'].get('created_at')} (python {base['meta'].get('python')})")
+    print(f"new:  {new['meta'].get('git_commit')} {new['meta'].get('created_at')} (python {new['meta'].get('python')})")
+    print("times are in calibration-loop units\n")
+    lines, regressed = compare(base, new, threshold=threshold)
+    print("\n".join(lines))
+    if regressed:
+        print(f"\nslower by more than {threshold:.0f}%: " + ", ".join(regressed))
+    return not regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--threshold", type=float, default=25.0, help="allowed slowdown in percent")
+    args = parser.parse_args()
+
+    base = json.loads(args.base.read_text(encoding="utf-8"))
+    new = json.loads(args.new.read_text(encoding="utf-8"))
+    if not report(base, new, threshold=args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Inputs shaped like production data.
+
+The seed ships no generator skills, so the generators below are the template from the admin
+skill editor (`src/pages/AdminSkills.vue`) and a fraction generator in the style admins paste
+in, `//` comments included. TSX comes from `miniapp-v2/exercieses`.
+"""
+
+from __future__ import annotations
+
+import re
+import zipfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+TSX_DIR = REPO_ROOT / "miniapp-v2" / "exercieses"
+_ARROW_COMPONENT = re.compile(r"^(\s*)const ([A-Z]\w*) = \(([^)]*)\) => \{", re.MULTILINE)
+
+ADDITION_GENERATOR = '''def generate(metadata):
+    # Генерируем задачу
+    import random
+
+    # Пример: генерация простой задачи на сложение
+    a = random.randint(1, 10)
+    b = random.randint(1, 10)
+    answer = a + b
+
+    return {
+        "prompt": f"Сколько будет {a} + {b}?",
+        "type": "MCQ",  # или "NUMERIC", "TEXT", "MULTI_SELECT"
+        "data": {
+            "choices": [
+                {"id": "A", "text": str(answer)},
+                {"id": "B", "text": str(answer + 1)},
+                {"id": "C", "text": str(answer - 1)},
+                {"id": "D", "text": str(answer + 2)}
+            ]
+        },
+        "correct_answer": {"answer": "A"},
+        "explanation": f"{a} + {b} = {answer}"
+    }
+'''
+
+FRACTION_GENERATOR = '''import random
+import math
+
+// Сравнение дробей: какая больше?
+def generate(metadata):
+    def simplify(n, d):
+        g = math.gcd(n, d)
+        return int(n / g), int(d / g)
+
+    level = metadata.get("level", 2)
+    max_den = 6 + level * 2  // знаменатель растет с уровнем
+    while True:
+        d1 = random.randint(2, max_den)
+        d2 = random.randint(2, max_den)
+        n1 = random.randint(1, d1 - 1)
+        n2 = random.randint(1, d2 - 1)
+        if n1 * d2 != n2 * d1:
+            break
+    a = simplify(n1, d1)
+    b = simplify(n2, d2)
+    bigger = a if a[0] * b[1] > b[0] * a[1] else b
+    choices = []
+    for i, frac in (("A", a), ("B", b)):
+        choices.append({"id": i, "text": str(frac[0]) + "/" + str(frac[1])})
+    return {
+        "prompt": "Какая дробь больше: " + choices[0]["text"] + " или " + choices[1]["text"] + "?",
+        "type": "MCQ",
+        "data": {"choices": choices},
+        "correct_answer": {"answer": "A" if bigger == a else "B"},
+        "explanation": str(n1 * d2) + "/" + str(d1 * d2) + " и " + str(n2 * d1) + "/" + str(d1 * d2),
+    }
+'''
+
+MCQ_DATA = {
+    "choices": [
+        {"value": "3/4", "label": "3/4"},
+        {"value": "2/3", "label": "2/3"},
+        {"value": "5/8", "label": "5/8"},
+        {"value": "1/2", "label": "1/2"},
+    ]
+}
+
+
+def tsx_sources() -> dict[str, str]:
+    """`{file stem: source}`; empty when the backend is checked out without `miniapp-v2`."""
+    if not TSX_DIR.is_dir():
+        return {}
+    return {path.stem: path.read_text(encoding="utf-8") for path in sorted(TSX_DIR.glob("*.tsx"))}
+
+
+def malformed_tsx(source: str) -> str:
+    """Arrow components rewritten as bare `Name() {` declarations, the way some AI output arrives."""
+    return _ARROW_COMPONENT.sub(r"\1\2(\3) {", source)
+
+
+def build_plugin_zip(path: Path, tsx: dict[str, str], *, assets: int = 40) -> Path:
+    """A plugin archive like the ones admins upload: built HTML, a JS bundle, JSON and images."""
+    html = (
+        "<!DOCTYPE html><html><head>"
+        '<script src="https://unpkg.com/react/umd/react.production.min.js"></script>'
+        '<script src="https://cdn.tailwindcss.com/3.4.0"></script>'
+        "</head><body><div id=\"root\"></div><script>{}</script></body></html>"
+    )
+    sources = tsx or {"plugin": "const x = 1;\n" * 2000}
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, source in sources.items():
+            zf.writestr(f"{name}/index.html", html.format(source))
+            zf.writestr(f"{name}/bundle.js", source * 4)
+            zf.writestr(f"{name}/manifest.json", '{"name": "%s", "version": "1.0.0", "entry": "index.html"}' % name)
+        for i in range(assets):
+            zf.writestr(f"assets/img_{i}.png", bytes(range(256)) * 16)
+    return path
+
+
+def practice_report(rows: int) -> dict[str, Any]:
+    started = datetime(2025, 3, 1, 9, 0, tzinfo=timezone.utc)
+    score = 0
+    log = []
+    for i in range(rows):
+        correct = i % 4 != 3
+        before, score = score, max(0, min(100, score + (15 - i % 10 if correct else -1)))
+        log.append(
+            {
+                "answered_at": (started + timedelta(seconds=25 * i)).isoformat(timespec="seconds"),
+                "question": f"Compare the fractions {i % 7 + 1}/{i % 5 + 3} and {i % 3 + 1}/{i % 4 + 2}. Which one is bigger?",
+                "submitted_answer": f"{i % 7 + 1}/{i % 5 + 3}",
+                "correct_answer": f"{i % 3 + 1}/{i % 4 + 2}" if not correct else f"{i % 7 + 1}/{i % 5 + 3}",
+                "is_correct": correct,
+                "time_spent_sec": 10 + i % 30,
+                "smartscore_before": before,
+                "smartscore_after": score,
+            }
+        )
+    header = {
+        "student": "Айгерим Нурланова",
+        "skill": "Сравнение дробей",
+        "date": started.date().isoformat(),
+        "current_smartscore": score,
+        "best_smartscore": max(r["smartscore_after"] for r in log) if log else 0,
+        "questions_answered": rows,
+        "correct": sum(r["is_correct"] for r in log),
+        "incorrect": sum(not r["is_correct"] for r in log),
+        "active_time_seconds": sum(r["time_spent_sec"] for r in log),
+    }
+    return {"header": header, "rows": log}
+
+
+def assignment_report(students: int) -> dict[str, Any]:
+    rows = [
+        {
+            "student": f"Student {i:03d}",
+            "status": ("MASTERED", "IN_PROGRESS", "NOT_STARTED")[i % 3],
+            "best_smartscore": (i * 7) % 101,
+            "last_smartscore": (i * 5) % 101,
+            "questions_answered": i % 40,
+            "time_spent_seconds": 60 * (i % 25),
+            "last_activity_at": "2025-03-01T10:15:00+00:00" if i % 3 != 2 else None,
+        }
+        for i in range(students)
+    ]
+    header = {
+        "assignment_id": "3f0a6f4e-6c2b-4b0e-9a51-1f3e8d2c7b90",
+        "skill": "Сравнение дробей",
+        "target_smartscore": 80,
+        "due_at": "2025-03-07T18:00:00+00:00",
+        "summary": f"{students // 3} mastered of {students}",
+    }
+    return {"header": header, "rows": rows}
+
+
+def practice_session_state(answered: int) -> dict[str, Any]:
+    """`PracticeSession.state` of a generator skill after `answered` submits."""
+    generated = {
+        f"generated_{i}": {
+            "type": "MCQ",
+            "prompt": f"Сколько будет {i} + {i + 1}?",
+            "data": {"choices": [str(2 * i + k) for k in range(4)]},
+            "correct_answer": {"choice": str(2 * i + 1)},
+            "explanation": f"{i} + {i + 1} = {2 * i + 1}",
+            "level": 1 + i % 3,
+        }
+        for i in range(answered + 1)
+    }
+    return {
+        "recent_question_ids": [],
+        "recent_window": {"correct": min(answered, 20) * 3 // 4, "total": min(answered, 20)},
+        "entered_challenge_zone_at": None,
+        "wrong_streak": 0,
+        "generated_questions": generated,
+        "current_question_id": f"generated_{answered}",
+        "answered_question_ids": [f"generated_{i}" for i in range(answered)],
+    }
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import contextlib
+import fnmatch
+import platform
+import subprocess
+import sys
+import timeit
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+Setup = Callable[[contextlib.ExitStack], Callable[[], Any]]
+
+
+class Skip(Exception):
+    """Raised by a setup function when its benchmark cannot run here (e.g. no esbuild)."""
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Setup
+
+
+REGISTRY: list[Benchmark] = []
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    """Register `setup(stack) -> fn`; `fn()` is what gets timed, everything before it is not."""
+
+    def _register(setup: Setup) -> Setup:
+        REGISTRY.append(Benchmark(name, setup))
+        return setup
+
+    return _register
+
+
+def select(patterns: list[str] | None) -> list[Benchmark]:
+    if not patterns:
+        return list(REGISTRY)
+    return [b for b in REGISTRY if any(fnmatch.fnmatchcase(b.name, p) or p in b.name for p in patterns)]
+
+
+def _calibration_loop() -> int:
+    total = 0
+    for i in range(20_000):
+        total += i * i % 7
+    return total
+
+
+def calibrate(repeat: int = 15) -> float:
+    """ns for a fixed pure-Python loop; results are stored relative to it so machines compare."""
+    timer = timeit.Timer(_calibration_loop)
+    return min(timer.repeat(repeat, 10)) / 10 * 1e9
+
+
+def measure(fn: Callable[[], Any], *, repeat: int, min_time: float) -> tuple[float, int]:
+    """Best-of-`repeat` ns per call, with the loop count picked so one repeat takes `min_time`."""
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / elapsed * 1.1)) if elapsed > 0 else number * 10
+    best = min([elapsed, *timer.repeat(repeat - 1, number)])
+    return best / number * 1e9, number
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5, check=True)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run(benchmarks: list[Benchmark], *, repeat: int = 5, min_time: float = 0.1, log: Callable[[str], None] = print) -> dict[str, Any]:
+    calibration_before = calibrate()
+    timings: dict[str, tuple[float, int]] = {}
+    skipped: dict[str, str] = {}
+    for bench in benchmarks:
+        with contextlib.ExitStack() as stack:
+            try:
+                fn = bench.setup(stack)
+            except Skip as e:
+                skipped[bench.name] = str(e)
+                log(f"{bench.name:<60} skipped: {e}")
+                continue
+            fn()  # warm caches (compiled regexes, fonts) before timing
+            timings[bench.name] = ns, number = measure(fn, repeat=repeat, min_time=min_time)
+        log(f"{bench.name:<60} {_format_ns(ns):>10}")
+    # Calibrating after the benchmarks too and keeping the faster figure filters out a CPU that
+    # was briefly throttled or busy at start-up, which would skew every relative number at once.
+    calibration_ns = min(calibrate(), calibration_before)
+    results = {
+        name: {"ns": round(ns, 1), "relative": float(f"{ns / calibration_ns:.4g}"), "number": number} for name, (ns, number) in timings.items()
+    }
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(terse=True),
+            "calibration_ns": round(calibration_ns, 1),
+        },
+        "benchmarks": results,
+        "skipped": skipped,
+    }
+
+
+def _format_ns(ns: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
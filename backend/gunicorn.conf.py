@@ -0,0 +1,45 @@
+"""Production serving: `gunicorn app.main:app` (this file is picked up from the working directory).
+
+A gunicorn master supervises `web_workers` UvicornWorker processes. With `web_preload` the app
+is imported once in the master and forked, so workers start fast and share read-only pages;
+the DB pool, Redis client, PDF pool and listeners are still created by each worker's lifespan.
+
+Restarts, all graceful (in-flight requests get `web_graceful_timeout_sec`):
+    kill -HUP <master>     new workers replace the old ones; code is NOT reloaded with preload
+    kill -USR2 <master>    start a new master on the new code next to the old one, then
+    kill -QUIT <old>       stop the old master once the new workers are up (zero-downtime deploy)
+    kill -TTIN / -TTOU     add / remove one worker
+"""
+
+from __future__ import annotations
+
+from app.core.config import settings
+from app.utils.cpus import usable_cpu_count
+
+# Default worker count cap: each worker has its own DB pool, so Postgres connections grow with it.
+MAX_DEFAULT_WORKERS = 8
+
+bind = settings.web_bind
+workers = settings.web_workers or min(usable_cpu_count(), MAX_DEFAULT_WORKERS)
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = settings.web_preload
+timeout = settings.web_timeout_sec
+graceful_timeout = settings.web_graceful_timeout_sec
+keepalive = settings.web_keepalive_sec
+max_requests = settings.web_max_requests
+max_requests_jitter = settings.web_max_requests_jitter
+accesslog = None  # requests are logged by the app
+errorlog = "-"
+
+if workers > 1:
+    # Workers are forked from this process, so they all see the changed settings object.
+    settings.metrics_shared = True
+
+
+def when_ready(server) -> None:
+    if preload_app:
+        from app.main import assert_no_shared_resources
+
+        assert_no_shared_resources()
+    server.log.info("Serving with %d workers (preload=%s)", workers, preload_app)
+
@@ -0,0 +1 @@
+"""Load-test harness simulating classroom traffic against a running API (see loadtest/__main__.py)."""
@@ -0,0 +1,116 @@
+"""Run a load test: `python -m loadtest --students 200 --teachers 8 --duration 120`.
+
+Prepare the data first with `python -m app.db.synthetic --students <at least --students>`.
+Results are printed as a table and written to `loadtest/results/<time>-<commit>.json`;
+compare two runs with `python -m loadtest.compare old.json new.json`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from loadtest.scenarios import Client, Options, student, student_email, teacher, teacher_email
+from loadtest.stats import Recorder, format_table
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5, check=True)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    opts = Options(
+        think_time_sec=args.think_time,
+        questions_per_session=args.questions_per_session,
+        accuracy=args.accuracy,
+        pdf_rate=args.pdf_rate,
+        grid_poll_sec=args.grid_poll,
+    )
+    recorder = Recorder()
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=args.students + args.teachers, max_keepalive_connections=args.students + args.teachers)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as http:
+
+        async def _user(index: int, fn, email: str) -> None:
+            # Users arrive over --ramp seconds; 0 logs everyone in at once (login storm).
+            if args.ramp > 0:
+                await asyncio.sleep(args.ramp * index / max(1, args.students + args.teachers))
+            await fn(Client(http, recorder, args.api_prefix), email, opts, stop, random.Random(args.seed + index))
+
+        users = [_user(i, student, student_email(i + 1)) for i in range(args.students)]
+        users += [_user(args.students + i, teacher, teacher_email(i + 1)) for i in range(args.teachers)]
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(u) for u in users]
+        await asyncio.sleep(args.duration)
+        stop.set()
+        # Let in-flight requests finish; a user mid-think stops at its next check.
+        _, pending = await asyncio.wait(tasks, timeout=args.timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        elapsed = time.perf_counter() - started
+
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "base_url": args.base_url,
+            "duration_sec": round(elapsed, 1),
+            "students": args.students,
+            "teachers": args.teachers,
+            "think_time_sec": args.think_time,
+            "ramp_sec": args.ramp,
+            "seed": args.seed,
+        },
+        **recorder.summary(elapsed),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate classroom traffic against a running API.")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--api-prefix", default="/api/v1")
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--teachers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=60, help="seconds of steady load")
+    parser.add_argument("--ramp", type=float, default=0, help="spread logins over this many seconds (0 = login storm)")
+    parser.add_argument("--think-time", type=float, default=3.0, help="mean seconds between a student's answers")
+    parser.add_argument("--questions-per-session", type=int, default=15)
+    parser.add_argument("--accuracy", type=float, default=0.8)
+    parser.add_argument("--pdf-rate", type=float, default=0.1, help="share of finished sessions / grid polls that fetch a PDF")
+    parser.add_argument("--grid-poll", type=float, default=5.0, help="seconds between a teacher's score grid polls")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", type=Path, default=None, help="result file (default: loadtest/results/<time>-<commit>.json)")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(format_table(result))
+    out = args.out
+    if out is None:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        out = RESULTS_DIR / f"{stamp}-{result['meta']['git_commit'] or 'nogit'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(f"\nresults: {out}")
+    if result["total"]["count"] == 0:
+        sys.exit("no requests completed: is the API up and synthetic data loaded?")
+
+
+if __name__ == "__main__":
+    main()
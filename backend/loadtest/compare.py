@@ -0,0 +1,66 @@
+"""Compare two load test results: `python -m loadtest.compare base.json new.json [--max-regression 20]`.
+
+Prints per-endpoint p50/p95/p99 and throughput changes; exits 1 if any endpoint's p95 got
+worse by more than `--max-regression` percent (endpoints with fewer than `--min-count`
+requests in either run are shown but not judged).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "rps")
+
+
+def _change(old: float, new: float) -> float | None:
+    if not old:
+        return None
+    return (new - old) / old * 100
+
+
+def compare(base: dict[str, Any], new: dict[str, Any], *, max_regression: float, min_count: int) -> tuple[list[str], list[str]]:
+    """Returns (report lines, regressed endpoints)."""
+    lines = [f"{'endpoint':<60} " + " ".join(f"{m:>18}" for m in METRICS)]
+    regressed = []
+    for name in sorted(set(base["endpoints"]) | set(new["endpoints"])):
+        old, cur = base["endpoints"].get(name), new["endpoints"].get(name)
+        if old is None or cur is None:
+            lines.append(f"{name:<60} {'only in ' + ('new' if old is None else 'base'):>18}")
+            continue
+        cells = []
+        for metric in METRICS:
+            change = _change(old[metric], cur[metric])
+            delta = f"{change:+.0f}%" if change is not None else "n/a"
+            cells.append(f"{cur[metric]:>10} {delta:>7}")
+        lines.append(f"{name:<60} " + " ".join(cells))
+        change = _change(old["p95_ms"], cur["p95_ms"])
+        if min(old["count"], cur["count"]) >= min_count and change is not None and change > max_regression:
+            regressed.append(name)
+    return lines, regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--max-regression", type=float, default=20.0, help="allowed p95 increase in percent")
+    parser.add_argument("--min-count", type=int, default=50)
+    args = parser.parse_args()
+
+    base = json.loads(args.base.read_text(encoding="utf-8"))
+    new = json.loads(args.new.read_text(encoding="utf-8"))
+    print(f"base: {base['meta'].get('git_commit')} {base['meta'].get('started_at')}")
+    print(f"new:  {new['meta'].get('git_commit')} {new['meta'].get('started_at')}\n")
+    lines, regressed = compare(base, new, max_regression=args.max_regression, min_count=args.min_count)
+    print("\n".join(lines))
+    if regressed:
+        print(f"\np95 regressed by more than {args.max_regression:.0f}%: " + ", ".join(regressed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
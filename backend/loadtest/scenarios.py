@@ -0,0 +1,166 @@
+"""Virtual users: students practicing and teachers watching their classes.
+
+Accounts come from `python -m app.db.synthetic` (synthetic-student-N / synthetic-teacher-N @load.local,
+password Password123!). Synthetic questions are NUMERIC "Compute a + b." prompts, so students
+answer them (correctly `accuracy` of the time) instead of sending junk.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+from loadtest.stats import Recorder
+
+PASSWORD = "Password123!"
+EMAIL_DOMAIN = "load.local"
+_SUM = re.compile(r"(-?\d+)\s*\+\s*(-?\d+)")
+_IDS = re.compile(r"/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|/\d+")
+
+
+@dataclass
+class Options:
+    think_time_sec: float = 3.0
+    questions_per_session: int = 15
+    heartbeat_every: int = 3
+    accuracy: float = 0.8
+    pdf_rate: float = 0.1
+    grid_poll_sec: float = 5.0
+
+
+class Client:
+    """httpx wrapper that times every call and labels it by route template."""
+
+    def __init__(self, http: httpx.AsyncClient, recorder: Recorder, prefix: str) -> None:
+        self.http = http
+        self.recorder = recorder
+        self.prefix = prefix
+        self.token: str | None = None
+
+    async def call(self, method: str, path: str, *, label: str | None = None, **kwargs: Any) -> httpx.Response | None:
+        headers = kwargs.pop("headers", {})
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        name = f"{method} {label or _IDS.sub('/{id}', path.split('?')[0])}"
+        started = time.perf_counter()
+        try:
+            resp = await self.http.request(method, self.prefix + path, headers=headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(name, type(e).__name__, (time.perf_counter() - started) * 1000)
+            return None
+        self.recorder.record(name, resp.status_code, (time.perf_counter() - started) * 1000)
+        return resp
+
+    async def login(self, email: str) -> bool:
+        resp = await self.call("POST", "/auth/login", json={"email": email, "password": PASSWORD})
+        if resp is None or resp.status_code != 200:
+            return False
+        self.token = resp.json()["data"]["access_token"]
+        return True
+
+
+def _data(resp: httpx.Response | None) -> Any:
+    if resp is None or resp.status_code != 200:
+        return None
+    return resp.json().get("data")
+
+
+async def _think(opts: Options, rng: random.Random) -> None:
+    # Exponential think time: most answers are quick, a few take much longer.
+    await asyncio.sleep(rng.expovariate(1 / opts.think_time_sec) if opts.think_time_sec > 0 else 0)
+
+
+def _answer(question: dict[str, Any], rng: random.Random, accuracy: float) -> dict[str, Any]:
+    match = _SUM.search(question.get("prompt") or "")
+    value = int(match.group(1)) + int(match.group(2)) if match else 0
+    if rng.random() >= accuracy:
+        value += rng.choice((-2, -1, 1, 2))
+    if question.get("type") == "MCQ":
+        choices = (question.get("data") or {}).get("choices") or ["A"]
+        first = choices[0]
+        return {"choice": first.get("id", "A") if isinstance(first, dict) else first}
+    return {"value": value}
+
+
+async def browse_catalog(client: Client, rng: random.Random) -> list[int]:
+    """What a student does before picking a skill. Returns skill ids to practice."""
+    await client.call("GET", "/grades")
+    await client.call("GET", "/subjects")
+    await client.call("GET", "/topics")
+    skills = _data(await client.call("GET", "/skills?q=SYN&page=1&page_size=50")) or []
+    ids = [s["id"] for s in skills]
+    if ids:
+        await client.call("GET", f"/skills/{rng.choice(ids)}")
+    return ids
+
+
+async def student(client: Client, email: str, opts: Options, stop: asyncio.Event, rng: random.Random) -> None:
+    if not await client.login(email):
+        return
+    skill_ids = await browse_catalog(client, rng)
+    if not skill_ids:
+        return
+    while not stop.is_set():
+        session = _data(await client.call("POST", "/practice/sessions", json={"skill_id": rng.choice(skill_ids)}))
+        if not session:
+            await _think(opts, rng)
+            continue
+        sid = session["id"]
+        question = session.get("current_question")
+        for n in range(opts.questions_per_session):
+            if question is None or stop.is_set():
+                break
+            await _think(opts, rng)
+            if opts.heartbeat_every and n % opts.heartbeat_every == 0:
+                await client.call("POST", f"/practice/sessions/{sid}/heartbeat", json={"is_active": True})
+            result = _data(
+                await client.call(
+                    "POST",
+                    f"/practice/sessions/{sid}/submit",
+                    json={"question_id": question["id"], "submitted_answer": _answer(question, rng, opts.accuracy), "time_spent_sec": 5},
+                    headers={"Idempotency-Key": str(uuid.uuid4())},
+                )
+            )
+            if not result or result.get("finished"):
+                break
+            question = result.get("next_question")
+        await client.call("POST", f"/practice/sessions/{sid}/finish")
+        if rng.random() < opts.pdf_rate:
+            await client.call("GET", f"/reports/practice-sessions/{sid}.pdf")
+
+
+async def teacher(client: Client, email: str, opts: Options, stop: asyncio.Event, rng: random.Random) -> None:
+    if not await client.login(email):
+        return
+    classrooms = _data(await client.call("GET", "/classrooms")) or []
+    if not classrooms:
+        return
+    cid = classrooms[0]["id"]
+    assignments = _data(await client.call("GET", f"/assignments?classroom_id={cid}")) or []
+    while not stop.is_set():
+        if assignments:
+            aid = rng.choice(assignments)["id"]
+            await client.call("GET", f"/teacher/classrooms/{cid}/assignments/{aid}/score-grid")
+            if rng.random() < opts.pdf_rate:
+                await client.call("GET", f"/reports/assignments/{aid}.pdf")
+        if rng.random() < 0.2:
+            await client.call("GET", f"/teacher/analytics/classroom/{cid}")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=opts.grid_poll_sec)
+        except asyncio.TimeoutError:
+            pass
+
+
+def student_email(n: int) -> str:
+    return f"synthetic-student-{n}@{EMAIL_DOMAIN}"
+
+
+def teacher_email(n: int) -> str:
+    return f"synthetic-teacher-{n}@{EMAIL_DOMAIN}"
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import math
+from collections import Counter, defaultdict
+from typing import Any
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    """Latencies (ms) and status codes per endpoint label, e.g. `POST /practice/sessions/{id}/submit`."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, Counter[str]] = defaultdict(Counter)
+
+    def record(self, endpoint: str, status: int | str, elapsed_ms: float) -> None:
+        self.latencies[endpoint].append(elapsed_ms)
+        self.statuses[endpoint][str(status)] += 1
+
+    def summary(self, duration_sec: float) -> dict[str, Any]:
+        endpoints = {name: _summarize(values, self.statuses[name], duration_sec) for name, values in sorted(self.latencies.items())}
+        all_values = [v for values in self.latencies.values() for v in values]
+        all_statuses: Counter[str] = Counter()
+        for statuses in self.statuses.values():
+            all_statuses.update(statuses)
+        return {"endpoints": endpoints, "total": _summarize(all_values, all_statuses, duration_sec)}
+
+
+def _summarize(values: list[float], statuses: Counter[str], duration_sec: float) -> dict[str, Any]:
+    ordered = sorted(values)
+    errors = sum(n for status, n in statuses.items() if not status.isdigit() or int(status) >= 400)
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / duration_sec, 2) if duration_sec > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered), 1) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 1),
+        "p95_ms": round(percentile(ordered, 95), 1),
+        "p99_ms": round(percentile(ordered, 99), 1),
+        "max_ms": round(ordered[-1], 1) if ordered else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+    }
+
+
+def format_table(summary: dict[str, Any]) -> str:
+    rows = [("endpoint", "count", "err", "rps", "p50", "p95", "p99", "max")]
+    for name, s in [*summary["endpoints"].items(), ("TOTAL", summary["total"])]:
+        rows.append((name, s["count"], s["errors"], s["rps"], s["p50_ms"], s["p95_ms"], s["p99_ms"], s["max_ms"]))
+    widths = [max(len(str(row[i])) for row in rows) for i in range(len(rows[0]))]
+    lines = []
+    for row in rows:
+        cells = [str(row[0]).ljust(widths[0]), *(str(c).rjust(w) for c, w in zip(row[1:], widths[1:]))]
+        lines.append("  ".join(cells))
+    return "\n".join(lines)
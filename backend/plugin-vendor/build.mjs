@@ -0,0 +1,59 @@
+// Builds the shared TSX plugin vendor files into ../static/vendor:
+//   plugin-vendor.<hash>.js   React, ReactDOM and lucide as window globals
+//   plugin-tailwind.<hash>.css precompiled Tailwind (see tailwind.config.cjs)
+// plus .gz/.br variants and manifest.json, which the backend reads when rendering plugin
+// HTML. Older hashed files are kept: already published plugins still reference them.
+import { execFileSync } from 'node:child_process';
+import { createHash } from 'node:crypto';
+import { mkdirSync, readdirSync, renameSync, writeFileSync } from 'node:fs';
+import { dirname, join } from 'node:path';
+import { fileURLToPath } from 'node:url';
+import { brotliCompressSync, constants, gzipSync } from 'node:zlib';
+
+import { build } from 'esbuild';
+
+const here = dirname(fileURLToPath(import.meta.url));
+const outDir = join(here, '..', 'static', 'vendor');
+
+function write(path, data) {
+  const tmp = `${path}.tmp`;
+  writeFileSync(tmp, data);
+  renameSync(tmp, path);
+}
+
+function emit(prefix, ext, data) {
+  const hash = createHash('sha256').update(data).digest('hex').slice(0, 12);
+  const name = `${prefix}.${hash}.${ext}`;
+  const path = join(outDir, name);
+  write(path, data);
+  write(`${path}.gz`, gzipSync(data, { level: 9 }));
+  write(`${path}.br`, brotliCompressSync(data, { params: { [constants.BROTLI_PARAM_QUALITY]: 11 } }));
+  console.log(`${name}: ${data.length} bytes`);
+  return name;
+}
+
+mkdirSync(outDir, { recursive: true });
+
+const js = await build({
+  entryPoints: [join(here, 'src', 'vendor.js')],
+  bundle: true,
+  minify: true,
+  format: 'iife',
+  target: 'es2020',
+  define: { 'process.env.NODE_ENV': '"production"' },
+  legalComments: 'none',
+  write: false,
+});
+
+const css = execFileSync(
+  join(here, 'node_modules', '.bin', 'tailwindcss'),
+  ['-c', 'tailwind.config.cjs', '-i', join('src', 'tailwind.css'), '--minify'],
+  { cwd: here, maxBuffer: 64 * 1024 * 1024 },
+);
+
+const manifest = {
+  js: emit('plugin-vendor', 'js', Buffer.from(js.outputFiles[0].contents)),
+  css: emit('plugin-tailwind', 'css', css),
+};
+write(join(outDir, 'manifest.json'), JSON.stringify(manifest, null, 2));
+console.log(`manifest.json -> ${manifest.js}, ${manifest.css} (${readdirSync(outDir).length} files in static/vendor)`);
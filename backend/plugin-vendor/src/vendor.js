@@ -0,0 +1,10 @@
+// Globals expected by TSX plugins (see app/plugins/tsx_transformer.py): the same names
+// the unpkg UMD builds used to define, so plugin HTML works with either source.
+import * as React from 'react';
+import * as ReactDOM from 'react-dom';
+import * as ReactDOMClient from 'react-dom/client';
+import * as lucide from 'lucide';
+
+window.React = React;
+window.ReactDOM = { ...ReactDOM, ...ReactDOMClient };
+window.lucide = lucide;
@@ -0,0 +1,27 @@
+// Precompiled replacement for the Tailwind Play CDN used by TSX plugins.
+// Classes are collected from published plugins and compiled TSX; the safelist covers the
+// utilities generated plugins commonly use, so a new plugin rarely needs a rebuild.
+const colors = 'slate|gray|zinc|neutral|stone|red|orange|amber|yellow|lime|green|emerald|teal|cyan|sky|blue|indigo|violet|purple|fuchsia|pink|rose';
+const shades = '50|100|200|300|400|500|600|700|800|900';
+
+module.exports = {
+  content: ['../static/plugins/**/*.html', '../var/tsx-cache/**/*.js'],
+  safelist: [
+    { pattern: new RegExp(`^(bg|text|border|ring|from|via|to)-(${colors})-(${shades})$`), variants: ['hover', 'focus', 'disabled'] },
+    { pattern: /^(bg|text|border)-(white|black|transparent)$/, variants: ['hover'] },
+    { pattern: /^-?(m|mx|my|mt|mb|ml|mr|p|px|py|pt|pb|pl|pr|gap|gap-x|gap-y|space-x|space-y|inset|top|bottom|left|right)-(0|px|0\.5|1|1\.5|2|2\.5|3|4|5|6|8|10|12|16|20|24|auto|full)$/ },
+    { pattern: /^(w|h|min-w|min-h|max-w|max-h|size)-/ },
+    { pattern: /^(text)-(xs|sm|base|lg|xl|2xl|3xl|4xl|5xl|6xl|left|center|right)$/ },
+    { pattern: /^font-(normal|medium|semibold|bold|extrabold|mono|sans)$/ },
+    { pattern: /^rounded(-(t|b|l|r))?(-(none|sm|md|lg|xl|2xl|3xl|full))?$/ },
+    { pattern: /^shadow(-(sm|md|lg|xl|2xl|inner|none))?$/, variants: ['hover'] },
+    { pattern: /^(items|justify|content|self|place-items|place-content)-/ },
+    { pattern: /^(grid-cols|grid-rows|col-span|row-span|order)-/ },
+    { pattern: /^(opacity|z|border|border-t|border-b|border-l|border-r|transition|duration|ease|scale|rotate|translate-x|translate-y|leading|tracking)-/, variants: ['hover'] },
+    { pattern: /^(flex|flex-row|flex-col|flex-wrap|flex-1|flex-none|grow|shrink-0|grid|inline-flex|inline-block|block|hidden|relative|absolute|fixed|sticky)$/ },
+    { pattern: /^(overflow|overflow-x|overflow-y)-(hidden|auto|scroll|visible)$/ },
+    { pattern: /^(cursor)-(pointer|not-allowed|default|grab|grabbing|move)$/ },
+    { pattern: /^animate-(spin|ping|pulse|bounce)$/ },
+    { pattern: /^(select-none|underline|italic|uppercase|capitalize|truncate|whitespace-nowrap|break-words|pointer-events-none|outline-none|transform|border|border-2|border-4|ring|ring-2|ring-4|mx-auto)$/, variants: ['hover', 'focus'] },
+  ],
+};
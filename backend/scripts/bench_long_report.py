@@ -0,0 +1,55 @@
+"""Render a synthetic marathon-session report and print time and peak Python memory.
+
+    python scripts/bench_long_report.py                # 10k rows
+    python scripts/bench_long_report.py 2000 10000 20000
+
+Rows go through a JSON-lines file, the way ReportService hands long sessions to the renderer.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.getcwd())
+
+
+def _write_rows(path: str, n: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            row = {
+                "answered_at": f"2026-01-01T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}+00:00",
+                "question": f"What is {i} + {i * 7}? Write the sum in the box.",
+                "submitted_answer": json.dumps({"value": i * 8 + (i % 3 == 0)}),
+                "correct_answer": json.dumps({"value": i * 8}),
+                "is_correct": i % 3 != 0,
+                "time_spent_sec": 5 + i % 40,
+                "smartscore_before": i % 100,
+                "smartscore_after": (i + 1) % 100,
+            }
+            f.write(json.dumps(row) + "\n")
+
+
+def bench(n: int) -> None:
+    from app.utils.pdf import build_practice_session_report_pdf
+
+    header = {"student": "Bench Student", "skill": "A.1 — Addition", "date": "2026-01-01", "questions_answered": n}
+    fd, rows_path = tempfile.mkstemp(suffix=".jsonl")
+    os.close(fd)
+    try:
+        _write_rows(rows_path, n)
+        tracemalloc.start()
+        started = time.perf_counter()
+        pdf = build_practice_session_report_pdf(paper=None, header=header, rows_path=rows_path)
+        elapsed = time.perf_counter() - started
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        os.unlink(rows_path)
+    print(f"{n:>7} rows  {elapsed:7.2f}s  {elapsed / n * 1000:6.2f} ms/row  peak {peak / 1e6:7.1f} MB  pdf {len(pdf) / 1e6:6.2f} MB")
+
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:] or ["10000"]:
+        bench(int(arg))
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import os
+import tempfile
 
 import pytest
 from alembic import command
@@ -32,6 +33,11 @@ def _set_test_env() -> None:
     os.environ.setdefault("AUTH_RATE_LIMIT", "1000")
     os.environ.setdefault("SUBMIT_RATE_LIMIT", "1000")
     os.environ.setdefault("FREE_DAILY_QUESTION_LIMIT", "100000")
+    os.environ.setdefault("SCORE_GRID_BUS_BACKEND", "memory")
+    os.environ.setdefault("JOB_QUEUE_BACKEND", "memory")
+    os.environ.setdefault("PDF_CACHE_DIR", tempfile.mkdtemp(prefix="ixl-pdf-cache-"))
+    os.environ.setdefault("REPORT_EXPORT_DIR", tempfile.mkdtemp(prefix="ixl-exports-"))
+    os.environ.setdefault("TSX_COMPILE_CACHE_DIR", tempfile.mkdtemp(prefix="ixl-tsx-cache-"))
 
 
 _set_test_env()
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import contextlib
+import json
+
+import benchmarks.cases  # noqa: F401
+from benchmarks.__main__ import BASELINE
+from benchmarks.compare import compare
+from benchmarks.runner import REGISTRY, Skip
+
+
+def _result(**relative: float) -> dict:
+    return {"meta": {}, "benchmarks": {name: {"relative": value} for name, value in relative.items()}}
+
+
+def test_compare_flags_only_slowdowns_over_threshold():
+    base = _result(a=1.0, b=1.0, c=1.0, gone=1.0)
+    new = _result(a=1.2, b=1.5, c=0.5, added=1.0)
+    lines, regressed = compare(base, new, threshold=25)
+    assert regressed == ["b"]
+    assert any("gone" in line and "only in base" in line for line in lines)
+    assert any("added" in line and "only in new" in line for line in lines)
+
+
+def test_every_benchmark_runs_and_baseline_names_exist():
+    names = {bench.name for bench in REGISTRY}
+    assert set(json.loads(BASELINE.read_text(encoding="utf-8"))["benchmarks"]) <= names
+    for bench in REGISTRY:
+        with contextlib.ExitStack() as stack:
+            try:
+                fn = bench.setup(stack)
+            except Skip:
+                continue
+            fn()
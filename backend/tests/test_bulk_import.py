@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+import uuid
+
+import pytest
+
+from app.core.errors import AppError
+from app.db.query_tracer import assert_max_queries
+from app.services.bulk_import import BulkImporter, json_rows, ndjson_rows
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def test_ndjson_rows_are_split_across_chunks():
+    rows = [row async for row in ndjson_rows(_chunks(b'{"a": 1}\n\n{"b"', b': 2}\r\n{"c": 3}'), max_bytes=1000)]
+    assert [(n, json.loads(line)) for n, line in rows] == [(1, {"a": 1}), (3, {"b": 2}), (4, {"c": 3})]
+
+    with pytest.raises(AppError) as exc:
+        _ = [row async for row in ndjson_rows(_chunks(b"{}\n" * 10, b"{}\n" * 10), max_bytes=40)]
+    assert exc.value.status_code == 413
+
+
+async def test_json_rows_accept_sections_lists_and_exports():
+    sections = await json_rows(_chunks(b'{"skills": [{"code": "A"}], "questions": [{"prompt": "q"}]}'), max_bytes=1000)
+    assert sections == [("skills[1]", {"code": "A", "kind": "skill"}), ("questions[1]", {"prompt": "q", "kind": "question"})]
+    export = await json_rows(_chunks(b'{"data": [{"id": 7, "prompt": "q"}], "meta": {}}'), max_bytes=1000)
+    assert export == [(1, {"id": 7, "prompt": "q"})]
+    with pytest.raises(AppError):
+        await json_rows(_chunks(b'{"rows": []}'), max_bytes=1000)
+
+
+async def test_invalid_rows_are_reported_without_touching_the_database():
+    rows = [
+        (1, b"{not json"),
+        (2, b"[1, 2]"),
+        (3, {"kind": "lesson"}),
+        (4, {"type": "NUMERIC", "prompt": "2 + 2"}),
+        (5, {"kind": "skill", "subject_id": 1, "grade_id": 1, "code": "", "title": "t"}),
+    ]
+    result = await BulkImporter(None).run(rows)  # no valid row, so no statement is executed
+    assert result.failed == 5 and result.questions_created == result.skills_created == 0
+    assert [(e.row, e.kind) for e in result.errors] == [
+        (1, "unknown"), (2, "unknown"), (3, "lesson"), (4, "question"), (5, "skill")
+    ]
+    assert "skill_code is required" in result.errors[3].message
+    assert result.errors[4].message.startswith("code:")
+
+
+async def test_ndjson_import_upserts_skills_and_reports_bad_rows(client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}", "Content-Type": "application/x-ndjson"}
+    code = f"B.{uuid.uuid4().hex[:4]}"
+    skill = {"kind": "skill", "subject_id": 1, "grade_id": 7, "code": code, "title": "Bulk Skill"}
+    question = {"subject_id": 1, "grade_id": 7, "skill_code": code, "type": "NUMERIC", "correct_answer": {"value": 4}}
+    lines = [skill] + [{**question, "prompt": f"{i} + 4"} for i in range(200)]
+    lines += [{**question, "prompt": "no such skill", "skill_code": "missing"}, {"skill_id": 10**9, "type": "NUMERIC", "prompt": "x"}]
+    body = "\n".join(json.dumps(line) for line in lines).encode()
+
+    with assert_max_queries(20, label="bulk import of 200 questions"):
+        r = await client.post("/api/v1/admin/questions/import", content=body, headers=headers)
+    assert r.status_code == 200, r.text
+    data = r.json()["data"]
+    assert (data["skills_created"], data["skills_updated"], data["questions_created"]) == (1, 0, 200)
+    assert data["failed"] == 2 and [e["row"] for e in data["errors"]] == [202, 203]
+
+    listed = (await client.get("/api/v1/skills", params={"q": code})).json()["data"]
+    assert [s["title"] for s in listed] == ["Bulk Skill"]
+
+    again = json.dumps({**skill, "title": "Bulk Skill Renamed"}).encode()
+    r = await client.post("/api/v1/admin/questions/import", content=again, headers=headers)
+    assert r.json()["data"]["skills_updated"] == 1
+
+    # The cached list page is dropped after commit
+    listed = (await client.get("/api/v1/skills", params={"q": code})).json()["data"]
+    assert [s["title"] for s in listed] == ["Bulk Skill Renamed"]
+    r = await client.delete(f"/api/v1/admin/skills/{listed[0]['id']}", headers={"Authorization": f"Bearer {admin_token}"})
+    assert r.status_code == 200, r.text
+
+
+async def test_skill_rows_after_a_failed_upsert_get_their_own_try(client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    code = f"D.{uuid.uuid4().hex[:4]}"
+    skill = {"subject_id": 1, "grade_id": 7, "code": code, "title": "Dup Skill"}
+    body = {
+        "skills": [{**skill, "example_url": "x" * 1025}, skill, {**skill, "title": "Dup Skill Again"}],  # example_url is VARCHAR(1024)
+        "questions": [{"subject_id": 1, "grade_id": 7, "skill_code": code, "type": "NUMERIC", "prompt": "1 + 1"}],
+    }
+    r = await client.post("/api/v1/admin/questions/import", json=body, headers=headers)
+    assert r.status_code == 200, r.text
+    data = r.json()["data"]
+    assert (data["skills_created"], data["questions_created"], data["failed"]) == (1, 1, 2)
+    assert [e["row"] for e in data["errors"]] == ["skills[1]", "skills[3]"]
+    assert "Duplicate" not in data["errors"][0]["message"]
+    assert data["errors"][1]["message"].startswith("Duplicate of row skills[2]")
+
+    listed = (await client.get("/api/v1/skills", params={"q": code})).json()["data"]
+    assert [s["title"] for s in listed] == ["Dup Skill"]
+    r = await client.delete(f"/api/v1/admin/skills/{listed[0]['id']}", headers=headers)
+    assert r.status_code == 200, r.text
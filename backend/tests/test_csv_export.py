@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+
+from app.models.enums import MistakeType
+from app.services.csv_export_service import ATTEMPT_COLUMNS, _attempt_row, _text
+
+
+def test_text_cells_are_not_spreadsheet_formulas():
+    assert _text("=HYPERLINK(\"x\")") == "'=HYPERLINK(\"x\")"
+    assert _text("+1") == "'+1"
+    assert _text("Alice") == "Alice"
+    assert _text(None) == ""
+
+
+def test_attempt_row_matches_columns():
+    row = (
+        datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        uuid.uuid4(),
+        "Student",
+        "s@example.com",
+        "A.1",
+        uuid.uuid4(),
+        None,
+        2,
+        True,
+        list(MistakeType)[0],
+        7,
+        40,
+        45,
+        {"value": 3},
+    )
+    cells = _attempt_row(row)
+    assert len(cells) == len(ATTEMPT_COLUMNS)
+    assert cells[0] == "2026-01-02T03:04:05+00:00"
+    assert cells[6] == ""
+    assert cells[8] == "1"
+    assert cells[9] == list(MistakeType)[0].value
+    assert cells[-1] == '{"value": 3}'
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.db import session as db
+from app.db.session import InstrumentedPool, PoolHealthCheck, _connect_args
+
+
+def test_connect_args_only_for_asyncpg():
+    args = _connect_args(
+        "postgresql+asyncpg://u:p@db/x",
+        statement_timeout_ms=5000,
+        idle_in_transaction_timeout_ms=0,
+        prepared_statement_cache_size=250,
+    )
+    assert args == {"server_settings": {"statement_timeout": "5000"}, "prepared_statement_cache_size": 250}
+    assert _connect_args(
+        "sqlite+aiosqlite://", statement_timeout_ms=5000, idle_in_transaction_timeout_ms=5000, prepared_statement_cache_size=0
+    ) == {}
+
+
+async def test_pool_counts_waits_overflow_and_timeouts():
+    engine = create_async_engine(
+        settings.database_url,
+        poolclass=InstrumentedPool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.2,
+        connect_args=_connect_args(
+            settings.database_url,
+            statement_timeout_ms=1234,
+            idle_in_transaction_timeout_ms=0,
+            prepared_statement_cache_size=100,
+        ),
+    )
+    pool = engine.sync_engine.pool
+    try:
+        async with engine.connect() as first, engine.connect() as second:
+            assert (await first.execute(text("SHOW statement_timeout"))).scalar_one() == "1234ms"
+            await second.execute(text("SELECT 1"))
+            assert pool.stats()["checked_out"] == 2
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+
+        stats = pool.stats()
+        assert stats["checked_out"] == 0
+        assert stats["checkouts"] == 2
+        assert stats["overflow_events"] == 1
+        assert stats["timeouts"] == 1
+        assert stats["max_wait_ms"] >= 200
+
+        health = PoolHealthCheck(engine, interval_sec=5)
+        assert await health.check() is True
+        assert health.stats()["failures"] == 0
+    finally:
+        await engine.dispose()
+
+
+async def test_health_check_reports_unreachable_database():
+    engine = create_async_engine("postgresql+asyncpg://nobody:x@127.0.0.1:1/none", poolclass=InstrumentedPool)
+    health = PoolHealthCheck(engine, interval_sec=2)
+    try:
+        assert await asyncio.wait_for(health.check(), timeout=5) is False
+        assert health.stats()["failures"] == 1
+        assert health.stats()["last_error"]
+    finally:
+        await engine.dispose()
+
+
+async def test_request_session_checks_out_lazily_and_releases_early():
+    db.init_engine(settings.database_url)
+    pool = db.get_engine().sync_engine.pool
+    try:
+        requests = db.get_db_session()
+        session = await requests.__anext__()
+        assert pool.checkedout() == 0
+
+        await session.execute(text("SELECT 1"))
+        assert pool.checkedout() == 1
+        await db.release_connection(session)
+        assert pool.checkedout() == 0
+
+        # After a write, text() DML included, the transaction is kept until the request ends.
+        await session.execute(text("CREATE TEMP TABLE release_probe (a int) ON COMMIT DROP"))
+        await session.execute(text("INSERT INTO release_probe VALUES (1)"))
+        assert session.info["wrote"] is True
+        await db.release_connection(session)
+        assert pool.checkedout() == 1
+
+        with pytest.raises(StopAsyncIteration):
+            await requests.__anext__()
+        assert pool.checkedout() == 0
+    finally:
+        await db.close_engine()
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import random
+
+from loadtest.compare import compare
+from loadtest.scenarios import _answer
+from loadtest.stats import Recorder, percentile
+
+
+def test_percentiles_and_summary():
+    assert percentile([float(v) for v in range(1, 101)], 95) == 95
+    recorder = Recorder()
+    for ms in range(1, 101):
+        recorder.record("GET /grades", 200, float(ms))
+    recorder.record("POST /auth/login", 429, 5.0)
+    recorder.record("POST /auth/login", "ConnectTimeout", 30000.0)
+
+    summary = recorder.summary(duration_sec=10)
+    grades = summary["endpoints"]["GET /grades"]
+    assert (grades["count"], grades["rps"], grades["p50_ms"], grades["p99_ms"]) == (100, 10.0, 50, 99)
+    assert summary["endpoints"]["POST /auth/login"]["errors"] == 2
+    assert summary["total"]["count"] == 102
+
+
+def test_compare_flags_p95_regressions():
+    def run(p95: float) -> dict:
+        stats = {"count": 100, "p50_ms": 10, "p95_ms": p95, "p99_ms": 100, "rps": 5}
+        return {"meta": {}, "endpoints": {"GET /grades": stats}}
+
+    _, regressed = compare(run(50), run(70), max_regression=20, min_count=50)
+    assert regressed == ["GET /grades"]
+    _, regressed = compare(run(50), run(55), max_regression=20, min_count=50)
+    assert regressed == []
+
+
+def test_students_answer_synthetic_questions():
+    question = {"type": "NUMERIC", "prompt": "Compute 7 + 35."}
+    assert _answer(question, random.Random(0), accuracy=1.0) == {"value": 42}
+    assert _answer(question, random.Random(0), accuracy=0.0) != {"value": 42}
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import os
+import uuid
+
+import pytest
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.metrics import merge_expositions
+from app.utils.local_cache import CacheInvalidator, LocalCache
+
+
+async def test_local_cache_expires_evicts_and_clears_without_redis():
+    cache = LocalCache(f"test-{uuid.uuid4()}", ttl_sec=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (None, 2, 3)
+
+    await CacheInvalidator(None).invalidate(cache.name)
+    assert cache.get("b") is None
+    assert cache.stats()["invalidations"] == 1
+
+    expired = LocalCache(f"test-{uuid.uuid4()}", ttl_sec=0)
+    expired.set("a", 1)
+    assert expired.get("a") is None
+
+
+async def test_invalidate_clears_this_process_without_waiting_for_pubsub():
+    redis = Redis.from_url(settings.redis_url, decode_responses=True)
+    invalidator = CacheInvalidator(redis)
+    invalidator.start()
+    cache = LocalCache(f"test-{uuid.uuid4()}", ttl_sec=60)
+    try:
+        cache.set("a", 1)
+        await invalidator.invalidate(cache.name)
+        assert cache.get("a") is None
+    finally:
+        await invalidator.close()
+        await redis.aclose()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_child_starts_with_empty_caches():
+    cache = LocalCache(f"test-{uuid.uuid4()}", ttl_sec=60)
+    cache.set("a", 1)
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.write(write, b"empty" if cache.get("a") is None else b"inherited")
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert os.read(read, 16) == b"empty"
+    assert cache.get("a") == 1
+
+
+def test_merge_expositions_labels_samples_by_worker():
+    text = "# HELP hits Hits\n# TYPE hits counter\nhits 3\n# HELP lat Latency\n# TYPE lat histogram\nlat_count{route=\"/a\"} 2\n"
+    merged = merge_expositions({"11": text, "12": text.replace("hits 3", "hits 4")})
+    assert merged.count("# TYPE hits counter") == 1
+    assert 'hits{worker="11"} 3' in merged and 'hits{worker="12"} 4' in merged
+    assert 'lat_count{route="/a",worker="12"} 2' in merged
+    assert merged.index('hits{worker="12"}') < merged.index("# HELP lat")
+
+
+async def test_admin_catalog_change_is_visible_immediately(client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    assert (await client.get("/api/v1/subjects")).status_code == 200  # warm Redis and the local cache
+    slug = f"cache-{uuid.uuid4().hex[:8]}"
+    r = await client.post("/api/v1/admin/subjects", json={"slug": slug, "title": "Cache test"}, headers=headers)
+    assert r.status_code == 200, r.text
+    subjects = (await client.get("/api/v1/subjects")).json()["data"]
+    assert slug in {s["slug"] for s in subjects}
+    await client.delete(f"/api/v1/admin/subjects/{r.json()['data']['id']}", headers=headers)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import io
+import json
+import logging
+import threading
+
+import httpx
+import structlog
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.logging import RequestIdMiddleware, close_logging, configure_logging, logging_stats
+
+
+def _lines(stream: io.StringIO) -> list[dict]:
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_structlog_and_stdlib_events_share_the_json_sink():
+    stream = io.StringIO()
+    configure_logging("test", stream=stream)
+    try:
+        log = structlog.get_logger("tests.logging")
+        state = {"answered": 1}
+        with structlog.contextvars.bound_contextvars(request_id="req-1"):
+            log.info("practice.submit", is_correct=True)
+            logging.getLogger("tests.stdlib").warning("Worker %d: %s", 3, state)
+            state["answered"] = 2  # after the call: the stdlib message is already fixed
+            log.debug("below.level", value=1)
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                log.error("failed", exc_info=True)
+    finally:
+        close_logging()
+
+    submit, stdlib, failed = _lines(stream)
+    assert submit["message"] == "practice.submit" and submit["is_correct"] is True
+    assert submit["request_id"] == "req-1" and submit["level"] == "info" and submit["logger"] == "tests.logging"
+    assert stdlib["message"] == "Worker 3: {'answered': 1}"
+    assert stdlib["request_id"] == "req-1" and stdlib["logger"] == "tests.stdlib" and stdlib["timestamp"].endswith("Z")
+    assert "ValueError: boom" in failed["exception"]
+
+
+def test_cached_loggers_follow_a_reconfigured_sink():
+    first, second = io.StringIO(), io.StringIO()
+    log = structlog.get_logger("tests.logging")
+    configure_logging("test", stream=first)
+    try:
+        log.info("before")
+    finally:
+        close_logging()
+    configure_logging("test", stream=second)
+    try:
+        log.info("after")
+    finally:
+        close_logging()
+    assert [line["message"] for line in _lines(first)] == ["before"]
+    assert [line["message"] for line in _lines(second)] == ["after"]
+
+
+def test_sampling_drops_debug_events_but_never_warnings():
+    stream = io.StringIO()
+    configure_logging("test", level="DEBUG", sample_rates="hot.*=0, kept=1", stream=stream)
+    try:
+        log = structlog.get_logger("tests.logging")
+        for _ in range(5):
+            log.debug("hot.path", n=1)
+        log.debug("kept")
+        log.warning("hot.warning")
+        sampled_out = logging_stats()["sampled_out"]
+    finally:
+        close_logging()
+    assert [line["message"] for line in _lines(stream)] == ["kept", "hot.warning"]
+    assert sampled_out >= 5
+
+
+class _BlockingStream(io.StringIO):
+    def __init__(self) -> None:
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, text: str) -> int:
+        self.entered.set()
+        self.release.wait(5)
+        return super().write(text)
+
+
+def test_full_queue_drops_instead_of_blocking():
+    stream = _BlockingStream()
+    configure_logging("test", queue_size=1, stream=stream)
+    try:
+        log = structlog.get_logger("tests.logging")
+        log.info("written")
+        assert stream.entered.wait(5)  # the writer holds "written" and waits on the stream
+        log.info("queued")
+        log.info("dropped")
+        assert logging_stats()["dropped"] == 1
+    finally:
+        stream.release.set()
+        close_logging()
+    assert [line["message"] for line in _lines(stream)] == ["written", "queued"]
+
+
+async def test_request_id_is_echoed_or_generated():
+    async def endpoint(request):
+        return PlainTextResponse(structlog.contextvars.get_contextvars()["request_id"])
+
+    app = RequestIdMiddleware(Starlette(routes=[Route("/", endpoint)]))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        given = await client.get("/", headers={"X-Request-ID": "abc-123"})
+        assert given.headers["x-request-id"] == given.text == "abc-123"
+        generated = await client.get("/", headers={"X-Request-ID": "bad id\n"})
+        assert len(generated.headers["x-request-id"]) == 32 and generated.text == generated.headers["x-request-id"]
+    assert "request_id" not in structlog.contextvars.get_contextvars()
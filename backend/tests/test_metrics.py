@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.core.metrics import HTTP_REQUEST_SECONDS, Histogram, MetricsMiddleware, Registry, stats_family
+from app.utils.redis import InstrumentedRedis, close_redis, get_redis, init_redis
+
+
+async def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    registry.register_collector(lambda: stats_family("queue", "Queue", [({"queue": "a"}, {"ready": 2, "name": "x"})]))
+    histogram = Histogram("test_render_seconds", "Test", ("kind",), buckets=(0.1, 1.0))
+    registry.register(histogram)
+    for value in (0.05, 0.5, 5.0):
+        histogram.labels('say "hi"').observe(value)
+
+    text = await registry.render()
+    assert "# TYPE test_render_seconds histogram" in text
+    assert 'test_render_seconds_bucket{kind="say \\"hi\\"",le="0.1"} 1' in text
+    assert 'test_render_seconds_bucket{kind="say \\"hi\\"",le="1"} 2' in text
+    assert 'test_render_seconds_bucket{kind="say \\"hi\\"",le="+Inf"} 3' in text
+    assert 'test_render_seconds_count{kind="say \\"hi\\""} 3' in text
+    assert 'queue_ready{queue="a"} 2' in text
+    assert "queue_name" not in text
+
+
+async def test_middleware_labels_requests_by_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/items/1")).status_code == 200
+        assert (await client.get("/items/2")).status_code == 200
+        assert (await client.get("/nowhere")).status_code == 404
+        await client.request("X-RANDOM-1", "/nowhere")
+
+    assert HTTP_REQUEST_SECONDS.labels("GET", "/items/{item_id}", "200").count == 2
+    assert HTTP_REQUEST_SECONDS.labels("other", "unmatched", "404").count == 1
+    assert "X-RANDOM-1" not in "\n".join(HTTP_REQUEST_SECONDS.render())
+    assert HTTP_REQUEST_SECONDS.labels("GET", "unmatched", "404").count == 1
+
+
+async def test_redis_commands_are_timed_only_when_metrics_are_on():
+    for metrics, instrumented in ((False, False), (True, True)):
+        await init_redis(settings.redis_url, metrics=metrics)
+        try:
+            assert isinstance(get_redis(), InstrumentedRedis) is instrumented
+        finally:
+            await close_redis()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import os
+
+from starlette.requests import Request
+
+from app.utils.pdf_cache import PdfDiskCache, PdfDocument, cached_pdf, pdf_response
+
+
+def _request(headers: dict[str, str] | None = None) -> Request:
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_key_depends_on_paper_and_version():
+    k = PdfDiskCache.key("practice_session", "s1", None, "v1")
+    assert k == PdfDiskCache.key("practice_session", "s1", "LETTER", "v1")
+    assert k != PdfDiskCache.key("practice_session", "s1", "a4", "v1")
+    assert k != PdfDiskCache.key("practice_session", "s1", None, "v2")
+
+
+def _read(f) -> bytes:
+    with f:
+        return f.read()
+
+
+def test_put_get_and_lru_eviction(tmp_path):
+    cache = PdfDiskCache(tmp_path, max_bytes=250)
+    a, b, c = (PdfDiskCache.key("k", name, None, "v") for name in "abc")
+
+    _read(cache.put(a, b"a" * 100))
+    _read(cache.put(b, b"b" * 100))
+    os.utime(cache._path(a), (1, 1))
+    os.utime(cache._path(b), (2, 2))
+    assert _read(cache.get(a)) == b"a" * 100  # a becomes most recently used
+    _read(cache.put(c, b"c" * 100))
+
+    assert cache.get(b) is None
+    assert _read(cache.get(a)) == b"a" * 100
+    assert _read(cache.get(c)) == b"c" * 100
+    assert cache.stats()["bytes"] == 200
+    assert not list(tmp_path.glob("*/*.tmp"))
+
+
+def test_processes_share_the_size_limit(tmp_path):
+    # Two caches on one directory stand in for two gunicorn workers.
+    first, second = PdfDiskCache(tmp_path, max_bytes=250), PdfDiskCache(tmp_path, max_bytes=250)
+    keys = [PdfDiskCache.key("k", name, None, "v") for name in "abcd"]
+    for i, key in enumerate(keys):
+        _read((first if i % 2 else second).put(key, bytes([65 + i]) * 100))
+        os.utime(first._path(key), (i + 1, i + 1))
+
+    assert sum(p.stat().st_size for p in tmp_path.glob("*/*.pdf")) == 200
+    assert first.get(keys[0]) is None
+    assert _read(second.get(keys[3])) == b"D" * 100
+
+
+def test_evicted_file_stays_readable_once_opened(tmp_path):
+    cache = PdfDiskCache(tmp_path, max_bytes=150)
+    a, b = PdfDiskCache.key("k", "a", None, "v"), PdfDiskCache.key("k", "b", None, "v")
+    _read(cache.put(a, b"a" * 100))
+    opened = cache.get(a)
+    os.utime(cache._path(a), (1, 1))
+    _read(cache.put(b, b"b" * 100))  # evicts a
+    assert not cache._path(a).exists()
+    assert _read(opened) == b"a" * 100
+
+
+async def test_cached_pdf_renders_again_when_the_file_is_gone(tmp_path, monkeypatch):
+    from app.utils import pdf_cache
+
+    monkeypatch.setattr(pdf_cache, "_cache", PdfDiskCache(tmp_path, max_bytes=1000))
+    renders: list[int] = []
+
+    async def render() -> bytes:
+        renders.append(1)
+        return b"%PDF-1.4"
+
+    doc = await cached_pdf("k", "a", None, "v", render)
+    assert _read(doc.file) == b"%PDF-1.4"
+    for path in tmp_path.glob("*/*.pdf"):
+        path.unlink()  # evicted by another worker
+    doc = await cached_pdf("k", "a", None, "v", render)
+    assert _read(doc.file) == b"%PDF-1.4" and len(renders) == 2
+
+
+def test_index_survives_restart(tmp_path):
+    key = PdfDiskCache.key("k", "a", None, "v")
+    _read(PdfDiskCache(tmp_path, max_bytes=1000).put(key, b"x" * 10))
+
+    reopened = PdfDiskCache(tmp_path, max_bytes=1000)
+    assert reopened.stats()["entries"] == 1
+    assert _read(reopened.get(key)) == b"x" * 10
+
+
+async def test_pdf_response_revalidates_by_etag(tmp_path):
+    path = tmp_path / "r.pdf"
+    path.write_bytes(b"%PDF-1.4 test")
+
+    fresh = pdf_response(_request(), PdfDocument(file=open(path, "rb"), etag='"abc"'), filename="r.pdf")
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] == '"abc"'
+    assert fresh.headers["content-length"] == "13"
+    assert b"".join([chunk async for chunk in fresh.body_iterator]) == b"%PDF-1.4 test"
+
+    doc = PdfDocument(file=open(path, "rb"), etag='"abc"')
+    not_modified = pdf_response(_request({"If-None-Match": '"zzz", "abc"'}), doc, filename="r.pdf")
+    assert not_modified.status_code == 304
+    assert doc.file.closed
+
+    uncached = pdf_response(_request({"If-None-Match": '"abc"'}), PdfDocument(content=b"%PDF"), filename="r.pdf")
+    assert uncached.status_code == 200
+    assert uncached.headers["cache-control"] == "no-store"
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+import re
+
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Table
+
+from app.utils import pdf
+
+HEADER = {"student": "Student", "skill": "A.1 — Counting", "date": "2026-01-01", "questions_answered": 0}
+
+
+def _row(i: int) -> dict:
+    return {
+        "answered_at": "2026-01-01T00:00:00+00:00",
+        "question": f"What is {i} + 1?",
+        "submitted_answer": json.dumps({"value": i + 1}),
+        "correct_answer": json.dumps({"value": i + 1}),
+        "is_correct": True,
+        "time_spent_sec": 3,
+        "smartscore_before": 10,
+        "smartscore_after": 12,
+    }
+
+
+def _page_count(data: bytes) -> int:
+    return len(re.findall(rb"/Type /Page\b", data))
+
+
+def test_question_log_is_chunked_and_pulled_lazily():
+    pulled = 0
+
+    def rows():
+        nonlocal pulled
+        for i in range(pdf.LOG_CHUNK_ROWS * 2 + 5):
+            pulled += 1
+            yield _row(i)
+
+    story = pdf._practice_session_story(getSampleStyleSheet(), HEADER, rows())
+    tables = []
+    for flowable in story:
+        if isinstance(flowable, Table) and flowable._ncols == 8:
+            tables.append(flowable)
+            # Only the rows of the chunks handed out so far have been read.
+            assert pulled <= len(tables) * pdf.LOG_CHUNK_ROWS + 1
+    assert [t._nrows for t in tables] == [pdf.LOG_CHUNK_ROWS + 1, pdf.LOG_CHUNK_ROWS + 1, 6]
+    assert tables[2]._cellvalues[-1][0] == str(pdf.LOG_CHUNK_ROWS * 2 + 5)
+
+
+def test_rows_file_renders_like_inline_rows(tmp_path):
+    rows = [_row(i) for i in range(pdf.LOG_CHUNK_ROWS + 50)]
+    rows_path = tmp_path / "rows.jsonl"
+    rows_path.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+    inline = pdf.build_practice_session_report_pdf(paper="a4", header=HEADER, rows=rows)
+    streamed = pdf.build_practice_session_report_pdf(paper="a4", header=HEADER, rows_path=str(rows_path))
+    assert streamed.startswith(b"%PDF")
+    assert _page_count(streamed) == _page_count(inline) > 1
+
+
+def test_bundle_mixes_inline_and_file_rows(tmp_path):
+    rows_path = tmp_path / "rows.jsonl"
+    rows_path.write_text("".join(json.dumps(_row(i)) + "\n" for i in range(5)), encoding="utf-8")
+
+    data = pdf.build_practice_session_bundle_pdf(
+        paper=None,
+        reports=[{"header": HEADER, "rows": [_row(1)]}, {"header": HEADER, "rows_path": str(rows_path)}],
+    )
+    assert _page_count(data) == 2
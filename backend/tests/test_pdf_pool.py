@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.core.errors import AppError
+from app.utils.pdf_pool import PdfRenderPool
+
+CERTIFICATE = {
+    "kind": "certificate",
+    "paper": "a4",
+    "title": "Certificate of Mastery",
+    "student_name": "Student",
+    "skill_name": "A.1 — Counting",
+    "date_str": "2026-01-01",
+    "awarded_by": None,
+}
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+async def test_pool_renders_pdf(workers: int):
+    pool = PdfRenderPool(workers=workers, timeout_sec=60)
+    try:
+        pdf = await pool.render(CERTIFICATE)
+        assert pdf.startswith(b"%PDF")
+        stats = pool.stats()
+        assert stats["completed"] == 1
+        assert stats["in_flight"] == 0
+        assert stats["queue_depth"] == 0
+    finally:
+        pool.shutdown()
+
+
+async def test_pool_rejects_when_queue_full():
+    pool = PdfRenderPool(workers=0, max_concurrency=1, max_queue=1, timeout_sec=60)
+    try:
+        spec = {**CERTIFICATE}
+        first = asyncio.create_task(pool.render(spec))
+        second = asyncio.create_task(pool.render(spec))
+        await asyncio.sleep(0)
+        with pytest.raises(AppError) as exc:
+            await pool.render(spec)
+        assert exc.value.status_code == 503
+        assert (await first).startswith(b"%PDF")
+        assert (await second).startswith(b"%PDF")
+        assert pool.stats()["rejected"] == 1
+    finally:
+        pool.shutdown()
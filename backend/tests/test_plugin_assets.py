@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import gzip
+import json
+
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from app.plugins.assets import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    PluginStaticFiles,
+    build_assets,
+    read_build_hash,
+)
+
+HTML = "<!doctype html><html><body>" + "<p>plugin</p>" * 200 + "</body></html>"
+
+
+def _plugin(tmp_path):
+    plugin_dir = tmp_path / "demo" / "1.0.0"
+    plugin_dir.mkdir(parents=True)
+    (plugin_dir / "index.html").write_text(HTML, encoding="utf-8")
+    (plugin_dir / "manifest.json").write_text('{"id": "demo"}', encoding="utf-8")
+    (plugin_dir / "logo.png").write_bytes(b"\x89PNG" + b"\0" * 4096)
+    return plugin_dir
+
+
+def _client(tmp_path, **kwargs):
+    app = Starlette(routes=[Mount("/static/plugins", PluginStaticFiles(directory=tmp_path, **kwargs))])
+    return TestClient(app)
+
+
+def test_build_assets_writes_variants_and_hash(tmp_path):
+    plugin_dir = _plugin(tmp_path)
+    build_hash = build_assets(plugin_dir)
+
+    assert gzip.decompress((plugin_dir / "index.html.gz").read_bytes()).decode() == HTML
+    # Small and binary files are served as is
+    assert not (plugin_dir / "manifest.json.gz").exists()
+    assert not (plugin_dir / "logo.png.gz").exists()
+    assert json.loads((plugin_dir / ".build.json").read_text())["hash"] == build_hash
+    assert read_build_hash(plugin_dir) == build_hash
+
+    # Rebuilding unchanged files keeps the hash; any change produces a new one
+    assert build_assets(plugin_dir) == build_hash
+    (plugin_dir / "index.html").write_text(HTML + "<!-- v2 -->", encoding="utf-8")
+    assert build_assets(plugin_dir) != build_hash
+
+
+def test_serves_best_accepted_encoding(tmp_path):
+    build_assets(_plugin(tmp_path))
+    client = _client(tmp_path)
+
+    r = client.get("/static/plugins/demo/1.0.0/index.html", headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["content-type"].startswith("text/html")
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.text == HTML
+
+    r = client.get("/static/plugins/demo/1.0.0/index.html", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in r.headers
+    assert r.text == HTML
+
+
+def test_pinned_build_is_immutable(tmp_path):
+    build_hash = build_assets(_plugin(tmp_path))
+    client = _client(tmp_path)
+
+    r = client.get(f"/static/plugins/demo/1.0.0@{build_hash}/index.html")
+    assert r.status_code == 200
+    assert r.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+    # Stale or missing build hash: same file, but it must be revalidated
+    r = client.get("/static/plugins/demo/1.0.0@0000000000000000/index.html")
+    assert r.status_code == 200
+    assert r.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+    r = client.get("/static/plugins/demo/1.0.0/logo.png")
+    assert r.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+
+    etag = r.headers["etag"]
+    assert client.get("/static/plugins/demo/1.0.0/logo.png", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(f"/static/plugins/demo/1.0.0@{build_hash}/missing.js").status_code == 404
+
+
+def test_accel_redirect_skips_body(tmp_path):
+    build_hash = build_assets(_plugin(tmp_path))
+    client = _client(tmp_path, accel_prefix="/_plugin_files/")
+
+    r = client.get(f"/static/plugins/demo/1.0.0@{build_hash}/index.html")
+    assert r.status_code == 200
+    assert r.headers["x-accel-redirect"] == "/_plugin_files/demo/1.0.0/index.html"
+    assert r.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert r.content == b""
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.models.plugin import Plugin
+from app.plugins.evaluators import evaluate_default, resolve_evaluator_name
+from app.plugins.ingest import manifest_validator
+from app.plugins.registry import INVALIDATE_CHANNEL, PluginRegistry, build_entries
+
+
+def _plugin(plugin_id: str, version: str, *, name: str = "Plugin", manifest_data: dict | None = None) -> Plugin:
+    return Plugin(
+        id=f"{plugin_id}-{version}",
+        plugin_id=plugin_id,
+        name=name,
+        version=version,
+        entry="index.html",
+        api_version="1",
+        capabilities={},
+        height=400,
+        is_published=True,
+        manifest_data=manifest_data or {},
+    )
+
+
+def test_evaluator_resolution():
+    assert resolve_evaluator_name("anything", "Plugin", {"evaluator": "self_checked"}) == "self_checked"
+    # Unknown declared names fall back to the legacy rules
+    assert resolve_evaluator_name("math-addition-example", None, {"evaluator": "bogus"}) == "addition"
+    assert resolve_evaluator_name("drag-drop-math-example", None, None) == "drag_drop_sum"
+    assert resolve_evaluator_name("tsx-1a2b3c4d", None, None) == "self_checked"
+    assert resolve_evaluator_name("fractions", "Fractions TSX", None) == "self_checked"
+    assert resolve_evaluator_name("fractions", "Fractions", None) == "default"
+
+
+def test_build_entries_keeps_newest_and_binds_evaluator():
+    entries = build_entries([
+        _plugin("math-addition-example", "1.1.0"),
+        _plugin("math-addition-example", "1.0.0"),
+        _plugin("quiz", "1.0.0", manifest_data={"evaluator": "self_checked"}),
+    ])
+    assert entries["math-addition-example"].version == "1.1.0"
+
+    result = entries["math-addition-example"].evaluate({"question": "5 + 3 = ?", "answer": 8})
+    assert result["correct"] is True and result["score"] == 1.0
+
+    result = entries["quiz"].evaluate({"isCorrect": "false", "userAnswer": "4", "correctAnswer": "5"})
+    assert result["correct"] is False
+    assert result["correct_answer"] == "5"
+
+
+def test_default_evaluator_uses_self_check_only_when_sent():
+    assert evaluate_default({"isCorrect": True, "correctAnswer": "7"})["correct"] is True
+    assert evaluate_default({"answer": 7})["explanation"] == "Логика проверки для этого плагина еще не реализована"
+
+
+def test_manifest_accepts_evaluator():
+    manifest = {"id": "quiz", "name": "Quiz", "version": "1.0.0", "entry": "index.html", "apiVersion": "1"}
+    assert manifest_validator().is_valid({**manifest, "evaluator": "addition"})
+    assert not manifest_validator().is_valid({**manifest, "evaluator": "eval-js"})
+
+
+async def test_invalidate_reloads_this_process_before_publishing():
+    events: list[str] = []
+
+    class _Redis:
+        async def publish(self, channel: str, message: str) -> int:
+            events.append(f"publish {channel}")
+            return 0
+
+    registry = PluginRegistry(None, _Redis())
+    registry._listener = asyncio.get_running_loop().create_future()  # a subscribed listener
+
+    async def reload() -> None:
+        events.append("reload")
+
+    registry.reload = reload
+    await registry.invalidate()
+    assert events == ["reload", f"publish {INVALIDATE_CHANNEL}"]
@@ -7,8 +7,11 @@ import tempfile
 import zipfile
 from pathlib import Path
 
+import httpx
 import pytest
+from fastapi import FastAPI, File, UploadFile
 
+from app.core.body_limit import BodyLimitMiddleware
 from app.plugins.security import PluginSecurityError, scan_zip_contents
 from app.plugins.schemas import PluginManifest
 
@@ -143,3 +146,107 @@ def test_security_scan_size_limit(tmp_path: Path):
     # Должно вызвать ошибку
     with pytest.raises(PluginSecurityError, match="слишком большой"):
         scan_zip_contents(zip_path, max_size_mb=10)
+
+
+def _plugin_zip(path: Path, files: dict[str, bytes | str]) -> Path:
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+    return path
+
+
+def test_ingest_extracts_and_returns_manifest(tmp_path: Path):
+    """Тест распаковки за один проход: файлы на месте, manifest возвращается."""
+    from app.plugins.ingest import extract_plugin_zip
+
+    manifest = json.dumps({"id": "p", "name": "P", "version": "1.0.0", "entry": "index.html", "apiVersion": "1"})
+    zip_path = _plugin_zip(
+        tmp_path / "p.zip",
+        {"manifest.json": manifest, "index.html": "<html></html>", "assets/logo.png": b"\x89PNG" + bytes(range(256))},
+    )
+
+    dest = tmp_path / "out"
+    assert extract_plugin_zip(zip_path, dest, max_unpacked_mb=1) == manifest.encode()
+    assert (dest / "index.html").read_text() == "<html></html>"
+    assert (dest / "assets" / "logo.png").read_bytes().startswith(b"\x89PNG")
+
+
+def test_ingest_rejects_dangerous_member_and_zip_bomb(tmp_path: Path):
+    """Тест распаковки: опасный код и превышение распакованного размера."""
+    from app.plugins.ingest import extract_plugin_zip
+
+    evil = _plugin_zip(tmp_path / "evil.zip", {"index.html": "<html></html>", "app.js": "new Function('x')"})
+    with pytest.raises(PluginSecurityError, match="опасный код"):
+        extract_plugin_zip(evil, tmp_path / "evil", max_unpacked_mb=1)
+    assert not (tmp_path / "evil" / "app.js").exists()
+
+    bomb = _plugin_zip(tmp_path / "bomb.zip", {"data.bin": b"\0" * (3 * 1024 * 1024)})
+    assert bomb.stat().st_size < 1024 * 1024
+    with pytest.raises(PluginSecurityError, match="слишком большой"):
+        extract_plugin_zip(bomb, tmp_path / "bomb", max_unpacked_mb=2)
+
+
+def test_save_upload_stops_at_size_limit(tmp_path: Path):
+    """Тест потокового сохранения загрузки с лимитом размера."""
+    import io
+
+    from app.plugins.ingest import save_upload
+
+    assert save_upload(io.BytesIO(b"x" * 1000), tmp_path / "ok.zip", max_size_mb=1) == 1000
+    with pytest.raises(PluginSecurityError, match="слишком большой"):
+        save_upload(io.BytesIO(b"x" * (1024 * 1024 + 1)), tmp_path / "big.zip", max_size_mb=1)
+
+
+async def test_upload_over_the_limit_is_refused_before_the_body_is_parsed():
+    """Тест лимита тела запроса: по Content-Length и при потоковой передаче без него."""
+    app = FastAPI()
+    app.add_middleware(BodyLimitMiddleware, limits={"/upload": 1000})
+    received: list[int] = []
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        received.append(len(await file.read()))
+        return {}
+
+    async def chunks():  # no Content-Length: the body is sent chunked
+        yield b'--b\r\nContent-Disposition: form-data; name="file"; filename="a.zip"\r\n\r\n'
+        for _ in range(100):
+            yield b"x" * 100
+        yield b"\r\n--b--\r\n"
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.post("/upload", files={"file": ("a.zip", b"x" * 500)})).status_code == 200
+        r = await client.post("/upload", files={"file": ("a.zip", b"x" * 5000)})
+        assert r.status_code == 413
+        r = await client.post("/upload", content=chunks(), headers={"Content-Type": "multipart/form-data; boundary=b"})
+        assert r.status_code == 413
+    assert received == [500]
+
+
+def test_publish_dir_replaces_existing_version(tmp_path: Path):
+    """Тест замены директории версии плагина переименованием."""
+    from app.plugins.ingest import publish_dir
+
+    target = tmp_path / "plugins" / "p" / "1.0.0"
+    target.mkdir(parents=True)
+    (target / "stale.js").write_text("old")
+
+    staged = tmp_path / "staging" / "files"
+    staged.mkdir(parents=True)
+    (staged / "index.html").write_text("new")
+
+    publish_dir(staged, target)
+    assert sorted(p.name for p in target.iterdir()) == ["index.html"]
+    assert not staged.exists()
+    assert list((tmp_path / "staging").iterdir()) == []
+
+
+def test_manifest_validator_is_cached_and_checks_semver():
+    """Тест валидатора manifest: схема компилируется один раз и проверяет версию."""
+    import jsonschema
+
+    from app.plugins.ingest import manifest_validator
+
+    assert manifest_validator() is manifest_validator()
+    with pytest.raises(jsonschema.ValidationError):
+        manifest_validator().validate({"id": "p", "name": "P", "version": "invalid", "entry": "index.html", "apiVersion": "1"})
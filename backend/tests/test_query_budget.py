@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import pytest
+
+from app.db.query_tracer import assert_max_queries, statement_shape, trace_queries
+
+
+def test_statement_shape_collapses_parameters_and_in_lists():
+    a = statement_shape("SELECT * FROM users\n WHERE id = $1 AND role IN ($2, $3, $4)")
+    b = statement_shape("SELECT * FROM users WHERE id = $1 AND role IN ($2)")
+    assert a == b == "SELECT * FROM users WHERE id = ? AND role IN (?)"
+    assert statement_shape("SELECT 1 FROM t LIMIT 20") == statement_shape("SELECT 1 FROM t LIMIT 50")
+
+
+def test_nested_traces_and_budget_assertion():
+    with pytest.raises(AssertionError, match="ran 3 SQL statements, budget 2"):
+        with assert_max_queries(2, label="loop") as inner, trace_queries() as outer:
+            for i in range(3):
+                inner.record(f"SELECT * FROM skills WHERE id = {i}")
+    assert outer.count == 0
+    assert inner.repeated(3) == [("SELECT * FROM skills WHERE id = ?", 3)]
+
+
+async def test_analytics_routes_stay_within_budget(client, student_token):
+    headers = {"Authorization": f"Bearer {student_token}"}
+    for path in ("/api/v1/analytics/overview", "/api/v1/analytics/skills"):
+        r = await client.get(path, headers=headers)
+        assert r.status_code == 200, r.text
+        assert int(r.headers["X-Query-Count"]) <= int(r.headers["X-Query-Budget"]), path
+        assert int(r.headers["X-Query-Repeats"]) <= 2, path
+
+
+async def test_classroom_analytics_query_count_does_not_grow_with_students(client):
+    r = await client.post("/api/v1/auth/login", json={"email": "teacher@example.com", "password": "Password123!"})
+    headers = {"Authorization": f"Bearer {r.json()['data']['access_token']}"}
+    classroom_id = (await client.get("/api/v1/classrooms", headers=headers)).json()["data"][0]["id"]
+
+    with assert_max_queries(6, label="classroom analytics"):
+        r = await client.get(f"/api/v1/teacher/analytics/classroom/{classroom_id}", headers=headers)
+    assert r.status_code == 200, r.text
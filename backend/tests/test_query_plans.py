@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from collections.abc import Awaitable, Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.synthetic import SyntheticScale, populate, purge
+
+# Tables that grow with usage; a sequential scan on any of them is a regression.
+HOT_TABLES = {"practice_sessions", "practice_attempts", "questions", "assignment_status", "progress_snapshots"}
+
+# Recorded plan costs, committed with the queries they cover. A missing entry fails the test;
+# set QUERY_PLAN_UPDATE_BASELINES=1 to record new entries or re-record after an intentional change.
+BASELINES_PATH = Path(__file__).with_name("query_plan_baselines.json")
+COST_TOLERANCE = float(os.getenv("QUERY_PLAN_COST_TOLERANCE", "0.25"))
+
+SCALE = SyntheticScale(
+    students=int(os.getenv("QUERY_PLAN_STUDENTS", "400")),
+    skills=100,
+    questions_per_skill=40,
+    sessions_per_student=10,
+    attempts_per_session=20,
+)
+
+
+@pytest.fixture(scope="module")
+def synthetic_db() -> Iterator[dict[str, Any]]:
+    from app.core.config import settings
+
+    async def _setup() -> dict[str, Any]:
+        engine = create_async_engine(settings.database_url)
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessionmaker() as session:
+            async with session.begin():
+                await purge(session)
+                # Same data on every run, so the recorded plan costs stay comparable
+                await session.execute(text("SELECT setseed(0.26)"))
+                await populate(session, SCALE)
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for table in sorted(HOT_TABLES | {"users", "skills", "assignments", "enrollments"}):
+                await conn.execute(text(f"ANALYZE {table};"))
+            active = (
+                await conn.execute(
+                    text(
+                        "SELECT s.user_id, s.skill_id FROM practice_sessions s JOIN users u ON u.id = s.user_id"
+                        " WHERE s.finished_at IS NULL AND s.state ? 'synthetic' ORDER BY u.email, s.started_at LIMIT 1"
+                    )
+                )
+            ).one()
+            attempt = (
+                await conn.execute(
+                    text(
+                        "SELECT a.session_id, a.user_id, a.skill_id, a.question_id FROM practice_attempts a"
+                        " JOIN practice_sessions s ON s.id = a.session_id JOIN users u ON u.id = a.user_id"
+                        " WHERE s.state ? 'synthetic' ORDER BY u.email, s.started_at, a.answered_at LIMIT 1"
+                    )
+                )
+            ).one()
+        await engine.dispose()
+        return {
+            "active_user_id": active.user_id,
+            "active_skill_id": active.skill_id,
+            "session_id": attempt.session_id,
+            "user_id": attempt.user_id,
+            "skill_id": attempt.skill_id,
+            "question_id": attempt.question_id,
+        }
+
+    async def _teardown() -> None:
+        engine = create_async_engine(settings.database_url)
+        async with async_sessionmaker(engine)() as session:
+            async with session.begin():
+                await purge(session)
+        await engine.dispose()
+
+    data = asyncio.run(_setup())
+    yield data
+    asyncio.run(_teardown())
+
+
+async def _explain_calls(call: Callable[[AsyncSession], Awaitable[Any]]) -> list[dict[str, Any]]:
+    """Run `call`, capture every SELECT it issues and EXPLAIN (ANALYZE, BUFFERS) each one."""
+    from app.core.config import settings
+
+    engine = create_async_engine(settings.database_url)
+    captured: list[tuple[str, Any]] = []
+
+    def _capture(_conn, _cursor, statement, parameters, _context, _executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    plans: list[dict[str, Any]] = []
+    try:
+        async with AsyncSession(engine) as session:
+            event.listen(engine.sync_engine, "before_cursor_execute", _capture)
+            try:
+                await call(session)
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", _capture)
+            conn = await session.connection()
+            for statement, parameters in captured:
+                result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters)
+                raw = result.scalar_one()
+                plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+                plans.append({"sql": statement, "plan": plan["Plan"]})
+            await session.rollback()
+    finally:
+        await engine.dispose()
+    return plans
+
+
+def _walk(node: dict[str, Any]):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def _load_baselines() -> dict[str, float]:
+    if BASELINES_PATH.exists():
+        return json.loads(BASELINES_PATH.read_text(encoding="utf-8"))
+    return {}
+
+
+def _assert_plans(name: str, plans: list[dict[str, Any]]) -> None:
+    assert plans, f"{name}: no SELECT statements captured"
+
+    for i, entry in enumerate(plans):
+        seq_scans = [
+            n["Relation Name"]
+            for n in _walk(entry["plan"])
+            if n.get("Node Type") == "Seq Scan" and n.get("Relation Name") in HOT_TABLES
+        ]
+        assert not seq_scans, f"{name}[{i}]: sequential scan on {seq_scans}\n{entry['sql']}\n{json.dumps(entry['plan'], indent=2)}"
+
+    baselines = _load_baselines()
+    update = os.getenv("QUERY_PLAN_UPDATE_BASELINES") == "1"
+    changed = False
+    for i, entry in enumerate(plans):
+        key = f"{name}[{i}]"
+        cost = float(entry["plan"]["Total Cost"])
+        if update:
+            baselines[key] = cost
+            changed = True
+            continue
+        assert key in baselines, f"{key}: no baseline in {BASELINES_PATH.name}; record it with QUERY_PLAN_UPDATE_BASELINES=1"
+        limit = baselines[key] * (1 + COST_TOLERANCE)
+        assert cost <= limit, f"{key}: plan cost {cost:.1f} exceeds baseline {baselines[key]:.1f} (+{COST_TOLERANCE:.0%})\n{entry['sql']}"
+    if changed:
+        BASELINES_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+async def test_plan_get_active_session(synthetic_db):
+    from app.repositories.practice_repo import PracticeRepository
+
+    async def _call(session: AsyncSession) -> None:
+        found = await PracticeRepository(session).get_active_session(
+            user_id=synthetic_db["active_user_id"], skill_id=synthetic_db["active_skill_id"]
+        )
+        assert found is not None
+
+    _assert_plans("practice.get_active_session", await _explain_calls(_call))
+
+
+async def test_plan_has_attempt(synthetic_db):
+    from app.repositories.practice_repo import PracticeRepository
+
+    async def _call(session: AsyncSession) -> None:
+        assert await PracticeRepository(session).has_attempt(
+            session_id=synthetic_db["session_id"], question_id=synthetic_db["question_id"]
+        )
+
+    _assert_plans("practice.has_attempt", await _explain_calls(_call))
+
+
+@pytest.mark.parametrize("with_exclusions", [False, True])
+async def test_plan_list_for_skill_levels(synthetic_db, with_exclusions: bool):
+    from app.repositories.question_repo import QuestionRepository
+
+    async def _call(session: AsyncSession) -> None:
+        found = await QuestionRepository(session).list_for_skill_levels(
+            skill_id=synthetic_db["skill_id"],
+            levels=[2, 3, 1, 4, 5],
+            exclude_ids=[synthetic_db["question_id"]] if with_exclusions else [],
+            limit=1,
+        )
+        assert found
+
+    suffix = "exclude" if with_exclusions else "plain"
+    _assert_plans(f"questions.list_for_skill_levels.{suffix}", await _explain_calls(_call))
+
+
+async def test_plan_list_active_assignments_for_student_skill(synthetic_db):
+    from app.repositories.assignment_repo import AssignmentRepository
+
+    async def _call(session: AsyncSession) -> None:
+        await AssignmentRepository(session).list_active_for_student_skill(
+            student_id=synthetic_db["user_id"], skill_id=synthetic_db["skill_id"]
+        )
+
+    _assert_plans("assignments.list_active_for_student_skill", await _explain_calls(_call))
+
+
+async def test_plan_questions_log(synthetic_db):
+    from app.services.analytics_service import AnalyticsService
+
+    async def _call(session: AsyncSession) -> None:
+        log = await AnalyticsService(session).questions_log(
+            requester_id=str(synthetic_db["user_id"]),
+            requester_role="STUDENT",
+            skill_id=synthetic_db["skill_id"],
+        )
+        assert log["sessions"]
+
+    _assert_plans("analytics.questions_log", await _explain_calls(_call))
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.config import settings
+from app.db import session as db
+from app.utils.redis import close_redis, init_redis
+
+
+@pytest.fixture
+async def replica():
+    # The primary doubles as the "replica": not in recovery, so its lag is 0.
+    db.init_engine(settings.database_url)
+    db.init_read_engine(settings.database_url, max_lag_sec=1.0, lag_check_interval_sec=60, read_your_writes_sec=5)
+    await init_redis(settings.redis_url)
+    try:
+        yield db._replica
+    finally:
+        await close_redis()
+        await db.close_engine()
+
+
+async def test_reads_use_primary_without_replica():
+    db.init_engine(settings.database_url)
+    db.init_read_engine(None)
+    try:
+        assert await db.get_read_sessionmaker("someone") is db.get_sessionmaker()
+        assert db.pool_stats()["replica"] is None
+    finally:
+        await db.close_engine()
+
+
+async def test_replica_routing_and_read_your_writes(replica):
+    # Unchecked replica: reads stay on the primary.
+    assert await db.get_read_sessionmaker() is db.get_sessionmaker()
+    assert replica.primary_fallbacks == 1
+
+    assert await replica.check() is True
+    assert replica.lag_sec == 0.0
+    assert await db.get_read_sessionmaker("u1") is db._read_sessionmaker
+
+    await db.mark_recent_write("u1")
+    assert await db.get_read_sessionmaker("u1") is db.get_sessionmaker()
+    assert await db.get_read_sessionmaker("u2") is db._read_sessionmaker
+
+    stats = db.pool_stats()["replica"]
+    assert stats["replica_reads"] == 2
+    assert stats["read_your_writes"] == 1
+    assert stats["healthy"] is True
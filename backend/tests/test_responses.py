@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.responses import api_response
+from app.models.enums import QuestionType
+from app.schemas.base import ApiResponse, PaginatedMeta
+from app.schemas.catalog import SkillListItem
+from app.schemas.practice import PracticeSessionResponse, PracticeSubmitResponse, QuestionPublic
+from app.services.practice_service import _public_state
+
+
+def _state(answered: int) -> dict[str, Any]:
+    """`PracticeSession.state` of a generator skill after `answered` submits."""
+    generated = {
+        f"generated_{i}": {
+            "type": "MCQ",
+            "prompt": f"{i} + {i + 1}?",
+            "data": {"choices": [str(2 * i + k) for k in range(4)]},
+            "correct_answer": {"choice": str(2 * i + 1)},
+            "level": 1,
+        }
+        for i in range(answered + 1)
+    }
+    return {
+        "recent_question_ids": [],
+        "wrong_streak": 0,
+        "generated_questions": generated,
+        "current_question_id": f"generated_{answered}",
+        "answered_question_ids": [f"generated_{i}" for i in range(answered)],
+    }
+
+
+def _submit(answered: int) -> PracticeSubmitResponse:
+    at = datetime(2025, 3, 1, 9, 30, tzinfo=timezone.utc)
+    session = PracticeSessionResponse(
+        id="3f0a6f4e-6c2b-4b0e-9a51-1f3e8d2c7b90", skill_id=1, started_at=at, finished_at=None, questions_answered=answered,
+        correct_count=answered - 1, wrong_count=1, smartscore=72, time_elapsed_sec=600, state=_public_state(_state(answered)),
+        current_smartscore=72, best_smartscore=75, total_questions_answered=answered, total_correct=answered - 1,
+        total_incorrect=1, current_streak_correct=2, max_streak_correct=2, current_zone="REFINING", last_question_id=None,
+        last_activity_at=at, active_time_seconds=600, inactivity_threshold_seconds=120,
+    )
+    question = QuestionPublic(id=1, skill_id=1, type=QuestionType.MCQ, prompt="Сколько будет 7 + 8?", data={"choices": ["14", "15"]}, level=2)
+    return PracticeSubmitResponse(is_correct=True, explanation=None, session=session, next_question=question, finished=False)
+
+
+def _skills(n: int) -> list[SkillListItem]:
+    return [
+        SkillListItem(id=i, subject_id=1, grade_id=1, topic_id=i, topic_title=f"Тема {i}", code=f"A.{i}", title=f"Навык {i}", difficulty=1, tags=["дроби"])
+        for i in range(n)
+    ]
+
+
+async def _fastapi_body(response_model: Any, content: ApiResponse) -> bytes:
+    """What FastAPI sends for a returned `ApiResponse` when the route declares `response_model`."""
+    app = FastAPI()
+    app.get("/", response_model=response_model)(lambda: content)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return (await client.get("/")).content
+
+
+async def test_api_response_matches_fastapi_serialization():
+    meta = PaginatedMeta(page=1, page_size=5, total=5)
+    for model, data, meta in (
+        (ApiResponse[PracticeSubmitResponse], _submit(3), None),
+        (ApiResponse[list[SkillListItem]], _skills(5), meta),
+        (ApiResponse[dict], {"ok": True}, None),
+        (ApiResponse[list[SkillListItem]], [], meta),
+    ):
+        expected = await _fastapi_body(model, ApiResponse(data=data, meta=meta))
+        response = api_response(data, meta=meta)
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == json.loads(expected)
+
+
+def test_public_state_hides_generated_questions():
+    state = _state(3)
+    public = _public_state(state)
+    assert "generated_questions" not in public and "answered_question_ids" not in public
+    assert public["current_question_id"] == "generated_3"
+    assert "generated_questions" in state
+
+
+def test_openapi_still_describes_fast_routes():
+    from app.main import app
+
+    paths = app.openapi()["paths"]
+    for path, method, schema in (
+        ("/api/v1/practice/sessions/{session_id}/submit", "post", "ApiResponse_PracticeSubmitResponse_"),
+        ("/api/v1/skills", "get", "ApiResponse_list_SkillListItem__"),
+        ("/api/v1/auth/login", "post", "ApiResponse_AuthTokensResponse_"),
+    ):
+        content = paths[path][method]["responses"]["200"]["content"]["application/json"]
+        assert content["schema"]["$ref"].endswith(f"/{schema}")
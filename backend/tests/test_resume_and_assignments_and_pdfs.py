@@ -161,3 +161,105 @@ async def test_assignment_completes_at_target_smartscore_and_pdfs_work(client, c
     assert pdf2.status_code == 200
     assert pdf2.headers["content-type"].startswith("application/pdf")
     assert len(pdf2.content) > 1000
+
+    # Every student completed the assignment, so its report is cached and revalidates by ETag.
+    etag = pdf2.headers["etag"]
+    assert int(pdf2.headers["content-length"]) == len(pdf2.content)
+    pdf2_again = await client.get(
+        f"/api/v1/reports/assignments/{assignment_id}.pdf",
+        headers={"Authorization": f"Bearer {teacher_token}", "If-None-Match": etag},
+    )
+    assert pdf2_again.status_code == 304
+
+    # CSV exports stream with a header row first.
+    grid_csv = await client.get(
+        f"/api/v1/teacher/classrooms/{classroom_id}/assignments/{assignment_id}/score-grid.csv",
+        headers={"Authorization": f"Bearer {teacher_token}"},
+    )
+    assert grid_csv.status_code == 200, grid_csv.text
+    assert grid_csv.headers["content-type"].startswith("text/csv")
+    grid_lines = grid_csv.content.decode("utf-8-sig").splitlines()
+    assert grid_lines[0].startswith("student_id,student_name")
+    assert any("COMPLETED" in line for line in grid_lines[1:])
+
+    attempts_csv = await client.get(
+        f"/api/v1/teacher/classrooms/{classroom_id}/attempts.csv",
+        params={"skill_id": 1},
+        headers={"Authorization": f"Bearer {teacher_token}"},
+    )
+    assert attempts_csv.status_code == 200, attempts_csv.text
+    attempt_lines = attempts_csv.content.decode("utf-8-sig").splitlines()
+    assert attempt_lines[0].startswith("answered_at,student_id")
+    assert len(attempt_lines) > 1
+
+    skill_csv = await client.get("/api/v1/analytics/skills/1/attempts.csv", headers={"Authorization": f"Bearer {teacher_token}"})
+    assert skill_csv.status_code == 200, skill_csv.text
+    assert len(skill_csv.content.decode("utf-8-sig").splitlines()) == len(attempt_lines)
+
+
+async def _wait_for_export(client, job_id: str, token: str) -> dict:
+    for _ in range(100):
+        r = await client.get(f"/api/v1/teacher/report-exports/{job_id}", headers={"Authorization": f"Bearer {token}"})
+        assert r.status_code == 200, r.text
+        job = r.json()["data"]
+        if job["status"] in {"done", "failed"}:
+            return job
+        await asyncio.sleep(0.1)
+    raise AssertionError("export did not finish")
+
+
+@pytest.mark.asyncio
+async def test_bulk_report_export(client, cleanup_practice_tables):
+    import io
+    import zipfile
+
+    teacher = await _login(client, "teacher@example.com", "Password123!")
+    student = await _login(client, "student@example.com", "Password123!")
+    teacher_token = teacher["access_token"]
+
+    cls = await client.get("/api/v1/classrooms", headers={"Authorization": f"Bearer {teacher_token}"})
+    classroom_id = cls.json()["data"][0]["id"]
+
+    start = await client.post(
+        "/api/v1/practice/sessions",
+        json={"skill_id": 1},
+        headers={"Authorization": f"Bearer {student['access_token']}", "Idempotency-Key": "export-start"},
+    )
+    assert start.status_code == 200, start.text
+    sid = start.json()["data"]["id"]
+
+    from app.core.config import settings
+
+    engine = create_async_engine(settings.database_url)
+    async with engine.begin() as conn:
+        await conn.execute(text("UPDATE practice_sessions SET finished_at = now() WHERE id = :id"), {"id": sid})
+    await engine.dispose()
+
+    for fmt in ("zip", "pdf"):
+        r = await client.post(
+            "/api/v1/teacher/report-exports",
+            json={"classroom_id": classroom_id, "format": fmt},
+            headers={"Authorization": f"Bearer {teacher_token}"},
+        )
+        assert r.status_code == 202, r.text
+        job = await _wait_for_export(client, r.json()["data"]["id"], teacher_token)
+        assert job["status"] == "done", job
+        assert job["done"] == job["total"] == 1
+
+        f = await client.get(f"/api/v1/teacher/report-exports/{job['id']}/file", headers={"Authorization": f"Bearer {teacher_token}"})
+        assert f.status_code == 200
+        if fmt == "zip":
+            with zipfile.ZipFile(io.BytesIO(f.content)) as zf:
+                names = zf.namelist()
+                assert len(names) == 1
+                assert zf.read(names[0]).startswith(b"%PDF")
+        else:
+            assert f.content.startswith(b"%PDF")
+
+    # Students cannot start exports.
+    r = await client.post(
+        "/api/v1/teacher/report-exports",
+        json={"classroom_id": classroom_id},
+        headers={"Authorization": f"Bearer {student['access_token']}"},
+    )
+    assert r.status_code == 403
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.utils.score_grid_bus import RedisStreamScoreGridBus, ScoreGridBus
+
+
+async def test_bus_fans_out_to_subscribers_of_the_same_assignment():
+    bus = ScoreGridBus()
+    a1 = await bus.subscribe("a")
+    a2 = await bus.subscribe("a")
+    b = await bus.subscribe("b")
+
+    await bus.publish([("a", {"student_id": "s1", "best_smartscore": 40}), ("a", {"student_id": "s2", "best_smartscore": 10})])
+
+    assert [d["student_id"] for d in await a1.get(timeout=0.1)] == ["s1", "s2"]
+    assert [d["student_id"] for d in await a2.get(timeout=0.1)] == ["s1", "s2"]
+    assert await b.get(timeout=0.01) == []
+
+
+async def test_bus_unsubscribe_stops_delivery():
+    bus = ScoreGridBus()
+    sub = await bus.subscribe("a")
+    assert bus.subscriber_count("a") == 1
+
+    await sub.close()
+    assert bus.subscriber_count("a") == 0
+
+    await bus.publish([("a", {"student_id": "s1"})])
+    assert await sub.get(timeout=0.01) == []
+
+
+async def test_bus_bounds_slow_subscriber_queue():
+    bus = ScoreGridBus(queue_size=2)
+    sub = await bus.subscribe("a")
+
+    await bus.publish([("a", {"n": i}) for i in range(5)])
+
+    assert [d["n"] for d in await sub.get(timeout=0.1)] == [0, 1]
+    assert sub.dropped == 3
+
+
+async def test_redis_stream_bus_delivers_deltas_across_processes():
+    redis = Redis.from_url(settings.redis_url, decode_responses=True)
+    # Two buses on one Redis stand in for two API processes.
+    watcher, publisher = RedisStreamScoreGridBus(redis, block_ms=100), RedisStreamScoreGridBus(redis, block_ms=100)
+    assignment_id = uuid.uuid4().hex
+    try:
+        await publisher.publish([(assignment_id, {"n": 0})])  # before the subscription: not replayed
+        sub = await watcher.subscribe(assignment_id)
+        await publisher.publish([(assignment_id, {"n": 1}), ("other", {"n": 2}), (assignment_id, {"n": 3})])
+        deltas = await sub.get(timeout=2)
+        while len(deltas) < 2:
+            deltas += await sub.get(timeout=2)
+        assert [d["n"] for d in deltas] == [1, 3]
+        assert await redis.ttl(f"grid:{assignment_id}") > 0
+
+        await sub.close()
+        assert watcher._readers == {}
+    finally:
+        await watcher.close()
+        await publisher.close()
+        await redis.delete(f"grid:{assignment_id}", "grid:other")
+        await redis.aclose()
+
+
+async def _login(client, email: str) -> dict:
+    r = await client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200, r.text
+    return r.json()["data"]
+
+
+class _SseStream:
+    """Drives one streaming request through the ASGI app; httpx's ASGI transport buffers whole bodies."""
+
+    def __init__(self, app, path: str, token: str) -> None:
+        self._chunks: asyncio.Queue[bytes] = asyncio.Queue()
+        self._disconnected = asyncio.Event()
+        self._requested = False
+        self._buffer = ""
+        self.status: int | None = None
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"test"), (b"authorization", f"Bearer {token}".encode())],
+            "client": ("127.0.0.1", 1),
+            "server": ("test", 80),
+        }
+        self._task = asyncio.create_task(app(scope, self._receive, self._send))
+
+    async def _receive(self) -> dict:
+        if not self._requested:
+            self._requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self._disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def _send(self, message: dict) -> None:
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+        elif message["type"] == "http.response.body":
+            await self._chunks.put(message.get("body", b""))
+
+    async def event(self) -> tuple[str, dict]:
+        """The next named event, skipping pings."""
+        while True:
+            while "\n\n" in self._buffer:
+                frame, self._buffer = self._buffer.split("\n\n", 1)
+                fields = dict(line.split(": ", 1) for line in frame.splitlines() if not line.startswith(":"))
+                if "event" in fields:
+                    return fields["event"], json.loads(fields["data"])
+            self._buffer += (await asyncio.wait_for(self._chunks.get(), timeout=10)).decode()
+
+    async def close(self) -> None:
+        self._disconnected.set()
+        await asyncio.wait_for(self._task, timeout=10)
+
+
+async def test_score_grid_stream_sends_snapshot_then_submit_delta(client, cleanup_practice_tables):
+    from app.main import app
+
+    teacher = (await _login(client, "teacher@example.com"))["access_token"]
+    student = await _login(client, "student@example.com")
+    teacher_headers = {"Authorization": f"Bearer {teacher}"}
+    student_headers = {"Authorization": f"Bearer {student['access_token']}"}
+    classroom_id = (await client.get("/api/v1/classrooms", headers=teacher_headers)).json()["data"][0]["id"]
+    r = await client.post(
+        "/api/v1/assignments",
+        json={"classroom_id": classroom_id, "skill_id": 1, "due_at": None, "target_smartscore": 100},
+        headers={**teacher_headers, "Idempotency-Key": f"grid-stream-{uuid.uuid4()}"},
+    )
+    assert r.status_code == 200, r.text
+    assignment_id = r.json()["data"]["id"]
+
+    stream = _SseStream(app, f"/api/v1/teacher/classrooms/{classroom_id}/assignments/{assignment_id}/score-grid/stream", teacher)
+    try:
+        event, snapshot = await stream.event()
+        assert stream.status == 200 and event == "snapshot"
+        assert snapshot["assignment"]["id"] == assignment_id
+
+        r = await client.post("/api/v1/practice/sessions", json={"skill_id": 1}, headers={**student_headers, "Idempotency-Key": f"grid-start-{uuid.uuid4()}"})
+        session = r.json()["data"]
+        question = session["current_question"]
+        answer = {"choice": "A"} if question["type"] == "MCQ" else {"value": -1}
+        r = await client.post(
+            f"/api/v1/practice/sessions/{session['id']}/submit",
+            json={"question_id": question["id"], "submitted_answer": answer, "time_spent_sec": 3},
+            headers={**student_headers, "Idempotency-Key": f"grid-submit-{uuid.uuid4()}"},
+        )
+        assert r.status_code == 200, r.text
+
+        event, delta = await stream.event()
+        assert event == "delta"
+        assert delta["student_id"] == student["user"]["id"]
+        assert (delta["status"], delta["questions_answered"], delta["time_spent_seconds"]) == ("IN_PROGRESS", 1, 3)
+    finally:
+        await stream.close()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Generous for CI machines; tighten locally with the env vars.
+IMPORT_BUDGET_MS = float(os.environ.get("STARTUP_IMPORT_BUDGET_MS", "1500"))
+READY_BUDGET_MS = float(os.environ.get("STARTUP_READY_BUDGET_MS", "5000"))
+
+# Imported on first use (or by the lifespan warm-up), never by `import app.main`.
+LAZY_MODULES = ("reportlab", "jsonschema", "jose", "passlib", "argon2")
+
+
+def _python(code: str, *options: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, *options, "-c", textwrap.dedent(code)],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+
+def test_import_stays_lazy_and_within_budget():
+    proc = _python(
+        f"""
+        import sys
+        import app.main
+        print(",".join(m for m in {LAZY_MODULES!r} if m in sys.modules))
+        """,
+        "-X",
+        "importtime",
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == "", f"imported at startup: {proc.stdout.strip()}"
+
+    # stderr lines: "import time: <self us> | <cumulative us> | <indented module>"
+    timings = []
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "self [us]" not in line:
+            _, cumulative, module = line[len("import time:") :].split("|")
+            timings.append((int(cumulative) / 1000, module.rstrip()))
+    top_level = [(ms, module) for ms, module in timings if not module.startswith("  ")]
+    total_ms = sum(ms for ms, _ in top_level)
+    slowest = "\n".join(f"{ms:8.1f} ms {module.strip()}" for ms, module in sorted(top_level, reverse=True)[:10])
+    assert total_ms <= IMPORT_BUDGET_MS, f"imports took {total_ms:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms):\n{slowest}"
+
+
+def test_app_ready_within_budget():
+    proc = _python(
+        """
+        import asyncio, time
+        from asgi_lifespan import LifespanManager
+
+        async def main():
+            started = time.perf_counter()
+            from app.main import app
+            async with LifespanManager(app):
+                print("ready_ms", (time.perf_counter() - started) * 1000)
+
+        asyncio.run(main())
+        """
+    )
+    assert proc.returncode == 0, proc.stderr
+    # Log records share stdout and the log writer thread may flush them after the timing line.
+    ready_ms = next(float(line.split()[1]) for line in proc.stdout.splitlines() if line.startswith("ready_ms "))
+    assert ready_ms <= READY_BUDGET_MS, f"app ready in {ready_ms:.0f} ms (budget {READY_BUDGET_MS:.0f} ms)"
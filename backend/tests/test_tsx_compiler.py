@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+import structlog.testing
+
+from app.core.config import settings
+from app.plugins.compiler import TsxCompileError, TsxCompiler
+from app.plugins.tsx_transformer import prepare_tsx, render_plugin_html, resolve_esbuild_path
+
+SOURCE = """
+import React, { useState } from 'react';
+
+export default function Counter() {
+  const [n, setN] = useState<number>(0);
+  return <button onClick={() => setN(n + 1)}>{n}</button>;
+}
+"""
+
+
+def test_prepare_logs_sizes_not_plugin_source():
+    with structlog.testing.capture_logs() as logs:
+        prepare_tsx(SOURCE)
+    assert "useState" not in repr(logs)
+
+
+def test_prepare_and_render_html(tmp_path, monkeypatch):
+    code, component = prepare_tsx(SOURCE)
+    assert component == "Counter"
+    assert "export default" not in code
+    assert "const { useState } = React;" in code
+    assert code.rstrip().endswith("__mountPlugin(Counter);")
+
+    # No vendor build: CDN fallback
+    monkeypatch.setattr(settings, "plugin_vendor_dir", str(tmp_path))
+    html = render_plugin_html("__mountPlugin(Counter);", "Counter plugin")
+    assert "<title>Counter plugin</title>" in html
+    assert "window.__mountPlugin = function(Component)" in html
+    assert "https://cdn.tailwindcss.com" in html
+
+    (tmp_path / "manifest.json").write_text(json.dumps({"js": "plugin-vendor.abc.js", "css": "plugin-tailwind.def.css"}))
+    html = render_plugin_html("__mountPlugin(Counter);", "Counter plugin")
+    assert '<script src="/static/vendor/plugin-vendor.abc.js"></script>' in html
+    assert '<link rel="stylesheet" href="/static/vendor/plugin-tailwind.def.css">' in html
+    assert "unpkg.com" not in html and "cdn.tailwindcss.com" not in html
+
+
+async def test_cache_hit_skips_esbuild(tmp_path):
+    # No esbuild binary at this path: a hit must not need one.
+    compiler = TsxCompiler(cache_dir=tmp_path, esbuild_path=str(tmp_path / "missing-esbuild"))
+    key = await compiler._key("const x = 1;")
+    await compiler._write_cache(key, "var x = 1;\n")
+
+    assert await compiler.compile("const x = 1;") == "var x = 1;\n"
+    stats = compiler.stats()
+    assert stats["cache_hits"] == 1
+    assert stats["compiled"] == 0
+
+
+async def test_missing_esbuild_raises(tmp_path):
+    compiler = TsxCompiler(cache_dir=tmp_path, esbuild_path="")
+    with pytest.raises(TsxCompileError, match="esbuild binary not found"):
+        await compiler.compile("const y = 2;")
+
+
+@pytest.mark.skipif(resolve_esbuild_path() is None, reason="esbuild is not installed")
+async def test_compiles_once_and_caches(tmp_path):
+    compiler = TsxCompiler(cache_dir=tmp_path, max_concurrency=1)
+    code, _component = prepare_tsx(SOURCE)
+
+    first, second = await asyncio.gather(compiler.compile(code), compiler.compile(code))
+    assert first == second
+    assert "React.createElement" in first
+    assert await compiler.compile(code) == first
+
+    stats = compiler.stats()
+    assert stats["compiled"] == 1
+    assert stats["deduplicated"] == 1
+    assert stats["cache_hits"] == 1
+
+    with pytest.raises(TsxCompileError, match="compilation failed"):
+        await compiler.compile("const = ;")
+    assert compiler.stats()["failed"] == 1
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+
+import pytest
+from asgi_lifespan import LifespanManager
+from pydantic import BaseModel, ValidationError
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.worker.queue import InMemoryQueueBackend, Job, RedisQueueBackend, close_job_queue, enqueue, get_job, get_job_queue, init_job_queue, task
+from app.utils import cpus
+from app.worker.worker import Worker, parse_queues
+
+
+class EchoPayload(BaseModel):
+    value: int
+
+
+calls: list[int] = []
+
+
+@task("tests.echo", payload=EchoPayload, queue="tests")
+async def _echo(payload: EchoPayload) -> dict:
+    calls.append(payload.value)
+    return {"value": payload.value * 2}
+
+
+@task("tests.flaky", payload=EchoPayload, queue="tests", max_retries=2, backoff_sec=0.01)
+async def _flaky(payload: EchoPayload) -> dict:
+    calls.append(payload.value)
+    if len(calls) < 3:
+        raise RuntimeError("boom")
+    return {"ok": True}
+
+
+@task("tests.broken", payload=EchoPayload, queue="tests", max_retries=1, backoff_sec=0.01)
+async def _broken(payload: EchoPayload) -> None:
+    raise RuntimeError("always")
+
+
+@pytest.fixture
+async def worker():
+    calls.clear()
+    init_job_queue("memory")
+    w = Worker(get_job_queue(), {"tests": 2}, poll_timeout=0.05)
+    w.start()
+    yield get_job_queue()
+    await w.stop(grace_sec=1)
+    await close_job_queue()
+
+
+async def _wait(job_id: str, statuses: set[str]):
+    for _ in range(200):
+        job = await get_job(job_id)
+        if job is not None and job.status in statuses:
+            return job
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"job {job_id} stuck in {job.status if job else None}")
+
+
+async def test_job_runs_and_stores_result(worker):
+    job = await enqueue("tests.echo", EchoPayload(value=21))
+    done = await _wait(job.id, {"succeeded"})
+    assert done.result == {"value": 42}
+    assert done.attempts == 1
+
+
+async def test_job_retries_with_backoff(worker):
+    job = await enqueue("tests.flaky", {"value": 1})
+    done = await _wait(job.id, {"succeeded"})
+    assert done.attempts == 3
+    assert calls == [1, 1, 1]
+
+
+async def test_job_dead_letters_after_retries(worker: InMemoryQueueBackend):
+    job = await enqueue("tests.broken", {"value": 1})
+    dead = await _wait(job.id, {"dead"})
+    assert dead.attempts == 2
+    assert "always" in dead.error
+    assert (await worker.depth("tests"))["dead"] == 1
+
+
+async def test_enqueue_validates_payload(worker):
+    with pytest.raises(ValidationError):
+        await enqueue("tests.echo", {"value": "not a number"})
+
+
+async def test_enqueue_refuses_unregistered_tasks(worker):
+    with pytest.raises(RuntimeError, match="not registered"):
+        await enqueue("tests.unknown", {"value": 1})
+
+
+async def test_api_enqueues_with_the_registered_queue_and_retries(monkeypatch):
+    from app.main import app
+
+    # Production defaults: redis backend and no inline worker, so the API never starts a Worker.
+    monkeypatch.setattr(settings, "job_queue_backend", "redis")
+    monkeypatch.setattr(settings, "job_inline_worker", False)
+    async with LifespanManager(app):
+        backend = get_job_queue()
+        assert isinstance(backend, RedisQueueBackend)
+        job = await enqueue("reports.export", {"job_id": uuid.uuid4().hex})
+        try:
+            stored = await backend.load(job.id)
+            assert (stored.queue, stored.max_retries) == ("reports", 0)
+            assert await backend.pop("reports", 0.1) == job.id
+        finally:
+            await backend.ack("reports", job.id)
+
+
+async def test_redis_reaper_requeues_claims_that_never_got_a_lease():
+    redis = Redis.from_url(settings.redis_url, decode_responses=True)
+    prefix = f"tests-jobs-{uuid.uuid4().hex[:8]}"
+    backend = RedisQueueBackend(redis, prefix=prefix, claim_timeout_sec=60)
+    try:
+        job = Job(id="crashed", task="tests.echo", queue="tests", payload={"value": 1}, max_retries=0)
+        await backend.save(job)
+        await backend.push("tests", job.id)
+        assert await backend.pop("tests", 0.1) == job.id  # the consumer dies before saving a lease
+
+        now = time.time()
+        assert await backend.requeue_expired("tests", now) == 0
+        assert await backend.requeue_expired("tests", now + 30) == 0
+        assert await backend.requeue_expired("tests", now + 61) == 1
+        assert await backend.depth("tests") == {"ready": 1, "delayed": 0, "processing": 0, "dead": 0}
+
+        # Claimed again: the expired lease from a reaped attempt is gone
+        assert await backend.pop("tests", 0.1) == job.id
+        reclaimed = await backend.load(job.id)
+        reclaimed.lease_until = now - 1
+        await backend.save(reclaimed)
+        assert await backend.requeue_expired("tests", now) == 1
+        assert (await backend.load(job.id)).lease_until is None
+        assert await backend.pop("tests", 0.1) == job.id
+        assert await backend.requeue_expired("tests", now + 61) == 0
+    finally:
+        keys = [key async for key in redis.scan_iter(match=f"{prefix}:*")]
+        if keys:
+            await redis.delete(*keys)
+        await redis.aclose()
+
+
+def test_parse_queues():
+    assert parse_queues("default=4, reports=2,misc") == {"default": 4, "reports": 2, "misc": 1}
+
+
+def test_usable_cpu_count_honours_the_cgroup_quota(tmp_path, monkeypatch):
+    monkeypatch.setattr(cpus.os, "sched_getaffinity", lambda pid: set(range(64)), raising=False)
+    cpu_max = tmp_path / "cpu.max"
+    monkeypatch.setattr(cpus, "CGROUP_CPU_MAX", cpu_max)
+    assert cpus.usable_cpu_count() == 64  # no cgroup file
+    cpu_max.write_text("max 100000\n")
+    assert cpus.usable_cpu_count() == 64
+    cpu_max.write_text("150000 100000\n")
+    assert cpus.usable_cpu_count() == 2